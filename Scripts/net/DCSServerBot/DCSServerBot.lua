@@ -13,6 +13,7 @@ end
 local MAGIC_BYTE = string.char(1)
 local MAX_CHUNK   = 65000          -- safe UDP payload size
 local HEADER_SEP  = '|'            -- separator in the header
+local MAX_BATCH   = MAX_CHUNK - 256  -- leave room for the envelope of a batch
 local HEADER_FMT = '%s'..HEADER_SEP..'%d'..HEADER_SEP..'%d'..HEADER_SEP..'%d'..HEADER_SEP
 
 -- load the configuration
@@ -38,12 +39,7 @@ dcsbot.sendBotMessage = dcsbot.sendBotMessage or function (msg, channel, raw)
 	dcsbot.sendBotTable(messageTable, channel)
 end
 
-dcsbot.sendBotTable = dcsbot.sendBotTable or function (tbl, channel)
-	tbl.server_name = cfg.name
-    tbl.channel = tostring(channel or "-1")
-
-    local msg = net.lua2json(tbl)
-
+local function sendPacket(msg)
     if #msg <= MAX_CHUNK then
         socket.try(dcsbot.UDPSendSocket:sendto(msg, config.BOT_HOST, config.BOT_PORT))
         return
@@ -64,6 +60,53 @@ dcsbot.sendBotTable = dcsbot.sendBotTable or function (tbl, channel)
     end
 end
 
+-- events are sent in batches of EVENT_BATCHING ms (0 = per frame), if configured
+local batch = {}
+local batch_size = 0
+local batch_started = nil
+
+dcsbot.flushBotTables = dcsbot.flushBotTables or function()
+    if #batch == 0 then
+        return
+    end
+    -- the events are already encoded, so the envelope is put together as a string
+    local msg = '{"command":"batch","server_name":' .. net.lua2json(cfg.name) .. ',"events":[' ..
+            table.concat(batch, ',') .. ']}'
+    batch = {}
+    batch_size = 0
+    batch_started = nil
+    sendPacket(msg)
+end
+
+dcsbot.sendBotTable = dcsbot.sendBotTable or function (tbl, channel)
+	tbl.server_name = cfg.name
+    tbl.channel = tostring(channel or "-1")
+
+    local msg = net.lua2json(tbl)
+
+    -- replies to the bot and large messages are sent at once, after the events that happened before them
+    if config.EVENT_BATCHING == nil or tbl.channel:sub(1, 5) == 'sync-' or #msg > MAX_BATCH then
+        dcsbot.flushBotTables()
+        sendPacket(msg)
+        return
+    end
+    if batch_size + #msg > MAX_BATCH then
+        dcsbot.flushBotTables()
+    elseif batch_started and (socket.gettime() - batch_started) * 1000 >= math.max(config.EVENT_BATCHING, 100) then
+        -- the timer does not run while the mission is paused
+        dcsbot.flushBotTables()
+    end
+    table.insert(batch, msg)
+    batch_size = batch_size + #msg + 1
+    if not batch_started then
+        batch_started = socket.gettime()
+        timer.scheduleFunction(function()
+            dcsbot.flushBotTables()
+            return nil
+        end, nil, timer.getTime() + math.max(config.EVENT_BATCHING, 1) / 1000)
+    end
+end
+
 dcsbot.enableExtension = dcsbot.enableExtension or function (extension, cfg)
     local msg = {
         command = 'enableExtension',
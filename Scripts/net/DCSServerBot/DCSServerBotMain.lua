@@ -12,9 +12,46 @@ local config	= require("DCSServerBotConfig")
 package.path  = package.path..";.\\LuaSocket\\?.lua;"
 package.cpath = package.cpath..";.\\LuaSocket\\?.dll;"
 local socket 	= require("socket")
+local utils 	= require("DCSServerBotUtils")
 
 local dcsbotgui = {}
 
+-- messages larger than a datagram are sent in fragments of MAGIC_BYTE .. "<msg_id>|<total>|<part>|" .. payload
+local MAGIC_BYTE = 1
+local MAX_WAIT = 10     -- seconds until incomplete messages are dropped
+local fragments = {}
+
+local function reassemble(msg)
+    local _, header_end, msg_id, total, part = msg:find('^\1([^|]+)|(%d+)|(%d+)|')
+    if not msg_id then
+        log.write('DCSServerBot', log.ERROR, 'Malformed fragment received, dropping it.')
+        return nil
+    end
+    total, part = tonumber(total), tonumber(part)
+    local now = os.time()
+    local buffer = fragments[msg_id]
+    if not buffer or buffer.total ~= total then
+        -- drop what was never completed
+        for id, other in pairs(fragments) do
+            if now - other.timestamp > MAX_WAIT then
+                log.write('DCSServerBot', log.ERROR, 'Incomplete message ' .. id .. ' dropped.')
+                fragments[id] = nil
+            end
+        end
+        buffer = { parts = {}, count = 0, total = total, timestamp = now }
+        fragments[msg_id] = buffer
+    end
+    if not buffer.parts[part] then
+        buffer.parts[part] = msg:sub(header_end + 1)
+        buffer.count = buffer.count + 1
+    end
+    if buffer.count < buffer.total then
+        return nil
+    end
+    fragments[msg_id] = nil
+    return table.concat(buffer.parts, '', 1, buffer.total)
+end
+
 local function createSimulationFrameHandler()
     local host, port = config.DCS_HOST, config.DCS_PORT
     local ip = socket.dns.toip(host)
@@ -28,7 +65,10 @@ local function createSimulationFrameHandler()
         local msg, err
         repeat
             msg, err = UDPRecvSocket:receive()
-            if not err then
+            if not err and msg:byte(1) == MAGIC_BYTE then
+                msg = reassemble(msg)
+            end
+            if not err and msg then
                 local decoded = net.json2lua(msg)
                 local commandFunc = dcsbot[decoded.command]
                 if commandFunc then
@@ -36,6 +76,9 @@ local function createSimulationFrameHandler()
                 end
             end
         until err
+        if config.EVENT_BATCHING ~= nil then
+            utils.checkBotTables()
+        end
     end
 end
 
@@ -37,17 +37,15 @@ server_name = nil
 local MAGIC_BYTE = string.char(1)
 local MAX_CHUNK   = 65000          -- safe UDP payload size
 local HEADER_SEP  = '|'            -- separator in the header
+local MAX_BATCH   = MAX_CHUNK - 256  -- leave room for the envelope of a batch
 local HEADER_FMT = '%s'..HEADER_SEP..'%d'..HEADER_SEP..'%d'..HEADER_SEP..'%d'..HEADER_SEP
 
-function sendBotTable(tbl, channel)
-    if server_name == nil then
-        server_name = loadSettingsRaw().name
-    end
-    tbl.server_name = server_name
-    tbl.channel = tostring(channel or "-1")
-
-    local msg = net.lua2json(tbl)
+-- events are sent in batches of EVENT_BATCHING ms (0 = per frame), if configured
+local batch = {}
+local batch_size = 0
+local batch_started = nil
 
+local function sendPacket(msg)
     if #msg <= MAX_CHUNK then
         socket.try(UDPSendSocket:sendto(msg, config.BOT_HOST, config.BOT_PORT))
         return
@@ -68,6 +66,49 @@ function sendBotTable(tbl, channel)
     end
 end
 
+function flushBotTables()
+    if #batch == 0 then
+        return
+    end
+    -- the events are already encoded, so the envelope is put together as a string
+    local msg = '{"command":"batch","server_name":' .. net.lua2json(server_name) .. ',"events":[' ..
+            table.concat(batch, ',') .. ']}'
+    batch = {}
+    batch_size = 0
+    batch_started = nil
+    sendPacket(msg)
+end
+
+-- called on every simulation frame
+function checkBotTables()
+    if batch_started and (socket.gettime() - batch_started) * 1000 >= config.EVENT_BATCHING then
+        flushBotTables()
+    end
+end
+
+function sendBotTable(tbl, channel)
+    if server_name == nil then
+        server_name = loadSettingsRaw().name
+    end
+    tbl.server_name = server_name
+    tbl.channel = tostring(channel or "-1")
+
+    local msg = net.lua2json(tbl)
+
+    -- replies to the bot and large messages are sent at once, after the events that happened before them
+    if config.EVENT_BATCHING == nil or tbl.channel:sub(1, 5) == 'sync-' or #msg > MAX_BATCH then
+        flushBotTables()
+        sendPacket(msg)
+        return
+    end
+    if batch_size + #msg > MAX_BATCH then
+        flushBotTables()
+    end
+    table.insert(batch, msg)
+    batch_size = batch_size + #msg + 1
+    batch_started = batch_started or socket.gettime()
+end
+
 function loadSettingsRaw()
 	local defaultSettingsServer = net.get_default_server_settings()
     local tbl = Tools.safeDoFile(lfs.writedir() .. "Config/serverSettings.lua", false)
@@ -232,3 +273,68 @@ function isDynamic(slotId)
         return false
     end
 end
+
+-- Indexes of the connected players and of the slots of the current mission, so that lookups do not need to go
+-- through all players or call into DCS for every slot change.
+local player_ids    = {}    -- ucid => player id
+local player_ucids  = {}    -- player id => ucid
+local players_indexed = false
+local slot_info     = {}    -- slot id => properties of this slot
+
+function addPlayer(id, ucid)
+    if ucid then
+        player_ids[ucid] = id
+        player_ucids[id] = ucid
+    end
+end
+
+function removePlayer(id)
+    local ucid = player_ucids[id]
+    if ucid and player_ids[ucid] == id then
+        player_ids[ucid] = nil
+    end
+    player_ucids[id] = nil
+end
+
+local function indexPlayers()
+    -- players that connected before this script was loaded
+    for _, id in pairs(net.get_player_list()) do
+        addPlayer(id, net.get_player_info(id, 'ucid'))
+    end
+    players_indexed = true
+end
+
+function getPlayerIdByUcid(ucid)
+    if not players_indexed then
+        indexPlayers()
+    end
+    local id = player_ids[ucid]
+    -- player ids are reused by DCS, make sure it is still the same player
+    if id and net.get_player_info(id, 'ucid') == ucid then
+        return id
+    end
+    return nil
+end
+
+function getSlotInfo(slotId)
+    local info = slot_info[slotId]
+    if info then
+        return info
+    end
+    info = {
+        unit_type = Sim.getUnitType(slotId),
+        unit_name = Sim.getUnitProperty(slotId, Sim.UNIT_NAME),
+        group_name = Sim.getUnitProperty(slotId, Sim.UNIT_GROUPNAME),
+        group_id = Sim.getUnitProperty(slotId, Sim.UNIT_GROUP_MISSION_ID),
+        unit_callsign = Sim.getUnitProperty(slotId, Sim.UNIT_CALLSIGN)
+    }
+    -- dynamic slots get a new unit on every spawn
+    if not isDynamic(slotId) then
+        slot_info[slotId] = info
+    end
+    return info
+end
+
+function clearSlots()
+    slot_info = {}
+end
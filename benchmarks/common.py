@@ -0,0 +1,22 @@
+"""
+Shared setup of the benchmarks.
+"""
+import sys
+
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def import_core() -> None:
+    """
+    Makes the packages of DCSServerBot importable. The core package parses the command line as soon as it is
+    imported, so it is imported here once, without the arguments of the benchmark.
+    """
+    sys.path.insert(0, str(PROJECT_ROOT))
+    argv = sys.argv
+    sys.argv = argv[:1]
+    try:
+        import core.commandline  # noqa: F401
+    finally:
+        sys.argv = argv
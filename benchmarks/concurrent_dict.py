@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for the dictionaries that are shared between threads (core/utils/helper.py).
+
+Measures the cost per operation of ConcurrentDict against ThreadSafeDict and a plain dict (as the lower bound):
+    get / getitem / contains:  lookups of existing keys
+    set / pop:                 writes
+    items (unchanged):         iterating over all items of a dictionary that was not changed in between
+    items (after write):       one write followed by one iteration, the worst case of the snapshot
+With --writer, a background thread writes into the dictionary while the operations are measured.
+
+Usage:
+    python benchmarks/concurrent_dict.py [--size 10,100,1000] [--number 100000] [--writer]
+"""
+import argparse
+import sys
+import threading
+import timeit
+
+from common import import_core
+
+OPERATIONS = {
+    'get': "d.get(key)",
+    'getitem': "d[key]",
+    'contains': "key in d",
+    'set': "d[key] = 1",
+    'pop': "d.pop(key, None); d[key] = 1",
+    'items (unchanged)': "for k, v in d.items(): pass",
+    'items (after write)': "d[key] = 1\nfor k, v in d.items(): pass",
+}
+# iterations are more expensive, run them less often
+ITERATIONS = ('items (unchanged)', 'items (after write)')
+
+
+def measure(cls: type, size: int, operation: str, number: int) -> float:
+    d = cls({f'server{i}': i for i in range(size)})
+    key = f'server{size // 2}'
+    if operation in ITERATIONS:
+        number = max(number * 10 // max(size, 10), 100)
+    timer = timeit.Timer(OPERATIONS[operation], globals={'d': d, 'key': key})
+    # best of 3, in ns per operation
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e9
+
+
+def main(args: argparse.Namespace) -> int:
+    classes = [dict, ThreadSafeDict, ConcurrentDict]
+    stop = threading.Event()
+    if args.writer:
+        shared = {cls: cls() for cls in classes}
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                for d in shared.values():
+                    d[i % 100] = i
+                i += 1
+        threading.Thread(target=write, daemon=True).start()
+    try:
+        for size in [int(x) for x in args.size.split(',')]:
+            print(f"{size} entries (ns/op)")
+            print(f"{'Operation':<22}" + ''.join(f"{cls.__name__:>16}" for cls in classes) + f"{'Speedup':>10}")
+            for operation in OPERATIONS:
+                results = [measure(cls, size, operation, args.number) for cls in classes]
+                print(f"{operation:<22}" + ''.join(f"{x:>16.1f}" for x in results) + f"{results[1] / results[2]:>9.1f}x")
+            print()
+    finally:
+        stop.set()
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='concurrent_dict.py', description='Benchmark the thread-safe dictionaries.')
+    parser.add_argument('-s', '--size', default='10,100,1000', help='Comma-separated list of dictionary sizes')
+    parser.add_argument('-n', '--number', type=int, default=100000, help='Operations per measurement')
+    parser.add_argument('-w', '--writer', action='store_true', help='Write from a background thread while measuring')
+    args = parser.parse_args()
+
+    import_core()
+    from core.utils.helper import ConcurrentDict, ThreadSafeDict
+
+    sys.exit(main(args))
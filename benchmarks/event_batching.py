@@ -0,0 +1,156 @@
+"""
+Benchmark for the batching of the events DCS sends to the bot (EVENT_BATCHING, see Scripts/net/DCSServerBot).
+
+A synthetic event generator sends S_EVENT_SHOT / S_EVENT_HIT events through dcsbot.sendBotTable of
+DCSServerBot.lua, which runs under the Lua 5.1 runtime of lupa with a simulated DCS API at 60 frames per second. The
+datagrams are sent over UDP to a receiver that decodes and unpacks them like the ServiceBus does, and reports:
+    - datagrams/s the bot has to receive and decode
+    - latency per event, from the call of sendBotTable until the bot has decoded it (mean and p99)
+    - CPU time the bot spends in decoding per event
+    - events lost, as the receive buffer of the bot overflowed
+The batching windows are given in ms, "off" sends every event at once (the default).
+
+Usage:
+    python benchmarks/event_batching.py [--rates 100,1000,5000] [--windows off,0,50] [--duration 3]
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+
+from lupa.lua51 import LuaRuntime, lua_type
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FPS = 60
+
+DCS_API = """
+timers = {}
+log = { DEBUG = 0, INFO = 1, ERROR = 2, write = function(...) end }
+env = { info = function(...) end }
+lfs = { writedir = function() return '' end }
+dofile = function() end
+loadfile = function() return function() cfg = { name = 'Benchmark' } end end
+timer = {
+    getTime = function() return socket.gettime() end,
+    scheduleFunction = function(func, args, time) table.insert(timers, { func = func, time = time }) end
+}
+function run_timers()
+    local due = timers
+    timers = {}
+    for _, t in ipairs(due) do
+        if t.time <= timer.getTime() then
+            t.func()
+        else
+            table.insert(timers, t)
+        end
+    end
+end
+package.preload['socket'] = function() return socket end
+"""
+
+
+def to_python(value):
+    if lua_type(value) == 'table':
+        return {str(k): to_python(v) for k, v in value.items()}
+    return value
+
+
+class Receiver(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.datagrams = 0
+        self.events = 0
+        self.latencies: list[float] = []
+        self.cpu = 0.0
+
+    def datagram_received(self, data: bytes, addr):
+        now = time.perf_counter()
+        start = time.process_time()
+        self.datagrams += 1
+        message = json.loads(data)
+        events = message['events'] if message['command'] == 'batch' else [message]
+        self.cpu += time.process_time() - start
+        for event in events:
+            if event['command'] == 'onMissionEvent':
+                self.events += 1
+                self.latencies.append(now - event['t'])
+
+
+def dcs(port: int, window: str) -> LuaRuntime:
+    lua = LuaRuntime()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    lua.execute(DCS_API)
+    g = lua.globals()
+    g.socket = lua.table(
+        gettime=time.perf_counter,
+        udp=lambda: lua.table(
+            settimeout=lambda *args: None,
+            setsockname=lambda *args: None,
+            sendto=lambda _, msg, host, port: sock.sendto(msg.encode('utf-8'), (host, port))
+        )
+    )
+    # "try" is a keyword in Python
+    lua.execute("socket['try'] = function(...) return ... end")
+    g.net = lua.table(lua2json=lambda tbl: json.dumps(to_python(tbl)))
+    batching = 'nil' if window == 'off' else window
+    lua.execute(f"""
+        package.preload['DCSServerBotConfig'] = function()
+            return {{ BOT_HOST = '127.0.0.1', BOT_PORT = {port}, DCS_PORT = 6666, EVENT_BATCHING = {batching} }}
+        end
+    """)
+    lua.execute((PROJECT_ROOT / 'Scripts' / 'net' / 'DCSServerBot' / 'DCSServerBot.lua').read_text(encoding='utf-8'))
+    return lua
+
+
+async def generate(lua: LuaRuntime, rate: int, duration: float):
+    g = lua.globals()
+    send = g.dcsbot.sendBotTable
+    frames = int(duration * FPS)
+    start = time.perf_counter()
+    sent = 0
+    for frame in range(frames):
+        # the events of this frame
+        due = int(rate * (frame + 1) / FPS)
+        while sent < due:
+            send(lua.table(command='onMissionEvent', eventName='S_EVENT_SHOT' if sent % 2 else 'S_EVENT_HIT',
+                           initiator=lua.table(unit_name=f'Unit {sent % 100}', type='F-16C_50'),
+                           target=lua.table(unit_name=f'Target {sent % 50}', type='T-72B'),
+                           weapon=lua.table(name='GAU-8'), t=time.perf_counter()), '-1')
+            sent += 1
+        g.run_timers()
+        await asyncio.sleep(max(0.0, start + (frame + 1) / FPS - time.perf_counter()))
+    # frames without events, until the last batch is sent
+    for frame in range(frames, frames + FPS):
+        g.run_timers()
+        await asyncio.sleep(max(0.0, start + (frame + 1) / FPS - time.perf_counter()))
+
+
+async def main(args: argparse.Namespace) -> int:
+    loop = asyncio.get_running_loop()
+    print(f"{'Window':>8}{'Events/s':>10}{'Datagrams/s':>13}{'Events/datagram':>17}{'Mean (ms)':>11}"
+          f"{'p99 (ms)':>10}{'Decode (µs/event)':>19}{'Lost':>7}")
+    for rate in [int(x) for x in args.rates.split(',')]:
+        for window in args.windows.split(','):
+            transport, receiver = await loop.create_datagram_endpoint(Receiver, local_addr=('127.0.0.1', 0))
+            port = transport.get_extra_info('sockname')[1]
+            lua = dcs(port, window)
+            await generate(lua, rate, args.duration)
+            transport.close()
+            latencies = sorted(receiver.latencies)
+            lost = rate * int(args.duration * FPS) // FPS - receiver.events
+            mean = sum(latencies) / len(latencies) * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            print(f"{window:>8}{rate:>10}{receiver.datagrams / args.duration:>13.0f}"
+                  f"{receiver.events / receiver.datagrams:>17.1f}{mean:>11.2f}{p99:>10.2f}"
+                  f"{receiver.cpu / receiver.events * 1e6:>19.2f}{lost:>7}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='event_batching.py', description='Benchmark the batching of DCS events.')
+    parser.add_argument('-r', '--rates', default='100,1000,5000', help='Comma-separated list of events per second')
+    parser.add_argument('-w', '--windows', default='off,0,50', help='Comma-separated list of batching windows in ms')
+    parser.add_argument('-d', '--duration', type=float, default=3, help='Seconds per measurement')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,195 @@
+"""
+Micro-benchmark for the player and slot lookups of the DCS hook (Scripts/net/DCSServerBot/DCSServerBotUtils.lua and
+plugins/slotblocking/lua/callbacks.lua).
+
+Runs the hook scripts under the Lua 5.1 runtime of lupa, with a simulated DCS API, and measures the time per lookup:
+    ucid:       finding the player id of a ucid, for commands like uploadUserRoles, updateUserPoints, kick or ban
+                (half of the ucids belong to players that are not connected, like in a batch upload)
+    slot:       checking the "restricted" rules of SlotBlocking on a slot change
+Each lookup is measured with the former loop ("legacy") and with the index.
+The simulated DCS API is much cheaper than the real one, where every net.get_player_info() and Sim.getUnitProperty()
+call goes into DCS, so the gain inside DCS is higher than the one shown here.
+
+Usage:
+    python benchmarks/lua_lookups.py [--players 10,50,100] [--rules 10,100] [--number 20000]
+"""
+import argparse
+import sys
+import time
+
+from lupa.lua51 import LuaRuntime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DCS_API = """
+local players = {}
+local slots = {}
+
+log = { DEBUG = 0, INFO = 1, ERROR = 2, write = function(...) end }
+dcsbot = { params = {}, userInfo = {} }
+net = {
+    get_player_list = function()
+        local ids = {}
+        for id, _ in pairs(players) do
+            table.insert(ids, id)
+        end
+        table.sort(ids)
+        return ids
+    end,
+    get_player_info = function(id, attribute)
+        local player = players[id]
+        if player then
+            return player[attribute]
+        end
+    end,
+    send_chat_to = function(...) end
+}
+Sim = {
+    UNIT_NAME = 1, UNIT_GROUPNAME = 2, UNIT_GROUP_MISSION_ID = 3, UNIT_CALLSIGN = 4,
+    getUnitType = function(slot) return slots[slot] and slots[slot][0] end,
+    getUnitProperty = function(slot, property) return slots[slot] and slots[slot][property] end,
+    setUserCallbacks = function(...) end
+}
+
+function connect(count)
+    -- the way onPlayerConnect / onPlayerStop maintain the index
+    for id, _ in pairs(players) do
+        utils.removePlayer(id)
+    end
+    -- player 1 is the server itself
+    players = { [1] = { ucid = 'server', name = 'Server' } }
+    for id = 2, count + 1 do
+        players[id] = { ucid = string.format('%032d', id), name = 'Player ' .. id }
+    end
+    for id, player in pairs(players) do
+        utils.addPlayer(id, player.ucid)
+    end
+end
+
+function create_slots(count)
+    slots = {}
+    for slot = 1, count do
+        slots[slot] = { [0] = 'F-16C_50', 'Viper ' .. slot, 'Group ' .. slot, slot, 'Enfield' }
+    end
+end
+
+package.preload['lfs'] = function() return {} end
+package.preload['TableUtils'] = function() return {} end
+package.preload['tools'] = function() return {} end
+package.preload['me_utilities'] = function() return {} end
+package.preload['DCSServerBotConfig'] = function() return {} end
+package.preload['socket'] = function()
+    return { udp = function() return { settimeout = function() end, setsockname = function() end } end }
+end
+"""
+
+LEGACY = """
+function legacy_player_id(ucid)
+    local plist = net.get_player_list()
+    for i = 2, #plist do
+        if net.get_player_info(plist[i], 'ucid') == ucid then
+            return plist[i]
+        end
+    end
+end
+
+function legacy_restrict_slots(playerID, side, slotID)
+    local player = net.get_player_info(playerID, 'ucid')
+    local unit_name = Sim.getUnitProperty(slotID, Sim.UNIT_NAME)
+    local group_name = Sim.getUnitProperty(slotID, Sim.UNIT_GROUPNAME)
+    local unit_type = Sim.getUnitType(slotID)
+    for id, unit in pairs(dcsbot.params.slotblocking.restricted) do
+        local is_unit_type_match = (unit.unit_type and unit.unit_type == unit_type) or (unit.unit_type == 'dynamic' and utils.isDynamic(slotID))
+        local is_unit_name_match = unit.unit_name and string.match(unit_name, unit.unit_name)
+        local is_group_name_match = unit.group_name and string.match(group_name, unit.group_name)
+        local is_side = (tonumber(unit.side) or side) == side
+        if is_side and (is_unit_type_match or is_unit_name_match or is_group_name_match) then
+            return false
+        end
+    end
+end
+
+function run_ucid(func, players, number)
+    local lookups = 0
+    for i = 1, number do
+        -- every second ucid is not connected
+        if func(string.format('%032d', (i % (players * 2)) + 1)) then
+            lookups = lookups + 1
+        end
+    end
+    return lookups
+end
+
+function run_slots(func, slots, number)
+    for i = 1, number do
+        func(2, 2, (i % slots) + 1)
+    end
+end
+
+function restricted(count)
+    local rules = {}
+    for i = 1, count do
+        -- rules for other slots, so that every rule has to be checked
+        table.insert(rules, { unit_name = '^Hornet ' .. i .. '$', group_name = '^CAP ' .. i .. '$', points = 10 })
+    end
+    dcsbot.params.slotblocking = { restricted = rules }
+end
+"""
+
+
+def load(lua: LuaRuntime, path: Path, name: str | None = None) -> None:
+    chunk = lua.eval("function(code, name) return loadstring(code, name) end")(path.read_text(encoding='utf-8'),
+                                                                                path.name)
+    if name:
+        lua.globals().package.preload[name] = chunk
+    else:
+        chunk()
+
+
+def measure(func, *args) -> float:
+    # best of 3, in seconds
+    results = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        results.append(time.perf_counter() - start)
+    return min(results)
+
+
+def main(args: argparse.Namespace) -> int:
+    lua = LuaRuntime()
+    lua.execute(DCS_API)
+    load(lua, PROJECT_ROOT / 'Scripts' / 'net' / 'DCSServerBot' / 'DCSServerBotUtils.lua', 'DCSServerBotUtils')
+    lua.execute("utils = require('DCSServerBotUtils')")
+    load(lua, PROJECT_ROOT / 'plugins' / 'slotblocking' / 'lua' / 'callbacks.lua')
+    lua.execute(LEGACY)
+    g = lua.globals()
+    number = args.number
+
+    print(f"{'Lookup':<8}{'Size':>8}{'legacy (µs)':>14}{'index (µs)':>14}{'Speedup':>10}")
+    for players in [int(x) for x in args.players.split(',')]:
+        g.connect(players)
+        # both have to find the same players
+        assert g.run_ucid(g.legacy_player_id, players, number) == \
+               g.run_ucid(g.utils.getPlayerIdByUcid, players, number)
+        legacy = measure(g.run_ucid, g.legacy_player_id, players, number) / number * 1e6
+        index = measure(g.run_ucid, g.utils.getPlayerIdByUcid, players, number) / number * 1e6
+        print(f"{'ucid':<8}{players:>8}{legacy:>14.2f}{index:>14.2f}{legacy / index:>9.1f}x")
+
+    g.connect(2)
+    g.create_slots(100)
+    for rules in [int(x) for x in args.rules.split(',')]:
+        g.restricted(rules)
+        legacy = measure(g.run_slots, g.legacy_restrict_slots, 100, number) / number * 1e6
+        index = measure(g.run_slots, g.restrict_slots, 100, number) / number * 1e6
+        print(f"{'slot':<8}{rules:>8}{legacy:>14.2f}{index:>14.2f}{legacy / index:>9.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='lua_lookups.py', description='Benchmark the lookups of the DCS hook.')
+    parser.add_argument('-p', '--players', default='10,50,100', help='Comma-separated list of connected players')
+    parser.add_argument('-r', '--rules', default='10,100', help='Comma-separated list of restricted rules')
+    parser.add_argument('-n', '--number', type=int, default=20000, help='Lookups per measurement')
+    sys.exit(main(parser.parse_args()))
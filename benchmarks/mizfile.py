@@ -0,0 +1,363 @@
+"""
+Benchmark for loading, modifying and saving missions with MizFile (core/mizfile.py, luadata).
+
+Generates synthetic missions with an increasing number of units and measures every step of a mission rotation:
+    load:      MizFile(filename)
+    modify:    apply_preset() with representative MizEdit presets (date, time, weather, fog, forced options, modify)
+    serialize: luadata.serialize() of the mission table
+    save:      MizFile.save()
+For each step, the median time of --repeat runs and the peak memory allocated (tracemalloc, measured in a separate
+run) are reported. Runs fully offline, no DCS installation and no database are needed.
+
+With --output, the results are written as JSON. If you pass such a file as --baseline, the benchmark fails (exit code 1)
+if any step got slower than --max-slowdown or needs more memory than --max-memory-growth.
+
+Usage:
+    python benchmarks/mizfile.py [--units 100,1000,5000,20000] [--repeat 3] [--output results.json]
+    python benchmarks/mizfile.py --baseline results.json --max-slowdown 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from common import import_core
+
+MB = 1024 * 1024
+PHASES = ['load', 'modify', 'serialize', 'save']
+
+# representative presets, see samples/presets.yaml and samples/presets_tournament.yaml
+PRESETS = [
+    {
+        "date": "2016-07-21",
+        "temperature": 23,
+        "start_time": "08:00"
+    },
+    {
+        "clouds": {"preset": "RainyPreset1"},
+        "wind": {
+            "at8000": {"speed": 10, "dir": 105},
+            "at2000": {"speed": 5, "dir": 130},
+            "atGround": {"speed": 1, "dir": 20}
+        }
+    },
+    {
+        "fog": {
+            "mode": "manual",
+            0: {"thickness": 100, "visibility": 1000},
+            300: {"thickness": 200, "visibility": 2000},
+            600: {"thickness": 0, "visibility": 0}
+        }
+    },
+    {
+        "forcedOptions": {
+            "fuel": False,
+            "miniHUD": False,
+            "permitCrash": True,
+            "labels": 3
+        },
+        "requiredModules": []
+    },
+    {
+        "modify": [
+            {
+                "for-each": "coalition/blue/country/*/ship/group/*/units/$re.match(r'CVN_7[1-5]', '{type}') is not None",
+                "replace": {
+                    "allowLso": True,
+                    "allowAirboss": True
+                }
+            },
+            {
+                "for-each": "coalition/${side}/country/*/plane/group/$'{task}' == 'AWACS'",
+                "replace": {
+                    "lateActivation": False
+                }
+            },
+            {
+                "for-each": "coalition/red/country/*/vehicle/group/*/units/$'{skill}' == 'Average'",
+                "replace": {
+                    "skill": "High"
+                }
+            },
+            {
+                "file": "warehouses",
+                "variables": {
+                    "side": "$'{side}'.upper()"
+                },
+                "for-each": "airports/$'{coalition}' == '{side}'/weapons/$'{wsType[3]}' == '24'",
+                "replace": {
+                    "initialAmount": "${initialAmount} + {num}"
+                }
+            }
+        ]
+    }
+]
+
+
+def make_unit(unit_id: int, category: str, x: float, y: float) -> dict:
+    unit = {
+        "unitId": unit_id,
+        "name": f"Unit #{unit_id}",
+        "x": x + unit_id % 10 * 50,
+        "y": y + unit_id % 7 * 50,
+        "heading": 0.0,
+        "playerCanDrive": True
+    }
+    if category == 'plane':
+        unit |= {
+            "type": "F-16C_50",
+            "skill": "Client" if unit_id % 3 else "High",
+            "alt": 2000,
+            "alt_type": "BARO",
+            "speed": 138.88,
+            "livery_id": "default",
+            "onboard_num": f"{unit_id % 1000:03d}",
+            "callsign": {1: 1, 2: 1, 3: unit_id % 4 + 1, "name": f"Enfield1{unit_id % 4 + 1}"},
+            "payload": {
+                "pylons": {
+                    1: {"CLSID": "{40EF17B7-F508-45de-8566-6FFECC0C1AB8}"},
+                    2: {"CLSID": "{40EF17B7-F508-45de-8566-6FFECC0C1AB8}"},
+                    5: {"CLSID": "{F376DBEE-4CAE-41BA-ADD9-B2910AC95DEC}"}
+                },
+                "fuel": 3249,
+                "flare": 60,
+                "chaff": 60,
+                "gun": 100
+            }
+        }
+    elif category == 'ship':
+        unit |= {"type": "CVN_71" if unit_id % 2 else "PERRY", "skill": "High", "frequency": 127500000}
+    else:
+        unit |= {"type": "T-72B", "skill": "Average", "coldAtStart": False}
+    return unit
+
+
+def make_group(group_id: int, unit_id: int, category: str, size: int) -> dict:
+    x, y = -300000 + group_id * 150.0, 600000 + group_id * 75.0
+    return {
+        "groupId": group_id,
+        "name": f"Group #{group_id}",
+        "task": ("AWACS" if group_id % 50 == 0 else "CAP") if category == 'plane' else "Ground Nothing",
+        "lateActivation": group_id % 5 == 0,
+        "hidden": False,
+        "visible": False,
+        "uncontrolled": False,
+        "start_time": 0,
+        "x": x,
+        "y": y,
+        "route": {
+            "points": {
+                i: {
+                    "x": x + i * 1000,
+                    "y": y + i * 1000,
+                    "alt": 2000,
+                    "type": "Turning Point",
+                    "action": "Turning Point",
+                    "speed": 138.88,
+                    "ETA": 0,
+                    "ETA_locked": i == 1,
+                    "task": {"id": "ComboTask", "params": {"tasks": {}}}
+                } for i in range(1, 4)
+            }
+        },
+        "units": {i + 1: make_unit(unit_id + i, category, x, y) for i in range(size)}
+    }
+
+
+def make_mission(units: int) -> tuple[dict, dict, dict]:
+    """
+    Creates a mission with the given number of units: 25% planes (groups of 2), 70% vehicles (groups of 4),
+    5% ships, split between blue and red.
+    """
+    coalitions = {}
+    group_id = unit_id = 1
+    for side, country_id, country in [('blue', 2, 'USA'), ('red', 0, 'Russia')]:
+        categories = {}
+        for category, share, size in [('plane', 0.25, 2), ('vehicle', 0.70, 4), ('ship', 0.05, 1)]:
+            groups = {}
+            for i in range(max(1, int(units / 2 * share / size))):
+                groups[i + 1] = make_group(group_id, unit_id, category, size)
+                group_id += 1
+                unit_id += size
+            categories[category] = {"group": groups}
+        coalitions[side] = {
+            "name": side,
+            "bullseye": {"x": 0, "y": 0},
+            "nav_points": {},
+            "country": {1: {"id": country_id, "name": country} | categories}
+        }
+    mission = {
+        "version": 21,
+        "theatre": "Caucasus",
+        "date": {"Day": 1, "Month": 6, "Year": 2016},
+        "start_time": 43200,
+        "descriptionText": "Synthetic benchmark mission",
+        "requiredModules": {1: "F-16C bl.50 AI"},
+        "failures": {},
+        "forcedOptions": {},
+        "maxDictId": 0,
+        "currentKey": 0,
+        "trig": {"actions": {}, "conditions": {}, "flag": {}, "funcStartup": {}},
+        "triggers": {"zones": {}},
+        "weather": {
+            "atmosphere_type": 0,
+            "groundTurbulence": 0,
+            "enable_dust": False,
+            "dust_density": 0,
+            "enable_fog": False,
+            "fog": {"thickness": 0, "visibility": 0},
+            "qnh": 760,
+            "season": {"temperature": 20},
+            "visibility": {"distance": 80000},
+            "clouds": {"thickness": 200, "density": 0, "preset": "Preset1", "base": 300, "iprecptns": 0},
+            "wind": {
+                "atGround": {"speed": 0, "dir": 0},
+                "at2000": {"speed": 0, "dir": 0},
+                "at8000": {"speed": 0, "dir": 0}
+            }
+        },
+        "coalition": coalitions
+    }
+    options = {
+        "difficulty": {"labels": 0, "miniHUD": False, "permitCrash": True},
+        "miscellaneous": {"f11_free_camera": True}
+    }
+    warehouses = {
+        "airports": {
+            i: {
+                "coalition": "BLUE" if i % 2 else "RED",
+                "unlimitedFuel": True,
+                "weapons": {
+                    j: {"wsType": {1: 4, 2: 4, 3: 7, 4: 24 if j % 4 == 0 else j}, "initialAmount": 10}
+                    for j in range(1, 41)
+                }
+            } for i in range(1, 31)
+        },
+        "warehouses": {}
+    }
+    return mission, options, warehouses
+
+
+def write_miz(filename: str, units: int):
+    mission, options, warehouses = make_mission(units)
+    with zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED) as miz:
+        for name, data in [('mission', mission), ('options', options), ('warehouses', warehouses)]:
+            miz.writestr(name, f"{name} = " + luadata.serialize(data, 'utf-8', indent='\t', indent_level=0))
+        miz.writestr('l10n/DEFAULT/dictionary', 'dictionary = {}')
+
+
+def run_phases(filename: str, outname: str, *, trace: bool) -> dict[str, float]:
+    """
+    Runs all phases once. Returns the time in seconds or, with trace, the peak memory in bytes per phase.
+    """
+    results = {}
+    miz = None
+
+    def measure(phase, func):
+        if trace:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            rc = func()
+            results[phase] = tracemalloc.get_traced_memory()[1] - baseline
+        else:
+            start = time.perf_counter()
+            rc = func()
+            results[phase] = time.perf_counter() - start
+        return rc
+
+    miz = measure('load', lambda: MizFile(filename))
+    measure('modify', lambda: miz.apply_preset(PRESETS, side='blue', num=2))
+    measure('serialize', lambda: luadata.serialize(miz.mission, 'utf-8', indent='\t', indent_level=0))
+    measure('save', lambda: miz.save(outname))
+    return results
+
+
+def benchmark(units: int, repeat: int, tmpdir: str) -> list[dict]:
+    filename = os.path.join(tmpdir, f"benchmark_{units}.miz")
+    outname = os.path.join(tmpdir, f"benchmark_{units}_out.miz")
+    write_miz(filename, units)
+    size = os.path.getsize(filename)
+    timings = [run_phases(filename, outname, trace=False) for _ in range(repeat)]
+    tracemalloc.start()
+    try:
+        memory = run_phases(filename, outname, trace=True)
+    finally:
+        tracemalloc.stop()
+    return [
+        {
+            "units": units,
+            "phase": phase,
+            "seconds": statistics.median(x[phase] for x in timings),
+            "peak_mb": memory[phase] / MB,
+            "miz_mb": size / MB
+        } for phase in PHASES
+    ]
+
+
+def compare(results: list[dict], baseline: dict, max_slowdown: float, max_memory_growth: float) -> list[str]:
+    reference = {(x['units'], x['phase']): x for x in baseline['results']}
+    regressions = []
+    for result in results:
+        ref = reference.get((result['units'], result['phase']))
+        if not ref:
+            continue
+        name = f"{result['units']} units / {result['phase']}"
+        if result['seconds'] > ref['seconds'] * (1 + max_slowdown):
+            regressions.append(f"{name}: {result['seconds']:.3f}s (baseline {ref['seconds']:.3f}s)")
+        if result['peak_mb'] > ref['peak_mb'] * (1 + max_memory_growth):
+            regressions.append(f"{name}: {result['peak_mb']:.1f} MB (baseline {ref['peak_mb']:.1f} MB)")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    results = []
+    print(f"{'Units':>7} {'Phase':<10} {'Time (s)':>10} {'Peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for units in [int(x) for x in args.units.split(',')]:
+            for result in benchmark(units, args.repeat, tmpdir):
+                print(f"{result['units']:>7} {result['phase']:<10} {result['seconds']:>10.3f} {result['peak_mb']:>10.1f}")
+                results.append(result)
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as outfile:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "results": results
+            }, outfile, indent=2)
+    if args.baseline:
+        with open(args.baseline, mode='r', encoding='utf-8') as infile:
+            regressions = compare(results, json.load(infile), args.max_slowdown, args.max_memory_growth)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"- {regression}")
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='mizfile.py', description='Benchmark loading and saving of missions.')
+    parser.add_argument('--units', default='100,1000,5000,20000', help='Comma-separated list of unit counts')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per mission (the median is reported)')
+    parser.add_argument('-o', '--output', help='Write the results into this JSON file')
+    parser.add_argument('-b', '--baseline', help='Compare the results with this JSON file')
+    parser.add_argument('--max-slowdown', type=float, default=0.25, help='Allowed slowdown against the baseline')
+    parser.add_argument('--max-memory-growth', type=float, default=0.25,
+                        help='Allowed growth of the peak memory against the baseline')
+    args = parser.parse_args()
+
+    import_core()
+    import luadata
+    from core import MizFile
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main(args))
@@ -0,0 +1,128 @@
+"""
+Micro-benchmark for the messages the bot sends to DCS (ServerImpl.send_to_dcs in core/data/impl/serverimpl.py).
+
+Encodes typical commands and measures the time per command and its size on the wire:
+    legacy:   the former implementation, that deep-copied the command, converted it in place and sent it in a single
+              datagram (which LuaSocket cuts off after 8 KB)
+    framed:   the conversion without copies, split into fragments that fit into a datagram
+The commands are:
+    chat:       a sendChatMessage
+    roles:      an uploadUserRoles batch with 50 players
+    params:     a loadParams with --rules SlotBlocking rules
+
+Usage:
+    python benchmarks/send_to_dcs.py [--rules 100,1000,5000] [--number 2000]
+"""
+import argparse
+import json
+import sys
+import time
+
+from copy import deepcopy
+from enum import Enum
+from typing import Any
+
+from common import import_core
+
+
+def legacy_serialize(message: dict) -> dict:
+    def _serialize_value(value: Any) -> Any:
+        if isinstance(value, bool):
+            return value
+        elif isinstance(value, int):
+            return value if value < MAX_SAFE_INTEGER else str(value)
+        elif isinstance(value, Enum):
+            return value.value
+        elif isinstance(value, dict):
+            return legacy_serialize(value)
+        elif isinstance(value, list):
+            return [_serialize_value(x) for x in value]
+        return value
+
+    for key, value in message.items():
+        message[key] = _serialize_value(value)
+    return message
+
+
+def legacy(message: dict) -> list[bytes]:
+    return [json.dumps(legacy_serialize(deepcopy(message))).encode('utf-8')]
+
+
+def framed(message: dict) -> list[bytes]:
+    return frame(json.dumps(serialize(message)).encode('utf-8'), 1)
+
+
+def commands(rules: int) -> dict[str, dict]:
+    return {
+        "chat": {
+            "command": "sendChatMessage",
+            "from": "DCSServerBot",
+            "message": "Server restart in 10 minutes!"
+        },
+        "roles": {
+            "command": "uploadUserRoles",
+            "batch": [
+                {
+                    "ucid": f"{i:032x}",
+                    "discord_id": 112233445566778899 + i,
+                    "roles": [998877665544332211 + j for j in range(3)]
+                } for i in range(50)
+            ]
+        },
+        "params": {
+            "command": "loadParams",
+            "plugin": "slotblocking",
+            "params": {
+                "restricted": [
+                    {"unit_name": f"^Tomcat {i}$", "group_name": f"^CAP {i}$", "points": i % 50, "side": 2,
+                     "message": "You need {points} points to fly this aircraft."}
+                    for i in range(rules)
+                ],
+                "messages": {"credits_taken": "{deposit} credits taken for using a reserved module."}
+            }
+        }
+    }
+
+
+def measure(func, message: dict, number: int) -> float:
+    # best of 3, in µs per command
+    results = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(message)
+        results.append(time.perf_counter() - start)
+    return min(results) / number * 1e6
+
+
+def main(args: argparse.Namespace) -> int:
+    print(f"{'Command':<10}{'Rules':>7}{'legacy (µs)':>14}{'framed (µs)':>14}{'Speedup':>10}{'Bytes':>10}"
+          f"{'Datagrams':>11}{'Max datagram':>14}")
+    seen = set()
+    for rules in [int(x) for x in args.rules.split(',')]:
+        for name, message in commands(rules).items():
+            if name != 'params' and name in seen:
+                continue
+            seen.add(name)
+            # both send the same data to DCS
+            assert b''.join(legacy(message)) == json.dumps(serialize(message)).encode('utf-8')
+            datagrams = framed(message)
+            old = measure(legacy, message, args.number)
+            new = measure(framed, message, args.number)
+            size = len(legacy(message)[0])
+            print(f"{name:<10}{rules if name == 'params' else '':>7}{old:>14.2f}{new:>14.2f}{old / new:>9.1f}x"
+                  f"{size:>10}{len(datagrams):>11}{max(len(x) for x in datagrams):>14}")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='send_to_dcs.py', description='Benchmark the messages sent to DCS.')
+    parser.add_argument('-r', '--rules', default='100,1000,5000', help='Comma-separated list of SlotBlocking rules')
+    parser.add_argument('-n', '--number', type=int, default=2000, help='Commands per measurement')
+    args = parser.parse_args()
+
+    import_core()
+    from core.const import MAX_SAFE_INTEGER
+    from core.data.impl.serverimpl import serialize, frame
+
+    sys.exit(main(args))
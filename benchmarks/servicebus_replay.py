@@ -0,0 +1,225 @@
+"""
+Replays a capture of DCS traffic into a running node and measures how fast its ServiceBus processes the events.
+
+Record a capture by starting the bot with "run.py --capture traffic.cap" while your servers are running. To replay it,
+start a test node with the same servers.yaml (the servers need to be known to the bot), the plugins you want to
+measure and the Metrics service enabled. The capture is sent to the listen port of that node in real time (--speed 1),
+N times faster (--speed N) or as fast as possible (--speed 0). Afterward, the script waits until all messages are
+processed and reports:
+    - events/s
+    - latency percentiles per event (time until all listeners have processed the event)
+    - database connections checked out of the pools
+    - database statements (needs --url, uses pg_stat_statements if installed, otherwise transactions)
+    - memory growth of the node
+
+Usage:
+    python benchmarks/servicebus_replay.py traffic.cap [--speed 0] [--port 10042] [--metrics http://127.0.0.1:9877/metrics]
+"""
+import aiohttp
+import argparse
+import asyncio
+import importlib.util
+import psycopg
+import re
+import socket
+import sys
+import time
+
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MB = 1024 * 1024
+
+# load the module directly, importing "core" would require a full bot configuration
+spec = importlib.util.spec_from_file_location('capture', PROJECT_ROOT / 'core' / 'utils' / 'capture.py')
+capture = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(capture)
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class Snapshot:
+    """
+    The samples of one scrape of the metrics endpoint.
+    """
+
+    def __init__(self, text: str):
+        self.samples: dict[str, list[tuple[dict[str, str], float]]] = defaultdict(list)
+        for line in text.splitlines():
+            match = SAMPLE.match(line)
+            if not match:
+                continue
+            labels = dict(LABEL.findall(match.group('labels') or ''))
+            self.samples[match.group('name')].append((labels, float(match.group('value'))))
+
+    def sum(self, name: str, **labels) -> float:
+        return sum(value for sample_labels, value in self.samples.get(name, [])
+                   if all(sample_labels.get(k) == v for k, v in labels.items()))
+
+    def buckets(self, name: str, group_by: str) -> dict[str, dict[float, float]]:
+        result: dict[str, dict[float, float]] = defaultdict(lambda: defaultdict(float))
+        for labels, value in self.samples.get(name + '_bucket', []):
+            result[labels.get(group_by, '')][float(labels['le'])] += value
+        return result
+
+
+def quantile(buckets: dict[float, float], q: float) -> float:
+    """
+    Estimates a quantile from cumulative histogram buckets, like histogram_quantile() in Prometheus.
+    """
+    bounds = sorted(buckets.keys())
+    total = buckets[bounds[-1]]
+    if not total:
+        return 0.0
+    rank = q * total
+    lower, count = 0.0, 0.0
+    for bound in bounds:
+        if buckets[bound] >= rank:
+            if bound == float('inf'):
+                return lower
+            return lower + (bound - lower) * (rank - count) / max(buckets[bound] - count, 1)
+        lower, count = bound, buckets[bound]
+    return lower
+
+
+async def scrape(session: aiohttp.ClientSession, url: str) -> Snapshot:
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return Snapshot(await response.text())
+
+
+async def count_statements(url: str | None) -> tuple[str, int] | None:
+    if not url:
+        return None
+    async with await psycopg.AsyncConnection.connect(url, autocommit=True) as conn:
+        try:
+            cursor = await conn.execute("SELECT SUM(calls)::BIGINT FROM pg_stat_statements")
+            return 'statements', (await cursor.fetchone())[0] or 0
+        except psycopg.Error:
+            cursor = await conn.execute("""
+                SELECT (xact_commit + xact_rollback)::BIGINT FROM pg_stat_database WHERE datname = current_database()
+            """)
+            return 'transactions', (await cursor.fetchone())[0]
+
+
+async def replay(filename: str, host: str, port: int, speed: float) -> int:
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 2 << 20)
+    sock.setblocking(False)
+    start = time.perf_counter()
+    first = None
+    count = 0
+    try:
+        for timestamp, data in capture.read_capture(filename):
+            if first is None:
+                first = timestamp
+            if speed:
+                delay = (timestamp - first) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await loop.sock_sendto(sock, data, (host, port))
+            count += 1
+            if not speed and count % 100 == 0:
+                # give the socket buffer a chance to drain, otherwise we drop datagrams locally
+                await asyncio.sleep(0.001)
+    finally:
+        sock.close()
+    return count
+
+
+async def wait_until_processed(session: aiohttp.ClientSession, url: str, timeout: float,
+                               peak: list[float]) -> Snapshot:
+    last = None
+    deadline = time.monotonic() + timeout
+    while True:
+        snapshot = await scrape(session, url)
+        peak[0] = max(peak[0], snapshot.sum('dcssb_process_resident_memory_bytes'))
+        messages = snapshot.sum('dcssb_bus_messages_total')
+        if snapshot.sum('dcssb_bus_queue_size') == 0 and messages == last:
+            return snapshot
+        if time.monotonic() > deadline:
+            print("WARNING: not all messages were processed in time!")
+            return snapshot
+        last = messages
+        await asyncio.sleep(1)
+
+
+async def sample_memory(session: aiohttp.ClientSession, url: str, peak: list[float]):
+    while True:
+        snapshot = await scrape(session, url)
+        peak[0] = max(peak[0], snapshot.sum('dcssb_process_resident_memory_bytes'))
+        await asyncio.sleep(1)
+
+
+async def main(args: argparse.Namespace) -> int:
+    async with aiohttp.ClientSession() as session:
+        before = await scrape(session, args.metrics)
+        if 'dcssb_process_resident_memory_bytes' not in before.samples:
+            print("ERROR: the metrics endpoint does not provide the node metrics, is the Metrics service running?")
+            return 1
+        statements_before = await count_statements(args.url)
+        peak = [before.sum('dcssb_process_resident_memory_bytes')]
+        sampler = asyncio.create_task(sample_memory(session, args.metrics, peak))
+        start = time.perf_counter()
+        try:
+            sent = await replay(args.capture, args.host, args.port, args.speed)
+        finally:
+            sampler.cancel()
+        after = await wait_until_processed(session, args.metrics, args.timeout, peak)
+        seconds = time.perf_counter() - start
+        statements_after = await count_statements(args.url)
+
+    events = after.sum('dcssb_bus_messages_total') - before.sum('dcssb_bus_messages_total')
+    print(f"Datagrams sent:   {sent}")
+    print(f"Events processed: {events:.0f} in {seconds:.2f}s ({events / seconds:.1f} events/s)")
+
+    buckets_before = before.buckets('dcssb_bus_dispatch_seconds', 'event')
+    buckets_after = after.buckets('dcssb_bus_dispatch_seconds', 'event')
+    rows = []
+    total: dict[float, float] = defaultdict(float)
+    for event, buckets in buckets_after.items():
+        delta = {le: value - buckets_before.get(event, {}).get(le, 0) for le, value in buckets.items()}
+        count = delta[float('inf')]
+        if not count:
+            continue
+        for le, value in delta.items():
+            total[le] += value
+        rows.append((event, count, quantile(delta, 0.5), quantile(delta, 0.95), quantile(delta, 0.99)))
+    if rows:
+        print()
+        print(f"{'Event':<32} {'Count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for event, count, p50, p95, p99 in sorted(rows, key=lambda x: x[1], reverse=True)[:args.top]:
+            print(f"{event[:32]:<32} {count:>8.0f} {p50 * 1000:>9.2f} {p95 * 1000:>9.2f} {p99 * 1000:>9.2f}")
+        print(f"{'(all)':<32} {total[float('inf')]:>8.0f} {quantile(total, 0.5) * 1000:>9.2f} "
+              f"{quantile(total, 0.95) * 1000:>9.2f} {quantile(total, 0.99) * 1000:>9.2f}")
+        print()
+
+    checkouts = after.sum('dcssb_db_pool_wait_seconds_count') - before.sum('dcssb_db_pool_wait_seconds_count')
+    print(f"DB connections:   {checkouts:.0f} checked out ({checkouts / max(events, 1):.2f} per event)")
+    if statements_before and statements_after:
+        kind, value = statements_after[0], statements_after[1] - statements_before[1]
+        print(f"DB {kind + ':':<14}{value} ({value / max(events, 1):.2f} per event, all clients)")
+    rss_before = before.sum('dcssb_process_resident_memory_bytes')
+    rss_after = after.sum('dcssb_process_resident_memory_bytes')
+    print(f"Memory (RSS):     {rss_before / MB:.1f} MB -> {rss_after / MB:.1f} MB "
+          f"(+{(rss_after - rss_before) / MB:.1f} MB, peak {peak[0] / MB:.1f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='servicebus_replay.py',
+                                     description='Replay captured DCS traffic into a running node.')
+    parser.add_argument('capture', help='Capture file (recorded with run.py --capture)')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address of the node')
+    parser.add_argument('-p', '--port', type=int, default=10042, help='Listen port of the node')
+    parser.add_argument('-s', '--speed', type=float, default=1.0, help='Replay speed, 0 = as fast as possible')
+    parser.add_argument('-m', '--metrics', default='http://127.0.0.1:9877/metrics', help='Metrics endpoint of the node')
+    parser.add_argument('-u', '--url', help='Database URL to count the statements (optional)')
+    parser.add_argument('--timeout', type=float, default=300, help='Maximum time to wait for the processing')
+    parser.add_argument('--top', type=int, default=20, help='Number of events to show')
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark for the slot costs of SlotBlocking (plugins/slotblocking/costs.py) and the points per kill of the
+CreditSystem (plugins/creditsystem/points.py).
+
+Generates configurations with the given number of rules and measures the time per lookup:
+    legacy:   the former implementation, that matched every lookup against all rules of the configuration
+    table:    the lookup table, including the first lookup of every slot (or unit type) in the measurement
+The slot costs are measured for a mission with --slots different slots, that are used over and over again.
+
+Usage:
+    python benchmarks/slot_costs.py [--rules 10,100,1000] [--slots 200] [--number 20000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from common import import_core
+
+UNIT_TYPES = [f'Unit{i}' for i in range(100)]
+CATEGORIES = ['Planes', 'Helicopters', 'Ground Units', 'Ships', 'Structures']
+
+
+def legacy_costs(config: dict, data: dict) -> int:
+    for unit in config.get('restricted', []):
+        for attribute in ['unit_type', 'unit_name', 'group_name']:
+            if attribute in unit and re.search(unit[attribute], utils.lua_pattern_to_python_regex(data[attribute])):
+                return unit.get('costs', 0)
+    return 0
+
+
+def legacy_points(config: dict, data: dict) -> int:
+    default = 1
+    for unit in config.get('points_per_kill', []):
+        if 'category' in unit and data.get('victimCategory', 'Planes') != unit['category']:
+            continue
+        if 'unit_type' in unit and unit['unit_type'] != data['arg5']:
+            continue
+        if 'category' in unit or 'unit_type' in unit:
+            return unit['points']
+        elif 'default' in unit:
+            default = unit['default']
+    return default
+
+
+def restricted(rnd: random.Random, size: int) -> dict:
+    rules = []
+    for i in range(size):
+        attribute = rnd.choice(['unit_type', 'unit_name', 'group_name'])
+        if attribute == 'unit_type':
+            pattern = rnd.choice(UNIT_TYPES) + '$'
+        else:
+            pattern = rf'^{attribute}{i}(#\d+)?$'
+        rules.append({attribute: pattern, 'costs': rnd.randint(1, 100)})
+    return {'restricted': rules}
+
+
+def points_per_kill(rnd: random.Random, size: int) -> dict:
+    rules = []
+    for _ in range(size - 1):
+        rule = {'unit_type': rnd.choice(UNIT_TYPES), 'points': rnd.randint(1, 100)}
+        if rnd.random() < 0.2:
+            rule['category'] = rnd.choice(CATEGORIES)
+        rules.append(rule)
+    rules.append({'default': 1})
+    return {'points_per_kill': rules}
+
+
+def measure(func, args: list, number: int) -> float:
+    # best of 3, in µs per lookup
+    results = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for i in range(number):
+            func(args[i % len(args)])
+        results.append(time.perf_counter() - start)
+    return min(results) / number * 1e6
+
+
+def main(args: argparse.Namespace) -> int:
+    rnd = random.Random(1)
+    print(f"{'Lookup':<16}{'Rules':>8}{'legacy (µs)':>14}{'table (µs)':>14}{'Speedup':>10}")
+    for size in [int(x) for x in args.rules.split(',')]:
+        config = restricted(rnd, size)
+        slots = [{
+            'unit_type': rnd.choice(UNIT_TYPES),
+            'unit_name': f'unit_name{rnd.randrange(size or 1)}#1',
+            'group_name': f'group_name{rnd.randrange(size or 1)}'
+        } for _ in range(args.slots)]
+        legacy = measure(lambda x: legacy_costs(config, x), slots, args.number)
+        table = CostTable(config)
+        compiled = measure(lambda x: table.costs(x['unit_type'], x['unit_name'], x['group_name']), slots,
+                           args.number)
+        print(f"{'slot costs':<16}{size:>8}{legacy:>14.2f}{compiled:>14.2f}{legacy / compiled:>9.1f}x")
+
+        config = points_per_kill(rnd, size)
+        kills = [{
+            'arg4': -1,
+            'arg5': rnd.choice(UNIT_TYPES),
+            'victimCategory': rnd.choice(CATEGORIES)
+        } for _ in range(args.slots)]
+        legacy = measure(lambda x: legacy_points(config, x), kills, args.number)
+        points = PointsTable(config['points_per_kill'])
+        compiled = measure(lambda x: points.points(None, x), kills, args.number)
+        print(f"{'points per kill':<16}{size:>8}{legacy:>14.2f}{compiled:>14.2f}{legacy / compiled:>9.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='slot_costs.py', description='Benchmark the slot cost lookups.')
+    parser.add_argument('-r', '--rules', default='10,100,1000', help='Comma-separated list of rule counts')
+    parser.add_argument('-s', '--slots', type=int, default=200, help='Number of different slots (or kills)')
+    parser.add_argument('-n', '--number', type=int, default=20000, help='Lookups per measurement')
+    args = parser.parse_args()
+
+    import_core()
+    from core import utils
+    from plugins.creditsystem.points import PointsTable
+    from plugins.slotblocking.costs import CostTable
+
+    sys.exit(main(args))
@@ -0,0 +1,124 @@
+"""
+Shared setup of the tests.
+
+The core package parses the command line as soon as it is imported. It is imported here once, without the arguments
+of pytest, so the tests can import it like any other package.
+"""
+import asyncio
+import sys
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+_argv = sys.argv
+sys.argv = [_argv[0]]
+try:
+    import core.commandline  # noqa: F401
+finally:
+    sys.argv = _argv
+
+from psycopg import errors
+
+
+# =============================================================================
+# Fake psycopg async pool
+# =============================================================================
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection", rows: list[tuple] | None = None):
+        self.conn = conn
+        # like psycopg, statements without a result set have no description
+        self.description = None if rows is None else [('column', )]
+        self.rows = rows or []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+    async def executemany(self, query: str, params: list[tuple]):
+        pool = self.conn.pool
+        await self.conn.statement()
+        if pool.fail_next:
+            pool.fail_next -= 1
+            raise errors.OperationalError("connection lost")
+        pool.db.check(query, params)
+        if self.conn.pending is not None:
+            self.conn.pending.append((query, params))
+        else:
+            pool.db.write(query, params)
+
+
+class FakeConnection:
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+        # the statements of the open transaction
+        self.pending: list[tuple[str, list[tuple]]] | None = None
+
+    async def statement(self):
+        self.pool.statements += 1
+        # let the other tasks run, as a round trip to the database would
+        await asyncio.sleep(0)
+
+    async def execute(self, query: str, params: tuple | dict | None = None, *, binary: bool = False):
+        await self.statement()
+        return FakeCursor(self, self.pool.db.select(query, params))
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.pending = []
+        try:
+            yield
+            await asyncio.sleep(0)
+            for query, params in self.pending:
+                self.pool.db.write(query, params)
+        finally:
+            self.pending = None
+
+
+class FakePool:
+    """
+    In-memory fake of the psycopg async pool. The data lives in db, which answers the statements of execute() with
+    select() (None for statements without a result set), rejects invalid rows with check() (like a constraint would)
+    and applies the rows of executemany() with write(), as soon as their transaction commits. Every statement yields
+    to the event loop, and the next fail_next writes fail with a lost connection.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.statements = 0
+        self.fail_next = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        yield FakeConnection(self)
+
+
+@pytest.fixture
+def fake_pool():
+    """
+    Creates a FakePool around a test database.
+    """
+    return FakePool
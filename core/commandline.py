@@ -21,6 +21,9 @@ if not COMMAND_LINE_ARGS:
         parser.add_argument('-s', '--secret', action='store_true', help='Reveal all stored passwords')
         parser.add_argument('-a', '--restarted', action='store_true', help='Indicates if the bot was restarted')
         parser.add_argument('-p', '--ping', action='store_true', help='Ping Google DNS on startup to assure internet connection')
+        parser.add_argument('--capture', help='Record all datagrams received from DCS into this file')
+        parser.add_argument('--profile-startup', action='store_true',
+                            help='Write an import time / memory profile to logs/startup-<node>.log')
     elif program == 'update.py':
         parser.add_argument('-n', '--node', help='Node name', default=platform.node())
         parser.add_argument('-r', '--no-restart', action='store_true', default=False,
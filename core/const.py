@@ -12,6 +12,7 @@ __all__ = [
     "QFE_TO_QNH_INHG",
     "QFE_TO_QNH_MB",
     "MAX_SAFE_INTEGER",
+    "MAX_DCS_DATAGRAM",
     "WEEKDAYS",
     "MONTH",
     "TRAFFIC_LIGHTS",
@@ -31,6 +32,7 @@ MMHG_IN_HPA = 1.333224
 QFE_TO_QNH_INHG = 0.00107777777777778
 QFE_TO_QNH_MB = 0.03662667
 MAX_SAFE_INTEGER = 9007199254740991 # Lua 5.1 max integer representation, 2^253 - 1
+MAX_DCS_DATAGRAM = 8192 # LuaSocket reads a datagram into a buffer of 8 KB and cuts off anything longer
 
 WEEKDAYS = {
     0: 'Mon',
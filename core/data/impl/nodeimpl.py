@@ -41,7 +41,7 @@ from psycopg import sql
 from psycopg.errors import ConnectionTimeout, UniqueViolation, UndefinedTable, UndefinedColumn
 from psycopg.types.json import Json
 from psycopg_pool import ConnectionPool, AsyncConnectionPool
-from typing import Awaitable, Callable, Any
+from typing import AsyncIterator, Awaitable, Callable, Any
 from typing_extensions import override
 from urllib.parse import urlparse, quote, unquote
 from version import __version__
@@ -55,7 +55,8 @@ from core.data.impl.instanceimpl import InstanceImpl
 from core.data.server import Server
 from core.data.impl.serverimpl import ServerImpl
 from core.services.registry import ServiceRegistry
-from core.utils.helper import YAMLError, cache_with_expiration
+from core.utils.cache import cache_with_expiration
+from core.utils.helper import YAMLError
 
 # ruamel YAML support
 from ruamel.yaml import YAML
@@ -435,21 +436,23 @@ class NodeImpl(Node):
         num_workers = pool_max // 2
         timeout = 180.0 if self.locals.get('slow_system', False) else 90.0
         self.log.debug("- Initializing database pools ...")
-        self.pool = ConnectionPool(lpool_url, name="SyncPool", min_size=2, max_size=10,
-                                   check=ConnectionPool.check_connection, max_idle=max_idle, timeout=timeout,
-                                   open=False)
+        # the metered pools report their connection wait times to the MetricsRegistry
+        self.pool = utils.MeteredConnectionPool(lpool_url, name="SyncPool", min_size=2, max_size=10,
+                                                check=ConnectionPool.check_connection, max_idle=max_idle,
+                                                timeout=timeout, open=False)
         self.pool.open()
 
-        self.apool = AsyncConnectionPool(conninfo=lpool_url, name="AsyncPool", min_size=pool_min, max_size=pool_max,
-                                         check=AsyncConnectionPool.check_connection, max_idle=max_idle, timeout=timeout,
-                                         num_workers=num_workers, max_waiting=max_waiting, open=False)
+        self.apool = utils.MeteredAsyncConnectionPool(conninfo=lpool_url, name="AsyncPool", min_size=pool_min,
+                                                      max_size=pool_max, check=AsyncConnectionPool.check_connection,
+                                                      max_idle=max_idle, timeout=timeout, num_workers=num_workers,
+                                                      max_waiting=max_waiting, open=False)
         await self.apool.open()
 
         # initialize the cluster pool
         if urlparse(lpool_url).path != urlparse(cpool_url).path:
             self.log.info("- Federation detected.")
             # create the fast cluster pool
-            self.cpool = AsyncConnectionPool(
+            self.cpool = utils.MeteredAsyncConnectionPool(
                 conninfo=cpool_url, name="ClusterPool", min_size=2, max_size=4,
                 check=AsyncConnectionPool.check_connection, max_idle=max_idle, timeout=timeout, open=False)
             await self.cpool.open()
@@ -533,11 +536,11 @@ class NodeImpl(Node):
             # check if there is an old database already
             cursor = await conn.execute("""
                 SELECT tablename FROM pg_catalog.pg_tables 
-                WHERE tablename IN ('cluster', 'nodes', 'files')
+                WHERE tablename IN ('cluster', 'nodes', 'files', 'file_chunks')
             """)
             tables = [x[0] async for x in cursor]
-            # initial setup
-            if len(tables) < 3:
+            # initial setup (or tables added later on, cluster.sql only creates what is missing)
+            if len(tables) < 4:
                 with open(os.path.join('sql', 'cluster.sql'), mode='r') as tables_sql:
                     for query in [
                         stmt.strip()
@@ -1419,13 +1422,24 @@ class NodeImpl(Node):
         if self.node.master:
             return await _read_file(path)
         else:
-            async with self.apool.connection() as conn:
-                cursor = await conn.execute("""
-                    INSERT INTO files (guild_id, name, data) 
-                    VALUES (%s, %s, %s)
-                    RETURNING id
-                """, (self.guild_id, path, psycopg.Binary(await _read_file(path))))
-                return (await cursor.fetchone())[0]
+            # the master picks the file up chunk by chunk, see NodeProxy.stream_file()
+            return await utils.FileTransfer(self.apool, self.guild_id, log=self.log).offer(
+                path, self.stream_file(path))
+
+    @override
+    async def stream_file(self, path: str) -> AsyncIterator[bytes]:
+        path = os.path.expandvars(path)
+        if path.startswith('http'):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(path, proxy=self.proxy, proxy_auth=self.proxy_auth) as response:
+                    if response.status != 200:
+                        raise FileNotFoundError(path)
+                    async for chunk in utils.read_chunks(response.content.read):
+                        yield chunk
+        else:
+            async with aiofiles.open(path, mode='rb') as file:
+                async for chunk in utils.read_chunks(file.read):
+                    yield chunk
 
     @override
     async def write_file(self, filename: str, url: str, overwrite: bool = False) -> UploadStatus:
@@ -4,6 +4,7 @@ import asyncio
 import atexit
 import importlib
 import inspect
+import itertools
 import json
 import luadata
 import os
@@ -22,9 +23,8 @@ if sys.platform == 'win32':
     import win32process
 
 from contextlib import suppress
-from copy import deepcopy
 from core import utils, Server
-from core.const import MAX_SAFE_INTEGER
+from core.const import MAX_SAFE_INTEGER, MAX_DCS_DATAGRAM
 from core.extension import InstallableExtension
 from core.data.dataobject import DataObjectFactory
 from core.data.const import Status, Channel, Coalition
@@ -33,7 +33,7 @@ from core.extension import Extension, InstallException
 from core.mizfile import MizFile
 from core.process import ProcessManager
 from core.services import ServiceRegistry
-from core.utils.helper import cache_with_expiration
+from core.utils.cache import cache_with_expiration
 from core.utils.performance import performance_log
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -59,7 +59,62 @@ DEFAULT_EXTENSIONS = {
     "Cloud": {}
 }
 
-__all__ = ["ServerImpl"]
+__all__ = [
+    "ServerImpl",
+    "serialize",
+    "frame"
+]
+
+# the header of a fragment is MAGIC_BYTE + "<msg_id>|<total>|<part>|", see DCSServerBotMain.lua
+MAGIC_BYTE = b'\x01'
+MAX_HEADER_LENGTH = 32
+MAX_FRAGMENT_PAYLOAD = MAX_DCS_DATAGRAM - MAX_HEADER_LENGTH
+
+
+def serialize(value: Any) -> Any:
+    """
+    Converts a value into something Lua can read: large numbers become strings and enums their values.
+    Dicts and lists are only copied if something in them needs to be converted, the value itself is never changed.
+    """
+    if isinstance(value, bool):
+        return value
+    elif isinstance(value, int):
+        return value if value < MAX_SAFE_INTEGER else str(value)
+    elif isinstance(value, Enum):
+        return value.value
+    elif isinstance(value, dict):
+        result = value
+        for key, item in value.items():
+            new = serialize(item)
+            if new is not item:
+                if result is value:
+                    result = dict(value)
+                result[key] = new
+        return result
+    elif isinstance(value, list):
+        result = value
+        for idx, item in enumerate(value):
+            new = serialize(item)
+            if new is not item:
+                if result is value:
+                    result = list(value)
+                result[idx] = new
+        return result
+    return value
+
+
+def frame(data: bytes, msg_id: int) -> list[bytes]:
+    """
+    Splits a message that does not fit into a single datagram into fragments, that DCS puts together again.
+    """
+    if len(data) <= MAX_DCS_DATAGRAM:
+        return [data]
+    total = -(-len(data) // MAX_FRAGMENT_PAYLOAD)
+    return [
+        MAGIC_BYTE + f"{msg_id:X}|{total}|{part + 1}|".encode('ascii') +
+        data[part * MAX_FRAGMENT_PAYLOAD:(part + 1) * MAX_FRAGMENT_PAYLOAD]
+        for part in range(total)
+    ]
 
 
 class MissionFileSystemEventHandler(FileSystemEventHandler):
@@ -164,6 +219,8 @@ class ServerImpl(Server):
         super().__post_init__()
         self.is_remote = False
         self.transport = None
+        # ids of fragmented messages, unique across restarts of the bot
+        self._msg_ids = itertools.count(int(time.time() * 1000))
         self._lock = asyncio.Lock()
         with self.pool.connection() as conn:
             conn.execute("""
@@ -372,12 +429,15 @@ class ServerImpl(Server):
             if not admin_channel:
                 data = yaml.load(Path(os.path.join(self.node.config_dir, 'services', 'bot.yaml')))
                 admin_channel = data.get('channels', {}).get('admin', -1)
+            # 0 (per frame) is a valid window, so it has to be passed as a string
+            event_batching = self.locals.get('event_batching')
+            event_batching = str(event_batching) if event_batching is not None else 'nil'
             with open(os.path.join('Scripts', 'net', 'DCSServerBot', 'DCSServerBotConfig.lua.tmpl'), mode='r',
                       encoding='utf-8') as template:
                 with open(os.path.join(bot_home, 'DCSServerBotConfig.lua'), mode='w', encoding='utf-8') as outfile:
                     for line in template.readlines():
                         line = utils.format_string(line, node=self.node, instance=self.instance, server=self,
-                                                   admin_channel=admin_channel)
+                                                   admin_channel=admin_channel, event_batching=event_batching)
                         outfile.write(line)
         except KeyError as k:
             self.log.error(f'! You must set a value for {k}. See README for help.')
@@ -482,42 +542,27 @@ class ServerImpl(Server):
             return miz.theatre
         return None
 
-    def serialize(self, message: dict):
-        def _serialize_value(value: Any) -> Any:
-            if isinstance(value, bool):
-                return value
-            elif isinstance(value, int):
-                return value if value < MAX_SAFE_INTEGER else str(value)
-            elif isinstance(value, Enum):
-                return value.value
-            elif isinstance(value, dict):
-                return self.serialize(value)
-            elif isinstance(value, list):
-                return [_serialize_value(x) for x in value]
-            return value
-
-        for key, value in message.items():
-            message[key] = _serialize_value(value)
-        return message
-
     async def _ensure_transport(self):
-        if self.transport:
-            return
+        port = int(self.port)
+        if self.transport and not self.transport.is_closing():
+            if self.transport.get_extra_info('peername', ('', port))[1] == port:
+                return
+            self.transport.close()
         loop = asyncio.get_running_loop()
         self.transport, _ = await loop.create_datagram_endpoint(
             lambda: asyncio.DatagramProtocol(),
-            remote_addr=("127.0.0.1", int(self.port)),
+            remote_addr=("127.0.0.1", port),
             local_addr=("0.0.0.0", 0),
         )
 
     @override
     async def send_to_dcs(self, message: dict) -> None:
         # As Lua does not support large numbers, convert them to strings
-        message = self.serialize(deepcopy(message))
-        msg = json.dumps(message)
+        msg = json.dumps(serialize(message))
         self.log.debug(f"HOST->{self.name}: {msg}")
         await self._ensure_transport()
-        self.transport.sendto(msg.encode("utf-8"))
+        for fragment in frame(msg.encode("utf-8"), next(self._msg_ids)):
+            self.transport.sendto(fragment)
 
     @override
     async def rename(self, new_name: str, update_settings: bool = False) -> None:
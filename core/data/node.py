@@ -10,7 +10,7 @@ from core.translations import get_translation
 from core.utils.helper import YAMLError
 from enum import Enum, auto
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import AsyncIterator, TYPE_CHECKING
 from urllib.parse import urlparse, unquote
 
 # ruamel YAML support
@@ -221,6 +221,10 @@ class Node(ABC):
     async def read_file(self, path: str) -> bytes | int:
         raise NotImplementedError()
 
+    @abstractmethod
+    def stream_file(self, path: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError()
+
     @abstractmethod
     async def write_file(self, filename: str, url: str, overwrite: bool = False) -> UploadStatus:
         raise NotImplementedError()
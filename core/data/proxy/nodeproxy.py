@@ -6,10 +6,10 @@ import os
 from core.data.node import Node, UploadStatus, SortOrder
 from core.data.proxy.instanceproxy import InstanceProxy
 from core.services.registry import ServiceRegistry
-from core.utils import async_cache, cache_with_expiration
+from core.utils import async_cache, cache_with_expiration, FileTransfer
 from pathlib import Path
 from psycopg import sql
-from typing import TYPE_CHECKING, cast
+from typing import AsyncIterator, TYPE_CHECKING, cast
 from typing_extensions import override
 
 # ruamel YAML support
@@ -233,6 +233,14 @@ class NodeProxy(Node):
 
     @override
     async def read_file(self, path: str) -> bytes | int:
+        # holds the whole file in memory, large files should be read with stream_file()
+        file = bytearray()
+        async for chunk in self.stream_file(path):
+            file += chunk
+        return bytes(file)
+
+    @override
+    async def stream_file(self, path: str) -> AsyncIterator[bytes]:
         timeout = 60 if not self.slow_system else 120
         data = await self.bus.send_to_node_sync({
             "command": "rpc",
@@ -242,11 +250,8 @@ class NodeProxy(Node):
                 "path": path
             }
         }, timeout=timeout, node=self.name)
-        async with self.apool.connection() as conn:
-            cursor = await conn.execute("SELECT data FROM files WHERE id = %s", (data, ), binary=True)
-            file = (await cursor.fetchone())[0]
-            await conn.execute("DELETE FROM files WHERE id = %s", (data, ))
-        return file
+        async for chunk in FileTransfer(self.apool, self.guild_id, log=self.log).receive(data):
+            yield chunk
 
     @override
     async def write_file(self, filename: str, url: str, overwrite: bool = False) -> UploadStatus:
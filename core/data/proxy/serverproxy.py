@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from core import Server, Status, utils, Coalition
-from core.utils.helper import async_cache, cache_with_expiration
+from core.utils.cache import async_cache, cache_with_expiration
 from core.data.node import UploadStatus
 from dataclasses import dataclass, field
 from typing import Any
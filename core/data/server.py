@@ -15,7 +15,8 @@ from typing import TYPE_CHECKING, Any
 
 from .dataobject import DataObject
 from .const import Status, Coalition, Channel, Side, Port
-from ..utils.helper import YAMLError, async_cache
+from ..utils.cache import async_cache
+from ..utils.helper import YAMLError
 
 # ruamel YAML support
 from ruamel.yaml import YAML
@@ -3,6 +3,8 @@ import inspect
 import logging
 
 from abc import ABCMeta
+from core.utils.metrics import MetricsRegistry
+from core.utils.performance import listener_latency
 from dataclasses import MISSING
 from typing import TypeVar, TYPE_CHECKING, Any, Type, Iterable, Callable, Generic
 
@@ -22,6 +24,11 @@ __all__ = [
 
 TPlugin = TypeVar("TPlugin", bound="Plugin")
 
+HANDLER_LATENCY = MetricsRegistry.histogram('dcssb_listener_handler_seconds', 'Event handler latency per listener',
+                                            ['plugin', 'event'])
+HANDLER_ERRORS = MetricsRegistry.counter('dcssb_listener_handler_errors', 'Failed event handlers per listener',
+                                         ['plugin', 'event'])
+
 
 def event(name: str = MISSING, cls: Type[Event] = MISSING, **attrs) -> Callable[[Any], Event]:
     if cls is MISSING:
@@ -38,6 +45,8 @@ def event(name: str = MISSING, cls: Type[Event] = MISSING, **attrs) -> Callable[
 class Event:
     def __init__(self, func, **kwargs):
         self.name: str = kwargs.get('name') or func.__name__
+        # "latest value wins": if more of these events are waiting, only the latest one needs to be processed
+        self.coalesce: bool = kwargs.get('coalesce', False)
         self.callback = func
 
     async def __call__(self, listener: EventListener, server: Server, data: dict) -> None:
@@ -74,6 +83,7 @@ class ChatCommand:
 class EventListenerMeta(type):
     __events__: dict[str, Event]
     __chat_commands__: dict[str, ChatCommand]
+    __coalesced__: set[str]
 
     def __new__(cls, *args: Any, **kwargs: Any):
         name, bases, attrs = args
@@ -92,6 +102,7 @@ class EventListenerMeta(type):
                     chat_commands[value.name] = value
         new_cls.__events__ = events
         new_cls.__chat_commands__ = chat_commands
+        new_cls.__coalesced__ = {name for name, value in events.items() if value.coalesce}
         return new_cls
 
 
@@ -104,6 +115,7 @@ class EventListener(Generic[TPlugin], metaclass=EventListenerMetaABC):
     __events__: dict[str, Event]
     __chat_commands__: dict[str, ChatCommand]
     __all_commands__: dict[str, ChatCommand]
+    __coalesced__: set[str]
 
     def __new__(cls, plugin: Plugin):
         self = super().__new__(cls)
@@ -144,8 +156,11 @@ class EventListener(Generic[TPlugin], metaclass=EventListenerMetaABC):
 
     async def processEvent(self, name: str, server: Server, data: dict) -> None:
         try:
-            await self.__events__[name](self, server, data)
+            with HANDLER_LATENCY.time(plugin=self.plugin_name, event=name):
+                async with listener_latency.measure(self.plugin_name, name):
+                    await self.__events__[name](self, server, data)
         except Exception as ex:
+            HANDLER_ERRORS.inc(plugin=self.plugin_name, event=name)
             self.log.exception(ex)
 
     def get_config(self, server: Server | None = None, *, plugin_name: str | None = None,
@@ -10,12 +10,9 @@ import shutil
 import tempfile
 import zipfile
 
-from astral import LocationInfo
-from astral.sun import sun
 from core import utils
 from datetime import datetime, timedelta, date as _date
 from packaging.version import parse, Version
-from tzfpy import get_tz
 from zoneinfo import ZoneInfo
 
 __all__ = [
@@ -41,8 +38,10 @@ class MizFile:
         if filename:
             self._load()
         self._files: list[dict] = []
-        self.node = ServiceRegistry.get(ServiceBus).node
-        if not THEATRES:
+        bus = ServiceRegistry.get(ServiceBus)
+        # MizFile can be used without a running node (mizedit.py, benchmarks)
+        self.node = bus.node if bus else None
+        if not THEATRES and self.node:
             self.read_theatres()
 
     def read_theatres(self):
@@ -305,16 +304,22 @@ class MizFile:
         else:
             self.mission['weather']['clouds'] = values
 
+    @property
+    def _has_fog2(self) -> bool:
+        # the new fog of DCS 2.9.10+ (fog2)
+        # a miz does not store the DCS version, so without a node (mizedit.py, benchmarks) we use the current format
+        return not self.node or parse(self.node.dcs_version) >= Version('2.9.10')
+
     @property
     def enable_fog(self) -> bool:
-        if parse(self.node.dcs_version) >= Version('2.9.10'):
+        if self._has_fog2:
             return self.mission['weather'].get('fog2') is not None
         else:
             return self.mission['weather'].get('enable_fog', False)
 
     @enable_fog.setter
     def enable_fog(self, value: bool) -> None:
-        if parse(self.node.dcs_version) >= Version('2.9.10'):
+        if self._has_fog2:
             if value:
                 self.mission['weather']['fog2'] = {
                     "mode": 2
@@ -326,7 +331,7 @@ class MizFile:
 
     @property
     def fog(self) -> dict:
-        if parse(self.node.dcs_version) >= Version('2.9.10'):
+        if self._has_fog2:
             fog = self.mission['weather'].get('fog2')
             if not fog:
                 return {}
@@ -341,7 +346,7 @@ class MizFile:
 
     @fog.setter
     def fog(self, values: dict):
-        if parse(self.node.dcs_version) >= Version('2.9.10'):
+        if self._has_fog2:
             if values.get('mode') == "auto":
                 self.mission['weather']['enable_fog'] = False
                 self.mission['weather']['fog2'] = {
@@ -350,7 +355,7 @@ class MizFile:
             elif "thickness" in values or "visibility" in values:
                 self.mission['weather']['enable_fog'] = True
                 self.mission['weather']['fog'] |= values
-            elif values.pop('mode', 'manual') == 'manual':
+            elif values.get('mode', 'manual') == 'manual':
                 self.mission['weather']['enable_fog'] = False
                 self.mission['weather']['fog2'] = {
                     "manual": [
@@ -481,6 +486,10 @@ class MizFile:
         - night: Two hours after dusk
         """
 
+        from astral import LocationInfo
+        from astral.sun import sun
+        from tzfpy import get_tz
+
         # Get the date from the MizFile object
         target_date = self.date
 
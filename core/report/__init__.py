@@ -2,3 +2,4 @@ from core.report.env import *
 from core.report.elements import *
 from core.report.errors import *
 from core.report.base import *
+from core.report.pipeline import *
@@ -3,9 +3,7 @@ from __future__ import annotations
 import asyncio
 import discord
 import inspect
-import numpy as np
 import os
-import pandas as pd
 import re
 import sys
 import traceback
@@ -17,8 +15,6 @@ from core import utils
 from datetime import timedelta, datetime
 from discord import ButtonStyle, Interaction
 from io import BytesIO
-from matplotlib.axes import Axes
-from matplotlib import pyplot as plt
 from psycopg.rows import dict_row
 from typing import Any, TYPE_CHECKING, cast
 
@@ -28,8 +24,14 @@ from .__utils import parse_params
 
 
 if TYPE_CHECKING:
+    from matplotlib.axes import Axes
     from services.bot import DCSServerBot
 
+# matplotlib, numpy and pandas are only loaded when the first report is rendered
+np = utils.lazy_import('numpy')
+pd = utils.lazy_import('pandas')
+plt = utils.lazy_import('matplotlib.pyplot')
+
 # ignore glyph warnings on MatPlotLib
 warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
 warnings.filterwarnings('ignore', message='.*glyph.*missing from font.*')
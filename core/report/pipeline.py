@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from core import utils
+from typing import Awaitable, Callable, Hashable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core import Server
+
+__all__ = [
+    "EmbedPipeline"
+]
+
+EMBED_CYCLE = utils.MetricsRegistry.histogram('dcssb_embed_cycle_seconds', 'Time to update all changed embeds',
+                                              ['embed'])
+EMBED_RENDERS = utils.MetricsRegistry.counter('dcssb_embed_renders', 'Embed updates per result',
+                                              ['embed', 'result'])
+
+
+class EmbedPipeline:
+    """
+    Updates a persistent embed of many servers, like the status or the player embeds.
+
+    Servers are marked as changed with mark(), and run() renders all of them concurrently (at most max_concurrency
+    at a time). If a fingerprint function is given, a server is not rendered again, as long as the fingerprint of its
+    inputs did not change and the last render is not older than max_age seconds.
+    """
+
+    def __init__(self, name: str, render: Callable[[Server], Awaitable[None]], *,
+                 fingerprint: Callable[[Server], Hashable] | None = None, max_concurrency: int = 5,
+                 max_age: float = 300):
+        self.name = name
+        self.log = logging.getLogger(__name__)
+        self._render = render
+        self._fingerprint = fingerprint
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_age = max_age
+        self._dirty: dict[str, Server] = {}
+        # server name => fingerprint, time of the last render
+        self._rendered: dict[str, tuple[Hashable, float]] = {}
+
+    def mark(self, server: Server) -> None:
+        self._dirty[server.name] = server
+
+    def forget(self, server: Server) -> None:
+        self._dirty.pop(server.name, None)
+        self._rendered.pop(server.name, None)
+
+    def _unchanged(self, server: Server) -> tuple[bool, Hashable]:
+        if not self._fingerprint:
+            return False, None
+        fingerprint = self._fingerprint(server)
+        last = self._rendered.get(server.name)
+        return bool(last and last[0] == fingerprint and time.monotonic() - last[1] < self.max_age), fingerprint
+
+    async def _process(self, server: Server) -> str:
+        try:
+            unchanged, fingerprint = self._unchanged(server)
+            if unchanged:
+                return 'skipped'
+            async with self._semaphore:
+                await self._render(server)
+            if self._fingerprint:
+                self._rendered[server.name] = (fingerprint, time.monotonic())
+            return 'rendered'
+        except (TimeoutError, asyncio.TimeoutError):
+            return 'failed'
+        except Exception as ex:
+            self.log.exception(ex)
+            return 'failed'
+
+    async def run(self) -> None:
+        if not self._dirty:
+            return
+        # servers that are marked while we render are rendered in the next run
+        servers = list(self._dirty.values())
+        self._dirty.clear()
+        start = time.perf_counter()
+        results = await asyncio.gather(*[self._process(server) for server in servers])
+        seconds = time.perf_counter() - start
+        EMBED_CYCLE.observe(seconds, embed=self.name)
+        for result in set(results):
+            EMBED_RENDERS.inc(results.count(result), embed=self.name, result=result)
+        self.log.debug(f"{self.name}: {results.count('rendered')} rendered, {results.count('skipped')} unchanged, "
+                       f"{results.count('failed')} failed in {seconds:.2f}s")
@@ -1,8 +1,13 @@
+from core.utils.cache import *
+from core.utils.capture import *
 from core.utils.campaigns import *
 from core.utils.coalitions import *
 from core.utils.dcs import *
 from core.utils.discord import *
+from core.utils.filetransfer import *
 from core.utils.helper import *
+from core.utils.lazy import *
+from core.utils.metrics import *
 from core.utils.mizedit import *
 from core.utils.network import *
 from core.utils.os import *
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, ClassVar, Hashable, Iterable
+
+__all__ = [
+    "Cache",
+    "CacheStats",
+    "CacheRegistry",
+    "cached",
+    "async_cache",
+    "cache_with_expiration"
+]
+
+DEFAULT_MAXSIZE = 1024
+
+_SENTINEL = object()
+
+
+@dataclass
+class CacheStats:
+    """
+    A miss means that the value had to be computed. Callers that waited for a value computed by another caller at the
+    same time are counted as coalesced, not as misses.
+    """
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.coalesced + self.misses
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+class Cache:
+    """
+    A bounded key / value cache, safe to be used from multiple threads.
+
+    If maxsize is reached, the least recently used entry is evicted. If a ttl (in seconds) is set, entries expire
+    after that time. Every cache is registered in the CacheRegistry under its name.
+    """
+
+    def __init__(self, name: str, *, maxsize: int | None = DEFAULT_MAXSIZE, ttl: float | None = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.RLock()
+        # changes on every invalidation, so that results computed before can be discarded
+        self._version = 0
+        CacheRegistry.register(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.lookup(key, count=False) is not _SENTINEL
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def lookup(self, key: Hashable, *, count: bool = True) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    if count:
+                        self.stats.hits += 1
+                    return value
+                del self._data[key]
+                self.stats.expirations += 1
+            if count:
+                self.stats.misses += 1
+            return _SENTINEL
+
+    def record(self, stat: str) -> None:
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.lookup(key)
+        return default if value is _SENTINEL else value
+
+    def set(self, key: Hashable, value: Any, *, version: int | None = None) -> None:
+        with self._lock:
+            # the cache was invalidated while the value was computed
+            if version is not None and version != self._version:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl if self.ttl else None)
+            self._data.move_to_end(key)
+            while self.maxsize and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            self._version += 1
+            if self._data.pop(key, _SENTINEL) is _SENTINEL:
+                return False
+            self.stats.invalidations += 1
+            return True
+
+    def invalidate_if(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            self._version += 1
+            keys = [key for key in self._data.keys() if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            self.stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self.stats.invalidations += len(self._data)
+            self._data.clear()
+
+    def info(self) -> dict[str, Any]:
+        return asdict(self.stats) | {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hit_ratio": self.stats.hit_ratio
+        }
+
+
+class CacheRegistry:
+    _lock = threading.Lock()
+    _caches: ClassVar[dict[str, Cache]] = {}
+
+    @classmethod
+    def register(cls, cache: Cache) -> None:
+        with cls._lock:
+            # a reloaded module replaces its caches
+            cls._caches[cache.name] = cache
+
+    @classmethod
+    def get(cls, name: str) -> Cache | None:
+        return cls._caches.get(name)
+
+    @classmethod
+    def caches(cls) -> list[Cache]:
+        with cls._lock:
+            return list(cls._caches.values())
+
+    @classmethod
+    def stats(cls) -> dict[str, dict[str, Any]]:
+        return {cache.name: cache.info() for cache in cls.caches()}
+
+    @classmethod
+    def clear(cls) -> None:
+        for cache in cls.caches():
+            cache.clear()
+
+
+def _key_builder(func: Callable, ignore: Iterable[str]) -> Callable[..., Hashable]:
+    signature = inspect.signature(func)
+    ignore = set(ignore)
+
+    def get_cache_key(*args, **kwargs) -> Hashable:
+        bound_args = signature.bind(*args, **kwargs)
+        bound_args.apply_defaults()
+
+        # Convert unhashable types to hashable forms
+        hashable_args = []
+        for k, v in bound_args.arguments.items():
+            if k in ignore:
+                continue
+            # For the self-parameter, use its id as part of the key
+            if k == "self":
+                hashable_args.append(id(v))
+            # if we have a .name element, use this as key instead
+            elif hasattr(v, "name") and not isinstance(v, (str, bytes)):
+                hashable_args.append(("name", getattr(v, "name", None)))
+            # Convert lists to tuples and handle nested lists
+            elif isinstance(v, list):
+                hashable_args.append(tuple(tuple(x) if isinstance(x, list) else x for x in v))
+            else:
+                hashable_args.append(v)
+        return tuple(hashable_args)
+
+    return get_cache_key
+
+
+def cached(maxsize: int | None = DEFAULT_MAXSIZE, ttl: float | None = None, *, name: str | None = None,
+           key: Callable[..., Hashable] | None = None, ignore: Iterable[str] = ()) -> Callable[[Callable], Callable]:
+    """
+    Decorator to cache the results of sync and async functions in a bounded Cache.
+
+    Concurrent calls with the same key wait for the first one (single-flight), exceptions are not cached.
+    The decorated function gets these attributes:
+        cache:                   the Cache object
+        invalidate(*args, **kw): removes the result for these arguments
+        cache_clear():           removes all results
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = Cache(name or f"{func.__module__}.{func.__qualname__}", maxsize=maxsize, ttl=ttl)
+        get_cache_key = key or _key_builder(func, ignore)
+
+        if inspect.iscoroutinefunction(func):
+            pending: dict[Hashable, asyncio.Future] = {}
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = get_cache_key(*args, **kwargs)
+                result = cache.lookup(cache_key, count=False)
+                if result is not _SENTINEL:
+                    cache.record('hits')
+                    return result
+
+                fut = pending.get(cache_key)
+                if fut is None:
+                    cache.record('misses')
+                    loop = asyncio.get_running_loop()
+                    fut = loop.create_future()
+                    pending[cache_key] = fut
+                    version = cache.version
+
+                    async def producer():
+                        try:
+                            result = await func(*args, **kwargs)
+                            cache.set(cache_key, result, version=version)
+                            fut.set_result(result)
+                        except asyncio.CancelledError:
+                            fut.cancel()
+                            raise
+                        except Exception as ex:
+                            fut.set_exception(ex)
+                        finally:
+                            if pending.get(cache_key) is fut:
+                                del pending[cache_key]
+
+                    # run the producer in its own task, so that a cancelled caller does not cancel the others
+                    loop.create_task(producer())
+                else:
+                    cache.record('coalesced')
+                return await asyncio.shield(fut)
+
+            def invalidate(*args, **kwargs) -> bool:
+                cache_key = get_cache_key(*args, **kwargs)
+                pending.pop(cache_key, None)
+                return cache.invalidate(cache_key)
+        else:
+            locks: dict[Hashable, threading.Lock] = {}
+            locks_lock = threading.Lock()
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = get_cache_key(*args, **kwargs)
+                result = cache.lookup(cache_key, count=False)
+                if result is not _SENTINEL:
+                    cache.record('hits')
+                    return result
+
+                with locks_lock:
+                    lock = locks.setdefault(cache_key, threading.Lock())
+                with lock:
+                    # another thread might have computed the result meanwhile
+                    result = cache.lookup(cache_key, count=False)
+                    if result is not _SENTINEL:
+                        cache.record('coalesced')
+                        return result
+                    cache.record('misses')
+                    try:
+                        version = cache.version
+                        result = func(*args, **kwargs)
+                        cache.set(cache_key, result, version=version)
+                        return result
+                    finally:
+                        with locks_lock:
+                            if locks.get(cache_key) is lock:
+                                del locks[cache_key]
+
+            def invalidate(*args, **kwargs) -> bool:
+                return cache.invalidate(get_cache_key(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def async_cache(func: Callable | None = None, *, maxsize: int | None = DEFAULT_MAXSIZE):
+    """
+    Caches the results of a function (LRU). An "interaction" parameter is not part of the cache key.
+    """
+    decorator = cached(maxsize=maxsize, ignore=("interaction", ))
+    return decorator(func) if func else decorator
+
+
+def cache_with_expiration(expiration: int, *, maxsize: int | None = DEFAULT_MAXSIZE):
+    """
+    Caches the results of a function for a specific duration (in seconds).
+    """
+    return cached(maxsize=maxsize, ttl=expiration)
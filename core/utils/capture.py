@@ -0,0 +1,57 @@
+import struct
+
+from typing import BinaryIO, Iterator
+
+__all__ = [
+    "CaptureWriter",
+    "read_capture"
+]
+
+MAGIC = b'DCSSBCAP\x01'
+RECORD = struct.Struct('<dI')
+
+
+class CaptureWriter:
+    """
+    Records raw datagrams with their arrival time into a capture file, which can be replayed with
+    benchmarks/servicebus_replay.py.
+
+    Format: MAGIC, followed by one record per datagram: timestamp (double, seconds since epoch), length (uint32), data.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.count = 0
+        self._file: BinaryIO | None = open(filename, mode='wb')
+        self._file.write(MAGIC)
+
+    def write(self, timestamp: float, data: bytes) -> None:
+        if not self._file:
+            return
+        self._file.write(RECORD.pack(timestamp, len(data)))
+        self._file.write(data)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def read_capture(filename: str) -> Iterator[tuple[float, bytes]]:
+    """
+    Yields (timestamp, datagram) tuples from a capture file.
+    """
+    with open(filename, mode='rb') as infile:
+        if infile.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filename} is not a capture file.")
+        while True:
+            header = infile.read(RECORD.size)
+            if len(header) < RECORD.size:
+                # a truncated record can happen if the bot was killed while capturing
+                return
+            timestamp, length = RECORD.unpack(header)
+            data = infile.read(length)
+            if len(data) < length:
+                return
+            yield timestamp, data
@@ -24,7 +24,8 @@ from psycopg.rows import dict_row
 from typing import cast, TYPE_CHECKING, Iterable, Any, Callable
 from typing_extensions import deprecated
 
-from .helper import get_all_players, is_ucid, format_string, cache_with_expiration
+from .cache import cache_with_expiration
+from .helper import get_all_players, is_ucid, format_string
 
 if TYPE_CHECKING:
     from core import Server, Player, Node, Instance, Plugin
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import logging
+import psycopg
+import tempfile
+import time
+import zipfile
+
+from contextlib import aclosing, asynccontextmanager
+from psycopg import errors
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from psycopg_pool import AsyncConnectionPool
+
+__all__ = [
+    "FileTransfer",
+    "ChecksumError",
+    "read_chunks",
+    "spool",
+    "CHUNK_SIZE"
+]
+
+CHUNK_SIZE = 4 * 1024 * 1024
+# files up to this size are spooled in memory, larger ones on disk
+SPOOL_SIZE = CHUNK_SIZE
+
+
+class ChecksumError(IOError):
+    pass
+
+
+async def read_chunks(read: Callable[[int], Awaitable[bytes]], chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Reads fixed-size chunks from a stream (aiofiles, aiohttp.StreamReader, ...). Only the last chunk can be smaller.
+    """
+    while True:
+        buffer = bytearray()
+        while len(buffer) < chunk_size:
+            data = await read(chunk_size - len(buffer))
+            if not data:
+                break
+            buffer += data
+        if buffer:
+            yield bytes(buffer)
+        if len(buffer) < chunk_size:
+            return
+
+
+@asynccontextmanager
+async def spool(chunks: AsyncIterator[bytes], *, zip_name: str | None = None) -> AsyncIterator[BinaryIO]:
+    """
+    Writes the chunks (like the ones of Node.stream_file()) into a temporary file, that is positioned at its start and
+    removed afterward. Small files stay in memory, larger ones are moved to disk. If zip_name is given, the chunks are
+    compressed into a zip archive, as a file of that name.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as file:
+        async with aclosing(chunks):
+            if zip_name:
+                with zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    with zip_file.open(zip_name, 'w', force_zip64=True) as outfile:
+                        async for chunk in chunks:
+                            await asyncio.to_thread(outfile.write, chunk)
+            else:
+                async for chunk in chunks:
+                    await asyncio.to_thread(file.write, chunk)
+        file.seek(0)
+        yield file
+
+
+class FileTransfer:
+    """
+    Streams files between nodes through the files and file_chunks tables.
+
+    The sender writes fixed-size chunks with their SHA-256 checksum, while the receiver reads, verifies and deletes
+    them. The sender stays at most "window" chunks ahead of the receiver, so memory and database usage are bounded on
+    both sides, independent of the file size. If the database connection drops, both sides continue with the last
+    unacknowledged chunk. Deleting the files row removes all of its chunks.
+    """
+
+    # keep references to the running uploads, asyncio only holds weak references to tasks
+    _tasks: set[asyncio.Task] = set()
+
+    def __init__(self, apool: "AsyncConnectionPool", guild_id: int, *, chunk_size: int = CHUNK_SIZE,
+                 window: int = 8, timeout: float = 60.0, retries: int = 3, log: logging.Logger | None = None):
+        self.apool = apool
+        self.guild_id = guild_id
+        self.chunk_size = chunk_size
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+        self.log = log or logging.getLogger(__name__)
+
+    async def _execute(self, query: str, params: tuple | dict, *, binary: bool = False) -> tuple | None:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.apool.connection() as conn:
+                    cursor = await conn.execute(query, params, binary=binary)
+                    return await cursor.fetchone() if cursor.description else None
+            except psycopg.OperationalError as ex:
+                if attempt >= self.retries:
+                    raise
+                self.log.debug(f"FileTransfer: database error, retrying: {ex!r}")
+                await asyncio.sleep(2 ** attempt)
+        return None
+
+    async def offer(self, name: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Registers a file and uploads its chunks in the background. Returns the file id for the receiver.
+        Errors on opening the source (like FileNotFoundError) are raised here, before anything is stored.
+        """
+        try:
+            first = await anext(chunks, None)
+            file_id = (await self._execute("""
+                INSERT INTO files (guild_id, name, data, chunk_size)
+                VALUES (%s, %s, ''::bytea, %s)
+                RETURNING id
+            """, (self.guild_id, name, self.chunk_size)))[0]
+        except BaseException:
+            await chunks.aclose()
+            raise
+        task = asyncio.create_task(self._send(file_id, first, chunks))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return file_id
+
+    async def _wait_for_receiver(self, file_id: int, seq: int) -> bool:
+        delay = 0.01
+        deadline = time.monotonic() + self.timeout
+        while True:
+            row = await self._execute("""
+                SELECT (SELECT MIN(seq) FROM file_chunks WHERE file_id = f.id) FROM files f WHERE f.id = %s
+            """, (file_id, ))
+            if not row:
+                # the receiver cancelled the transfer
+                return False
+            if row[0] is None or seq - row[0] < self.window:
+                return True
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Receiver did not pick up file {file_id} within {self.timeout}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    async def _send(self, file_id: int, first: bytes | None, chunks: AsyncIterator[bytes]) -> None:
+        seq = 0
+        size = 0
+        chunk = first
+        try:
+            while chunk is not None:
+                if not await self._wait_for_receiver(file_id, seq):
+                    return
+                await self._execute("""
+                    INSERT INTO file_chunks (file_id, seq, data, checksum)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (file_id, seq) DO NOTHING
+                """, (file_id, seq, psycopg.Binary(chunk), hashlib.sha256(chunk).hexdigest()))
+                seq += 1
+                size += len(chunk)
+                chunk = await anext(chunks, None)
+            await self._execute("UPDATE files SET chunks = %s, size = %s WHERE id = %s", (seq, size, file_id))
+        except errors.ForeignKeyViolation:
+            # the receiver cancelled the transfer
+            pass
+        except Exception as ex:
+            self.log.error(f"FileTransfer: upload of file {file_id} failed: {ex!r}")
+            try:
+                await self._execute("UPDATE files SET error = %s WHERE id = %s", (repr(ex), file_id))
+            except psycopg.Error:
+                pass
+        finally:
+            await chunks.aclose()
+
+    async def receive(self, file_id: int) -> AsyncIterator[bytes]:
+        """
+        Yields the chunks of a file as they arrive. The file is removed from the database afterward.
+        """
+        seq = 0
+        size = 0
+        delay = 0.01
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                # delete the chunks we already have in the same round trip, so that the sender can continue
+                row = await self._execute("""
+                    WITH acked AS (
+                        DELETE FROM file_chunks WHERE file_id = %(file_id)s AND seq < %(seq)s
+                    )
+                    SELECT data, checksum FROM file_chunks WHERE file_id = %(file_id)s AND seq = %(seq)s
+                """, {"file_id": file_id, "seq": seq}, binary=True)
+                if row:
+                    data, checksum = row
+                    if hashlib.sha256(data).hexdigest() != checksum:
+                        raise ChecksumError(f"Chunk {seq} of file {file_id} is corrupted.")
+                    seq += 1
+                    size += len(data)
+                    yield data
+                    delay = 0.01
+                    deadline = time.monotonic() + self.timeout
+                    continue
+                header = await self._execute("SELECT name, chunks, size, error FROM files WHERE id = %s",
+                                             (file_id, ))
+                if not header:
+                    raise FileNotFoundError(f"File {file_id} does not exist (anymore).")
+                name, chunks, total, error = header
+                if error:
+                    raise IOError(f"Transfer of {name} failed: {error}")
+                if chunks is not None and seq >= chunks:
+                    if size != total:
+                        raise ChecksumError(f"File {name} is incomplete ({size} of {total} bytes).")
+                    return
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Sender of {name} did not send any data within {self.timeout}s.")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+        finally:
+            await self._execute("DELETE FROM files WHERE id = %s", (file_id, ))
@@ -5,10 +5,8 @@ import asyncio
 import base64
 import builtins
 import certifi
-import functools
 import hashlib
 import importlib
-import inspect
 import json
 import keyword
 import logging
@@ -30,6 +28,7 @@ import unicodedata
 from collections.abc import Mapping
 from copy import deepcopy
 from core.data.const import Port
+from core.utils.cache import cached
 from croniter import croniter
 from datetime import datetime, timedelta, timezone, tzinfo
 from difflib import unified_diff
@@ -37,7 +36,7 @@ from importlib import import_module
 from lupa.lua51 import LuaSyntaxError
 from packaging.version import parse
 from pathlib import Path
-from typing import TYPE_CHECKING, Generator, Iterable, Callable, Any, Coroutine
+from typing import TYPE_CHECKING, Generator, Iterable, Any, Coroutine
 from urllib.parse import urlparse
 
 # ruamel YAML support
@@ -73,10 +72,9 @@ __all__ = [
     "is_github_repo",
     "matches_cron",
     "dynamic_import",
-    "async_cache",
-    "cache_with_expiration",
     "asyncio_run",
     "ThreadSafeDict",
+    "ConcurrentDict",
     "SettingsDict",
     "RemoteSettingsDict",
     "tree_delete",
@@ -488,6 +486,12 @@ def get_presets(node: Node) -> Iterable[str]:
     return presets
 
 
+# Path objects have a .name, which is not unique, so use the whole path as the key
+@cached(maxsize=64, ttl=120, key=lambda filename: str(filename))
+def load_all_presets(filename: Path) -> dict:
+    return yaml.load(filename.read_text(encoding='utf-8'))
+
+
 def get_preset(node: Node, name: str, filename: str | list[str] | None = None) -> dict | list | None:
     """
     :param node: The node where the configuration is stored.
@@ -495,10 +499,6 @@ def get_preset(node: Node, name: str, filename: str | list[str] | None = None) -
     :param filename: The optional filename of the preset file to search in. If not provided, it will search for preset files in the 'config' directory.
     :return: The dictionary containing the preset data if found, or None if the preset was not found.
     """
-    @cache_with_expiration(120)
-    def load_all_presets(filename: Path) -> dict:
-        return yaml.load(filename.read_text(encoding='utf-8'))
-
     def _read_presets_from_file(filename: Path, name: str) -> dict | list | None:
         all_presets = load_all_presets(filename)
         preset = all_presets.get(name)
@@ -586,185 +586,6 @@ def dynamic_import(package_name: str):
             except Exception as ex:
                 logger.error(f"Failed to import {module_name} due to {ex}, skipping.")
 
-def async_cache(func: Callable):
-    cache: dict[Any, Any] = {}
-    pending: dict[Any, asyncio.Future] = {}
-    locks: dict[Any, asyncio.Lock] = {}
-    _SENTINEL = object()
-
-    def get_cache_key(*args, **kwargs):
-        signature = inspect.signature(func)
-        bound_args = signature.bind(*args, **kwargs)
-        bound_args.apply_defaults()
-
-        # Convert unhashable types to hashable forms
-        hashable_args = []
-        for k, v in bound_args.arguments.items():
-            if k not in ["interaction"]:  # Removed "self" from the exclusion list
-                # For the self-parameter, use its id as part of the key
-                if k == "self":
-                    hashable_args.append(id(v))
-                # if we have a .name element, use this as key instead
-                elif hasattr(v, "name") and not isinstance(v, (str, bytes)):
-                    hashable_args.append(("name", getattr(v, "name", None)))
-                # Convert lists to tuples and handle nested lists
-                elif isinstance(v, list):
-                    hashable_args.append(tuple(tuple(x) if isinstance(x, list) else x for x in v))
-                else:
-                    hashable_args.append(v)
-
-        # Use tuple instead of frozenset to preserve order and handle nested structures
-        return func.__name__, tuple(hashable_args)
-
-    async def _get_lock(key) -> asyncio.Lock:
-        lock = locks.get(key)
-        if lock is None:
-            lock = asyncio.Lock()
-            locks[key] = lock
-        return lock
-
-    @functools.wraps(func)
-    async def wrapper(*args, **kwargs):
-        key = get_cache_key(*args, **kwargs)
-
-        cached = cache.get(key, _SENTINEL)
-        if cached is not _SENTINEL:
-            return cached
-
-        lock = await _get_lock(key)
-        async with lock:
-            cached = cache.get(key, _SENTINEL)
-            if cached is not _SENTINEL:
-                return cached
-
-            fut = pending.get(key)
-            if fut is None:
-                loop = asyncio.get_running_loop()
-                fut = loop.create_future()
-                pending[key] = fut
-
-                async def run():
-                    try:
-                        result = await func(*args, **kwargs)
-                        cache[key] = result
-                        fut.set_result(result)
-                    except Exception as e:
-                        fut.set_exception(e)
-                    finally:
-                        _ = pending.pop(key, None)
-
-                loop.create_task(run())
-
-        return await fut
-
-    return wrapper
-
-
-def cache_with_expiration(expiration: int):
-    """
-    Decorator to cache function results for a specific duration.
-    Works with both sync and async functions.
-    Adds concurrency safety (per-key in-flight coalescing).
-    """
-    def decorator(func: Callable) -> Callable:
-        cache: dict[Any, Any] = {}
-        cache_expiry: dict[Any, float] = {}
-        pending: dict[Any, asyncio.Future] = {}
-        locks: dict[Any, asyncio.Lock] = {}
-        _SENTINEL = object()
-
-        def get_cache_key(*args, **kwargs):
-            signature = inspect.signature(func)
-            bound_args = signature.bind(*args, **kwargs)
-            bound_args.apply_defaults()
-
-            # Convert unhashable types to hashable forms
-            hashable_args = []
-            for k, v in bound_args.arguments.items():
-                # For the self-parameter, use its id as part of the key
-                if k == "self":
-                    hashable_args.append(id(v))
-                # if we have a .name element, use this as key instead
-                elif hasattr(v, "name") and not isinstance(v, (str, bytes)):
-                    hashable_args.append(("name", getattr(v, "name", None)))
-                # Convert lists to tuples and handle nested lists
-                elif isinstance(v, list):
-                    hashable_args.append(tuple(tuple(x) if isinstance(x, list) else x for x in v))
-                else:
-                    hashable_args.append(v)
-            return func.__name__, tuple(hashable_args)
-
-        def check_cache(cache_key):
-            ts = cache_expiry.get(cache_key)
-            if ts is not None and time.time() < ts:
-                return cache.get(cache_key, _SENTINEL)
-            return _SENTINEL
-
-        def update_cache(cache_key, result):
-            cache[cache_key] = result
-            cache_expiry[cache_key] = time.time() + expiration
-            return result
-
-        async def _get_lock(cache_key) -> asyncio.Lock:
-            # Fast path
-            lock = locks.get(cache_key)
-            if lock is None:
-                # Create lazily; a small race is fine (we only need mutual exclusion, not singletons)
-                lock = asyncio.Lock()
-                locks[cache_key] = lock
-            return lock
-
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            cache_key = get_cache_key(*args, **kwargs)
-
-            cached_result = check_cache(cache_key)
-            if cached_result is not _SENTINEL:
-                return cached_result
-
-            lock = await _get_lock(cache_key)
-            async with lock:
-                cached_result = check_cache(cache_key)
-                if cached_result is not _SENTINEL:
-                    return cached_result
-
-                fut = pending.get(cache_key)
-                if fut is None:
-                    loop = asyncio.get_running_loop()
-                    fut = loop.create_future()
-                    pending[cache_key] = fut
-
-                    async def producer():
-                        try:
-                            result = await func(*args, **kwargs)
-                            update_cache(cache_key, result)
-                            fut.set_result(result)
-                        except Exception as e:
-                            fut.set_exception(e)
-                        finally:
-                            _ = pending.pop(cache_key, None)
-
-                    loop.create_task(producer())
-
-            return await fut
-
-        @functools.wraps(func)
-        def sync_wrapper(*args, **kwargs):
-            cache_key = get_cache_key(*args, **kwargs)
-
-            cached_result = check_cache(cache_key)
-            if cached_result is not _SENTINEL:
-                return cached_result
-
-            result = func(*args, **kwargs)
-            return update_cache(cache_key, result)
-
-        if inspect.iscoroutinefunction(func):
-            return async_wrapper
-        return sync_wrapper
-
-    return decorator
-
 
 def asyncio_run(func: Coroutine[Any, Any, Any]) -> Any:
     if sys.platform == "win32" and sys.version_info >= (3, 14):
@@ -827,6 +648,89 @@ class ThreadSafeDict(dict):
             super().clear()
 
 
+class ConcurrentDict(dict):
+    """
+    A dictionary that can be shared between threads and the event loop.
+
+    Reads (d[key], get(), in, len()) do not take a lock, as single dict operations are atomic.
+    Writes are serialized by a lock. keys(), values(), items() and iterations work on an immutable snapshot of the
+    dictionary, which is only copied on the first access after a write, so iterating a dictionary that is rarely
+    changed is as cheap as iterating a dict, and it never raises a "dictionary changed size during iteration".
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self._snapshot: dict | None = None
+
+    def _get_snapshot(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self.lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    # dict.copy() would call our keys() again
+                    snapshot = self._snapshot = dict(dict.items(self))
+        return snapshot
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self._snapshot = None
+
+    def __delitem__(self, key):
+        with self.lock:
+            super().__delitem__(key)
+            self._snapshot = None
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __iter__(self):
+        return iter(self._get_snapshot())
+
+    def items(self):
+        return self._get_snapshot().items()
+
+    def values(self):
+        return self._get_snapshot().values()
+
+    def keys(self):
+        return self._get_snapshot().keys()
+
+    def copy(self) -> dict:
+        return dict(self._get_snapshot())
+
+    def pop(self, key, *default):
+        with self.lock:
+            if key not in self:
+                return super().pop(key, *default)
+            self._snapshot = None
+            return super().pop(key)
+
+    def popitem(self):
+        with self.lock:
+            self._snapshot = None
+            return super().popitem()
+
+    def setdefault(self, key, default=None):
+        with self.lock:
+            if key not in self:
+                self._snapshot = None
+            return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        with self.lock:
+            super().update(*args, **kwargs)
+            self._snapshot = None
+
+    def clear(self):
+        with self.lock:
+            super().clear()
+            self._snapshot = None
+
+
 class SettingsDict(dict):
     """
     A dictionary subclass that represents settings stored in a file.
@@ -0,0 +1,47 @@
+import importlib
+import sys
+import threading
+import types
+
+__all__ = [
+    "lazy_import"
+]
+
+
+class LazyModule(types.ModuleType):
+    """
+    Placeholder for a module that is imported on first attribute access.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = self.__dict__['_lazy_module'] = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, item: str):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns a module that is only imported when it is used for the first time, like
+        plt = lazy_import('matplotlib.pyplot')
+    Use it for heavy modules (matplotlib, pandas, numpy, ...) that are not needed on every node.
+    """
+    return sys.modules.get(name) or LazyModule(name)
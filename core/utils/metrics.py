@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+import time
+
+from contextlib import contextmanager
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+from typing import Any, Callable, ClassVar, Iterable, Iterator
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MeteredConnectionPool",
+    "MeteredAsyncConnectionPool"
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type: ClassVar[str] = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, Any] = {}
+
+    @property
+    def family(self) -> str:
+        return self.name
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        try:
+            return tuple(labels[name] for name in self.labelnames)
+        except KeyError as ex:
+            raise ValueError(f"Metric {self.name}: missing label {ex}") from None
+
+    def remove(self, **labels) -> None:
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[tuple[str, dict[str, Any], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Counter(Metric):
+    """
+    A value that only goes up, like the number of processed events.
+    """
+    type = 'counter'
+
+    @property
+    def family(self) -> str:
+        return self.name + '_total'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        # for totals that are counted somewhere else (like cache hits)
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterator[tuple[str, dict[str, Any], float]]:
+        for _, labels, value in super().samples():
+            yield self.family, labels, value
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, like a queue size.
+    """
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Counts observations (like latencies in seconds) into buckets.
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # one counter per bucket plus +Inf, sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, Any], float]]:
+        with self._lock:
+            values = [(key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items()]
+        for key, (counts, total, count) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, num in zip(self.buckets + (math.inf, ), counts):
+                cumulative += num
+                yield self.name + '_bucket', labels | {"le": _format_value(float(bound))}, cumulative
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, count
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of all metrics.
+
+    Metrics are created on first use and shared afterward, so modules can define them on module level:
+        EVENTS = MetricsRegistry.counter('dcssb_events', 'Processed events', ['server', 'event'])
+        EVENTS.inc(server=server.name, event=command)
+
+    Collectors are called before every scrape to update values that are not tracked continuously (like queue sizes).
+    """
+    _lock = threading.Lock()
+    _metrics: ClassVar[dict[str, Metric]] = {}
+    _collectors: ClassVar[list[Callable[[], None]]] = []
+    _const_labels: ClassVar[dict[str, str]] = {}
+
+    @classmethod
+    def _get_or_create(cls, metric_type: type[Metric], name: str, *args, **kwargs) -> Any:
+        with cls._lock:
+            metric = cls._metrics.get(name)
+            if metric is None:
+                metric = cls._metrics[name] = metric_type(name, *args, **kwargs)
+            elif not isinstance(metric, metric_type):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}.")
+            return metric
+
+    @classmethod
+    def counter(cls, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return cls._get_or_create(Counter, name, documentation, labelnames)
+
+    @classmethod
+    def gauge(cls, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return cls._get_or_create(Gauge, name, documentation, labelnames)
+
+    @classmethod
+    def histogram(cls, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return cls._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    @classmethod
+    def get(cls, name: str) -> Metric | None:
+        return cls._metrics.get(name)
+
+    @classmethod
+    def set_const_labels(cls, **labels) -> None:
+        cls._const_labels = {k: str(v) for k, v in labels.items()}
+
+    @classmethod
+    def add_collector(cls, collector: Callable[[], None]) -> None:
+        if collector not in cls._collectors:
+            cls._collectors.append(collector)
+
+    @classmethod
+    def remove_collector(cls, collector: Callable[[], None]) -> None:
+        if collector in cls._collectors:
+            cls._collectors.remove(collector)
+
+    @classmethod
+    def collect(cls) -> None:
+        for collector in list(cls._collectors):
+            try:
+                collector()
+            except Exception as ex:
+                # a broken collector must not break the scrape
+                logger.warning(f"Metrics collector {collector!r} failed: {ex!r}")
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        cls.collect()
+        with cls._lock:
+            metrics = sorted(cls._metrics.values(), key=lambda x: x.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.family} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.family} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(cls._const_labels | labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+DB_POOL_WAIT = MetricsRegistry.histogram('dcssb_db_pool_wait_seconds', 'Time waited for a database connection',
+                                         ['pool'])
+
+
+class MeteredConnectionPool(ConnectionPool):
+
+    def getconn(self, timeout: float | None = None):
+        with DB_POOL_WAIT.time(pool=self.name):
+            return super().getconn(timeout=timeout)
+
+
+class MeteredAsyncConnectionPool(AsyncConnectionPool):
+
+    async def getconn(self, timeout: float | None = None):
+        with DB_POOL_WAIT.time(pool=self.name):
+            return await super().getconn(timeout=timeout)
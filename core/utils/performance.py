@@ -1,47 +1,74 @@
+import asyncio
 import cProfile
 import inspect
 import io
 import logging
+import math
 import pstats
+import threading
 import time
 import traceback
 
-from contextlib import ContextDecorator
+from collections import deque
+from contextlib import ContextDecorator, asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from .metrics import MetricsRegistry
 
 __all__ = [
     "PerformanceLog",
     "performance_log",
-    "log_call"
+    "log_call",
+    "LatencyStats",
+    "LatencyTracker",
+    "listener_latency"
 ]
 
 logger = logging.getLogger(__name__)
 
+FUNCTION_LATENCY = MetricsRegistry.histogram('dcssb_function_seconds', 'Execution time of performance-logged functions',
+                                             ['function'])
+
+# only one profiler can be active at a time (Python 3.12+ raises a ValueError on the second one)
+_profiler_lock = threading.Lock()
+
 
 class PerformanceLog(ContextDecorator):
-    def __init__(self, func_name: str, use_profiling: bool = False):
+    def __init__(self, func_name: str, use_profiling: bool = False, profile_lines: int = 5):
         self.func_name = func_name
         self.use_profiling = use_profiling
+        self.profile_lines = profile_lines
         self.logger = logging.getLogger('performance_log')
+        self.profiler: cProfile.Profile | None = None
 
     def __enter__(self):
         self.start_time = time.time()
-        if self.use_profiling:
+        # if another profile is running, this one is skipped
+        if self.use_profiling and _profiler_lock.acquire(blocking=False):
             self.profiler = cProfile.Profile()
-            self.profiler.enable()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # another profiling tool (like a debugger) is active
+                self.profiler = None
+                _profiler_lock.release()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         execution_time = time.time() - self.start_time
+        FUNCTION_LATENCY.observe(execution_time, function=self.func_name)
 
-        if self.use_profiling:
+        if self.profiler:
             self.profiler.disable()
+            _profiler_lock.release()
 
             s = io.StringIO()
             sorted_stats = pstats.Stats(self.profiler, stream=s).sort_stats("cumulative")
             sorted_stats.print_stats(100)
 
             profiling_results = s.getvalue()
-            profiling_results = '\n'.join(profiling_results.split('\n')[0:5])
+            profiling_results = '\n'.join(profiling_results.split('\n')[0:self.profile_lines])
             self.logger.info('Function {} profiling results:\n{}'.format(self.func_name, profiling_results))
 
         if exc_type is not None:
@@ -57,6 +84,146 @@ class PerformanceLog(ContextDecorator):
         return False
 
 
+@dataclass
+class LatencyStats:
+    count: int
+    exceeded: int
+    budget: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    # nearest-rank on a sorted list
+    return values[max(0, math.ceil(percentile / 100 * len(values)) - 1)]
+
+
+class LatencyTracker:
+    """
+    Rolling latency windows per plugin and event, checked against a soft budget (in seconds).
+
+    If a handler exceeds its budget, a warning is written to the performance log, together with a trace:
+        stack:   the stack of the handler when its budget runs out. If the handler blocks the event loop, no stack can
+                 be taken, so the next call of that handler is profiled instead.
+        profile: the next call of that handler is profiled with cProfile. As the profile runs until the handler is done,
+                 it contains all other tasks that run while the handler waits. Only one handler is profiled at a time.
+        none:    no trace.
+    Warnings are written at most once per log_interval per handler.
+    """
+    DEFAULT_BUDGET = 0.5
+
+    def __init__(self, budget: float = DEFAULT_BUDGET, *, budgets: dict[str, float] | None = None,
+                 trace: str = 'stack', window: int = 1000, log_interval: float = 60):
+        self.logger = logging.getLogger('performance_log')
+        self._windows: dict[tuple[str, str], deque[float]] = {}
+        self._exceeded: dict[tuple[str, str], int] = {}
+        self._last_logged: dict[tuple[str, str], float] = {}
+        self._profile_next: set[tuple[str, str]] = set()
+        self.configure({
+            "budget": budget,
+            "budgets": budgets or {},
+            "trace": trace,
+            "window": window,
+            "log_interval": log_interval
+        })
+
+    def configure(self, config: dict) -> None:
+        self.budget = float(config.get('budget', self.DEFAULT_BUDGET))
+        # keys are either "plugin" or "plugin:event"
+        self.budgets = {str(k): float(v) for k, v in (config.get('budgets') or {}).items()}
+        self.trace = config.get('trace', 'stack')
+        self.window = int(config.get('window', 1000))
+        self.log_interval = float(config.get('log_interval', 60))
+        self.reset()
+
+    def get_budget(self, plugin: str, event: str) -> float:
+        return self.budgets.get(f"{plugin}:{event}", self.budgets.get(plugin, self.budget))
+
+    def record(self, plugin: str, event: str, duration: float) -> bool:
+        """
+        Adds a duration to the window of this handler. Returns True if the budget was exceeded.
+        """
+        key = (plugin, event)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = deque(maxlen=self.window)
+        window.append(duration)
+        if duration <= self.get_budget(plugin, event):
+            return False
+        self._exceeded[key] = self._exceeded.get(key, 0) + 1
+        return True
+
+    def summary(self, plugin: str, event: str) -> LatencyStats | None:
+        window = self._windows.get((plugin, event))
+        if not window:
+            return None
+        values = sorted(window)
+        return LatencyStats(count=len(values), exceeded=self._exceeded.get((plugin, event), 0),
+                            budget=self.get_budget(plugin, event), p50=_percentile(values, 50),
+                            p95=_percentile(values, 95), p99=_percentile(values, 99), max=values[-1])
+
+    def summaries(self) -> dict[tuple[str, str], LatencyStats]:
+        return {key: self.summary(*key) for key in list(self._windows.keys())}
+
+    def reset(self) -> None:
+        self._windows.clear()
+        self._exceeded.clear()
+        self._last_logged.clear()
+        self._profile_next.clear()
+
+    def _should_log(self, key: tuple[str, str]) -> bool:
+        now = time.monotonic()
+        if now - self._last_logged.get(key, -math.inf) < self.log_interval:
+            return False
+        self._last_logged[key] = now
+        return True
+
+    def _trace_stack(self, task: asyncio.Task, key: tuple[str, str], budget: float, traced: list[bool]) -> None:
+        traced.append(True)
+        if task.done() or not self._should_log(key):
+            return
+        buffer = io.StringIO()
+        task.print_stack(limit=20, file=buffer)
+        self.logger.warning(f"{key[0]}:{key[1]} is still running after {budget:.3f}s:\n{buffer.getvalue()}")
+
+    @asynccontextmanager
+    async def measure(self, plugin: str, event: str) -> AsyncIterator[None]:
+        key = (plugin, event)
+        budget = self.get_budget(plugin, event)
+        handle = None
+        traced: list[bool] = []
+        if self.trace == 'stack':
+            handle = asyncio.get_running_loop().call_later(budget, self._trace_stack, asyncio.current_task(), key,
+                                                           budget, traced)
+        profile = key in self._profile_next
+        self._profile_next.discard(key)
+        start = time.perf_counter()
+        try:
+            if profile:
+                with PerformanceLog(f"{plugin}:{event}", use_profiling=True, profile_lines=40) as log:
+                    if not log.profiler:
+                        # another handler is profiled, try again next time
+                        self._profile_next.add(key)
+                    yield
+            else:
+                yield
+        finally:
+            if handle:
+                handle.cancel()
+            duration = time.perf_counter() - start
+            if self.record(plugin, event, duration):
+                if self.trace == 'profile' or (self.trace == 'stack' and not traced):
+                    # the event loop was blocked, so no stack could be taken
+                    self._profile_next.add(key)
+                if not traced and self._should_log(key):
+                    self.logger.warning(f"{plugin}:{event} took {duration:.3f}s (budget {budget:.3f}s)")
+
+
+listener_latency = LatencyTracker()
+
+
 def performance_log(use_profiling: bool = False):
     def decorator(func):
 
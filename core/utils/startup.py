@@ -0,0 +1,139 @@
+"""
+Startup profile (run.py --profile-startup).
+
+This module is loaded by run.py before anything else is imported, so it must not import anything from core.
+"""
+import importlib.abc
+import os
+import sys
+import time
+
+from dataclasses import dataclass
+from typing import Any
+
+__all__ = [
+    "ImportProfiler"
+]
+
+MB = 1024 * 1024
+
+
+def _rss() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    seconds: float = 0.0
+    memory: int = 0
+    self_seconds: float = 0.0
+    self_memory: int = 0
+    # seconds since the profiler was installed
+    started: float = 0.0
+
+
+class _ProfilingLoader:
+    def __init__(self, loader: Any, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, item: str):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # give the module its real loader back, some packages check it
+        module.__loader__ = self._loader
+        if module.__spec__:
+            module.__spec__.loader = self._loader
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    Measures the time and the memory (RSS) spent in every module import, including the lazily imported ones.
+    "self" values exclude the imports that were done by the module.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.start_rss = _rss()
+        self.records: dict[str, ImportRecord] = {}
+        self._stack: list[tuple[str, float, int, float, int]] = []
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _ProfilingLoader(spec.loader, self)
+            return spec
+        return None
+
+    def _enter(self, name: str) -> None:
+        # name, start time, start rss, time and memory of the nested imports
+        self._stack.append((name, time.perf_counter(), _rss(), 0.0, 0))
+
+    def _leave(self, name: str) -> None:
+        _, start, rss, child_seconds, child_memory = self._stack.pop()
+        seconds = time.perf_counter() - start
+        memory = _rss() - rss
+        self.records[name] = ImportRecord(name=name, seconds=seconds, memory=memory,
+                                          self_seconds=seconds - child_seconds, self_memory=memory - child_memory,
+                                          started=start - self.start)
+        if self._stack:
+            parent = self._stack[-1]
+            self._stack[-1] = (parent[0], parent[1], parent[2], parent[3] + seconds, parent[4] + memory)
+
+    def report(self, top: int = 30) -> str:
+        total = time.perf_counter() - self.start
+        rss = _rss()
+        packages: dict[str, ImportRecord] = {}
+        for record in self.records.values():
+            package = packages.setdefault(record.name.split('.')[0], ImportRecord(record.name.split('.')[0]))
+            package.self_seconds += record.self_seconds
+            package.self_memory += record.self_memory
+        lines = [
+            f"Startup profile of process {os.getpid()}",
+            f"Time to ready: {total:.2f}s, RSS: {rss / MB:.1f} MB (+{(rss - self.start_rss) / MB:.1f} MB)",
+            f"Imports: {len(self.records)} modules, "
+            f"{sum(x.self_seconds for x in self.records.values()):.2f}s, "
+            f"{sum(x.self_memory for x in self.records.values()) / MB:.1f} MB",
+            "",
+            f"Top {top} packages (self time / memory of all their modules):",
+            f"{'Package':<40} {'Time (s)':>9} {'RSS (MB)':>9}"
+        ]
+        for record in sorted(packages.values(), key=lambda x: x.self_seconds, reverse=True)[:top]:
+            lines.append(f"{record.name[:40]:<40} {record.self_seconds:>9.3f} {record.self_memory / MB:>9.1f}")
+        lines += [
+            "",
+            f"Top {top} modules:",
+            f"{'Module':<60} {'Self (s)':>9} {'Total (s)':>9} {'Self (MB)':>9} {'At (s)':>7}"
+        ]
+        for record in sorted(self.records.values(), key=lambda x: x.self_seconds, reverse=True)[:top]:
+            lines.append(f"{record.name[:60]:<60} {record.self_seconds:>9.3f} {record.seconds:>9.3f} "
+                         f"{record.self_memory / MB:>9.1f} {record.started:>7.2f}")
+        return '\n'.join(lines) + '\n'
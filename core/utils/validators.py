@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
 import logging
 import os
 import re
 import sys
 import threading
+import time
 
 from core.const import DEFAULT_TAG
 from core.commandline import COMMAND_LINE_ARGS
+from core.utils.cache import Cache, CacheRegistry
+from core.utils.metrics import MetricsRegistry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pykwalify import partial_schemas
 from pykwalify.core import Core
@@ -50,7 +55,8 @@ __all__ = [
     "is_node",
     "is_server",
     "is_element",
-    "validate"
+    "validate",
+    "validate_all"
 ]
 
 # ruamel YAML support
@@ -64,6 +70,21 @@ if 'ports' not in vars(sys):
 else:
     ports = getattr(sys, 'ports')
 
+# Everything a validation depends on besides the file and the schemas (see validate()).
+# pykwalify loads this file again for every validation, so this has to survive these loads, too.
+if 'validation_facts' not in vars(sys):
+    setattr(sys, 'validation_facts', threading.local())
+_facts: threading.local = getattr(sys, 'validation_facts')
+
+VALIDATION_TIME = MetricsRegistry.histogram('dcssb_config_validation_seconds', 'Time to validate a configuration file',
+                                            ['file'])
+
+
+def _record(*fact) -> None:
+    facts = getattr(_facts, 'current', None)
+    if facts is not None:
+        facts.append(fact)
+
 
 class NodeData:
     _instance: ClassVar[NodeData | None] = None
@@ -136,6 +157,7 @@ def file_exists(value, _, path) -> bool | str:
             return True
         if not os.path.exists(filename) or not os.path.isfile(filename):
            return f'File "{value}" does not exist or is no file'
+        _record('file', filename)
     return True
 
 def dir_exists(value, _, path) -> str | bool:
@@ -146,6 +168,7 @@ def dir_exists(value, _, path) -> str | bool:
             return True
         if not os.path.exists(filename) or not os.path.isdir(filename):
             return f'Directory "{value}" does not exist or is no directory'
+        _record('dir', filename)
     return True
 
 def deprecated(_value, rule_obj, path) -> str | bool:
@@ -155,12 +178,15 @@ def deprecated(_value, rule_obj, path) -> str | bool:
         message += ' ' + ' '.join(enum)
     message += f' Path "{path}"'
     logger.warning(message)
+    _record('warning', logger.name, message)
     rule_obj.enum = None
     return True
 
 def obsolete(_value, _rule_obj, path) -> str | bool:
     if _is_valid(path):
-        logger.warning(f'"{os.path.basename(path)}" is obsolete and will be set by the bot: Path "{path}"')
+        message = f'"{os.path.basename(path)}" is obsolete and will be set by the bot: Path "{path}"'
+        logger.warning(message)
+        _record('warning', logger.name, message)
     return True
 
 def unique_port(value, _, path) -> str | bool:
@@ -177,6 +203,7 @@ def unique_port(value, _, path) -> str | bool:
         if value in ports[node] and ports[node][value] != path:
             return f"Port {value} is already in use in {ports[node][value]}"
         ports[node][value] = path
+        _record('port', node, value, path)
     return True
 
 def _load_schema(include_name: str, _path: str) -> str:
@@ -399,11 +426,74 @@ def check_main_structure(value, _rule_obj, path) -> str | bool:
                               path=path)
     return True
 
+def _validation_cache() -> Cache:
+    cache = CacheRegistry.get('config_validation')
+    if cache is None:
+        cache = Cache('config_validation', maxsize=512)
+    return cache
+
+
+def _hash(files: list[str]) -> str:
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.encode('utf-8'))
+        digest.update(Path(file).read_bytes())
+    return digest.hexdigest()
+
+
+def _replay(facts: list[tuple]) -> bool:
+    """
+    Checks if the facts a cached validation depended on are still true and replays its side effects.
+    """
+    for fact in facts:
+        if fact[0] == 'file' and not os.path.isfile(fact[1]):
+            return False
+        elif fact[0] == 'dir' and not os.path.isdir(fact[1]):
+            return False
+        elif fact[0] == 'port':
+            _, node, port, path = fact
+            if ports.get(node, {}).get(port, path) != path:
+                return False
+    for fact in facts:
+        if fact[0] == 'port':
+            _, node, port, path = fact
+            ports.setdefault(node, {})[port] = path
+        elif fact[0] == 'warning':
+            logging.getLogger(fact[1]).warning(fact[2])
+    return True
+
+
 def validate(source_file: str, schema_files: list[str], *, raise_exception: bool = False):
+    """
+    Validates a YAML file against the given schemas.
+
+    Successful validations are cached by the content of the file and the schemas. A cache hit skips the validation,
+    unless any file, directory or port that was checked during the validation changed in between.
+    """
+    cache = _validation_cache()
+    try:
+        # is_node(), is_server() and the other structure checks depend on nodes.yaml and servers.yaml
+        structure = [
+            x for x in (os.path.join(COMMAND_LINE_ARGS.config, 'nodes.yaml'),
+                        os.path.join(COMMAND_LINE_ARGS.config, 'servers.yaml'))
+            if os.path.exists(x)
+        ]
+        key = (_hash([source_file]), _hash(schema_files), _hash(structure), getattr(COMMAND_LINE_ARGS, 'node', None))
+    except OSError:
+        # let pykwalify report the missing file
+        key = None
+    if key:
+        facts = cache.get(key)
+        if facts is not None and _replay(facts):
+            return
+    _facts.current = facts = []
+    start = time.perf_counter()
     c = Core(source_file=source_file, schema_files=schema_files, file_encoding='utf-8',
              extensions=['core/utils/validators.py'])
     try:
         c.validate(raise_exception=True)
+        if key:
+            cache.set(key, facts)
     except PyKwalifyException as ex:
         if ex.error_key:
             source_file = ex.error_key
@@ -415,3 +505,28 @@ def validate(source_file: str, schema_files: list[str], *, raise_exception: bool
             logger.error(f'Error while parsing {ex.path}:\n{ex.error_key}')
         else:
             logger.error(f'Error while parsing {source_file}:\n{ex}', exc_info=ex)
+    finally:
+        _facts.current = None
+        seconds = time.perf_counter() - start
+        VALIDATION_TIME.observe(seconds, file=os.path.basename(str(source_file)))
+        logger.debug(f"{source_file} validated in {seconds * 1000:.1f} ms")
+
+
+def validate_all(source_files: list[str], schema_files: list[str], *, raise_exception: bool = False):
+    """
+    Validates multiple YAML files against the same schemas in parallel.
+    If raise_exception is set, the error of the first failed file (in the given order) is raised.
+    """
+    if len(source_files) < 2:
+        for source_file in source_files:
+            validate(source_file, schema_files, raise_exception=raise_exception)
+        return
+    with ThreadPoolExecutor(max_workers=min(len(source_files), os.cpu_count() or 1),
+                            thread_name_prefix='validation') as executor:
+        futures = [
+            executor.submit(validate, source_file, schema_files, raise_exception=raise_exception)
+            for source_file in source_files
+        ]
+    for future in futures:
+        # raises the exception of a failed validation
+        future.result()
@@ -8,7 +8,7 @@ import ssl
 import subprocess
 
 from contextlib import suppress
-from core import Server, utils, get_translation, PortType, Port, ThreadSafeDict, ProcessManager, InstallableExtension, \
+from core import Server, utils, get_translation, PortType, Port, ConcurrentDict, ProcessManager, InstallableExtension, \
     ServerMaintenanceManager
 from discord.ext import tasks
 from threading import Thread
@@ -29,7 +29,7 @@ LARDOON_DOWNLOAD_URL = "https://github.com/Special-K-s-Flightsim-Bots/lardoon/re
 class Lardoon(InstallableExtension):
     _process: psutil.Process | None = None
     _servers: set[str] = set()
-    _tacview_dirs: dict[str, set[str]] = ThreadSafeDict()
+    _tacview_dirs: dict[str, set[str]] = ConcurrentDict()
     _lock = asyncio.Lock()
 
     NODE_CONFIG_DICT = {
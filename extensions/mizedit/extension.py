@@ -53,11 +53,12 @@ class MizEdit(Extension):
         else:
             schema_files = []
 
+        if schema_files:
+            # unchanged files are not validated again, the others in parallel
+            utils.validate_all(presets_file, schema_files, raise_exception=(validation == 'strict'))
+
         for file in presets_file:
             try:
-                if schema_files:
-                    utils.validate(file, schema_files, raise_exception=(validation == 'strict'))
-
                 presets |= yaml.load(Path(file).read_text(encoding='utf-8'))
                 if not isinstance(presets, dict):
                     raise ValueError("File must contain a dictionary, not a list!")
@@ -1,4 +1,3 @@
-import aiofiles
 import asyncio
 import discord
 import json
@@ -6,6 +5,7 @@ import os
 import psycopg
 import shutil
 
+from contextlib import AsyncExitStack
 from core import utils, Plugin, Server, command, Node, UploadStatus, Group, Instance, Status, PlayerType, \
     PaginationReport, get_translation, DISCORD_FILE_SIZE_LIMIT, DEFAULT_PLUGINS, ServiceRegistry, NodeTransformer, \
     InstallException, InstallableExtension, ConfigView
@@ -21,7 +21,6 @@ from plugins.scheduler.views import ServerConfigView
 from services.bot import DCSServerBot
 from services.modmanager import ModManagerService
 from typing import Literal
-from zipfile import ZipFile, ZIP_DEFLATED
 
 # ruamel YAML support
 from ruamel.yaml import YAML
@@ -499,30 +498,29 @@ class Admin(Plugin[AdminEventListener]):
                 tempfolder = f"DCS.{branch.replace('.', '')}"
                 path = f"%TEMP%\\{tempfolder}\\autoupdate_templog.txt"
                 try:
-                    file = await node.read_file(path)
+                    async with utils.spool(node.stream_file(path)) as file:
+                        await msg.edit(content=_("Repair of DCS World failed on node {}.").format(node.name))
+                        await interaction.followup.send(file=discord.File(file, "autoupdate_templog.txt"),
+                                                        ephemeral=ephemeral)
                 except FileNotFoundError:
                     await msg.edit(
                         content=_("Error while repairing DCS World on node {name}. "
                                   "Check your autoupdater_log.txt").format(name=node.name))
                     return
-                await msg.edit(content=_("Repair of DCS World failed on node {}.").format(node.name))
-                await interaction.followup.send(file=discord.File(BytesIO(file), "autoupdate_templog.txt"),
-                                                ephemeral=ephemeral)
             elif rc == 2:
                 await msg.edit(
                     content=_("The repair of DCS World was cancelled on node {name}.").format(name=node.name))
             elif rc == -1:
                 path = os.path.join("logs", "dcs_repair.log")
                 try:
-                    file = await node.read_file(path)
+                    async with utils.spool(node.stream_file(path)) as file:
+                        await msg.edit(content=_("Repair of DCS World failed on node {}.").format(node.name))
+                        await interaction.followup.send(file=discord.File(file, "dcs_repair.log"), ephemeral=ephemeral)
                 except FileNotFoundError:
                     await msg.edit(
                         content=_("Error while repairing DCS World on node {name}. "
                                   "Check your dcs_repair.log").format(name=node.name))
                     return
-                await msg.edit(content=_("Repair of DCS World failed on node {}.").format(node.name))
-                await interaction.followup.send(file=discord.File(BytesIO(file), "dcs_repair.log"),
-                                                ephemeral=ephemeral)
             elif rc == -2:
                 await msg.edit(
                     content=_("You cannot run a DCS repair on a headless system without an active session!"))
@@ -637,60 +635,67 @@ class Admin(Plugin[AdminEventListener]):
         # now continue to download
         if filename.endswith('.orig'):
             filename = filename[:-5]
-        try:
-            file = await server.node.read_file(path)
-        except FileNotFoundError:
-            self.log.error(f"File {path} not found.")
-            await interaction.followup.send(content=_("File {file} not found.").format(file=filename),
-                                            ephemeral=True)
-            return
-        target = config.get('target')
-        if target:
-            target = target.format(server=server)
-        if not filename.endswith('.zip') and not filename.endswith('.miz') and not filename.endswith('.acmi') and \
-                len(file) >= DISCORD_FILE_SIZE_LIMIT:
-            zip_buffer = BytesIO()
-            with ZipFile(zip_buffer, "a", ZIP_DEFLATED, False) as zip_file:
-                zip_file.writestr(filename, file)
-            file = zip_buffer.getvalue()
-            filename += '.zip'
-        if not target:
-            dm_channel = await interaction.user.create_dm()
-            for channel in [dm_channel, interaction.channel]:
-                try:
-                    await channel.send(file=discord.File(fp=BytesIO(file), filename=os.path.basename(filename)))
-                    if channel == dm_channel:
-                        await interaction.followup.send(_('File sent as a DM.'), ephemeral=ephemeral)
-                    else:
-                        await interaction.followup.send(_('Here is your file:'), ephemeral=ephemeral)
-                    break
-                except discord.HTTPException:
-                    continue
-            else:
-                await interaction.followup.send(_('File too large. You need a higher boost level for your server.'),
-                                                ephemeral=ephemeral)
+        async with AsyncExitStack() as stack:
+            # the file is streamed from its node, it can be larger than what we want to hold in memory
+            try:
+                file = await stack.enter_async_context(utils.spool(server.node.stream_file(path)))
+            except FileNotFoundError:
+                self.log.error(f"File {path} not found.")
+                await interaction.followup.send(content=_("File {file} not found.").format(file=filename),
+                                                ephemeral=True)
                 return
-        elif target.startswith('<'):
-            channel = self.bot.get_channel(int(target[4:-1]))
-            if channel:
-                try:
-                    await channel.send(file=discord.File(fp=BytesIO(file), filename=os.path.basename(filename)))
-                except discord.HTTPException:
+            target = config.get('target')
+            if target:
+                target = target.format(server=server)
+            size = file.seek(0, os.SEEK_END)
+            file.seek(0)
+            if not filename.endswith('.zip') and not filename.endswith('.miz') and not filename.endswith('.acmi') and \
+                    size >= DISCORD_FILE_SIZE_LIMIT:
+                file = await stack.enter_async_context(
+                    utils.spool(utils.read_chunks(partial(asyncio.to_thread, file.read)), zip_name=filename))
+                filename += '.zip'
+            if not target:
+                dm_channel = await interaction.user.create_dm()
+                for channel in [dm_channel, interaction.channel]:
+                    try:
+                        file.seek(0)
+                        await channel.send(file=discord.File(fp=file, filename=os.path.basename(filename)))
+                        if channel == dm_channel:
+                            await interaction.followup.send(_('File sent as a DM.'), ephemeral=ephemeral)
+                        else:
+                            await interaction.followup.send(_('Here is your file:'), ephemeral=ephemeral)
+                        break
+                    except discord.HTTPException:
+                        continue
+                else:
                     await interaction.followup.send(_('File too large. You need a higher boost level for your server.'),
                                                     ephemeral=ephemeral)
-                if channel != interaction.channel:
-                    await interaction.followup.send(_('File sent to the configured channel.'), ephemeral=ephemeral)
+                    return
+            elif target.startswith('<'):
+                channel = self.bot.get_channel(int(target[4:-1]))
+                if channel:
+                    try:
+                        await channel.send(file=discord.File(fp=file, filename=os.path.basename(filename)))
+                    except discord.HTTPException:
+                        await interaction.followup.send(
+                            _('File too large. You need a higher boost level for your server.'), ephemeral=ephemeral)
+                    if channel != interaction.channel:
+                        await interaction.followup.send(_('File sent to the configured channel.'), ephemeral=ephemeral)
+                    else:
+                        await interaction.followup.send(_('Here is your file:'), ephemeral=ephemeral)
                 else:
-                    await interaction.followup.send(_('Here is your file:'), ephemeral=ephemeral)
+                    await interaction.followup.send(
+                        _('Channel {} not found, check your admin.yaml!').format(target[4:-1]), ephemeral=ephemeral)
             else:
-                await interaction.followup.send(_('Channel {} not found, check your admin.yaml!').format(target[4:-1]),
-                                                ephemeral=ephemeral)
-        else:
-            target_file = os.path.join(os.path.expandvars(target), os.path.basename(filename))
-            os.makedirs(os.path.dirname(target_file), exist_ok=True)
-            async with aiofiles.open(target_file, mode='wb') as outfile:
-                await outfile.write(file)
-            await interaction.followup.send(_('File copied to the specified location.'), ephemeral=ephemeral)
+                target_file = os.path.join(os.path.expandvars(target), os.path.basename(filename))
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+
+                def copy():
+                    with open(target_file, mode='wb') as outfile:
+                        shutil.copyfileobj(file, outfile)
+
+                await asyncio.to_thread(copy)
+                await interaction.followup.send(_('File copied to the specified location.'), ephemeral=ephemeral)
         await self.bot.audit(f"downloaded {filename}", user=interaction.user, server=server)
 
     @command(name='prune', description=_('Prune unused data in the database'))
@@ -794,6 +799,35 @@ class Admin(Plugin[AdminEventListener]):
             node = self.node
         await report.render(node=node.name, period=period)
 
+    @node_group.command(description=_('Latency of the event handlers'))
+    @app_commands.guild_only()
+    @utils.app_has_role('Admin')
+    @app_commands.describe(plugin=_("Show the handlers of this plugin only"))
+    @app_commands.describe(reset=_("Reset the statistics afterward"))
+    @app_commands.autocomplete(plugin=plugins_autocomplete)
+    async def latency(self, interaction: discord.Interaction, plugin: str | None = None,
+                      sort: Literal['p50', 'p95', 'p99', 'max', 'exceeded'] | None = 'p95', reset: bool | None = False):
+        ephemeral = utils.get_ephemeral(interaction)
+        summaries = [
+            (f"{key[0]}:{key[1]}", stats) for key, stats in utils.listener_latency.summaries().items()
+            if stats and (not plugin or key[0] == plugin)
+        ]
+        if not summaries:
+            await interaction.response.send_message(_("No event handlers measured yet."), ephemeral=ephemeral)
+            return
+        summaries.sort(key=lambda x: getattr(x[1], sort), reverse=True)
+        lines = [f"{'Handler':<36} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'>budget':>7}"]
+        for name, stats in summaries[:25]:
+            lines.append(f"{name[:36]:<36} {stats.p50 * 1000:>7.1f} {stats.p95 * 1000:>7.1f} "
+                         f"{stats.p99 * 1000:>7.1f} {stats.max * 1000:>7.1f} {stats.exceeded:>7}")
+        embed = discord.Embed(title=_("Event Handler Latency (ms)"), color=discord.Color.blue())
+        embed.description = "```" + '\n'.join(lines)[:4090] + "```"
+        embed.set_footer(text=_("Last {} calls per handler, default budget {}s").format(
+            utils.listener_latency.window, utils.listener_latency.budget))
+        if reset:
+            utils.listener_latency.reset()
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
+
     @node_group.command(name='list', description=_('Status of all nodes'))
     @app_commands.guild_only()
     @utils.app_has_role('DCS Admin')
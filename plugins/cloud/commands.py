@@ -3,15 +3,15 @@ import asyncio
 import certifi
 import discord
 import os
-import pandas as pd
 import platform
 import psycopg
 import shutil
 import ssl
+import time
 
 from contextlib import suppress
 from core import Plugin, utils, PaginationReport, Group, DEFAULT_TAG, PluginConfigurationError, get_translation, \
-    command, ThreadSafeDict
+    command, ConcurrentDict
 from datetime import timedelta
 from discord import app_commands, DiscordServerError
 from discord.ext import commands, tasks
@@ -23,7 +23,9 @@ from urllib.parse import quote
 
 from .listener import CloudListener
 from .logger import CloudLoggingHandler
+from .sync import CloudUploader
 
+pd = utils.lazy_import('pandas')
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -40,7 +42,11 @@ class Cloud(Plugin[CloudListener]):
         self._session = None
         self.client = None
         self.guild_bans = []
-        self.troublemakers = ThreadSafeDict()
+        self.troublemakers = ConcurrentDict()
+        sync_config = self.config.get('sync', {})
+        self.uploader = CloudUploader(self._post, chunk_size=sync_config.get('chunk_size', 100),
+                                      max_concurrency=sync_config.get('max_concurrency', 4),
+                                      retries=sync_config.get('retries', 3), log=self.log)
 
     async def _is_cloud_available(self, timeout: float = 5.0) -> bool:
         """Check if the cloud service is reachable via a quick TCP connect.
@@ -195,6 +201,10 @@ class Cloud(Plugin[CloudListener]):
         else:
             await send(data)
 
+    async def _post(self, request: str, data: dict) -> Any:
+        # retries are handled by the uploader
+        return await self._request_with_retry("post", f"{self.base_url}/{request}/", json=data, retries=0)
+
     async def _request_with_retry(self, method: str, url: str, *, retries: int = 1, **kwargs) -> Any:
         last_error: Exception | None = None
 
@@ -253,6 +263,11 @@ class Cloud(Plugin[CloudListener]):
                     message += _("\nYou need a cloud TOKEN, if you want to use cloud statistics!")
             else:
                 message += _("\nCloud sync is disabled. Set 'register' to true in cloud.yaml to enable it.")
+            stats = self.uploader.stats
+            if stats.rows:
+                message += _("\nCloud sync: {rows} rows uploaded ({rate:.0f} rows/s), {failed} failed, "
+                             "{retries} retries.").format(rows=stats.rows, rate=stats.rows_per_second,
+                                                          failed=stats.failed, retries=stats.retries)
             await interaction.followup.send(message, ephemeral=ephemeral)
         except aiohttp.ClientError:
             await interaction.followup.send(_('Cloud not connected!'), ephemeral=ephemeral)
@@ -461,6 +476,33 @@ class Cloud(Plugin[CloudListener]):
     async def before_cloud_bans(self):
         await self.bot.wait_until_ready()
 
+    async def track_changes(self) -> int:
+        # every player that got new statistics since the last high-water mark needs to be synced again
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                cursor = await conn.execute("SELECT hwm FROM cloud_sync WHERE name = 'statistics' FOR UPDATE")
+                row = await cursor.fetchone()
+                hwm = row[0] if row else None
+                cursor = await conn.execute("SELECT MAX(hop_off) FROM statistics")
+                new_hwm = (await cursor.fetchone())[0]
+                if not new_hwm or (hwm and new_hwm <= hwm):
+                    return 0
+                num = 0
+                # on the first run, all players are unsynced already
+                if hwm:
+                    cursor = await conn.execute("""
+                        UPDATE players SET synced = FALSE 
+                        WHERE synced IS TRUE AND ucid IN (
+                            SELECT DISTINCT player_ucid FROM statistics WHERE hop_off > %s AND hop_off <= %s
+                        )
+                    """, (hwm, new_hwm))
+                    num = cursor.rowcount
+                await conn.execute("""
+                    INSERT INTO cloud_sync (name, hwm) VALUES ('statistics', %s) 
+                    ON CONFLICT (name) DO UPDATE SET hwm = EXCLUDED.hwm
+                """, (new_hwm, ))
+                return num
+
     async def sync_stats(self) -> int:
         async with self.apool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cursor:
@@ -468,59 +510,66 @@ class Cloud(Plugin[CloudListener]):
                     SELECT ucid FROM players 
                     WHERE synced IS FALSE 
                     ORDER BY last_seen DESC 
-                    LIMIT 10
-                """)
-                rows = await cursor.fetchall()
-                if not rows:
+                    LIMIT %s
+                """, (self.uploader.chunk_size, ))
+                ucids = [row['ucid'] for row in await cursor.fetchall()]
+                if not ucids:
                     return 0
 
-                for row in rows:
-                    await cursor.execute("""
-                        SELECT DISTINCT x.name, x.discord_id, min(time) AS linked_at, max(time) AS last_seen FROM  
-                        (
-                            SELECT name, discord_id, COALESCE(last_seen, first_seen) AS time FROM players
-                            WHERE ucid = %(ucid)s AND manual = TRUE AND discord_id != -1
-                            UNION
-                            SELECT DISTINCT name, discord_id, min(time) AS time FROM players_hist
-                            WHERE ucid = %(ucid)s AND manual = TRUE AND discord_id != -1
-                            GROUP BY 1, 2
-                        ) x
-                        GROUP BY 1, 2
-                        ORDER BY 3
-                    """, {"ucid": row['ucid']})
-                    async for player in cursor:
-                        linked_at = player['linked_at'] or player['last_seen']
-                        await self.post('register_player', {
-                            "ucid": row['ucid'],
-                            "name": player['name'],
-                            "discord_id": player['discord_id'],
-                            "linked_at": linked_at.isoformat(),
-                            "last_seen": player['last_seen'].isoformat()
-                        })
-                    await cursor.execute("""
-                        SELECT s.player_ucid, m.mission_theatre, s.slot, 
-                               SUM(s.kills) as kills, SUM(s.pvp) as pvp, SUM(deaths) as deaths, 
-                               SUM(ejections) as ejections, SUM(crashes) as crashes, 
-                               SUM(teamkills) as teamkills, SUM(kills_planes) AS kills_planes, 
-                               SUM(kills_helicopters) AS kills_helicopters, SUM(kills_ships) AS kills_ships, 
-                               SUM(kills_sams) AS kills_sams, SUM(kills_ground) AS kills_ground, 
-                               SUM(deaths_pvp) as deaths_pvp, SUM(deaths_planes) AS deaths_planes, 
-                               SUM(deaths_helicopters) AS deaths_helicopters, SUM(deaths_ships) AS deaths_ships,
-                               SUM(deaths_sams) AS deaths_sams, SUM(deaths_ground) AS deaths_ground, 
-                               SUM(takeoffs) as takeoffs, SUM(landings) as landings, 
-                               ROUND(SUM(EXTRACT(EPOCH FROM (s.hop_off - s.hop_on))))::BIGINT AS playtime 
-                        FROM statistics s, missions m 
-                        WHERE s.player_ucid = %s AND s.hop_off IS NOT null AND s.mission_id = m.id 
+                await cursor.execute("""
+                    SELECT x.ucid, x.name, x.discord_id, min(time) AS linked_at, max(time) AS last_seen FROM  
+                    (
+                        SELECT ucid, name, discord_id, COALESCE(last_seen, first_seen) AS time FROM players
+                        WHERE ucid = ANY(%(ucids)s) AND manual = TRUE AND discord_id != -1
+                        UNION
+                        SELECT ucid, name, discord_id, min(time) AS time FROM players_hist
+                        WHERE ucid = ANY(%(ucids)s) AND manual = TRUE AND discord_id != -1
                         GROUP BY 1, 2, 3
-                    """, (row['ucid'], ))
-                    async for line in cursor:
-                        line['client'] = self.client
-                        await self.post('upload', line)
-                    await cursor.execute('UPDATE players SET synced = TRUE WHERE ucid = %s', (row['ucid'], ))
-
-                return len(rows)
+                    ) x
+                    GROUP BY 1, 2, 3
+                    ORDER BY 1, 4
+                """, {"ucids": ucids})
+                players = [
+                    {
+                        "ucid": player['ucid'],
+                        "name": player['name'],
+                        "discord_id": player['discord_id'],
+                        "linked_at": (player['linked_at'] or player['last_seen']).isoformat(),
+                        "last_seen": player['last_seen'].isoformat()
+                    }
+                    async for player in cursor
+                ]
+                await cursor.execute("""
+                    SELECT s.player_ucid, m.mission_theatre, s.slot, 
+                           SUM(s.kills) as kills, SUM(s.pvp) as pvp, SUM(deaths) as deaths, 
+                           SUM(ejections) as ejections, SUM(crashes) as crashes, 
+                           SUM(teamkills) as teamkills, SUM(kills_planes) AS kills_planes, 
+                           SUM(kills_helicopters) AS kills_helicopters, SUM(kills_ships) AS kills_ships, 
+                           SUM(kills_sams) AS kills_sams, SUM(kills_ground) AS kills_ground, 
+                           SUM(deaths_pvp) as deaths_pvp, SUM(deaths_planes) AS deaths_planes, 
+                           SUM(deaths_helicopters) AS deaths_helicopters, SUM(deaths_ships) AS deaths_ships,
+                           SUM(deaths_sams) AS deaths_sams, SUM(deaths_ground) AS deaths_ground, 
+                           SUM(takeoffs) as takeoffs, SUM(landings) as landings, 
+                           ROUND(SUM(EXTRACT(EPOCH FROM (s.hop_off - s.hop_on))))::BIGINT AS playtime 
+                    FROM statistics s, missions m 
+                    WHERE s.player_ucid = ANY(%s) AND s.hop_off IS NOT null AND s.mission_id = m.id 
+                    GROUP BY 1, 2, 3
+                """, (ucids, ))
+                stats = [line | {"client": self.client} async for line in cursor]
+
+        # do not keep the connection while uploading
+        num = await self.uploader.upload_chunks('register_player', players)
+        num += await self.uploader.upload_chunks('upload', stats)
+        async with self.apool.connection() as conn:
+            await conn.execute('UPDATE players SET synced = TRUE WHERE ucid = ANY(%s)', (ucids, ))
+        return max(num, len(ucids))
 
     async def sync_bans(self) -> int:
+        async def mark_synced(chunk: list[dict]):
+            async with self.apool.connection() as conn:
+                await conn.execute('UPDATE bans SET synced = TRUE WHERE ucid = ANY(%s)',
+                                   ([x['ucid'] for x in chunk], ))
+
         async with self.apool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cursor:
                 await cursor.execute("""
@@ -529,29 +578,40 @@ class Cloud(Plugin[CloudListener]):
                     WHERE synced IS FALSE 
                     and NOW() AT TIME ZONE 'UTC' BETWEEN banned_at AND banned_until
                     ORDER BY banned_at 
-                    LIMIT 10
-                """)
-                rows = await cursor.fetchall()
-                if not rows:
-                    return 0
-                for row in rows:
-                    await self.post('register_ban', {
+                    LIMIT %s
+                """, (self.uploader.chunk_size * self.uploader.max_concurrency, ))
+                rows = [
+                    {
                         "guild_id": self.bot.guilds[0].id,
                         "ucid": row['ucid'],
                         "reason": row['reason'],
                         "added": row['banned_at'].isoformat()
-                    })
-                    await cursor.execute('UPDATE bans SET synced = TRUE WHERE ucid = %s', (row['ucid'], ))
-                return len(rows)
+                    }
+                    async for row in cursor
+                ]
+        if not rows:
+            return 0
+        return await self.uploader.upload_chunks('register_ban', rows, on_chunk=mark_synced)
 
     @tasks.loop(seconds=10.0)
     async def cloud_sync(self):
         try:
-            num = await self.sync_stats()
-            num += await self.sync_bans()
+            if self.cloud_sync.minutes == 5.0:
+                await self.track_changes()
+            start = time.perf_counter()
+            num = 0
+            # drain the backlog, but give other tasks a chance to use the database every now and then
+            while time.perf_counter() - start < 60:
+                synced = await self.sync_stats() + await self.sync_bans()
+                if not synced:
+                    break
+                num += synced
+            if num:
+                seconds = time.perf_counter() - start
+                self.log.info(f"Cloud: {num} rows synced in {seconds:.1f}s ({num / seconds:.0f} rows/s).")
             if num == 0 and self.cloud_sync.seconds == 10.0:
                 self.cloud_sync.change_interval(minutes=5.0, seconds=0.0)
-            elif self.cloud_sync.minutes == 5.0:
+            elif num and self.cloud_sync.minutes == 5.0:
                 self.cloud_sync.change_interval(minutes=0.0, seconds=10.0)
         except (aiohttp.ClientError, TypeError):
             if self.cloud_sync.minutes == 0.0:
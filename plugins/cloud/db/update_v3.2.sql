@@ -0,0 +1 @@
+CREATE TABLE IF NOT EXISTS cloud_sync (name TEXT NOT NULL PRIMARY KEY, hwm TIMESTAMP NOT NULL);
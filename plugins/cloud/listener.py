@@ -285,7 +285,7 @@ class CloudListener(EventListener["Cloud"]):
             return
         asyncio.create_task(self.update_cloud_data(server, player))
 
-    @event(name="getMissionUpdate")
+    @event(name="getMissionUpdate", coalesce=True)
     async def getMissionUpdate(self, server: Server, _: dict) -> None:
         if not self.updates.get(server.name):
             self.updates[server.name] = datetime.now(tz=timezone.utc)
@@ -0,0 +1,119 @@
+import aiohttp
+import asyncio
+import logging
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+__all__ = [
+    "CloudUploader",
+    "SyncStats"
+]
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class SyncStats:
+    rows: int = 0
+    failed: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    last_run: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, name: str, rows: int, seconds: float) -> None:
+        self.rows += rows
+        self.seconds += seconds
+        self.last_run[name] = {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0
+        }
+
+
+class CloudUploader:
+    """
+    Uploads rows to the cloud in chunks.
+
+    The cloud API takes one row per request, so a chunk is sent with a bounded number of parallel requests. Failed
+    requests are retried with an exponential backoff. If the cloud asks us to slow down (429 / 503), all requests
+    pause until the requested time has passed. A chunk is only reported as uploaded, if every row made it.
+    """
+
+    def __init__(self, post: Callable[[str, dict], Awaitable[Any]], *, chunk_size: int = 100,
+                 max_concurrency: int = 4, retries: int = 3, backoff: float = 1.0, max_backoff: float = 60.0,
+                 log: logging.Logger | None = None):
+        self._post = post
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.log = log or logging.getLogger(__name__)
+        self.stats = SyncStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._resume_at = 0.0
+
+    def chunks(self, rows: list) -> Iterable[list]:
+        for i in range(0, len(rows), self.chunk_size):
+            yield rows[i:i + self.chunk_size]
+
+    async def _wait_for_resume(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pause(self, ex: Exception, attempt: int) -> float:
+        delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+        if isinstance(ex, aiohttp.ClientResponseError) and ex.headers:
+            try:
+                delay = min(float(ex.headers.get('Retry-After', delay)), self.max_backoff)
+            except ValueError:
+                pass
+        if isinstance(ex, aiohttp.ClientResponseError) and ex.status in (429, 503):
+            # backpressure: the cloud is overloaded, so stop all requests for a while
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return delay
+
+    async def post(self, endpoint: str, row: dict) -> Any:
+        for attempt in range(self.retries + 1):
+            await self._wait_for_resume()
+            async with self._semaphore:
+                try:
+                    return await self._post(endpoint, row)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                    if isinstance(ex, aiohttp.ClientResponseError) and ex.status not in RETRY_STATUS:
+                        raise
+                    if attempt >= self.retries:
+                        raise
+                    delay = self._pause(ex, attempt)
+                    self.stats.retries += 1
+            self.log.debug(f"Cloud: retrying {endpoint} in {delay:.1f}s ...")
+            await asyncio.sleep(delay)
+        return None
+
+    async def upload(self, endpoint: str, rows: list[dict]) -> int:
+        results = await asyncio.gather(*[self.post(endpoint, row) for row in rows], return_exceptions=True)
+        errors = [x for x in results if isinstance(x, BaseException)]
+        if errors:
+            self.stats.failed += len(errors)
+            raise errors[0]
+        return len(rows)
+
+    async def upload_chunks(self, endpoint: str, rows: list[dict],
+                            on_chunk: Callable[[list[dict]], Awaitable[None]] | None = None) -> int:
+        start = time.perf_counter()
+        num = 0
+        try:
+            for chunk in self.chunks(rows):
+                num += await self.upload(endpoint, chunk)
+                if on_chunk:
+                    await on_chunk(chunk)
+        finally:
+            self.stats.add(endpoint, num, time.perf_counter() - start)
+        return num
@@ -0,0 +1 @@
+# Cloud plugin tests
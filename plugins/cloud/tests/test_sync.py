@@ -0,0 +1,205 @@
+"""
+End-to-end tests for the chunked cloud upload.
+
+A local aiohttp server mocks the cloud endpoints. It can be told to answer with errors or to ask the client to slow
+down, and it records the maximum number of parallel requests it has seen.
+"""
+
+import aiohttp
+import asyncio
+import sys
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.cloud.sync import CloudUploader
+
+
+# =============================================================================
+# Mock cloud
+# =============================================================================
+
+class MockCloud:
+    def __init__(self, delay: float = 0.005):
+        self.delay = delay
+        self.received: dict[str, list[dict]] = {}
+        self.failures: list[tuple[int, dict]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                status, headers = self.failures.pop(0)
+                return web.json_response({}, status=status, headers=headers)
+            self.received.setdefault(request.match_info['endpoint'], []).append(await request.json())
+            return web.json_response({})
+        finally:
+            self.in_flight -= 1
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/{endpoint}/', self.handle)
+        return app
+
+
+async def start(cloud: MockCloud) -> tuple[TestServer, aiohttp.ClientSession]:
+    server = TestServer(cloud.app())
+    await server.start_server()
+    session = aiohttp.ClientSession(raise_for_status=True)
+    return server, session
+
+
+def make_post(server: TestServer, session: aiohttp.ClientSession):
+    async def post(endpoint: str, data: dict):
+        async with session.post(server.make_url(f'/{endpoint}/'), json=data) as response:
+            return await response.json()
+    return post
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+class TestUploader:
+
+    def test_all_rows_arrive_in_chunks(self):
+        async def _test():
+            cloud = MockCloud()
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), chunk_size=25, max_concurrency=5)
+                chunks = []
+
+                async def on_chunk(chunk: list[dict]):
+                    chunks.append(len(chunk))
+
+                rows = [{"ucid": f"ucid{i}", "kills": i} for i in range(110)]
+                assert await uploader.upload_chunks('upload', rows, on_chunk=on_chunk) == 110
+                assert sorted(cloud.received['upload'], key=lambda x: x['kills']) == rows
+                assert chunks == [25, 25, 25, 25, 10]
+                assert cloud.max_in_flight <= 5
+                assert uploader.stats.rows == 110
+                assert uploader.stats.rows_per_second > 0
+                assert uploader.stats.last_run['upload']['rows'] == 110
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+    def test_concurrency_is_bounded(self):
+        async def _test():
+            cloud = MockCloud(delay=0.02)
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), chunk_size=100, max_concurrency=3)
+                await uploader.upload_chunks('upload', [{"id": i} for i in range(30)])
+                assert cloud.max_in_flight == 3
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+    def test_retry_after_server_error(self):
+        async def _test():
+            cloud = MockCloud()
+            cloud.failures = [(500, {}), (502, {})]
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), max_concurrency=1, backoff=0.01)
+                await uploader.upload_chunks('register_ban', [{"ucid": "a"}, {"ucid": "b"}])
+                assert len(cloud.received['register_ban']) == 2
+                assert uploader.stats.retries == 2
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+    def test_backpressure_pauses_all_requests(self):
+        async def _test():
+            cloud = MockCloud()
+            cloud.failures = [(429, {'Retry-After': '0.2'})]
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), max_concurrency=1, backoff=0.01)
+                loop = asyncio.get_running_loop()
+                start_time = loop.time()
+                await uploader.upload_chunks('upload', [{"id": i} for i in range(3)])
+                assert loop.time() - start_time >= 0.2
+                assert len(cloud.received['upload']) == 3
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+    def test_failed_chunk_is_not_confirmed(self):
+        async def _test():
+            cloud = MockCloud()
+            cloud.failures = [(503, {})] * 6
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), chunk_size=2, max_concurrency=1, retries=2,
+                                         backoff=0.01, max_backoff=0.01)
+                confirmed = []
+
+                async def on_chunk(chunk: list[dict]):
+                    confirmed.extend(chunk)
+
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await uploader.upload_chunks('upload', [{"id": i} for i in range(4)], on_chunk=on_chunk)
+                assert confirmed == []
+                assert uploader.stats.failed == 2
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+    def test_client_errors_are_not_retried(self):
+        async def _test():
+            cloud = MockCloud()
+            cloud.failures = [(403, {})]
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), max_concurrency=1, backoff=0.01)
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await uploader.upload('upload', [{"id": 1}])
+                assert cloud.requests == 1
+            finally:
+                await session.close()
+                await server.close()
+        run(_test())
+
+
+class TestThroughput:
+
+    def test_sync_throughput(self, capsys):
+        async def _test():
+            cloud = MockCloud(delay=0.001)
+            server, session = await start(cloud)
+            try:
+                uploader = CloudUploader(make_post(server, session), chunk_size=100, max_concurrency=8)
+                await uploader.upload_chunks('upload', [{"id": i} for i in range(1000)])
+                return uploader.stats
+            finally:
+                await session.close()
+                await server.close()
+        stats = run(_test())
+        assert stats.rows == 1000
+        with capsys.disabled():
+            print(f"\n  cloud sync throughput: {stats.rows_per_second:.0f} rows/s")
@@ -11,8 +11,10 @@ from plugins.competitive import rating
 from psycopg.rows import dict_row
 from services.bot import DCSServerBot
 from trueskill import Rating, BETA, global_env
+from typing import Type
 
 from .listener import CompetitiveListener
+from .ratings import RatingStore
 from ..userstats.filter import MissionStatisticsFilter, PeriodTransformer, StatisticsFilter, PeriodFilter, \
     CampaignFilter
 
@@ -39,6 +41,20 @@ async def all_modules_autocomplete(interaction: discord.Interaction, current: st
 
 class Competitive(Plugin[CompetitiveListener]):
 
+    def __init__(self, bot: DCSServerBot, eventlistener: Type[CompetitiveListener] = None):
+        super().__init__(bot, eventlistener)
+        config = self.get_config().get('ratings', {})
+        self.ratings = RatingStore(self.apool, flush_interval=config.get('flush_interval', 5.0),
+                                   batch_size=config.get('batch_size', 500), log=self.log)
+
+    async def cog_load(self) -> None:
+        await super().cog_load()
+        self.ratings.start()
+
+    async def cog_unload(self) -> None:
+        await self.ratings.stop()
+        await super().cog_unload()
+
     async def install(self) -> bool:
         if not await super().install():
             return False
@@ -141,6 +157,8 @@ class Competitive(Plugin[CompetitiveListener]):
                 (await utils.get_command(self.bot, name='linkme')).mention
             ), ephemeral=True)
             return
+        # make sure we read the latest ratings
+        await self.ratings.flush()
         async with self.apool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cursor:
                 await cursor.execute("""
@@ -230,6 +248,8 @@ class Competitive(Plugin[CompetitiveListener]):
                      user: app_commands.Transform[discord.Member | str, utils.UserTransformer] | None = None,
                      squadron_id: int | None = None):
         if squadron_id:
+            # make sure we read the latest ratings
+            await self.ratings.flush()
             r = await self.trueskill_squadron(self.node, squadron_id)
             await interaction.response.send_message(_("TrueSkill:tm: rating: {rating:.2f}.").format(
                 rating=self.calculate_rating(r)), ephemeral=True)
@@ -265,6 +285,8 @@ class Competitive(Plugin[CompetitiveListener]):
 
         ephemeral = utils.get_ephemeral(interaction)
         await interaction.response.defer(ephemeral=ephemeral)
+        # make sure we read the latest ratings
+        await self.ratings.flush()
         report = Report(self.bot, self.plugin_name, 'trueskill_hist.json')
         env = await report.render(ucid=ucid, name=name, flt=period)
         try:
@@ -291,10 +313,12 @@ class Competitive(Plugin[CompetitiveListener]):
         async with self.apool.connection() as conn:
             if user and await utils.yn_question(
                     interaction, _("Do you really want to delete TrueSkill:tm: ratings for this user?")):
+                await self.ratings.discard(ucid)
                 await conn.execute("DELETE FROM trueskill WHERE player_ucid = %s", (ucid,))
                 await conn.execute("DELETE FROM trueskill_hist WHERE player_ucid = %s", (ucid,))
             elif not user and await utils.yn_question(
                     interaction, _("Do you really want to delete the TrueSkill:tm: ratings for all users?")):
+                await self.ratings.discard()
                 await conn.execute("TRUNCATE trueskill CASCADE")
                 await conn.execute("TRUNCATE trueskill_hist CASCADE")
             else:
@@ -323,6 +347,7 @@ class Competitive(Plugin[CompetitiveListener]):
                 return
 
         ephemeral = utils.get_ephemeral(interaction)
+        await self.ratings.discard(user)
         async with self.apool.connection() as conn:
             if user:
                 await conn.execute("DELETE FROM trueskill WHERE player_ucid = %s", (user, ))
@@ -334,6 +359,8 @@ class Competitive(Plugin[CompetitiveListener]):
                                         ephemeral=ephemeral)
         channel = interaction.channel
         await self.init_trueskill(user)
+        # ratings that were loaded during the generation are outdated
+        await self.ratings.discard(user)
         if user:
             await interaction.followup.send(_("TrueSkill:tm: ratings regenerated."), ephemeral=ephemeral)
         else:
@@ -2,12 +2,11 @@ import asyncio
 import trueskill
 
 from core import EventListener, event, Server, Status, Player, chat_command, Side, get_translation, ChatCommand, \
-    Coalition, ThreadSafeDict, utils
+    Coalition, ConcurrentDict, utils
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from discord.ext import tasks
 from functools import partial
-from plugins.competitive import rating
 from trueskill import Rating
 from typing import TYPE_CHECKING
 
@@ -95,7 +94,7 @@ class CompetitiveListener(EventListener["Competitive"]):
 
     def __init__(self, plugin: "Competitive"):
         super().__init__(plugin)
-        self.matches: dict[str, dict[str, Match]] = ThreadSafeDict()
+        self.matches: dict[str, dict[str, Match]] = ConcurrentDict()
         self.in_match: dict[str, dict[str, Match]] = {}
         self.home_base: dict[str, dict[str, str]] = {}
         self.active_servers: set[str] = set()
@@ -143,7 +142,7 @@ class CompetitiveListener(EventListener["Competitive"]):
             self.active_servers.discard(server.name)
             return
         if server.name not in self.in_match:
-            self.in_match[server.name] = ThreadSafeDict()
+            self.in_match[server.name] = ConcurrentDict()
         if server.name not in self.matches:
             self.matches[server.name] = {}
         if server.name not in self.home_base:
@@ -168,6 +167,12 @@ class CompetitiveListener(EventListener["Competitive"]):
         if player:
             asyncio.create_task(self._print_trueskill(player))
 
+    @event(name="onPlayerStop")
+    async def onPlayerStop(self, server: Server, data: dict) -> None:
+        if data['id'] == 1 or 'ucid' not in data:
+            return
+        self.plugin.ratings.evict(data['ucid'])
+
     async def start_match(self, server: Server, match: Match):
         match.started = datetime.now(timezone.utc)
         self.log.debug(f"The match {match.match_id} is now on.")
@@ -315,30 +320,10 @@ class CompetitiveListener(EventListener["Competitive"]):
                 asyncio.create_task(self._addPlayerToMatch(server, new_data))
 
     async def get_rating(self, ucid: str) -> Rating:
-        async with self.apool.connection() as conn:
-            cursor = await conn.execute("""
-                SELECT skill_mu, skill_sigma 
-                FROM trueskill 
-                WHERE player_ucid = %s
-            """, (ucid, ))
-            row = await cursor.fetchone()
-            if not row:
-                r = rating.create_rating()
-                return await self.set_rating(ucid, r)
-            else:
-                return Rating(float(row[0]), float(row[1]))
+        return await self.plugin.ratings.get(ucid)
 
     async def set_rating(self, ucid: str, skill: Rating) -> Rating:
-        async with self.apool.connection() as conn:
-            await conn.execute("""
-                INSERT INTO trueskill (player_ucid, skill_mu, skill_sigma, time) 
-                VALUES (%s, %s, %s, NOW() AT TIME ZONE 'utc')
-                ON CONFLICT (player_ucid) DO UPDATE
-                SET skill_mu = excluded.skill_mu, 
-                    skill_sigma = excluded.skill_sigma, 
-                    time = excluded.time
-            """, (ucid, skill.mu, skill.sigma))
-        return skill
+        return self.plugin.ratings.set(ucid, skill)
 
     @staticmethod
     def calculate_rating(r: Rating) -> float:
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+
+from datetime import datetime, timezone
+from psycopg import errors
+from trueskill import Rating
+from typing import TYPE_CHECKING
+
+from . import rating
+
+if TYPE_CHECKING:
+    from psycopg_pool import AsyncConnectionPool
+
+__all__ = [
+    "RatingStore"
+]
+
+# player_ucid, skill_mu, skill_sigma, time
+RatingRow = tuple[str, float, float, datetime]
+
+
+class RatingStore:
+    """
+    TrueSkill ratings of the active players with write-behind persistence.
+
+    Ratings are loaded when a player joins and are read and changed in memory afterwards. Changed ratings are written
+    in batches, inside one transaction, by a background task. The trueskill table keeps the history trigger, which
+    moves the last written rating into trueskill_hist. Ratings that were replaced before they were written are
+    added to trueskill_hist by the store, so the history is the same as if every change had been written on its own.
+    """
+
+    def __init__(self, apool: "AsyncConnectionPool", *, flush_interval: float = 5.0, batch_size: int = 500,
+                 log: logging.Logger | None = None):
+        self.apool = apool
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.log = log or logging.getLogger(__name__)
+        self.ratings: dict[str, Rating] = {}
+        self._dirty: dict[str, RatingRow] = {}
+        self._flushing: dict[str, RatingRow] = {}
+        self._history: list[RatingRow] = []
+        self._loading: dict[str, asyncio.Future] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if not self._task:
+            self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty) + len(self._history)
+
+    async def get(self, ucid: str) -> Rating:
+        skill = self.ratings.get(ucid)
+        if skill is None:
+            skill = await self.load(ucid)
+        return skill
+
+    async def load(self, ucid: str) -> Rating:
+        if ucid in self.ratings:
+            return self.ratings[ucid]
+        # concurrent loads of the same player share one query
+        future = self._loading.get(ucid)
+        if not future:
+            future = self._loading[ucid] = asyncio.ensure_future(self._read(ucid))
+            future.add_done_callback(lambda _: self._loading.pop(ucid, None))
+        row = await asyncio.shield(future)
+        # a set() or another load might have happened while we were waiting for the database
+        if ucid not in self.ratings:
+            if row:
+                self.ratings[ucid] = Rating(float(row[0]), float(row[1]))
+            else:
+                self.set(ucid, rating.create_rating())
+        return self.ratings[ucid]
+
+    async def _read(self, ucid: str) -> tuple | None:
+        async with self.apool.connection() as conn:
+            cursor = await conn.execute("""
+                SELECT skill_mu, skill_sigma
+                FROM trueskill
+                WHERE player_ucid = %s
+            """, (ucid, ))
+            return await cursor.fetchone()
+
+    def set(self, ucid: str, skill: Rating) -> Rating:
+        replaced = self._dirty.get(ucid)
+        if replaced:
+            self._history.append(replaced)
+        self.ratings[ucid] = skill
+        self._dirty[ucid] = (ucid, skill.mu, skill.sigma, datetime.now(timezone.utc).replace(tzinfo=None))
+        if self.pending >= self.batch_size:
+            self._flush_event.set()
+        return skill
+
+    def evict(self, ucid: str) -> None:
+        # unflushed ratings have to stay, otherwise a later load() would read an outdated value
+        if ucid not in self._dirty and ucid not in self._flushing:
+            self.ratings.pop(ucid, None)
+
+    async def discard(self, ucid: str | None = None) -> None:
+        """
+        Forgets the ratings (including the unwritten changes) of one or all players, before they are deleted from
+        the database.
+        """
+        # wait for a running flush, which would write them again otherwise
+        async with self._flush_lock:
+            if ucid:
+                self.ratings.pop(ucid, None)
+                self._dirty.pop(ucid, None)
+                self._history = [x for x in self._history if x[0] != ucid]
+            else:
+                self.ratings.clear()
+                self._dirty.clear()
+                self._history.clear()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            # swap the pending changes, so that updates during the write go into the next batch
+            dirty, self._dirty = self._dirty, {}
+            history, self._history = self._history, []
+            if not dirty and not history:
+                return 0
+            self._flushing = dirty
+            try:
+                try:
+                    await self._write(list(dirty.values()), history)
+                except (errors.IntegrityError, errors.DataError):
+                    # a player might have been deleted meanwhile, write row by row to skip these only
+                    await self._write_each(list(dirty.values()), history)
+            except BaseException:
+                # put everything back (even on cancellation), newer ratings take precedence over the ones we could
+                # not write
+                for ucid, row in dirty.items():
+                    if ucid in self._dirty:
+                        self._history.insert(0, row)
+                    else:
+                        self._dirty[ucid] = row
+                self._history[:0] = history
+                raise
+            finally:
+                self._flushing = {}
+            return len(dirty) + len(history)
+
+    async def _write(self, ratings: list[RatingRow], history: list[RatingRow]) -> None:
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cursor:
+                    for i in range(0, len(history), self.batch_size):
+                        await cursor.executemany("""
+                            INSERT INTO trueskill_hist (player_ucid, skill_mu, skill_sigma, time)
+                            VALUES (%s, %s, %s, %s)
+                            ON CONFLICT (player_ucid, time) DO UPDATE
+                            SET skill_mu = excluded.skill_mu,
+                                skill_sigma = excluded.skill_sigma
+                        """, history[i:i + self.batch_size])
+                    for i in range(0, len(ratings), self.batch_size):
+                        await cursor.executemany("""
+                            INSERT INTO trueskill (player_ucid, skill_mu, skill_sigma, time)
+                            VALUES (%s, %s, %s, %s)
+                            ON CONFLICT (player_ucid) DO UPDATE
+                            SET skill_mu = excluded.skill_mu,
+                                skill_sigma = excluded.skill_sigma,
+                                time = excluded.time
+                        """, ratings[i:i + self.batch_size])
+
+    async def _write_each(self, ratings: list[RatingRow], history: list[RatingRow]) -> None:
+        for ucid in dict.fromkeys(x[0] for x in ratings + history):
+            try:
+                await self._write([x for x in ratings if x[0] == ucid], [x for x in history if x[0] == ucid])
+            except (errors.IntegrityError, errors.DataError) as ex:
+                self.log.error(f"RatingStore: dropping the rating of {ucid}: {ex}")
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.log.error(f"RatingStore: flush failed, retrying in {self.flush_interval}s: {ex!r}")
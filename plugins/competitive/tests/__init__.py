@@ -0,0 +1 @@
+# Competitive plugin tests
@@ -0,0 +1,223 @@
+"""
+Tests for the write-behind persistence of the TrueSkill ratings.
+
+The store is tested against the in-memory fake of the psycopg async pool (see conftest.py), with a database that
+mimics the history trigger of the trueskill table, so that the resulting history can be compared with the one of a
+direct write per rating change.
+"""
+
+import asyncio
+import sys
+import trueskill
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from psycopg import errors
+from plugins.competitive import rating
+from plugins.competitive.ratings import RatingStore
+
+
+# =============================================================================
+# Fake database
+# =============================================================================
+
+class FakeDatabase:
+    def __init__(self):
+        self.players: set[str] = {'a', 'b', 'c', 'd'}
+        # ucid => (mu, sigma, time)
+        self.trueskill: dict[str, tuple] = {}
+        # (ucid, time) => (mu, sigma)
+        self.trueskill_hist: dict[tuple, tuple] = {}
+
+    def select(self, query: str, params: tuple) -> list[tuple]:
+        row = self.trueskill.get(params[0])
+        return [row[:2]] if row else []
+
+    def check(self, query: str, params: list[tuple]):
+        for ucid, *_ in params:
+            if ucid not in self.players:
+                raise errors.ForeignKeyViolation(f"player {ucid} does not exist")
+
+    def write(self, query: str, params: list[tuple]):
+        for ucid, mu, sigma, time in params:
+            if 'trueskill_hist' in query:
+                self.trueskill_hist[(ucid, time)] = (mu, sigma)
+            else:
+                old = self.trueskill.get(ucid)
+                if old:
+                    # tgr_trueskill_update
+                    self.trueskill_hist[(ucid, old[2])] = (old[0], old[1])
+                self.trueskill[ucid] = (mu, sigma, time)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+class TestRatings:
+
+    def test_new_player_gets_the_default_rating(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            skill = await store.get('a')
+            assert (skill.mu, skill.sigma) == (rating.mu, rating.sigma)
+            await store.flush()
+            assert db.trueskill['a'][:2] == (rating.mu, rating.sigma)
+        run(_test())
+
+    def test_existing_rating_is_loaded_once(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            db.trueskill['a'] = (30.0, 5.0, None)
+            pool = fake_pool(db)
+            store = RatingStore(pool)
+            skills = await asyncio.gather(*[store.get('a') for _ in range(10)])
+            assert all((x.mu, x.sigma) == (30.0, 5.0) for x in skills)
+            assert pool.statements == 1
+            await store.get('a')
+            assert pool.statements == 1
+        run(_test())
+
+    def test_matches_are_rated_like_before(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            expected = {ucid: rating.create_rating() for ucid in 'abcd'}
+            for winner, loser in ['ab', 'ac', 'dc', 'ba', 'ad']:
+                (expected[winner], ), (expected[loser], ) = trueskill.rate(
+                    [(expected[winner], ), (expected[loser], )], [0, 1])
+                (r_winner, ), (r_loser, ) = trueskill.rate(
+                    [(await store.get(winner), ), (await store.get(loser), )], [0, 1])
+                store.set(winner, r_winner)
+                store.set(loser, r_loser)
+            await store.flush()
+            assert {ucid: row[:2] for ucid, row in db.trueskill.items()} == {
+                ucid: (skill.mu, skill.sigma) for ucid, skill in expected.items()
+            }
+        run(_test())
+
+
+class TestPersistence:
+
+    def test_history_keeps_unwritten_ratings(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            for i in range(5):
+                store.set('a', trueskill.Rating(20 + i, 8))
+                # make sure that every change gets its own time
+                await asyncio.sleep(0.001)
+            await store.flush()
+            store.set('a', trueskill.Rating(30, 8))
+            await store.flush()
+            # every rating but the current one ends up in the history, the same as if each was written on its own
+            assert sorted(mu for mu, _ in db.trueskill_hist.values()) == [20, 21, 22, 23, 24]
+            assert db.trueskill['a'][0] == 30
+        run(_test())
+
+    def test_batched_in_one_transaction(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            db.players = {f'p{i}' for i in range(250)}
+            pool = fake_pool(db)
+            store = RatingStore(pool, batch_size=100)
+            for i in range(250):
+                store.set(f'p{i}', trueskill.Rating(i, 1))
+            await store.flush()
+            assert pool.statements == 3
+            assert len(db.trueskill) == 250
+        run(_test())
+
+    def test_failed_flush_is_retried(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            pool = fake_pool(db)
+            store = RatingStore(pool)
+            store.set('a', trueskill.Rating(20, 8))
+            pool.fail_next = 1
+            with pytest.raises(errors.OperationalError):
+                await store.flush()
+            assert store.pending == 1
+            await store.flush()
+            assert db.trueskill['a'][0] == 20
+        run(_test())
+
+    def test_newer_rating_survives_failed_flush(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            pool = fake_pool(db)
+            store = RatingStore(pool)
+            store.set('a', trueskill.Rating(20, 8))
+            pool.fail_next = 1
+            task = asyncio.create_task(store.flush())
+            await asyncio.sleep(0)
+            store.set('a', trueskill.Rating(25, 8))
+            with pytest.raises(errors.OperationalError):
+                await task
+            await store.flush()
+            assert db.trueskill['a'][0] == 25
+            assert [mu for mu, _ in db.trueskill_hist.values()] == [20]
+        run(_test())
+
+    def test_deleted_player_is_skipped(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            store.set('a', trueskill.Rating(20, 8))
+            store.set('x', trueskill.Rating(20, 8))
+            await store.flush()
+            assert list(db.trueskill) == ['a']
+            assert store.pending == 0
+        run(_test())
+
+    def test_discard(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            store.set('a', trueskill.Rating(20, 8))
+            store.set('a', trueskill.Rating(21, 8))
+            store.set('b', trueskill.Rating(20, 8))
+            await store.discard('a')
+            assert store.pending == 1
+            await store.discard()
+            assert store.pending == 0
+            assert await store.flush() == 0
+            assert db.trueskill == {}
+        run(_test())
+
+    def test_evict_keeps_unwritten_ratings(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db))
+            store.set('a', trueskill.Rating(20, 8))
+            store.evict('a')
+            assert store.ratings['a'].mu == 20
+            await store.flush()
+            store.evict('a')
+            assert 'a' not in store.ratings
+            assert (await store.get('a')).mu == 20
+        run(_test())
+
+    def test_stop_writes_everything(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            store = RatingStore(fake_pool(db), flush_interval=60)
+            store.start()
+            store.set('a', trueskill.Rating(20, 8))
+            store.set('b', trueskill.Rating(25, 8))
+            await store.stop()
+            restarted = RatingStore(fake_pool(db))
+            assert (await restarted.get('a')).mu == 20
+            assert (await restarted.get('b')).mu == 25
+        run(_test())
@@ -6,8 +6,9 @@ from discord.ext import tasks
 from core import utils, Plugin, PluginRequiredError, Group, get_translation, PersistentReport
 from psycopg.rows import dict_row
 from services.bot import DCSServerBot
-from typing import cast
+from typing import cast, Type
 
+from .ledger import CreditLedger
 from .listener import CreditSystemListener
 from .player import CreditPlayer
 
@@ -16,8 +17,15 @@ _ = get_translation(__name__.split('.')[1])
 
 class CreditSystem(Plugin[CreditSystemListener]):
 
+    def __init__(self, bot: DCSServerBot, eventlistener: Type[CreditSystemListener]):
+        super().__init__(bot, eventlistener)
+        config = self.get_config().get('ledger', {})
+        self.ledger = CreditLedger(self.apool, flush_interval=config.get('flush_interval', 5.0),
+                                   batch_size=config.get('batch_size', 500), log=self.log)
+
     async def cog_load(self) -> None:
         await super().cog_load()
+        self.ledger.start()
         config = self.get_config()
         if config.get('leaderboard'):
             utils.safe_start(self.update_leaderboard)
@@ -26,9 +34,12 @@ class CreditSystem(Plugin[CreditSystemListener]):
         config = self.get_config()
         if config.get('leaderboard'):
             await utils.safe_cancel(self.update_leaderboard)
+        await self.ledger.stop()
         await super().cog_unload()
 
     async def get_credits(self, ucid: str) -> list[dict]:
+        # make sure we read the latest balances
+        await self.ledger.flush()
         async with self.apool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cursor:
                 await cursor.execute("""
@@ -153,47 +164,30 @@ class CreditSystem(Plugin[CreditSystemListener]):
             p_receiver = cast(CreditPlayer, server.get_player(ucid=receiver))
             if p_receiver:
                 break
-        async with self.apool.connection() as conn:
-            if not p_receiver:
-                cursor = await conn.execute("""
-                    SELECT COALESCE(SUM(points), 0) 
-                    FROM credits 
-                    WHERE campaign_id = %s AND player_ucid = %s
-                """, (data[n]['id'], receiver))
-                old_points_receiver = (await cursor.fetchone())[0]
-            else:
-                old_points_receiver = p_receiver.points
-            if 'max_points' in self.get_config() and \
-                    (old_points_receiver + donation) > int(self.get_config()['max_points']):
-                await interaction.followup.send(
-                    _('Member {} would overrun the configured maximum points with this donation. Aborted.').format(
-                        to.mention), ephemeral=True
-                )
-                return
-            if p_receiver:
-                # make sure we do not donate to a squadron
-                squadron = p_receiver.squadron
-                p_receiver.squadron = None
-                p_receiver.points += donation
-                p_receiver.squadron = squadron
-                await p_receiver.audit('donation', old_points_receiver,
-                                       _('Donation from member {}').format(interaction.user.display_name))
-            else:
-                await conn.execute("""
-                    INSERT INTO credits (campaign_id, player_ucid, points) 
-                    VALUES (%s, %s, %s) 
-                    ON CONFLICT (campaign_id, player_ucid) DO UPDATE 
-                    SET points = credits.points + EXCLUDED.points
-                """, (data[n]['id'], receiver, donation))
-                cursor = await conn.execute("""
-                    SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s
-                """, (data[n]['id'], receiver))
-                new_points_receiver = (await cursor.fetchone())[0]
-                await conn.execute("""
-                    INSERT INTO credits_log (campaign_id, event, player_ucid, old_points, new_points, remark) 
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (data[n]['id'], 'donation', receiver, old_points_receiver, new_points_receiver,
-                      _('Credit points change by Admin {}').format(interaction.user.display_name)))
+        campaign_id = data[n]['id']
+        if not p_receiver:
+            old_points_receiver = await self.ledger.load(campaign_id, receiver)
+        else:
+            old_points_receiver = p_receiver.points
+        if 'max_points' in self.get_config() and \
+                (old_points_receiver + donation) > int(self.get_config()['max_points']):
+            await interaction.followup.send(
+                _('Member {} would overrun the configured maximum points with this donation. Aborted.').format(
+                    to.mention), ephemeral=True
+            )
+            return
+        if p_receiver:
+            # make sure we do not donate to a squadron
+            squadron = p_receiver.squadron
+            p_receiver.squadron = None
+            p_receiver.points += donation
+            p_receiver.squadron = squadron
+            await p_receiver.audit('donation', old_points_receiver,
+                                   _('Donation from member {}').format(interaction.user.display_name))
+        else:
+            new_points_receiver = self.ledger.set(campaign_id, receiver, old_points_receiver + donation)
+            self.ledger.audit(campaign_id, 'donation', receiver, old_points_receiver, new_points_receiver,
+                              _('Credit points change by Admin {}').format(interaction.user.display_name))
         if donation > 0:
             try:
                 await (await to.create_dm()).send(
@@ -273,67 +267,44 @@ class CreditSystem(Plugin[CreditSystemListener]):
             p_receiver = cast(CreditPlayer, server.get_player(ucid=receiver))
             if p_receiver:
                 break
-        async with self.apool.connection() as conn:
-            if not p_receiver:
-                cursor = await conn.execute("""
-                    SELECT COALESCE(SUM(points), 0) FROM credits WHERE campaign_id = %s AND player_ucid = %s
-                """, (data[n]['id'], receiver))
-                old_points_receiver = (await cursor.fetchone())[0]
-            else:
-                old_points_receiver = p_receiver.points
-            if 'max_points' in self.get_config() and \
-                    (old_points_receiver + donation) > int(self.get_config()['max_points']):
-                await interaction.followup.send(
-                    _('Member {} would overrun the configured maximum points with this donation. Aborted.').format(
-                        to.mention), ephemeral=True)
-                return
-            if p_donor:
-                squadron = p_donor.squadron
-                p_donor.squadron = None
-                p_donor.points -= donation
-                p_donor.squadron = squadron
-                await p_donor.audit(
-                    'donation',
-                    data[n]['credits'],
-                    _('Donation to member {}').format(to.display_name)
-                )
-            else:
-                await conn.execute("""
-                    UPDATE credits SET points = points - %s WHERE campaign_id = %s AND player_ucid = %s
-                """, (donation, data[n]['id'], donor))
-                cursor = await conn.execute("""
-                    SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s
-                """, (data[n]['id'], donor))
-                new_points_donor = (await cursor.fetchone())[0]
-                await conn.execute("""
-                    INSERT INTO credits_log (campaign_id, event, player_ucid, old_points, new_points, remark) 
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (data[n]['id'], 'donation', donor, data[n]['credits'], new_points_donor,
-                      _('Donation to member {}').format(to.display_name)))
-            if p_receiver:
-                # make sure we do not donate to a squadron
-                squadron = p_receiver.squadron
-                p_receiver.squadron = None
-                p_receiver.points += donation
-                p_receiver.squadron = squadron
-                await p_receiver.audit('donation', old_points_receiver,
-                                       _('Donation from member {}').format(interaction.user.display_name))
-            else:
-                await conn.execute("""
-                    INSERT INTO credits (campaign_id, player_ucid, points) 
-                    VALUES (%s, %s, %s) 
-                    ON CONFLICT (campaign_id, player_ucid) DO UPDATE 
-                    SET points = credits.points + EXCLUDED.points
-                """, (data[n]['id'], receiver, donation))
-                cursor = await conn.execute("""
-                    SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s
-                """, (data[n]['id'], receiver))
-                new_points_receiver = (await cursor.fetchone())[0]
-                await conn.execute("""
-                    INSERT INTO credits_log (campaign_id, event, player_ucid, old_points, new_points, remark) 
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (data[n]['id'], 'donation', receiver, old_points_receiver, new_points_receiver,
-                      _('Donation from member {}').format(interaction.user.display_name)))
+        campaign_id = data[n]['id']
+        if not p_receiver:
+            old_points_receiver = await self.ledger.load(campaign_id, receiver)
+        else:
+            old_points_receiver = p_receiver.points
+        if 'max_points' in self.get_config() and \
+                (old_points_receiver + donation) > int(self.get_config()['max_points']):
+            await interaction.followup.send(
+                _('Member {} would overrun the configured maximum points with this donation. Aborted.').format(
+                    to.mention), ephemeral=True)
+            return
+        if p_donor:
+            squadron = p_donor.squadron
+            p_donor.squadron = None
+            p_donor.points -= donation
+            p_donor.squadron = squadron
+            await p_donor.audit(
+                'donation',
+                data[n]['credits'],
+                _('Donation to member {}').format(to.display_name)
+            )
+        else:
+            old_points_donor = await self.ledger.load(campaign_id, donor)
+            new_points_donor = self.ledger.set(campaign_id, donor, old_points_donor - donation)
+            self.ledger.audit(campaign_id, 'donation', donor, data[n]['credits'], new_points_donor,
+                              _('Donation to member {}').format(to.display_name))
+        if p_receiver:
+            # make sure we do not donate to a squadron
+            squadron = p_receiver.squadron
+            p_receiver.squadron = None
+            p_receiver.points += donation
+            p_receiver.squadron = squadron
+            await p_receiver.audit('donation', old_points_receiver,
+                                   _('Donation from member {}').format(interaction.user.display_name))
+        else:
+            new_points_receiver = self.ledger.set(campaign_id, receiver, old_points_receiver + donation)
+            self.ledger.audit(campaign_id, 'donation', receiver, old_points_receiver, new_points_receiver,
+                              _('Donation from member {}').format(interaction.user.display_name))
         try:
             await (await to.create_dm()).send(
                 _('You just received {donation} credit points from {member}!').format(
@@ -375,6 +346,8 @@ class CreditSystem(Plugin[CreditSystemListener]):
             return
 
         campaign_id, campaign_name = await utils.get_running_campaign_async(self.node)
+        # reset the cached balances first, so that no pending write can restore the old points
+        self.ledger.reset(campaign_id, ucid)
         async with self.apool.connection() as conn:
             await conn.execute(sql, {
                 "campaign_id": campaign_id,
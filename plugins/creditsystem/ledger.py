@@ -0,0 +1,197 @@
+import asyncio
+import logging
+
+from psycopg import errors
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core import Server
+    from psycopg_pool import AsyncConnectionPool
+
+__all__ = [
+    "CreditLedger"
+]
+
+LedgerKey = tuple[int, str]
+
+
+class CreditLedger:
+    """
+    In-memory credit balances per (campaign_id, ucid) with write-behind persistence.
+
+    Balances are changed synchronously in memory, so read-modify-write sequences like "player.points += 5" stay
+    atomic on the event loop. Dirty balances and their audit rows are written in batches, inside one transaction,
+    by a background task. DCS notifications are coalesced per player, so only the latest balance is sent.
+    As the credits table holds the last flushed balance, it is the source to recover from on a restart.
+    """
+
+    def __init__(self, apool: "AsyncConnectionPool", *, flush_interval: float = 5.0, batch_size: int = 500,
+                 notify_delay: float = 0.25, log: logging.Logger | None = None):
+        self.apool = apool
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.notify_delay = notify_delay
+        self.log = log or logging.getLogger(__name__)
+        self.balances: dict[LedgerKey, int] = {}
+        self._dirty: dict[LedgerKey, int] = {}
+        self._flushing: dict[LedgerKey, int] = {}
+        self._audit: list[tuple[int, str, str, int, int, str | None]] = []
+        self._notifications: dict[tuple[str, str], tuple["Server", int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_event = asyncio.Event()
+        self._notify_event = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._flusher()),
+            asyncio.create_task(self._notifier())
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self._send_notifications()
+        await self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty) + len(self._audit)
+
+    def get(self, campaign_id: int, ucid: str) -> int | None:
+        return self.balances.get((campaign_id, ucid))
+
+    async def load(self, campaign_id: int, ucid: str) -> int:
+        key = (campaign_id, ucid)
+        if key in self.balances:
+            return self.balances[key]
+        async with self.apool.connection() as conn:
+            cursor = await conn.execute('SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s',
+                                        (campaign_id, ucid))
+            row = await cursor.fetchone()
+        # a set() might have happened while we were waiting for the database, which takes precedence
+        return self.balances.setdefault(key, row[0] if row else 0)
+
+    def set(self, campaign_id: int, ucid: str, points: int) -> int:
+        key = (campaign_id, ucid)
+        self.balances[key] = points
+        self._dirty[key] = points
+        self._check_batch()
+        return points
+
+    def audit(self, campaign_id: int, event: str, ucid: str, old_points: int, new_points: int,
+              remark: str | None) -> None:
+        self._audit.append((campaign_id, event, ucid, old_points, new_points, remark))
+        self._check_batch()
+
+    def reset(self, campaign_id: int, ucid: str | None = None, points: int = 0) -> None:
+        for key in list(self.balances.keys()):
+            if key[0] == campaign_id and (not ucid or key[1] == ucid):
+                self.set(key[0], key[1], points)
+
+    def evict(self, campaign_id: int, ucid: str) -> None:
+        key = (campaign_id, ucid)
+        # unflushed balances have to stay, otherwise a later load() would read an outdated value
+        if key not in self._dirty and key not in self._flushing:
+            self.balances.pop(key, None)
+
+    def notify(self, server: "Server", ucid: str, points: int) -> None:
+        self._notifications[(server.name, ucid)] = (server, points)
+        self._notify_event.set()
+
+    def _check_batch(self) -> None:
+        if self.pending >= self.batch_size:
+            self._flush_event.set()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            # swap the pending changes, so that updates during the write go into the next batch
+            dirty, self._dirty = self._dirty, {}
+            audit, self._audit = self._audit, []
+            if not dirty and not audit:
+                return 0
+            self._flushing = dirty
+            try:
+                try:
+                    await self._write(dirty, audit)
+                except (errors.IntegrityError, errors.DataError):
+                    # a campaign or player might have been deleted meanwhile, write row by row to skip these only
+                    await self._write_each(dirty, audit)
+            except BaseException:
+                # put everything back (even on cancellation), newer balances take precedence over the ones we could
+                # not write
+                for key, points in dirty.items():
+                    self._dirty.setdefault(key, points)
+                self._audit[:0] = audit
+                raise
+            finally:
+                self._flushing = {}
+            return len(dirty) + len(audit)
+
+    async def _write(self, dirty: dict[LedgerKey, int], audit: list[tuple]) -> None:
+        balances = [(campaign_id, ucid, points) for (campaign_id, ucid), points in dirty.items()]
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cursor:
+                    for i in range(0, len(balances), self.batch_size):
+                        await cursor.executemany("""
+                            INSERT INTO credits (campaign_id, player_ucid, points)
+                            VALUES (%s, %s, %s)
+                            ON CONFLICT (campaign_id, player_ucid) DO UPDATE SET points = EXCLUDED.points
+                        """, balances[i:i + self.batch_size])
+                    for i in range(0, len(audit), self.batch_size):
+                        await cursor.executemany("""
+                            INSERT INTO credits_log (campaign_id, event, player_ucid, old_points, new_points, remark)
+                            VALUES (%s, %s, %s, %s, %s, %s)
+                        """, audit[i:i + self.batch_size])
+
+    async def _write_each(self, dirty: dict[LedgerKey, int], audit: list[tuple]) -> None:
+        for key, points in dirty.items():
+            try:
+                await self._write({key: points}, [])
+            except (errors.IntegrityError, errors.DataError) as ex:
+                self.log.error(f"CreditLedger: dropping balance {points} of {key}: {ex}")
+        for row in audit:
+            try:
+                await self._write({}, [row])
+            except (errors.IntegrityError, errors.DataError) as ex:
+                self.log.error(f"CreditLedger: dropping credits_log entry {row}: {ex}")
+
+    async def _send_notifications(self) -> None:
+        notifications, self._notifications = self._notifications, {}
+        results = await asyncio.gather(*[
+            server.send_to_dcs({
+                'command': 'updateUserPoints',
+                'ucid': ucid,
+                'points': points
+            }) for (_, ucid), (server, points) in notifications.items()
+        ], return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.log.warning(f"CreditLedger: can't send points to DCS: {result!r}")
+
+    async def _flusher(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                self.log.error(f"CreditLedger: flush failed, retrying in {self.flush_interval}s: {ex!r}")
+
+    async def _notifier(self) -> None:
+        while True:
+            await self._notify_event.wait()
+            # collect all changes in this time window into one message per player
+            await asyncio.sleep(self.notify_delay)
+            self._notify_event.clear()
+            await self._send_notifications()
@@ -5,6 +5,7 @@ from core import EventListener, Server, Status, utils, event, chat_command, get_
 from typing import cast, TYPE_CHECKING, Literal
 
 from .player import CreditPlayer
+from .points import PointsTable
 from .squadron import Squadron
 
 if TYPE_CHECKING:
@@ -18,32 +19,18 @@ class CreditSystemListener(EventListener["CreditSystem"]):
     def __init__(self, plugin: "CreditSystem"):
         super().__init__(plugin)
         self.squadrons: dict[str, Squadron] = {}
+        self.points_tables: dict[str, PointsTable] = {}
 
     @staticmethod
     def get_points_per_kill(server: Server, config: dict, data: dict) -> int:
-        default = 1
-        if 'points_per_kill' in config:
-            for unit in config['points_per_kill']:
-                if 'category' in unit:
-                    if unit['category'].lower() == 'user' and data['arg4'] != -1:
-                        continue
-                    elif data.get('victimCategory', 'Planes') != unit['category']:
-                        continue
-                if 'unit_type' in unit and unit['unit_type'] != data['arg5']:
-                    continue
-                if 'type' in unit and ((unit['type'] == 'AI' and int(data['arg4']) != -1) or
-                                       (unit['type'] == 'Player' and int(data['arg4']) == -1)):
-                    continue
-                if 'ucid' in unit or 'discord' in unit:
-                    victim = server.get_player(id=data['arg4'])
-                    # (mis)use check_excemptions as it is there and does what we need
-                    if not victim or not victim.check_exemptions(unit):
-                        continue
-                if 'category' in unit or 'unit_type' in unit or 'type' in unit:
-                    return unit['points']
-                elif 'default' in unit:
-                    default = unit['default'] if data.get('victimCategory', 'Planes') != 'Structures' else 0
-        return default if data.get('victimCategory', 'Planes') != 'Structures' else 0
+        return PointsTable(config.get('points_per_kill')).points(server, data)
+
+    def get_points_table(self, server: Server, config: dict) -> PointsTable:
+        # the table is built again, whenever the configuration was read again
+        table = self.points_tables.get(server.name)
+        if not table or table.rules is not config.get('points_per_kill'):
+            table = self.points_tables[server.name] = PointsTable(config.get('points_per_kill'))
+        return table
 
     def get_initial_points(self, player: CreditPlayer, config: dict) -> int:
         if not config or 'initial_points' not in config:
@@ -69,6 +56,9 @@ class CreditSystemListener(EventListener["CreditSystem"]):
         player = cast(CreditPlayer, server.get_player(ucid=data['ucid']))
         if not player:
             return
+        if player.points == -1:
+            # a campaign might have been started in between
+            await player.get_points()
         if player.points == -1:
             # do not add initial points to squadrons
             squadron = player.squadron
@@ -233,9 +223,9 @@ class CreditSystemListener(EventListener["CreditSystem"]):
         if data['eventName'] == 'kill':
             # players gain points only if they don't kill themselves and no teamkills
             if data['arg1'] != -1 and data['arg1'] != data['arg4'] and data['arg3'] != data['arg6']:
+                ppk = self.get_points_table(server, config).points(server, data)
                 # Multicrew - pilot and all crew members gain points
                 for player in server.get_crew_members(server.get_player(id=data['arg1'])):  # type: CreditPlayer
-                    ppk = self.get_points_per_kill(server, config, data)
                     if ppk:
                         old_points = player.points
                         # We will add the PPK to the deposit to allow for multiplied paybacks
@@ -254,6 +244,8 @@ class CreditSystemListener(EventListener["CreditSystem"]):
             player = cast(CreditPlayer, server.get_player(id=data['arg1']))
             if player:
                 asyncio.create_task(self.process_achievements(server, player))
+                if player.campaign_id:
+                    self.plugin.ledger.evict(player.campaign_id, player.ucid)
 
     @event(name="onCampaignReset")
     async def onCampaignReset(self, server: Server, _data: dict) -> None:
@@ -261,6 +253,8 @@ class CreditSystemListener(EventListener["CreditSystem"]):
             return
         config = self.plugin.get_config(server)
         for player in server.get_active_players():  # type: CreditPlayer
+            # the campaign has been recreated, so we need to load the new one
+            await player.get_points()
             # do not add initial points to squadrons
             squadron = player.squadron
             player.squadron = None
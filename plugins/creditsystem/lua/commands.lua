@@ -11,13 +11,8 @@ function dcsbot.updateUserPoints(json)
     dcsbot.userInfo[json.ucid] = dcsbot.userInfo[json.ucid] or {}
     dcsbot.userInfo[json.ucid].points = tonumber(json.points)
 
-    local plist = net.get_player_list()
-    for i = 2, #plist do
-        if (net.get_player_info(plist[i], 'ucid') == json.ucid) then
-            name = net.get_player_info(plist[i], 'name')
-            break
-        end
-    end
+    local id = utils.getPlayerIdByUcid(json.ucid)
+    local name = id and id ~= 1 and net.get_player_info(id, 'name')
     if name then
         local script = 'dcsbot._setUserPoints(' .. utils.basicSerialize(name) .. ', ' .. json.points .. ')'
         net.dostring_in('mission', 'a_do_script(' .. utils.basicSerialize(script) .. ')')
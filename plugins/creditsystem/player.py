@@ -1,10 +1,9 @@
-from contextlib import closing
-
 from core import Player, DataObjectFactory, utils, Plugin
 from dataclasses import field, dataclass
 from typing import cast
 from typing_extensions import override
 
+from .ledger import CreditLedger
 from .squadron import Squadron
 
 
@@ -13,6 +12,7 @@ from .squadron import Squadron
 class CreditPlayer(Player):
     _points: int = field(compare=False, default=-1)
     deposit: int = field(compare=False, default=0)
+    campaign_id: int | None = field(compare=False, default=None, init=False)
     plugin: Plugin = field(compare=False, init=False)
     config: dict = field(compare=False, init=False)
     squadron: Squadron | None = field(compare=False, init=False)
@@ -26,6 +26,7 @@ class CreditPlayer(Player):
     async def prep(self) -> Player:
         await super().prep()
         campaign_id, _ = await utils.get_running_campaign_async(self.node, self.server)
+        self.campaign_id = campaign_id
         async with self.apool.connection() as conn:
             cursor = await conn.execute("""
                 SELECT s.name FROM squadrons s JOIN squadron_members sm 
@@ -49,44 +50,29 @@ class CreditPlayer(Player):
 
     async def get_points(self) -> int:
         # load credit points
-        campaign_id, _ = await utils.get_running_campaign_async(self.node, self.server)
-        if not campaign_id:
+        self.campaign_id, _ = await utils.get_running_campaign_async(self.node, self.server)
+        if not self.campaign_id:
             self._points = -1
             return -1
-        async with self.apool.connection() as conn:
-            cursor = await conn.execute('SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s',
-                                        (campaign_id, self.ucid))
-            if cursor.rowcount == 1:
-                row = await cursor.fetchone()
-                self._points = row[0]
-            else:
-                self.log.debug(
-                    f'CreditPlayer: No entry found in credits table for player {self.name}({self.ucid})')
-                self._points = 0
+        self._points = await self.ledger.load(self.campaign_id, self.ucid)
         return self._points
 
+    @property
+    def ledger(self) -> CreditLedger:
+        return self.plugin.ledger
+
     @property
     def points(self) -> int:
-        if self._points == -1:
-            with self.pool.connection() as conn:
-                with closing(conn.cursor()) as cursor:
-                    # load credit points
-                    campaign_id, _ = utils.get_running_campaign(self.node, self.server)
-                    if not campaign_id:
-                        return -1
-                    cursor.execute('SELECT points FROM credits WHERE campaign_id = %s AND player_ucid = %s',
-                                   (campaign_id, self.ucid))
-                    if cursor.rowcount == 1:
-                        self._points = cursor.fetchone()[0]
-                    else:
-                        self.log.debug(
-                            f'CreditPlayer: No entry found in credits table for player {self.name}({self.ucid})')
-                        self._points = 0
+        if self.campaign_id:
+            # the ledger is shared, so changes from other places (donations, etc.) are visible here
+            points = self.ledger.get(self.campaign_id, self.ucid)
+            if points is not None:
+                self._points = points
         return self._points
 
     @points.setter
     def points(self, p: int) -> None:
-        if p == self._points:
+        if p == self.points:
             return
         old_points = self.points
 
@@ -99,14 +85,8 @@ class CreditPlayer(Player):
         if self._points < 0:
             self._points = 0
 
-        campaign_id, _ = utils.get_running_campaign(self.node, self.server)
-        if campaign_id:
-            with self.pool.connection() as conn:
-                conn.execute("""
-                    INSERT INTO credits (campaign_id, player_ucid, points) 
-                    VALUES (%s, %s, %s) 
-                    ON CONFLICT (campaign_id, player_ucid) DO UPDATE SET points = EXCLUDED.points
-                """, (campaign_id, self.ucid, self._points))
+        if self.campaign_id:
+            self.ledger.set(self.campaign_id, self.ucid, self._points)
         else:
             self.log.debug("No campaign active, player points will vanish after a bot restart.")
 
@@ -115,23 +95,12 @@ class CreditPlayer(Player):
                 self.squadron.points += self._points - old_points
 
         # sending points to DCS
-        self.bot.loop.create_task(self.server.send_to_dcs({
-            'command': 'updateUserPoints',
-            'ucid': self.ucid,
-            'points': self._points
-        }))
+        self.ledger.notify(self.server, self.ucid, self._points)
 
     async def audit(self, event: str, old_points: int, remark: str):
-        if old_points == self.points:
+        if old_points == self.points or not self.campaign_id:
             return
-        campaign_id, _ = await utils.get_running_campaign_async(self.node, self.server)
-        if not campaign_id:
-            return
-        async with self.apool.connection() as conn:
-            await conn.execute("""
-                INSERT INTO credits_log (campaign_id, event, player_ucid, old_points, new_points, remark) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (campaign_id, event, self.ucid, old_points, self._points, remark))
+        self.ledger.audit(self.campaign_id, event, self.ucid, old_points, self._points, remark)
 
         if self.squadron and old_points < self.points:
             if self.config.get('squadron_credits', False):
@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core import Server
+
+__all__ = [
+    "PointsTable"
+]
+
+
+class PointsTable:
+    """
+    The "points_per_kill" rules, indexed by unit type.
+
+    Rules with a unit_type can only match kills of that unit type, so a kill is only checked against the rules of its
+    unit type and the ones without a unit_type, in the order of the configuration.
+    """
+
+    def __init__(self, rules: list[dict] | None):
+        self.rules = rules
+        rules = rules or []
+        generic = [idx for idx, unit in enumerate(rules) if 'unit_type' not in unit]
+        by_type: dict[str, list[int]] = {}
+        for idx, unit in enumerate(rules):
+            if 'unit_type' in unit:
+                by_type.setdefault(unit['unit_type'], []).append(idx)
+        self.generic: list[dict] = [rules[idx] for idx in generic]
+        self.by_type: dict[str, list[dict]] = {
+            unit_type: [rules[idx] for idx in sorted(indices + generic)]
+            for unit_type, indices in by_type.items()
+        }
+
+    def candidates(self, unit_type: str | None) -> list[dict]:
+        return self.by_type.get(unit_type, self.generic)
+
+    def points(self, server: "Server", data: dict) -> int:
+        default = 1
+        for unit in self.candidates(data.get('arg5')):
+            if 'category' in unit:
+                if unit['category'].lower() == 'user' and data['arg4'] != -1:
+                    continue
+                elif data.get('victimCategory', 'Planes') != unit['category']:
+                    continue
+            if 'type' in unit and ((unit['type'] == 'AI' and int(data['arg4']) != -1) or
+                                   (unit['type'] == 'Player' and int(data['arg4']) == -1)):
+                continue
+            if 'ucid' in unit or 'discord' in unit:
+                victim = server.get_player(id=data['arg4'])
+                # (mis)use check_excemptions as it is there and does what we need
+                if not victim or not victim.check_exemptions(unit):
+                    continue
+            if 'category' in unit or 'unit_type' in unit or 'type' in unit:
+                return unit['points']
+            elif 'default' in unit:
+                default = unit['default'] if data.get('victimCategory', 'Planes') != 'Structures' else 0
+        return default if data.get('victimCategory', 'Planes') != 'Structures' else 0
@@ -0,0 +1 @@
+# CreditSystem plugin tests
@@ -0,0 +1,269 @@
+"""
+Concurrency tests for the CreditSystem ledger.
+
+The ledger is tested against the in-memory fake of the psycopg async pool (see conftest.py), which commits whole
+transactions and yields to the event loop on every statement, so that writers, flushes and loads interleave.
+"""
+
+import asyncio
+import random
+import sys
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from psycopg import errors
+from plugins.creditsystem.ledger import CreditLedger
+
+
+# =============================================================================
+# Fake database
+# =============================================================================
+
+class FakeDatabase:
+    def __init__(self):
+        self.credits: dict[tuple[int, str], int] = {}
+        self.credits_log: list[tuple] = []
+        self.campaigns: set[int] = {1, 2}
+
+    def select(self, query: str, params: tuple) -> list[tuple]:
+        points = self.credits.get(params)
+        return [(points, )] if points is not None else []
+
+    def check(self, query: str, params: list[tuple]):
+        for row in params:
+            if row[0] not in self.campaigns:
+                raise errors.ForeignKeyViolation(f"campaign {row[0]} does not exist")
+
+    def write(self, query: str, params: list[tuple]):
+        if 'credits_log' in query:
+            self.credits_log.extend(params)
+        else:
+            for campaign_id, ucid, points in params:
+                self.credits[(campaign_id, ucid)] = points
+
+
+class FakeServer:
+    def __init__(self, name: str):
+        self.name = name
+        self.messages = []
+
+    async def send_to_dcs(self, message: dict):
+        self.messages.append(message)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+class TestBalances:
+
+    def test_load_missing_player(self, fake_pool):
+        async def _test():
+            ledger = CreditLedger(fake_pool(FakeDatabase()))
+            assert await ledger.load(1, 'a') == 0
+            assert ledger.get(1, 'a') == 0
+        run(_test())
+
+    def test_set_is_visible_before_flush(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            ledger = CreditLedger(fake_pool(db))
+            ledger.set(1, 'a', 10)
+            assert ledger.get(1, 'a') == 10
+            assert await ledger.load(1, 'a') == 10
+            assert db.credits == {}
+            assert await ledger.flush() == 1
+            assert db.credits == {(1, 'a'): 10}
+        run(_test())
+
+    def test_set_during_load_wins(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            db.credits[(1, 'a')] = 5
+            ledger = CreditLedger(fake_pool(db))
+            task = asyncio.create_task(ledger.load(1, 'a'))
+            await asyncio.sleep(0)
+            ledger.set(1, 'a', 42)
+            assert await task == 42
+        run(_test())
+
+    def test_reset_campaign(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            ledger = CreditLedger(fake_pool(db))
+            ledger.set(1, 'a', 10)
+            ledger.set(1, 'b', 20)
+            ledger.set(2, 'a', 30)
+            ledger.reset(1)
+            await ledger.flush()
+            assert db.credits == {(1, 'a'): 0, (1, 'b'): 0, (2, 'a'): 30}
+        run(_test())
+
+    def test_evict_keeps_dirty_balances(self, fake_pool):
+        async def _test():
+            ledger = CreditLedger(fake_pool(FakeDatabase()))
+            ledger.set(1, 'a', 10)
+            ledger.evict(1, 'a')
+            assert ledger.get(1, 'a') == 10
+            await ledger.flush()
+            ledger.evict(1, 'a')
+            assert ledger.get(1, 'a') is None
+            assert await ledger.load(1, 'a') == 10
+        run(_test())
+
+
+class TestPersistence:
+
+    def test_batched_in_one_transaction(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            pool = fake_pool(db)
+            ledger = CreditLedger(pool, batch_size=100)
+            for i in range(250):
+                ledger.set(1, f'p{i}', i)
+                ledger.audit(1, 'kill', f'p{i}', 0, i, 'test')
+            await ledger.flush()
+            # 3 chunks for the balances, 3 chunks for the audit entries
+            assert pool.statements == 6
+            assert len(db.credits) == 250
+            assert len(db.credits_log) == 250
+        run(_test())
+
+    def test_failed_flush_is_retried(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            pool = fake_pool(db)
+            ledger = CreditLedger(pool)
+            ledger.set(1, 'a', 10)
+            ledger.audit(1, 'kill', 'a', 0, 10, None)
+            pool.fail_next = 1
+            with pytest.raises(errors.OperationalError):
+                await ledger.flush()
+            assert db.credits == {}
+            assert ledger.pending == 2
+            await ledger.flush()
+            assert db.credits == {(1, 'a'): 10}
+            assert len(db.credits_log) == 1
+        run(_test())
+
+    def test_newer_balance_survives_failed_flush(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            pool = fake_pool(db)
+            ledger = CreditLedger(pool)
+            ledger.set(1, 'a', 10)
+            pool.fail_next = 1
+            task = asyncio.create_task(ledger.flush())
+            await asyncio.sleep(0)
+            ledger.set(1, 'a', 20)
+            with pytest.raises(errors.OperationalError):
+                await task
+            await ledger.flush()
+            assert db.credits == {(1, 'a'): 20}
+        run(_test())
+
+    def test_deleted_campaign_is_skipped(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            ledger = CreditLedger(fake_pool(db))
+            ledger.set(1, 'a', 10)
+            ledger.set(3, 'a', 10)
+            ledger.audit(3, 'kill', 'a', 0, 10, None)
+            await ledger.flush()
+            assert db.credits == {(1, 'a'): 10}
+            assert ledger.pending == 0
+        run(_test())
+
+    def test_recovery_after_restart(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            ledger = CreditLedger(fake_pool(db), flush_interval=60)
+            ledger.start()
+            ledger.set(1, 'a', 10)
+            ledger.set(1, 'b', 15)
+            await ledger.stop()
+            restarted = CreditLedger(fake_pool(db))
+            assert await restarted.load(1, 'a') == 10
+            assert await restarted.load(1, 'b') == 15
+        run(_test())
+
+
+class TestNotifications:
+
+    def test_notifications_are_coalesced(self, fake_pool):
+        async def _test():
+            ledger = CreditLedger(fake_pool(FakeDatabase()), notify_delay=0.01)
+            server = FakeServer('DCS.server')
+            ledger.start()
+            for i in range(100):
+                ledger.notify(server, 'a', i)
+            ledger.notify(server, 'b', 5)
+            await asyncio.sleep(0.05)
+            await ledger.stop()
+            assert sorted(server.messages, key=lambda x: x['ucid']) == [
+                {'command': 'updateUserPoints', 'ucid': 'a', 'points': 99},
+                {'command': 'updateUserPoints', 'ucid': 'b', 'points': 5}
+            ]
+        run(_test())
+
+
+class TestConcurrency:
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_concurrent_writers_with_background_flushes(self, seed: int, fake_pool):
+        async def _test():
+            rnd = random.Random(seed)
+            db = FakeDatabase()
+            db.credits.update({(1, f'p{i}'): 100 for i in range(10)})
+            pool = fake_pool(db)
+            ledger = CreditLedger(pool, flush_interval=0.001, batch_size=20)
+            ledger.start()
+            expected = {f'p{i}': 100 for i in range(10)}
+            audits = 0
+
+            async def writer(n: int):
+                nonlocal audits
+                for _ in range(200):
+                    ucid = f'p{rnd.randrange(10)}'
+                    delta = rnd.randint(-3, 5)
+                    old_points = await ledger.load(1, ucid)
+                    # read-modify-write without an await in between, the way CreditPlayer.points does it
+                    new_points = ledger.set(1, ucid, ledger.get(1, ucid) + delta)
+                    ledger.audit(1, 'kill', ucid, old_points, new_points, f'writer {n}')
+                    expected[ucid] += delta
+                    audits += 1
+                    if rnd.random() < 0.05:
+                        pool.fail_next = 1
+                    if rnd.random() < 0.1:
+                        ledger.evict(1, ucid)
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(*[writer(n) for n in range(20)])
+            pool.fail_next = 0
+            await ledger.stop()
+            assert ledger.pending == 0
+            assert {ucid: points for (_, ucid), points in db.credits.items()} == expected
+            assert len(db.credits_log) == audits
+        run(_test())
+
+    def test_concurrent_flushes_do_not_duplicate_audits(self, fake_pool):
+        async def _test():
+            db = FakeDatabase()
+            ledger = CreditLedger(fake_pool(db))
+            for i in range(50):
+                ledger.set(1, 'a', i)
+                ledger.audit(1, 'kill', 'a', i - 1, i, None)
+            await asyncio.gather(*[ledger.flush() for _ in range(10)])
+            assert db.credits == {(1, 'a'): 49}
+            assert len(db.credits_log) == 50
+        run(_test())
@@ -0,0 +1,114 @@
+"""
+Tests for the points_per_kill table of the CreditSystem plugin.
+
+The table has to return the same points as the former implementation, which checked every kill against all
+"points_per_kill" rules.
+"""
+
+import random
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.creditsystem.points import PointsTable
+
+UNIT_TYPES = ['F-14B', 'F-16C_50', 'FA-18C_hornet', 'Su-27', 'MiG-29S', 'T-72B']
+CATEGORIES = ['Planes', 'Helicopters', 'Ground Units', 'Ships', 'Structures']
+
+
+class FakePlayer:
+    def __init__(self, ucid: str):
+        self.ucid = ucid
+
+    def check_exemptions(self, unit: dict) -> bool:
+        return self.ucid == unit.get('ucid')
+
+
+class FakeServer:
+    def __init__(self):
+        self.players = {1: FakePlayer('a'), 2: FakePlayer('b')}
+
+    def get_player(self, *, id: int):
+        return self.players.get(id)
+
+
+def legacy_points(server: FakeServer, config: dict, data: dict) -> int:
+    """
+    CreditSystemListener.get_points_per_kill before the points table.
+    """
+    default = 1
+    if 'points_per_kill' in config:
+        for unit in config['points_per_kill']:
+            if 'category' in unit:
+                if unit['category'].lower() == 'user' and data['arg4'] != -1:
+                    continue
+                elif data.get('victimCategory', 'Planes') != unit['category']:
+                    continue
+            if 'unit_type' in unit and unit['unit_type'] != data['arg5']:
+                continue
+            if 'type' in unit and ((unit['type'] == 'AI' and int(data['arg4']) != -1) or
+                                   (unit['type'] == 'Player' and int(data['arg4']) == -1)):
+                continue
+            if 'ucid' in unit or 'discord' in unit:
+                victim = server.get_player(id=data['arg4'])
+                if not victim or not victim.check_exemptions(unit):
+                    continue
+            if 'category' in unit or 'unit_type' in unit or 'type' in unit:
+                return unit['points']
+            elif 'default' in unit:
+                default = unit['default'] if data.get('victimCategory', 'Planes') != 'Structures' else 0
+    return default if data.get('victimCategory', 'Planes') != 'Structures' else 0
+
+
+def random_rule(rnd: random.Random) -> dict:
+    if rnd.random() < 0.1:
+        return {'default': rnd.randint(0, 5)}
+    rule = {'points': rnd.randint(1, 100)}
+    if rnd.random() < 0.6:
+        rule['unit_type'] = rnd.choice(UNIT_TYPES)
+    if rnd.random() < 0.3:
+        rule['category'] = rnd.choice(CATEGORIES)
+    if rnd.random() < 0.3:
+        rule['type'] = rnd.choice(['AI', 'Player'])
+    if rnd.random() < 0.1:
+        rule['ucid'] = rnd.choice(['a', 'b'])
+    return rule
+
+
+def test_same_points_as_before():
+    rnd = random.Random(1)
+    server = FakeServer()
+    for size in [0, 1, 5, 50]:
+        rules = [random_rule(rnd) for _ in range(size)]
+        table = PointsTable(rules)
+        for _ in range(500):
+            data = {
+                'arg4': rnd.choice([-1, 1, 2, 3]),
+                'arg5': rnd.choice(UNIT_TYPES),
+                'victimCategory': rnd.choice(CATEGORIES)
+            }
+            assert table.points(server, data) == legacy_points(server, {'points_per_kill': rules}, data), \
+                (rules, data)
+
+
+def test_rules_of_other_unit_types_are_skipped():
+    rules = [
+        {'unit_type': 'F-14B', 'points': 10},
+        {'category': 'Planes', 'points': 5},
+        {'unit_type': 'Su-27', 'points': 20},
+        {'default': 2}
+    ]
+    table = PointsTable(rules)
+    assert table.candidates('F-14B') == rules[:2] + rules[3:]
+    assert table.candidates('MiG-29S') == [rules[1], rules[3]]
+
+
+def test_no_rules():
+    table = PointsTable(None)
+    server = FakeServer()
+    assert table.points(server, {'arg4': -1, 'arg5': 'F-14B'}) == 1
+    assert table.points(server, {'arg4': -1, 'arg5': 'Bunker', 'victimCategory': 'Structures'}) == 0
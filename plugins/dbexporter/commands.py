@@ -1,21 +1,27 @@
 import discord
-import json
 import os
 import psycopg
+import time
 
 from core import Plugin, utils, command, get_translation
 from discord import app_commands
 from discord.ext import tasks
+from psycopg import sql
 from services.bot import DCSServerBot
 
+from .writer import ExportWriter, MarkerStore
+
 _ = get_translation(__name__.split('.')[1])
 
+EXPORT_PATH = 'export'
+MARKER_FILE = '.markers.json'
+
 
 class DBExporter(Plugin):
 
     def __init__(self, bot: DCSServerBot):
         super().__init__(bot)
-        os.makedirs('export', exist_ok=True)
+        os.makedirs(EXPORT_PATH, exist_ok=True)
         if self.get_config().get('autoexport', False):
             self.schedule.add_exception_type(psycopg.Error)
             utils.safe_start(self.schedule)
@@ -25,18 +31,65 @@ class DBExporter(Plugin):
             await utils.safe_cancel(self.schedule)
         await super().cog_unload()
 
+    async def export_table(self, table: str, markers: MarkerStore) -> int:
+        config = self.get_config()
+        compression = config.get('compression', 'none')
+        column = config.get('incremental', {}).get(table)
+        marker = markers.get(table, column) if column else None
+        writer = ExportWriter(EXPORT_PATH, table, compression=compression, append=marker is not None)
+        # the export file is gone, so we need a full export again
+        if marker is not None and not os.path.exists(writer.filename):
+            marker = None
+            writer = ExportWriter(EXPORT_PATH, table, compression=compression)
+        query = sql.SQL("SELECT ROW_TO_JSON(t) FROM (SELECT * FROM {table}) t").format(table=sql.Identifier(table))
+        if column:
+            query = sql.SQL("SELECT ROW_TO_JSON(t), t.{column} FROM (SELECT * FROM {table}) t").format(
+                table=sql.Identifier(table), column=sql.Identifier(column))
+            if marker is not None:
+                query += sql.SQL(" WHERE t.{column} > %(marker)s").format(column=sql.Identifier(column))
+            query += sql.SQL(" ORDER BY t.{column}").format(column=sql.Identifier(column))
+        batch_size = config.get('batch_size', 1000)
+        start = time.perf_counter()
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                # a server-side cursor streams the rows instead of loading the whole table into memory
+                async with conn.cursor(name=f'export_{table}') as cursor:
+                    cursor.itersize = batch_size
+                    await cursor.execute(query, {"marker": marker} if marker is not None else None)
+                    last = None
+                    async with writer:
+                        while rows := await cursor.fetchmany(batch_size):
+                            await writer.write(x[0] for x in rows)
+                            if column:
+                                last = rows[-1][1]
+                                # appended rows are persisted already, even if the export fails later on
+                                if writer.append:
+                                    markers.set(table, column, last)
+                    if last is not None:
+                        markers.set(table, column, last)
+        if writer.rows:
+            self.log.debug(f"  - {table}: {writer.rows} rows, {writer.bytes / 1024:.0f} KB exported in "
+                           f"{time.perf_counter() - start:.2f}s")
+        return writer.rows
+
     async def do_export(self, table_filter: list[str]):
+        markers = MarkerStore(os.path.join(EXPORT_PATH, MARKER_FILE))
         async with self.apool.connection() as conn:
             cursor = await conn.execute("""
                 SELECT table_name FROM information_schema.tables 
                 WHERE table_schema = 'public' 
                 AND table_name not in ('pu_events_sdw', 'servers', 'message_persistence')
             """)
-            for table in [x[0] async for x in cursor if x[0] not in table_filter]:
-                cursor = await conn.execute(f'SELECT ROW_TO_JSON(t) FROM (SELECT * FROM {table}) t')
-                if cursor.rowcount > 0:
-                    with open(os.path.join('export', f'{table}.json'), mode='w', encoding='utf-8') as file:
-                        file.writelines([json.dumps(x[0]) + '\n' async for x in cursor])
+            tables = [x[0] async for x in cursor if x[0] not in table_filter]
+        start = time.perf_counter()
+        num = 0
+        try:
+            for table in tables:
+                num += await self.export_table(table, markers)
+        finally:
+            markers.save()
+        self.log.info(f"DBExporter: {num} rows of {len(tables)} tables exported in "
+                      f"{time.perf_counter() - start:.2f}s.")
 
     @command(description=_('Exports database tables as json.'))
     @app_commands.guild_only()
@@ -0,0 +1 @@
+# DBExporter plugin tests
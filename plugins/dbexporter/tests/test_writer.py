@@ -0,0 +1,108 @@
+"""
+Unit tests for the streaming export writer and the change markers of the DBExporter plugin.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tracemalloc
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.dbexporter.writer import ExportWriter, MarkerStore
+
+
+def read_lines(filename: str) -> list[dict]:
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, mode='rt', encoding='utf-8') as infile:
+        return [json.loads(line) for line in infile]
+
+
+async def export(path: str, table: str, rows: list[dict], batch_size: int = 10, **kwargs) -> ExportWriter:
+    writer = ExportWriter(path, table, **kwargs)
+    async with writer:
+        for i in range(0, len(rows), batch_size):
+            await writer.write(rows[i:i + batch_size])
+    return writer
+
+
+class TestExportWriter:
+
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_full_export(self, tmp_path, compression):
+        rows = [{"id": i, "name": f"row{i}"} for i in range(25)]
+        writer = asyncio.run(export(str(tmp_path), 'players', rows, compression=compression))
+        assert writer.rows == 25
+        assert read_lines(writer.filename) == rows
+        assert not os.path.exists(writer.filename + '.tmp')
+
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_incremental_export_appends(self, tmp_path, compression):
+        first = [{"id": i} for i in range(10)]
+        second = [{"id": i} for i in range(10, 15)]
+        asyncio.run(export(str(tmp_path), 'missions', first, compression=compression))
+        writer = asyncio.run(export(str(tmp_path), 'missions', second, compression=compression, append=True))
+        assert read_lines(writer.filename) == first + second
+
+    def test_failed_export_keeps_old_file(self, tmp_path):
+        async def fail():
+            async with ExportWriter(str(tmp_path), 'missions') as writer:
+                await writer.write([{"id": 99}])
+                raise RuntimeError("connection lost")
+
+        old = [{"id": 1}]
+        writer = asyncio.run(export(str(tmp_path), 'missions', old))
+        with pytest.raises(RuntimeError):
+            asyncio.run(fail())
+        assert read_lines(writer.filename) == old
+        assert not os.path.exists(writer.filename + '.tmp')
+
+    def test_empty_table_writes_no_file(self, tmp_path):
+        writer = asyncio.run(export(str(tmp_path), 'empty', []))
+        assert not os.path.exists(writer.filename)
+
+    def test_memory_is_flat(self, tmp_path):
+        def peak(num_rows: int) -> int:
+            async def _export():
+                writer = ExportWriter(str(tmp_path), f'table{num_rows}', compression='gzip')
+                async with writer:
+                    for i in range(0, num_rows, 500):
+                        await writer.write({"id": j, "payload": "x" * 100} for j in range(i, i + 500))
+
+            tracemalloc.start()
+            asyncio.run(_export())
+            _, size = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return size
+
+        small = peak(5_000)
+        large = peak(50_000)
+        # ten times the rows must not need significantly more memory
+        assert large < small * 2
+
+
+class TestMarkerStore:
+
+    def test_roundtrip(self, tmp_path):
+        filename = str(tmp_path / '.markers.json')
+        markers = MarkerStore(filename)
+        markers.set('statistics', 'hop_on', datetime(2024, 1, 2, 3, 4, 5))
+        markers.set('missions', 'id', 42)
+        markers.save()
+        markers = MarkerStore(filename)
+        assert markers.get('statistics', 'hop_on') == '2024-01-02T03:04:05'
+        assert markers.get('missions', 'id') == 42
+
+    def test_changed_column_resets_marker(self, tmp_path):
+        markers = MarkerStore(str(tmp_path / '.markers.json'))
+        markers.set('missions', 'id', 42)
+        assert markers.get('missions', 'mission_start') is None
@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import json
+import os
+
+from datetime import date, datetime
+from typing import Any, Iterable, IO
+
+__all__ = [
+    "ExportWriter",
+    "MarkerStore",
+    "COMPRESSIONS"
+]
+
+COMPRESSIONS = {
+    "none": "",
+    "gzip": ".gz"
+}
+
+
+class ExportWriter:
+    """
+    Writes JSON lines into an export file batch by batch, so only one batch is held in memory.
+
+    A full export is written into a temporary file that replaces the old export when it is complete. An incremental
+    export is appended to the existing file (gzip files can be appended, as concatenated gzip members are valid).
+    """
+
+    def __init__(self, path: str, table: str, *, compression: str = "none", append: bool = False):
+        self.filename = os.path.join(path, f"{table}.json{COMPRESSIONS[compression]}")
+        self.compression = compression
+        self.append = append
+        self.rows = 0
+        self.bytes = 0
+        self._tmpname = self.filename if append else self.filename + '.tmp'
+        self._file: IO | None = None
+
+    def _open(self) -> IO:
+        mode = 'ab' if self.append else 'wb'
+        if self.compression == 'gzip':
+            return gzip.open(self._tmpname, mode=mode, compresslevel=6)
+        return open(self._tmpname, mode=mode)
+
+    def _write(self, lines: list[bytes]) -> None:
+        if not self._file:
+            self._file = self._open()
+        self._file.writelines(lines)
+
+    async def write(self, rows: Iterable[Any]) -> None:
+        lines = [json.dumps(row).encode('utf-8') + b'\n' for row in rows]
+        if not lines:
+            return
+        self.rows += len(lines)
+        self.bytes += sum(len(x) for x in lines)
+        await asyncio.to_thread(self._write, lines)
+
+    def _close(self, commit: bool) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.append:
+            return
+        if commit and os.path.exists(self._tmpname):
+            os.replace(self._tmpname, self.filename)
+        elif os.path.exists(self._tmpname):
+            os.remove(self._tmpname)
+
+    async def close(self, commit: bool = True) -> None:
+        await asyncio.to_thread(self._close, commit)
+
+    async def __aenter__(self) -> "ExportWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
+        await self.close(commit=exc_type is None)
+        return False
+
+
+class MarkerStore:
+    """
+    Persists the change marker (the highest exported value of the configured column) per table.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.markers: dict[str, dict[str, Any]] = {}
+        if os.path.exists(filename):
+            with open(filename, mode='r', encoding='utf-8') as infile:
+                self.markers = json.load(infile)
+
+    def get(self, table: str, column: str) -> Any:
+        marker = self.markers.get(table)
+        # the column was changed in the configuration, so we need to start over
+        if not marker or marker['column'] != column:
+            return None
+        return marker['value']
+
+    def set(self, table: str, column: str, value: Any) -> None:
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        self.markers[table] = {"column": column, "value": value}
+
+    def remove(self, table: str) -> None:
+        self.markers.pop(table, None)
+
+    def save(self) -> None:
+        tmpname = self.filename + '.tmp'
+        with open(tmpname, mode='w', encoding='utf-8') as outfile:
+            json.dump(self.markers, outfile, indent=2)
+        os.replace(tmpname, self.filename)
@@ -2,18 +2,19 @@ import asyncio
 import discord
 import sys
 import uuid
-import matplotlib.figure
 
-from core import EventListener, Server, event, PersistentReport, Channel, get_translation
+from core import EventListener, Server, event, PersistentReport, Channel, get_translation, utils
 from io import BytesIO
-from matplotlib import pyplot as plt
 from typing import Literal, TYPE_CHECKING
 
 from .const import StrafeQuality, BombQuality
 
 if TYPE_CHECKING:
+    from matplotlib.figure import Figure
     from .commands import FunkMan
 
+plt = utils.lazy_import('matplotlib.pyplot')
+
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -104,7 +105,7 @@ class FunkManEventListener(EventListener["FunkMan"]):
         return embed
 
     @staticmethod
-    def save_fig(fig: matplotlib.figure.Figure) -> tuple[str, BytesIO]:
+    def save_fig(fig: 'Figure') -> tuple[str, BytesIO]:
         filename = f'{uuid.uuid4()}.png'
         buffer = BytesIO()
         fig.savefig(buffer, format='png', bbox_inches='tight', facecolor='#2C2F33')
@@ -112,7 +113,7 @@ class FunkManEventListener(EventListener["FunkMan"]):
         plt.close(fig)
         return filename, buffer
 
-    async def send_fig(self, fig: matplotlib.figure.Figure, channel: discord.abc.Messageable):
+    async def send_fig(self, fig: 'Figure', channel: discord.abc.Messageable):
         try:
             filename, buffer = self.save_fig(fig)
             with buffer:
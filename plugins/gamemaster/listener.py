@@ -86,9 +86,9 @@ class GameMasterEventListener(EventListener["GameMaster"]):
                 color = colors[player.side]
             else:
                 color = colors[Side.NEUTRAL]
-            asyncio.create_task(chat_channel.send(
-                f"```ansi\n\u001b[1;{color}mPlayer {player.name} said: {data['message']}```"
-            ))
+            self.bot.messages.put(
+                chat_channel.id, f"```ansi\n\u001b[1;{color}mPlayer {player.name} said: {data['message']}```"
+            )
 
     async def get_coalition(self, server: Server, player: Player) -> Coalition | None:
         if not server.locals.get('coalitions'):
@@ -11,7 +11,6 @@ from core import Plugin, PluginRequiredError, utils, PaginationReport, Report, G
     get_translation
 from discord import SelectOption, app_commands
 from discord.app_commands import Range
-from matplotlib import pyplot as plt
 from pathlib import Path
 from psycopg.rows import dict_row
 from services.bot import DCSServerBot
@@ -26,6 +25,7 @@ from .views import TrapView
 from ruamel.yaml import YAML
 yaml = YAML()
 
+plt = utils.lazy_import('matplotlib.pyplot')
 _ = get_translation(__name__.split('.')[1])
 
 
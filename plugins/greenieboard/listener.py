@@ -7,7 +7,6 @@ import string
 import sys
 
 from core import EventListener, Server, Player, Channel, Side, PersistentReport, event, get_translation, utils
-from matplotlib import pyplot as plt
 from pathlib import Path
 from plugins.creditsystem.player import CreditPlayer
 from plugins.greenieboard import get_element, GRADES
@@ -17,6 +16,7 @@ from typing import cast, TYPE_CHECKING
 if TYPE_CHECKING:
     from .commands import GreenieBoard
 
+plt = utils.lazy_import('matplotlib.pyplot')
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -1,14 +1,17 @@
+from __future__ import annotations
+
 import csv
 import logging
 
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 
+from core import utils
 from datetime import datetime, timezone
-from numpy import ndarray
-from matplotlib.axes import Axes
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from numpy import ndarray
 
 ######################################################
 # This file has been taken and amended from HypeMan! #
@@ -16,6 +19,10 @@ from pathlib import Path
 
 log = logging.getLogger(__name__)
 
+np = utils.lazy_import('numpy')
+patches = utils.lazy_import('matplotlib.patches')
+plt = utils.lazy_import('matplotlib.pyplot')
+
 
 def read_trapsheet(filename: str) -> dict[str, ndarray]:
     # read a trap sheet into a dictionary as numpy arrays
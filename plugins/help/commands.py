@@ -1,6 +1,5 @@
 import discord
 import os
-import pandas as pd
 
 from core import Plugin, Report, ReportEnv, command, utils, get_translation, Status, async_cache, Command, Port, Node, \
     Group
@@ -12,6 +11,7 @@ from typing import cast, Literal, Any
 
 from .listener import HelpListener
 
+pd = utils.lazy_import('pandas')
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -263,7 +263,7 @@ class Help(Plugin[HelpListener]):
                 await interaction.delete_original_response()
 
     async def discord_commands_to_df(self, interaction: discord.Interaction, *,
-                                     use_mention: bool | None = False) -> pd.DataFrame:
+                                     use_mention: bool | None = False) -> 'pd.DataFrame':
         df = pd.DataFrame(columns=['Plugin', 'Command', 'Parameter', 'Roles', 'Description', 'Restricted'])
         for cmd in sorted((await get_commands(interaction)).values(), key=lambda x: x.qualified_name):
             restricted = False
@@ -289,7 +289,7 @@ class Help(Plugin[HelpListener]):
             df = pd.concat([df, data_df], ignore_index=True)
         return df
 
-    async def ingame_commands_to_df(self) -> pd.DataFrame:
+    async def ingame_commands_to_df(self) -> 'pd.DataFrame':
         df = pd.DataFrame(columns=['Plugin', 'Command', 'Parameter', 'Roles', 'Description'])
         for listener in self.bot.eventListeners:
             for cmd in listener.chat_commands:
@@ -380,7 +380,7 @@ _ _
             # noinspection PyUnresolvedReferences
             await interaction.response.send_message(_("Please provide a role for channel output."), ephemeral=True)
 
-    async def server_info_to_df(self) -> pd.DataFrame:
+    async def server_info_to_df(self) -> 'pd.DataFrame':
         columns = ['Node', 'Instance', 'Name', 'Password', 'Max Players', 'DCS Port', 'Bot Port']
         df = pd.DataFrame(columns=columns)
 
@@ -413,7 +413,7 @@ _ _
         df = df[columns + [col for col in df.columns if col not in columns]]
         return df
 
-    async def nodes_info_to_df(self) -> pd.DataFrame:
+    async def nodes_info_to_df(self) -> 'pd.DataFrame':
         columns = ['Node', 'Listen Port']
         df = pd.DataFrame(columns=columns)
 
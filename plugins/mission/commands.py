@@ -5,7 +5,6 @@ import discord
 import importlib
 import inspect
 import os
-import pandas as pd
 import psycopg
 import random
 import re
@@ -40,8 +39,12 @@ from ruamel.yaml import YAML
 from ruamel.yaml.error import MarkedYAMLError
 yaml = YAML()
 
+pd = utils.lazy_import('pandas')
 _ = get_translation(__name__.split('.')[1])
 
+# ucids per unban message, to stay below the maximum datagram size of DCS
+UNBAN_BATCH_SIZE = 100
+
 SHEET_TITLES = {
     "aircraft": "Aircraft",
     "weapon": "Weapons",
@@ -1320,7 +1323,7 @@ class Mission(Plugin[MissionEventListener]):
 
     @staticmethod
     async def download_warehouse(interaction: discord.Interaction, airbase: dict, data: dict):
-        def dict_to_df(mapping: dict) -> pd.DataFrame:
+        def dict_to_df(mapping: dict) -> 'pd.DataFrame':
             df = pd.DataFrame(list(mapping.items()), columns=["Name", "Count"])
             return df
 
@@ -2392,26 +2395,35 @@ class Mission(Plugin[MissionEventListener]):
 
     @tasks.loop(minutes=1.0)
     async def check_for_unban(self):
+        # delete all expired bans at once
         async with self.apool.connection() as conn:
             cursor = await conn.execute("""
-                SELECT ucid FROM bans 
+                DELETE FROM bans 
                 WHERE banned_by <> 'cloud'
                 AND banned_until < (NOW() AT TIME ZONE 'utc')
+                RETURNING ucid
             """)
-            rows = await cursor.fetchall()
-            for row in rows:
-                for server in self.bot.servers.values():
-                    if server.status not in [Status.PAUSED, Status.RUNNING, Status.STOPPED]:
-                        continue
-                    await server.send_to_dcs({
-                        "command": "unban",
-                        "ucid": row[0]
-                    })
-                    player = server.get_player(ucid=row[0])
-                    if player:
-                        player.banned = False
-                # delete unbanned accounts from the database
-                await conn.execute("DELETE FROM bans WHERE ucid = %s", (row[0], ))
+            ucids = [row[0] for row in await cursor.fetchall()]
+        if not ucids:
+            return
+        self.log.debug(f"Unbanning {len(ucids)} players with expired bans.")
+        # every node unbans them on its own servers (one message per server, unless the list exceeds a datagram)
+        for node in [x for x in self.node.all_nodes.values() if x]:
+            for i in range(0, len(ucids), UNBAN_BATCH_SIZE):
+                await self.bus.send_to_node({
+                    "command": "rpc",
+                    "service": "ServiceBus",
+                    "method": "unban_local",
+                    "params": {
+                        "ucids": ucids[i:i + UNBAN_BATCH_SIZE]
+                    }
+                }, node=node)
+        # the master keeps the players of the remote servers, too
+        for server in [x for x in self.bot.servers.values() if x.is_remote]:
+            for ucid in ucids:
+                player = server.get_player(ucid=ucid)
+                if player:
+                    player.banned = False
 
     @check_for_unban.before_loop
     async def before_check_unban(self):
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from core import Server
+
+__all__ = [
+    "player_embed_inputs",
+    "mission_embed_inputs"
+]
+
+
+def player_embed_inputs(server: Server, srs_users: Iterable[str]) -> tuple:
+    """
+    Everything the players embed shows. The embed is only rendered again, if this changes.
+    """
+    return (
+        server.status,
+        tuple(
+            (p.display_name, p.side, p.unit_type, p.unit_display_name, p.sub_slot, p.pending)
+            for p in server.get_active_players()
+        ),
+        tuple(srs_users)
+    )
+
+
+def mission_embed_inputs(server: Server) -> str:
+    """
+    Everything the mission embed shows. The embed is only rendered again, if this changes.
+    """
+    mission = server.current_mission
+    if mission:
+        mission_inputs = (mission.display_name, mission.map, mission.date, mission.start_time,
+                          int(mission.mission_time), mission.num_slots_blue, mission.num_slots_red,
+                          mission.weather, mission.clouds)
+    else:
+        mission_inputs = None
+    players = server.get_active_players()
+    # the settings and the weather are nested dicts, so we compare their representation
+    return repr((
+        server.status, server.maintenance, server.restart_time, dict(server.settings or {}),
+        server.node.public_ip, server.node.dcs_version, mission_inputs,
+        len(players), [p.side for p in players]
+    ))
@@ -6,7 +6,7 @@ import shlex
 
 from copy import deepcopy
 from core import utils, EventListener, PersistentReport, Plugin, Report, Status, Side, Player, Coalition, \
-    Channel, DataObjectFactory, event, chat_command, ChatCommand, get_translation
+    Channel, DataObjectFactory, event, chat_command, ChatCommand, get_translation, EmbedPipeline
 from datetime import datetime, timezone
 from discord import ButtonStyle
 from discord.ext import tasks
@@ -16,6 +16,7 @@ from pathlib import Path
 from psycopg.rows import dict_row
 from typing import TYPE_CHECKING, Callable, Coroutine, cast
 
+from .embeds import player_embed_inputs, mission_embed_inputs
 from .menu import read_menu_config, filter_menu
 from ..missionstats.commands import MissionStatistics
 
@@ -86,21 +87,19 @@ class MissionEventListener(EventListener["Mission"]):
 
     def __init__(self, plugin: "Mission"):
         super().__init__(plugin)
-        self.queue: dict[int, asyncio.Queue[str]] = {}
-        self.player_embeds: dict[str, bool] = {}
-        self.mission_embeds: dict[str, bool] = {}
+        self.player_embeds = EmbedPipeline('players_embed', self._render_player_embed,
+                                           fingerprint=self._player_embed_inputs)
+        self.mission_embeds = EmbedPipeline('mission_embed', self._render_mission_embed,
+                                            fingerprint=mission_embed_inputs)
         self.alert_fired: dict[str, bool] = {}
         self.whitelist: set[str] = set()
         self.restart_pending: dict[str, bool] = {}
         self.mission_stats: dict[str, bool] = {}
         # start schedulers
-        utils.safe_start(self.print_queue)
         utils.safe_start(self.update_player_embed)
         utils.safe_start(self.update_mission_embed)
 
     async def shutdown(self):
-        await utils.safe_cancel(self.print_queue)
-        await self.work_queue()
         await utils.safe_cancel(self.update_player_embed)
         await utils.safe_cancel(self.update_mission_embed)
 
@@ -109,82 +108,32 @@ class MissionEventListener(EventListener["Mission"]):
             return False
         return await super().can_run(command, server, player)
 
-    async def work_queue(self):
-        for channel in list(self.queue.keys()):
-            if self.queue[channel].empty():
-                continue
-            _channel = self.bot.get_channel(channel)
-            if not _channel:
-                try:
-                    _channel = await self.bot.fetch_channel(channel)
-                except Exception:
-                    pass
-                if not _channel:
-                    return
-            messages = message_old = ''
-            while not self.queue[channel].empty():
-                message = await self.queue[channel].get()
-                if message != message_old:
-                    if len(messages + message) > 2000:
-                        await _channel.send(messages)
-                        await asyncio.sleep(self.print_queue.seconds or 2)
-                        messages = message
-                    else:
-                        messages += message
-                    message_old = message
-            if messages:
-                await _channel.send(messages)
+    def _player_embed_inputs(self, server: Server) -> tuple:
+        srs_plugin = self.bot.cogs.get('SRS')
+        srs_users = srs_plugin.eventlistener.srs_users.get(server.name, {}) if srs_plugin else {}
+        return player_embed_inputs(server, srs_users)
 
-    @tasks.loop(seconds=2)
-    async def print_queue(self):
-        try:
-            await self.work_queue()
-            if self.print_queue.seconds == 10:
-                self.print_queue.change_interval(seconds=2)
-        except discord.DiscordException as ex:
-            self.log.exception(ex)
-            self.print_queue.change_interval(seconds=10)
-        except Exception as ex:
-            self.log.debug("Exception in print_queue(): " + str(ex))
+    async def _render_player_embed(self, server: Server):
+        if server.name not in self.bot.servers or server.locals.get('coalitions'):
+            return
+        report = PersistentReport(self.bot, self.plugin_name, 'players.json', embed_name='players_embed',
+                                  server=server)
+        await report.render(server=server, sides=[Coalition.BLUE, Coalition.RED])
+
+    async def _render_mission_embed(self, server: Server):
+        if server.name not in self.bot.servers or not server.settings:
+            return
+        report = PersistentReport(self.bot, self.plugin_name, 'serverStatus.json', embed_name='mission_embed',
+                                  server=server)
+        await report.render(server=server)
 
     @tasks.loop(seconds=10)
     async def update_player_embed(self):
-        for server_name, update in self.player_embeds.copy().items():
-            if not update:
-                continue
-            try:
-                server = self.bot.servers.get(server_name)
-                if server and not server.locals.get('coalitions'):
-                    report = PersistentReport(self.bot, self.plugin_name, 'players.json',
-                                              embed_name='players_embed', server=server)
-                    await report.render(server=server, sides=[Coalition.BLUE, Coalition.RED])
-            except Exception as ex:
-                self.log.exception(ex)
-            finally:
-                self.player_embeds[server_name] = False
+        await self.player_embeds.run()
 
     @tasks.loop(seconds=10)
     async def update_mission_embed(self):
-        for server_name, update in self.mission_embeds.copy().items():
-            if not update:
-                continue
-            try:
-                server = self.bot.servers.get(server_name)
-                if not server or not server.settings:
-                    continue
-                report = PersistentReport(self.bot, self.plugin_name, 'serverStatus.json',
-                                          embed_name='mission_embed', server=server)
-                await report.render(server=server)
-            except (TimeoutError, asyncio.TimeoutError):
-                pass
-            except Exception as ex:
-                self.log.exception(ex)
-            finally:
-                self.mission_embeds[server_name] = False
-
-    @print_queue.before_loop
-    async def before_check(self):
-        await self.bot.wait_until_ready()
+        await self.mission_embeds.run()
 
     def get_mission_stats(self, server: Server) -> bool:
         if server.name not in self.mission_stats:
@@ -237,17 +186,14 @@ class MissionEventListener(EventListener["Mission"]):
                 events_channel = server.channels.get(Channel.COALITION_BLUE_EVENTS, -1)
         if not events_channel:
             events_channel = server.channels.get(Channel.EVENTS, -1)
-        if int(events_channel) != -1:
-            if events_channel not in self.queue:
-                self.queue[events_channel] = asyncio.Queue()
-            self.queue[events_channel].put_nowait(message)
+        self.bot.messages.put(int(events_channel), message)
 
     def display_mission_embed(self, server: Server):
-        self.mission_embeds[server.name] = True
+        self.mission_embeds.mark(server)
 
     # Display the list of active players
     def display_player_embed(self, server: Server):
-        self.player_embeds[server.name] = True
+        self.player_embeds.mark(server)
 
     @event(name="callback")
     async def callback(self, server: Server, data: dict):
@@ -587,7 +533,7 @@ class MissionEventListener(EventListener["Mission"]):
                 asyncio.create_task(self._smooth_pause(server, smooth_pause))
         self.display_mission_embed(server)
 
-    @event(name="getMissionUpdate")
+    @event(name="getMissionUpdate", coalesce=True)
     async def getMissionUpdate(self, server: Server, data: dict) -> None:
         if not server.current_mission:
             server.status = Status.STOPPED
@@ -189,6 +189,8 @@ end
 
 function mission.onMissionLoadBegin()
     log.write('DCSServerBot', log.DEBUG, 'Mission: onMissionLoadBegin()')
+    -- the slots belong to the mission
+    utils.clearSlots()
     if dcsbot.registered == false then
         dcsbot.registerDCSServer()
     end
@@ -281,6 +283,7 @@ function mission.onPlayerConnect(id)
     dcsbot.userInfo[msg.ucid] = dcsbot.userInfo[msg.ucid] or {}
     dcsbot.userInfo[msg.ucid].points = nil
     mission.num_change_slots[id] = 0
+    utils.addPlayer(id, msg.ucid)
     utils.sendBotTable(msg)
 end
 
@@ -317,6 +320,7 @@ function mission.onPlayerStop(id)
         name = net.get_player_info(id, 'name'),
         active = false
     }
+    utils.removePlayer(id)
     utils.sendBotTable(msg)
 end
 
@@ -369,16 +373,17 @@ function mission.onPlayerChangeSlot(id)
         active = true
     }
     msg.unit_type, msg.slot, msg.sub_slot = utils.getMulticrewAllParameters(id)
-    msg.unit_name = Sim.getUnitProperty(msg.slot, Sim.UNIT_NAME)
+    local slot_info = utils.getSlotInfo(msg.slot)
+    msg.unit_name = slot_info.unit_name
     if msg.unit_type ~= '?' then
         msg.unit_category = utils.getCategory(msg.unit_type)
     else
         msg.unit_category = ""
     end
-    msg.group_name = Sim.getUnitProperty(msg.slot, Sim.UNIT_GROUPNAME)
-    msg.group_id = Sim.getUnitProperty(msg.slot, Sim.UNIT_GROUP_MISSION_ID)
-    msg.unit_callsign = Sim.getUnitProperty(msg.slot, Sim.UNIT_CALLSIGN)
-    msg.unit_display_name = Sim.getUnitTypeAttribute(Sim.getUnitType(msg.slot), "DisplayName") or msg.unit_name
+    msg.group_name = slot_info.group_name
+    msg.group_id = slot_info.group_id
+    msg.unit_callsign = slot_info.unit_callsign
+    msg.unit_display_name = Sim.getUnitTypeAttribute(slot_info.unit_type, "DisplayName") or msg.unit_name
 
     -- DCS MC bug workaround
     if msg.sub_slot > 0 then
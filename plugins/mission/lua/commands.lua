@@ -848,14 +848,8 @@ end
 local function setUserRoles(json)
     dcsbot.userInfo[json.ucid] = dcsbot.userInfo[json.ucid] or {}
     dcsbot.userInfo[json.ucid].roles = json.roles
-    local plist = net.get_player_list()
-
-    for i = 2, #plist do
-        if (net.get_player_info(plist[i], 'ucid') == json.ucid) then
-            name = net.get_player_info(plist[i], 'name')
-            break
-        end
-    end
+    local id = utils.getPlayerIdByUcid(json.ucid)
+    local name = id and id ~= 1 and net.get_player_info(id, 'name')
     if name then
         local script = ''
         if json.discord_id then
@@ -897,10 +891,16 @@ function dcsbot.kick(json)
         net.kick(json.id, json.reason)
         return
     end
+    if json.ucid then
+        local id = utils.getPlayerIdByUcid(json.ucid)
+        if id and id ~= 1 then
+            net.kick(id, json.reason)
+        end
+        return
+    end
     local plist = net.get_player_list()
     for i = 2, #plist do
-        if ((json.ucid and net.get_player_info(plist[i], 'ucid') == json.ucid) or
-                (json.name and net.get_player_info(plist[i], 'name') == json.name)) then
+        if json.name and net.get_player_info(plist[i], 'name') == json.name then
             net.kick(plist[i], json.reason)
             break
         end
@@ -940,13 +940,12 @@ local function single_ban(json)
     end
     local reason = json.reason .. '.\nExpires ' .. banned_until
     dcsbot.banList[json.ucid] = reason
-    local plist = net.get_player_list()
-    for i = 2, #plist do
-        if net.get_player_info(plist[i], 'ucid') == json.ucid then
-            net.kick(plist[i], reason)
-            ipaddr = utils.getIP(net.get_player_info(plist[i], 'ipaddr'))
+    local id = utils.getPlayerIdByUcid(json.ucid)
+    if id and id ~= 1 then
+        net.kick(id, reason)
+        local ipaddr = utils.getIP(net.get_player_info(id, 'ipaddr'))
+        if ipaddr then
             dcsbot.banList[ipaddr] = json.ucid
-            break
         end
     end
 end
@@ -965,7 +964,14 @@ end
 
 function dcsbot.unban(json)
     log.write('DCSServerBot', log.DEBUG, 'Mission: unban()')
-	dcsbot.banList[json.ucid] = nil
+    -- do we unban a list of players?
+    if json.ucids then
+        for _, ucid in ipairs(json.ucids) do
+            dcsbot.banList[ucid] = nil
+        end
+    else
+        dcsbot.banList[json.ucid] = nil
+    end
 end
 
 function dcsbot.lock_player(json)
@@ -0,0 +1 @@
+# Mission plugin tests
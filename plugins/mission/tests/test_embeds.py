@@ -0,0 +1,93 @@
+"""
+Tests for the inputs of the status and player embeds of the Mission plugin (plugins/mission/embeds.py).
+
+The embeds are only rendered again, if their inputs change, so every value they show has to change the inputs.
+"""
+
+import sys
+
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core import Side, Status
+from plugins.mission.embeds import player_embed_inputs, mission_embed_inputs
+
+
+class FakePlayer(SimpleNamespace):
+    def __init__(self, name: str, **kwargs):
+        super().__init__(display_name=name, side=Side.BLUE, unit_type='F-16C_50', unit_display_name='Viper',
+                         sub_slot=0, pending=False, active=True, **kwargs)
+
+
+class FakeServer:
+    def __init__(self):
+        self.status = Status.RUNNING
+        self.maintenance = False
+        self.restart_time = None
+        self.settings = {'name': 'Server', 'password': '', 'maxPlayers': 16}
+        self.node = SimpleNamespace(public_ip='127.0.0.1', dcs_version='2.9.10')
+        self.current_mission = SimpleNamespace(display_name='Mission', map='Caucasus', date='2016-06-21',
+                                               start_time=28800, mission_time=60.5, num_slots_blue=10,
+                                               num_slots_red=10, weather={'wind': {'speed': 5}}, clouds={})
+        self.players = [FakePlayer('Alpha'), FakePlayer('Bravo')]
+
+    def get_active_players(self) -> list[FakePlayer]:
+        return [x for x in self.players if x.active]
+
+
+def test_player_embed_inputs():
+    server = FakeServer()
+    inputs = player_embed_inputs(server, {})
+    assert player_embed_inputs(server, {}) == inputs
+
+    server.players[0].unit_type = 'FA-18C_hornet'
+    assert player_embed_inputs(server, {}) != inputs
+    inputs = player_embed_inputs(server, {})
+
+    # inactive players are not shown
+    server.players.append(FakePlayer('Charlie'))
+    server.players[-1].active = False
+    assert player_embed_inputs(server, {}) == inputs
+
+    server.players[1].side = Side.RED
+    assert player_embed_inputs(server, {}) != inputs
+    inputs = player_embed_inputs(server, {})
+
+    assert player_embed_inputs(server, {'Alpha': {}}) != inputs
+
+
+def test_mission_embed_inputs():
+    server = FakeServer()
+    inputs = mission_embed_inputs(server)
+    assert mission_embed_inputs(server) == inputs
+
+    # the mission time is shown in seconds
+    server.current_mission.mission_time = 60.9
+    assert mission_embed_inputs(server) == inputs
+    server.current_mission.mission_time = 61
+    assert mission_embed_inputs(server) != inputs
+    inputs = mission_embed_inputs(server)
+
+    # nested values
+    server.current_mission.weather['wind']['speed'] = 10
+    assert mission_embed_inputs(server) != inputs
+    inputs = mission_embed_inputs(server)
+
+    server.settings['password'] = 'secret'
+    assert mission_embed_inputs(server) != inputs
+    inputs = mission_embed_inputs(server)
+
+    server.players.append(FakePlayer('Charlie'))
+    assert mission_embed_inputs(server) != inputs
+    inputs = mission_embed_inputs(server)
+
+    server.status = Status.PAUSED
+    assert mission_embed_inputs(server) != inputs
+    inputs = mission_embed_inputs(server)
+
+    server.current_mission = None
+    assert mission_embed_inputs(server) != inputs
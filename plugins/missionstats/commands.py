@@ -1,6 +1,5 @@
 import asyncio
 import discord
-import pandas as pd
 import psycopg
 
 from core import Plugin, PluginRequiredError, utils, Report, Status, Server, command, get_translation
@@ -15,6 +14,7 @@ from services.bot import DCSServerBot
 
 from .listener import MissionStatisticsEventListener
 
+pd = utils.lazy_import('pandas')
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -1,7 +1,7 @@
 import asyncio
 
 from core import EventListener, PersistentReport, Server, Coalition, Channel, event, Report, get_translation, \
-    ThreadSafeDict, Side, utils
+    ConcurrentDict, Side, utils
 from discord.ext import tasks
 from typing import TYPE_CHECKING, Counter, Any
 
@@ -64,7 +64,7 @@ class MissionStatisticsEventListener(EventListener["MissionStatistics"]):
     def __init__(self, plugin: "MissionStatistics"):
         super().__init__(plugin)
         self.mission_stats = {}
-        self.update: dict[str, bool] = ThreadSafeDict()
+        self.update: dict[str, bool] = ConcurrentDict()
         utils.safe_start(self.do_update)
 
     async def shutdown(self):
@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import eyed3
 
-from core import ServiceRegistry
+from core import ServiceRegistry, cached
 from eyed3.id3 import Tag
-from functools import lru_cache
 
 
-@lru_cache(maxsize=None)
+@cached(maxsize=1024)
 def get_tag(file) -> Tag:
     audio = eyed3.load(file)
     if not audio or not audio.tag:
@@ -8,11 +8,11 @@ from core import (Plugin, PluginRequiredError, utils, Server, PluginInstallation
 from discord import app_commands
 from discord.app_commands import Range
 from discord.ext import tasks
-from psycopg.rows import dict_row
 from psycopg.types.json import Json
 from services.bot import DCSServerBot
 from typing import Type, cast
 
+from .ledger import PunishmentLedger
 from .listener import PunishmentEventListener
 from ..creditsystem.player import CreditPlayer
 
@@ -27,6 +27,7 @@ class Punishment(Plugin[PunishmentEventListener]):
             raise PluginInstallationError(reason=f"No {self.plugin_name}.yaml file found!", plugin=self.plugin_name)
         cpool_url, lpool_url = self.node.get_database_urls()
         self.trigger = PubSub(self.node, "punish", lpool_url, self.process_punishment)
+        self.ledger = PunishmentLedger(self.apool, self.locals.get(DEFAULT_TAG, {}).get('decay'), log=self.log)
 
     async def cog_load(self) -> None:
         await super().cog_load()
@@ -135,13 +136,10 @@ class Punishment(Plugin[PunishmentEventListener]):
             await self.bot.audit(message)
 
     async def process_punishment(self, data: dict):
-        async with self.apool.connection() as conn:
-            cursor = await conn.execute("SELECT SUM(points) FROM pu_events WHERE init_id = %s", (data['init_id'],))
-            row = await cursor.fetchone()
-        if not row or row[0] == 0:
+        points = await self.ledger.get(data['init_id'])
+        if not points:
             return
 
-        points = row[0]
         server = self.bot.servers.get(data['server_name'])
         config = self.get_config(server)
         # we are not initialized correctly yet
@@ -168,17 +166,9 @@ class Punishment(Plugin[PunishmentEventListener]):
 
     @tasks.loop(hours=1.0)
     async def decay(self):
-        decay_config = self.locals.get(DEFAULT_TAG, {}).get('decay')
-        if decay_config:
+        if self.ledger.decay:
             self.log.debug('Punishment - Running decay ...')
-            async with self.apool.connection() as conn:
-                for d in decay_config:
-                    days = d['days']
-                    await conn.execute(f"""
-                        UPDATE pu_events SET points = ROUND((points * %s)::numeric, 2), decay_run = %s 
-                        WHERE time < (timezone('utc', now()) - interval '{days} days') AND decay_run < %s
-                    """, (d['weight'], days, days))
-                    await conn.execute("DELETE FROM pu_events WHERE points = 0.0")
+            await self.ledger.refresh()
 
     @decay.before_loop
     async def before_decay(self):
@@ -205,11 +195,7 @@ class Punishment(Plugin[PunishmentEventListener]):
             await interaction.response.send_message(_("The UCID provided is invalid."), ephemeral=True)
             return
 
-        async with self.apool.connection() as conn:
-            await conn.execute("""
-                INSERT INTO pu_events (init_id, server_name, event, points)
-                VALUES (%s, %s, %s, %s) 
-            """, (ucid, server.name, reason, points))
+        await self.ledger.add(ucid, server.name, reason, points)
         await self.trigger.publish({
             "guild_id": self.node.guild_id,
             "node": "Master",
@@ -256,9 +242,9 @@ class Punishment(Plugin[PunishmentEventListener]):
                 else:
                     ucids = [user]
 
-                for ucid in ucids:
-                    await conn.execute('DELETE FROM pu_events WHERE init_id = %s', (ucid, ))
-                    await self.bus.unban(ucid)
+            for ucid in ucids:
+                await self.ledger.forgive(ucid)
+                await self.bus.unban(ucid)
 
             await interaction.followup.send(
                 _("All punishment points deleted and player unbanned (if they were banned by the bot before)."),
@@ -294,28 +280,21 @@ class Punishment(Plugin[PunishmentEventListener]):
                         (await utils.get_command(self.bot, name='linkme')).mention
                     ), ephemeral=True)
                 return
-        async with self.apool.connection() as conn:
-            async with conn.cursor(row_factory=dict_row) as cursor:
-                await cursor.execute("""
-                    SELECT event, points, time 
-                    FROM pu_events 
-                    WHERE init_id = %s 
-                    ORDER BY time DESC
-                """, (ucid, ))
-                if cursor.rowcount == 0:
-                    await interaction.response.send_message(_('User has no penalty points.'), ephemeral=ephemeral)
-                    return
-                embed = discord.Embed(
-                    title=_("Penalty Points for {}").format(
-                        user.display_name if isinstance(user, discord.Member) else user),
-                    color=discord.Color.blue())
-                times = events = points = ''
-                total = 0.0
-                async for row in cursor:
-                    times += f"{row['time']:%m-%d %H:%M}\n"
-                    events += ' '.join(row['event'].split('_')).title() + '\n'
-                    points += f"{row['points']:.2f}\n"
-                    total += float(row['points'])
+        rows = await self.ledger.events(ucid)
+        if not rows:
+            await interaction.response.send_message(_('User has no penalty points.'), ephemeral=ephemeral)
+            return
+        embed = discord.Embed(
+            title=_("Penalty Points for {}").format(
+                user.display_name if isinstance(user, discord.Member) else user),
+            color=discord.Color.blue())
+        times = events = points = ''
+        total = 0.0
+        for row in rows:
+            times += f"{row['time']:%m-%d %H:%M}\n"
+            events += ' '.join(row['event'].split('_')).title() + '\n'
+            points += f"{row['points']:.2f}\n"
+            total += row['points']
 
         embed.description = _("Total penalty points: {total:.2f}").format(total=total)
         embed.add_field(name='▬' * 10 + ' Log ' + '▬' * 10, value='_ _', inline=False)
@@ -14,3 +14,10 @@ CREATE TABLE IF NOT EXISTS pu_events (
 CREATE INDEX IF NOT EXISTS idx_pu_events_init_id ON pu_events(init_id);
 CREATE INDEX IF NOT EXISTS idx_pu_events_target_id ON pu_events(target_id);
 CREATE UNIQUE INDEX idx_pu_events_unique ON pu_events (init_id, COALESCE(target_id, '-1'), event, DATE_TRUNC('minute', time));
+CREATE TABLE IF NOT EXISTS pu_ledger (
+    init_id TEXT PRIMARY KEY,
+    points DECIMAL NOT NULL DEFAULT 0,
+    next_decay TIMESTAMP,
+    FOREIGN KEY (init_id) REFERENCES players (ucid) ON UPDATE CASCADE ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_pu_ledger_next_decay ON pu_ledger(next_decay);
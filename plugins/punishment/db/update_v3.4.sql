@@ -0,0 +1,3 @@
+CREATE TABLE IF NOT EXISTS pu_ledger (init_id TEXT PRIMARY KEY, points DECIMAL NOT NULL DEFAULT 0, next_decay TIMESTAMP, FOREIGN KEY (init_id) REFERENCES players (ucid) ON UPDATE CASCADE ON DELETE CASCADE);
+CREATE INDEX IF NOT EXISTS idx_pu_ledger_next_decay ON pu_ledger(next_decay);
+INSERT INTO pu_ledger (init_id, points, next_decay) SELECT init_id, SUM(points), (now() AT TIME ZONE 'utc') FROM pu_events GROUP BY init_id ON CONFLICT DO NOTHING;
@@ -0,0 +1,171 @@
+import logging
+
+from datetime import datetime, timedelta
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from psycopg_pool import AsyncConnectionPool
+
+__all__ = [
+    "PunishmentLedger"
+]
+
+
+class PunishmentLedger:
+    """
+    Current punishment points per player.
+
+    The events in pu_events keep the points they were given with, the decay is applied when the points are read,
+    depending on the age of the event. pu_ledger holds the decayed total of every player and the time, when the next
+    of their events reaches a decay step. Until then, the points of a player are a single lookup. Afterwards, the
+    total is computed again from the events of this player, and events that have decayed to zero are deleted.
+    """
+
+    def __init__(self, apool: "AsyncConnectionPool", decay: list[dict] | None = None,
+                 log: logging.Logger | None = None):
+        self.apool = apool
+        self.log = log or logging.getLogger(__name__)
+        # decay steps, ordered by days
+        self.decay: list[tuple[int, float]] = sorted((int(x['days']), float(x['weight'])) for x in decay or [])
+
+    def weight(self, age: timedelta, decay_run: int = -1) -> float:
+        """
+        Factor of the points of an event of the given age.
+        Steps up to decay_run have been applied to the points of the event already (by the former decay task).
+        """
+        weight = 1.0
+        for days, step_weight in self.decay:
+            if days > decay_run and age > timedelta(days=days):
+                weight *= step_weight
+        return weight
+
+    def next_decay(self, time: datetime, now: datetime, decay_run: int = -1) -> datetime | None:
+        """
+        Time of the next decay step of an event, or None if its points will not change anymore.
+        """
+        if self.weight(now - time, decay_run) == 0:
+            return None
+        return next((
+            time + timedelta(days=days)
+            for days, _ in self.decay
+            if days > decay_run and now - time <= timedelta(days=days)
+        ), None)
+
+    async def add(self, init_id: str, server_name: str, event: str, points: float,
+                  target_id: str | None = None) -> bool:
+        """
+        Adds a punishment event. Returns False if the same event was added in the same minute already.
+        """
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                cursor = await conn.execute("""
+                    INSERT INTO pu_events (init_id, target_id, server_name, event, points)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                    RETURNING time, (now() AT TIME ZONE 'utc')
+                """, (init_id, target_id, server_name, event, points))
+                row = await cursor.fetchone()
+                if not row:
+                    return False
+                time, now = row
+                # LEAST() ignores NULL values
+                await conn.execute("""
+                    INSERT INTO pu_ledger (init_id, points, next_decay)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (init_id) DO UPDATE
+                    SET points = pu_ledger.points + excluded.points,
+                        next_decay = LEAST(pu_ledger.next_decay, excluded.next_decay)
+                """, (init_id, round(points * self.weight(now - time), 2), self.next_decay(time, now)))
+        return True
+
+    async def get(self, ucid: str) -> float:
+        async with self.apool.connection() as conn:
+            cursor = await conn.execute("""
+                SELECT points, next_decay <= (now() AT TIME ZONE 'utc') FROM pu_ledger WHERE init_id = %s
+            """, (ucid, ))
+            row = await cursor.fetchone()
+            if not row:
+                return 0.0
+            if row[1]:
+                return await self._refresh(conn, ucid)
+            return float(row[0])
+
+    async def events(self, ucid: str) -> list[dict]:
+        """
+        The events of a player with their current (decayed) points, newest first.
+        """
+        async with self.apool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute("""
+                    SELECT event, points, time, decay_run, (now() AT TIME ZONE 'utc') AS now
+                    FROM pu_events
+                    WHERE init_id = %s
+                    ORDER BY time DESC
+                """, (ucid, ))
+                rows = await cursor.fetchall()
+        events = []
+        for row in rows:
+            weight = self.weight(row['now'] - row['time'], row['decay_run'])
+            # fully decayed events are deleted on the next refresh
+            if weight:
+                events.append({
+                    "event": row['event'],
+                    "points": round(float(row['points']) * weight, 2),
+                    "time": row['time']
+                })
+        return events
+
+    async def forgive(self, ucid: str) -> None:
+        async with self.apool.connection() as conn:
+            async with conn.transaction():
+                await conn.execute('DELETE FROM pu_events WHERE init_id = %s', (ucid, ))
+                await conn.execute('DELETE FROM pu_ledger WHERE init_id = %s', (ucid, ))
+
+    async def refresh(self) -> int:
+        """
+        Applies the decay to all players that reached a decay step, so that reports that read the ledger directly
+        stay up to date.
+        """
+        async with self.apool.connection() as conn:
+            cursor = await conn.execute("""
+                SELECT init_id FROM pu_ledger WHERE next_decay <= (now() AT TIME ZONE 'utc')
+            """)
+            ucids = [row[0] async for row in cursor]
+            for ucid in ucids:
+                await self._refresh(conn, ucid)
+        if ucids:
+            self.log.debug(f'Punishment - Decay applied to {len(ucids)} players.')
+        return len(ucids)
+
+    async def _refresh(self, conn: AsyncConnection, ucid: str) -> float:
+        async with conn.transaction():
+            # the row lock makes concurrent add() calls wait until the new total is written
+            await conn.execute("""
+                INSERT INTO pu_ledger (init_id, points) VALUES (%s, 0) ON CONFLICT DO NOTHING
+            """, (ucid, ))
+            cursor = await conn.execute("""
+                SELECT (now() AT TIME ZONE 'utc') FROM pu_ledger WHERE init_id = %s FOR UPDATE
+            """, (ucid, ))
+            now = (await cursor.fetchone())[0]
+            cursor = await conn.execute("SELECT id, points, time, decay_run FROM pu_events WHERE init_id = %s",
+                                        (ucid, ))
+            total = 0.0
+            next_decay = None
+            decayed = []
+            async for _id, points, time, decay_run in cursor:
+                weight = self.weight(now - time, decay_run)
+                if weight == 0:
+                    decayed.append(_id)
+                    continue
+                total += float(points) * weight
+                step = self.next_decay(time, now, decay_run)
+                if step and (not next_decay or step < next_decay):
+                    next_decay = step
+            if decayed:
+                await conn.execute("DELETE FROM pu_events WHERE id = ANY(%s)", (decayed, ))
+            total = round(total, 2)
+            await conn.execute("UPDATE pu_ledger SET points = %s, next_decay = %s WHERE init_id = %s",
+                               (total, next_decay, ucid))
+        return total
@@ -4,7 +4,7 @@ import os
 import time
 
 from core import EventListener, Server, Player, event, chat_command, get_translation, ChatCommand, Channel, \
-    ThreadSafeDict, Coalition, Side, utils
+    ConcurrentDict, Coalition, Side, utils
 from pathlib import Path
 from plugins.competitive.commands import Competitive
 from psycopg.types.json import Json
@@ -24,9 +24,9 @@ class PunishmentEventListener(EventListener["Punishment"]):
         self.active_servers: set[str] = set()
         self.pending_forgiveness: dict[tuple[str, str], list[asyncio.Task]] = {}
         self.pending_repair: dict[str, asyncio.Task] = {}
-        self.pending_kill: dict[str, tuple[int, dict | None]] = ThreadSafeDict()
-        self.disconnected: dict[str, tuple[int, dict | None]] = ThreadSafeDict()
-        self.awaiting_task: dict[str, asyncio.TimerHandle] = ThreadSafeDict()
+        self.pending_kill: dict[str, tuple[int, dict | None]] = ConcurrentDict()
+        self.disconnected: dict[str, tuple[int, dict | None]] = ConcurrentDict()
+        self.awaiting_task: dict[str, asyncio.TimerHandle] = ConcurrentDict()
         self.missile_parameters: dict[str, dict[str, float]] = self.read_missile_parameters()
 
     async def shutdown(self) -> None:
@@ -140,14 +140,8 @@ class PunishmentEventListener(EventListener["Punishment"]):
             """, (player.ucid, ))
             return (await cursor.fetchone())[0]
 
-    async def _get_punishment_points(self, player: Player) -> int:
-        async with self.apool.connection() as conn:
-            cursor = await conn.execute("""
-                SELECT COALESCE(SUM(points), 0) 
-                FROM pu_events 
-                WHERE init_id = %s
-            """, (player.ucid, ))
-            return (await cursor.fetchone())[0]
+    async def _get_punishment_points(self, player: Player) -> float:
+        return await self.plugin.ledger.get(player.ucid)
 
     async def _provide_forgiveness_window(self, data: dict, window: int, key: tuple[str, str]) -> None:
         initiator: Player = data['initiator']
@@ -229,13 +223,8 @@ class PunishmentEventListener(EventListener["Punishment"]):
                 self.plugin.punish(server, initiator.ucid, penalty, penalty['reason']))
 
         if data.get('points', 0) > 0:
-            async with self.apool.connection() as conn:
-                await conn.execute("""
-                    INSERT INTO pu_events (init_id, target_id, server_name, event, points) 
-                    VALUES (%s, %s, %s, %s, %s) 
-                    ON CONFLICT DO NOTHING
-                """, (initiator.ucid, target.ucid if target else None, data['server_name'], data['eventName'],
-                      data['points']))
+            await self.plugin.ledger.add(initiator.ucid, data['server_name'], data['eventName'], data['points'],
+                                         target_id=target.ucid if target else None)
             await self.plugin.trigger.publish({
                 "guild_id": self.node.guild_id,
                 "node": "Master",
@@ -0,0 +1 @@
+# Punishment plugin tests
@@ -0,0 +1,88 @@
+"""
+Tests for the decay of the Punishment ledger.
+
+The lazy decay has to give the same points as the former hourly decay task, which multiplied the points of all
+events older than each decay step with its weight, once per step.
+"""
+
+import sys
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.punishment.ledger import PunishmentLedger
+
+# the decay of the sample configuration
+DECAY = [
+    {"days": 0, "weight": 1},
+    {"days": 3, "weight": 0.75},
+    {"days": 30, "weight": 0.25},
+    {"days": 60, "weight": 0}
+]
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def hourly_decay(points: float, age: timedelta, decay_run: int = -1) -> tuple[float, int]:
+    """
+    The former decay task, applied to a single event.
+    """
+    for step in DECAY:
+        if age > timedelta(days=step['days']) and decay_run < step['days']:
+            points = round(points * step['weight'], 2)
+            decay_run = step['days']
+    return points, decay_run
+
+
+class TestWeight:
+
+    def test_same_points_as_the_hourly_decay(self):
+        ledger = PunishmentLedger(None, DECAY)
+        for days in [0, 1, 3, 4, 29, 31, 59, 61, 365]:
+            age = timedelta(days=days, hours=1)
+            assert round(10 * ledger.weight(age), 2) == hourly_decay(10, age)[0], days
+
+    def test_steps_of_the_hourly_decay_are_not_applied_twice(self):
+        ledger = PunishmentLedger(None, DECAY)
+        # decayed by the former task 4 days after the event
+        points, decay_run = hourly_decay(10, timedelta(days=4))
+        assert decay_run == 3
+        age = timedelta(days=40)
+        assert round(points * ledger.weight(age, decay_run), 2) == hourly_decay(10, age)[0]
+
+    def test_steps_are_ordered(self):
+        ledger = PunishmentLedger(None, list(reversed(DECAY)))
+        assert ledger.weight(timedelta(days=31)) == 0.75 * 0.25
+
+    def test_no_decay(self):
+        ledger = PunishmentLedger(None, None)
+        assert ledger.weight(timedelta(days=1000)) == 1
+        assert ledger.next_decay(NOW, NOW) is None
+
+
+class TestNextDecay:
+
+    def test_next_step(self):
+        ledger = PunishmentLedger(None, DECAY)
+        time = NOW - timedelta(days=10)
+        assert ledger.next_decay(time, NOW) == time + timedelta(days=30)
+        assert ledger.next_decay(time, NOW, decay_run=30) == time + timedelta(days=60)
+
+    def test_new_events(self):
+        ledger = PunishmentLedger(None, DECAY)
+        # the first step (after 0 days) is reached right away
+        assert ledger.next_decay(NOW, NOW) == NOW
+
+    def test_fully_decayed_events(self):
+        ledger = PunishmentLedger(None, DECAY)
+        assert ledger.next_decay(NOW - timedelta(days=61), NOW) is None
+
+    def test_points_do_not_change_between_steps(self):
+        ledger = PunishmentLedger(None, DECAY)
+        time = NOW - timedelta(days=5)
+        step = ledger.next_decay(time, NOW)
+        assert ledger.weight(step - time) == ledger.weight(NOW - time)
+        assert ledger.weight(step - time + timedelta(seconds=1)) < ledger.weight(NOW - time)
@@ -1 +1 @@
-__version__ = "3.4"
+__version__ = "3.5"
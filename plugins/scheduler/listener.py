@@ -254,7 +254,7 @@ class SchedulerListener(EventListener["Scheduler"]):
         if result:
             server.restart_time = datetime.now(tz=timezone.utc) + timedelta(seconds=result[0])
 
-    @event(name="getMissionUpdate")
+    @event(name="getMissionUpdate", coalesce=True)
     async def getMissionUpdate(self, server: Server, _data: dict) -> None:
         asyncio.create_task(self.set_restart_time(server))
 
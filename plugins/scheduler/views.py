@@ -6,7 +6,6 @@ import os
 from core import Server, utils
 from discord import ButtonStyle, ChannelType
 from discord.ui import Button, ChannelSelect
-from io import BytesIO
 from pathlib import Path
 from services.bot import DCSServerBot
 from typing import cast
@@ -466,8 +465,8 @@ class ServerConfigView(discord.ui.View):
     async def on_download(self, interaction: discord.Interaction, _: Button):
         await interaction.response.defer()
         path = os.path.join(self.server.instance.home, 'Config', 'serverSettings.lua')
-        file = await self.server.node.read_file(path)
-        await interaction.followup.send(file=discord.File(fp=BytesIO(file), filename=os.path.basename(path)))
+        async with utils.spool(self.server.node.stream_file(path)) as file:
+            await interaction.followup.send(file=discord.File(fp=file, filename=os.path.basename(path)))
 
     @discord.ui.button(label='Upload', style=ButtonStyle.primary, emoji='📥', row=4)
     async def on_upload(self, interaction: discord.Interaction, _: Button):
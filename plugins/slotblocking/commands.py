@@ -1,12 +1,16 @@
+import asyncio
+import discord
 import os
 import psycopg
 
 from core import Plugin, PluginRequiredError, Server, PluginInstallationError, DEFAULT_TAG
+from discord.ext import commands
 from pathlib import Path
 from services.bot import DCSServerBot
 from typing import Type
 
 from .listener import SlotBlockingListener
+from .vips import VIPIndex
 
 # ruamel YAML support
 from ruamel.yaml import YAML
@@ -19,6 +23,7 @@ class SlotBlocking(Plugin[SlotBlockingListener]):
         super().__init__(bot, eventlistener)
         if not self.locals:
             raise PluginInstallationError(reason=f"No {self.plugin_name}.yaml file found!", plugin=self.plugin_name)
+        self.vips = VIPIndex(bot, log=self.log)
 
     def _migrate_3_1(self, instance: dict, **kwargs):
         if instance.get('use_reservations'):
@@ -82,6 +87,16 @@ class SlotBlocking(Plugin[SlotBlockingListener]):
                 self._config[server.node.name][server.instance.name]['VIP'] = vips
         return self._config[server.node.name][server.instance.name]
 
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles and self.vips.update_member(after):
+            asyncio.create_task(self.eventlistener.upload_vips())
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        if self.vips.remove_member(member):
+            asyncio.create_task(self.eventlistener.upload_vips())
+
 
 async def setup(bot: DCSServerBot):
     for plugin in ['mission', 'creditsystem']:
@@ -0,0 +1,47 @@
+import re
+
+from core import utils
+
+__all__ = [
+    "CostTable"
+]
+
+ATTRIBUTES = ('unit_type', 'unit_name', 'group_name')
+
+
+class CostTable:
+    """
+    Costs of the restricted slots of a server.
+
+    The patterns of the "restricted" section are compiled once per configuration, and the costs of every slot are
+    cached on first use. Any further slot change into the same slot is a single lookup. A new table is created,
+    whenever the configuration is read again (on mission load or on a reload of the plugin).
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        # (compiled patterns per attribute, costs) in the order of the configuration
+        self.rules: list[tuple[list[tuple[int, re.Pattern]], int]] = [
+            (
+                [(idx, re.compile(unit[attribute])) for idx, attribute in enumerate(ATTRIBUTES) if attribute in unit],
+                unit.get('costs', 0)
+            )
+            for unit in config.get('restricted', [])
+        ]
+        self._costs: dict[tuple[str, str, str], int] = {}
+
+    def costs(self, unit_type: str, unit_name: str, group_name: str) -> int:
+        slot = (unit_type, unit_name, group_name)
+        costs = self._costs.get(slot)
+        if costs is None:
+            costs = self._costs[slot] = self._match(slot)
+        return costs
+
+    def _match(self, slot: tuple[str, str, str]) -> int:
+        values = [utils.lua_pattern_to_python_regex(x) for x in slot]
+        # the first rule with a matching attribute wins
+        for patterns, costs in self.rules:
+            for idx, pattern in patterns:
+                if pattern.search(values[idx]):
+                    return costs
+        return 0
@@ -1,11 +1,11 @@
 import asyncio
-import discord
-import re
 
 from core import EventListener, Server, Status, utils, event, Side
 from plugins.creditsystem.player import CreditPlayer
 from typing import cast, TYPE_CHECKING
 
+from .costs import CostTable
+
 if TYPE_CHECKING:
     from .commands import SlotBlocking
 
@@ -15,6 +15,7 @@ class SlotBlockingListener(EventListener["SlotBlocking"]):
     def __init__(self, plugin: "SlotBlocking"):
         super().__init__(plugin)
         self.lock = asyncio.Lock()
+        self.cost_tables: dict[str, CostTable] = {}
 
     def _migrate_roles(self, config: dict) -> None:
         if config.get('VIP', {}).get('discord', []):
@@ -27,52 +28,20 @@ class SlotBlockingListener(EventListener["SlotBlocking"]):
         config: dict = self.plugin.get_config(server, use_cache=False)
         if config:
             self._migrate_roles(config)
+            self.cost_tables[server.name] = CostTable(config)
             await server.send_to_dcs({
                 'command': 'loadParams',
                 'plugin': self.plugin_name,
                 'params': config
             })
-            # find all VIP roles
-            roles = []
-            for role in config.get('VIP', {}).get('discord', []):
-                roles.append(self.bot.get_role(role))
-            if not roles:
-                return
-            guild = self.bot.guilds[0]
-            # get all linked members
-            async with self.apool.connection() as conn:
-                cursor = await conn.execute("""
-                    SELECT ucid, discord_id FROM players 
-                    WHERE discord_id != -1 AND LENGTH(ucid) = 32 AND manual = TRUE
-                """)
-                batch = []
-                async for row in cursor:
-                    member = guild.get_member(row[1])
-                    if not member:
-                        continue
-                    if any(role in roles for role in member.roles):
-                        batch.append({
-                            'ucid': row[0],
-                            'discord_id': row[1],
-                            'roles': [x.id for x in member.roles]
-                        })
-                    # upload the VIP users in batches of 25
-                    if len(batch) >= 25:
-                        await server.send_to_dcs({
-                            'command': 'uploadUserRoles',
-                            'batch': batch
-                        })
-                        batch = []
-
-                # Send remaining VIP users, if any
-                if batch:
-                    await server.send_to_dcs({
-                        'command': 'uploadUserRoles',
-                        'batch': batch
-                    })
+            roles = config.get('VIP', {}).get('discord', [])
+            if roles:
+                await self.plugin.vips.upload(server, roles)
 
     @event(name="registerDCSServer")
     async def registerDCSServer(self, server: Server, data: dict) -> None:
+        # we do not know, which roles the DCS server has already
+        self.plugin.vips.reset(server)
         # the server is running already
         if data['channel'].startswith('sync-'):
             asyncio.create_task(self._load_params_into_mission(server))
@@ -81,43 +50,19 @@ class SlotBlockingListener(EventListener["SlotBlocking"]):
     async def onMissionLoadEnd(self, server: Server, _: dict) -> None:
         asyncio.create_task(self._load_params_into_mission(server))
 
-    def _get_points(self, server: Server, player: CreditPlayer) -> int:
+    def _get_cost_table(self, server: Server) -> CostTable:
         config = self.plugin.get_config(server)
-
-        for unit in config.get('restricted', []):
-            is_unit_type = unit.get('unit_type') == player.unit_type
-            is_unit_name = unit.get('unit_name') in player.unit_name
-            is_group_name = unit.get('group_name') in player.group_name
-            side = unit.get('side', player.side) == player.side
-
-            if side and (is_unit_type or is_unit_name or is_group_name):
-                is_player_slot = player.sub_slot == 0 and 'points' in unit
-                is_crew_slot = player.sub_slot > 0 and 'crew' in unit
-
-                if is_player_slot:
-                    return unit['points']
-                elif is_crew_slot:
-                    return unit['crew']
-        return 0
+        table = self.cost_tables.get(server.name)
+        # the table is built again, whenever the configuration was read again
+        if not table or table.config is not config:
+            table = self.cost_tables[server.name] = CostTable(config)
+        return table
 
     def _get_costs(self, server: Server, data: CreditPlayer | dict) -> int:
-        def _get_data(data: CreditPlayer | dict, attribute_name: str):
-            return getattr(data, attribute_name) if isinstance(data, CreditPlayer) else data[attribute_name]
-
-        def _is_unit_match(unit: dict, attribute_name: str, attribute_value: str) -> bool:
-            if attribute_name in unit and re.search(unit[attribute_name],
-                                                    utils.lua_pattern_to_python_regex(attribute_value)):
-                return True
-            return False
-
-        config = self.plugin.get_config(server)
-
-        attributes = ['unit_type', 'unit_name', 'group_name']
-        for unit in config.get('restricted', []):
-            for attribute in attributes:
-                if _is_unit_match(unit, attribute, _get_data(data, attribute)):
-                    return unit.get('costs', 0)
-        return 0
+        table = self._get_cost_table(server)
+        if isinstance(data, CreditPlayer):
+            return table.costs(data.unit_type, data.unit_name, data.group_name)
+        return table.costs(data['unit_type'], data['unit_name'], data['group_name'])
 
     async def _is_vip(self, config: dict, data: dict) -> bool:
         if 'VIP' not in config:
@@ -264,23 +209,20 @@ class SlotBlockingListener(EventListener["SlotBlocking"]):
                 asyncio.create_task(server.move_to_spectators(
                     player, reason="You do not have enough credits to use this slot anymore."))
 
+    async def upload_vips(self) -> None:
+        for server in self.bot.servers.values():
+            if server.status in [Status.UNREGISTERED, Status.SHUTDOWN]:
+                continue
+            roles = self.get_config(server).get('VIP', {}).get('discord', [])
+            if roles:
+                await self.plugin.vips.upload(server, utils.get_role_ids(self.plugin, roles))
+
     @event(name="onMemberLinked")
     async def onMemberLinked(self, _server: Server, data: dict) -> None:
-        async def upload_vip(server: Server, member: discord.Member, ucid: str):
-            roles = [x.id for x in member.roles]
-            await server.send_to_dcs({
-                'command': 'uploadUserRoles',
-                'ucid': ucid,
-                'discord_id': member.id,
-                'roles': roles
-            })
-
-        member = self.bot.guilds[0].get_member(data['discord_id'])
-        if not member:
-            return
+        self.plugin.vips.link(data['ucid'], data['discord_id'])
+        asyncio.create_task(self.upload_vips())
 
-        ucid = data['ucid']
-        for server in self.bot.servers.values():
-            config = self.get_config(server)
-            if utils.check_roles(config.get('VIP', {}).get('discord', []), member):
-                await upload_vip(server, member, ucid)
+    @event(name="onMemberUnlinked")
+    async def onMemberUnlinked(self, _server: Server, data: dict) -> None:
+        self.plugin.vips.unlink(data['ucid'])
+        asyncio.create_task(self.upload_vips())
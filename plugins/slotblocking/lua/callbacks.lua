@@ -135,20 +135,35 @@ function slotblock.onPlayerTryConnect(addr, name, ucid, playerID)
     end
 end
 
+-- the restrictions that match a slot, cached with the slot until the mission or the configuration changes
+local function get_restrictions(slotID)
+    local restricted = dcsbot.params.slotblocking.restricted
+    local slot_info = utils.getSlotInfo(slotID)
+    if slot_info.restricted == restricted then
+        return slot_info.restrictions
+    end
+    local restrictions = {}
+    for _, unit in pairs(restricted) do
+        local is_unit_type_match = (unit.unit_type and unit.unit_type == slot_info.unit_type) or (unit.unit_type == 'dynamic' and utils.isDynamic(slotID))
+        local is_unit_name_match = unit.unit_name and slot_info.unit_name and string.match(slot_info.unit_name, unit.unit_name)
+        local is_group_name_match = unit.group_name and slot_info.group_name and string.match(slot_info.group_name, unit.group_name)
+        if is_unit_type_match or is_unit_name_match or is_group_name_match then
+            table.insert(restrictions, unit)
+        end
+    end
+    slot_info.restricted = restricted
+    slot_info.restrictions = restrictions
+    return restrictions
+end
+
 function restrict_slots(playerID, side, slotID)
     local player = net.get_player_info(playerID, 'ucid')
-    local unit_name = Sim.getUnitProperty(slotID, Sim.UNIT_NAME)
-    local group_name = Sim.getUnitProperty(slotID, Sim.UNIT_GROUPNAME)
-    local unit_type = Sim.getUnitType(slotID)
     local points
     -- check levels if any
-    for id, unit in pairs(dcsbot.params.slotblocking.restricted) do
-        local is_unit_type_match = (unit.unit_type and unit.unit_type == unit_type) or (unit.unit_type == 'dynamic' and utils.isDynamic(slotID))
-        local is_unit_name_match = unit.unit_name and string.match(unit_name, unit.unit_name)
-        local is_group_name_match = unit.group_name and string.match(group_name, unit.group_name)
+    for _, unit in ipairs(get_restrictions(slotID)) do
         local is_side = (tonumber(unit.side) or side) == side
 
-        if is_side and (is_unit_type_match or is_unit_name_match or is_group_name_match) then
+        if is_side then
             -- blocking slots by points // check multicrew
             if tonumber(slotID) then
                 points = tonumber(unit.points)
@@ -0,0 +1 @@
+# SlotBlocking plugin tests
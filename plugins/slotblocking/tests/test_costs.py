@@ -0,0 +1,85 @@
+"""
+Tests for the slot cost table of the SlotBlocking plugin.
+
+The table has to return the same costs as the former implementation, which matched every slot change against the
+"restricted" rules of the configuration.
+"""
+
+import random
+import re
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core import utils
+from plugins.slotblocking.costs import CostTable
+
+UNIT_TYPES = ['F-14B', 'F-16C_50', 'FA-18C_hornet', 'AH-64D_BLK_II', 'Ka-50_3', 'artillery_commander']
+
+
+def legacy_costs(config: dict, data: dict) -> int:
+    """
+    SlotBlockingListener._get_costs before the cost table.
+    """
+    for unit in config.get('restricted', []):
+        for attribute in ['unit_type', 'unit_name', 'group_name']:
+            if attribute in unit and re.search(unit[attribute], utils.lua_pattern_to_python_regex(data[attribute])):
+                return unit.get('costs', 0)
+    return 0
+
+
+def random_config(rnd: random.Random, size: int) -> dict:
+    rules = []
+    for i in range(size):
+        rule = {'costs': rnd.randint(0, 100)}
+        attribute = rnd.choice(['unit_type', 'unit_name', 'group_name'])
+        if attribute == 'unit_type':
+            rule['unit_type'] = rnd.choice(UNIT_TYPES)
+        else:
+            rule[attribute] = rnd.choice(['^Tomcat', 'Apache', r'.*#\d+$', 'CAP', f'Group{i}'])
+        rules.append(rule)
+    return {'restricted': rules}
+
+
+def random_slot(rnd: random.Random) -> dict:
+    return {
+        'unit_type': rnd.choice(UNIT_TYPES),
+        'unit_name': rnd.choice(['Tomcat #1', 'Apache #2', 'Viper', 'Hornet #12']),
+        'group_name': rnd.choice(['CAP North', f'Group{rnd.randrange(50)}', 'SEAD'])
+    }
+
+
+def test_same_costs_as_before():
+    rnd = random.Random(1)
+    for size in [0, 1, 5, 50]:
+        config = random_config(rnd, size)
+        table = CostTable(config)
+        for _ in range(200):
+            slot = random_slot(rnd)
+            assert table.costs(slot['unit_type'], slot['unit_name'], slot['group_name']) == \
+                   legacy_costs(config, slot), (size, slot)
+
+
+def test_first_matching_rule_wins():
+    table = CostTable({'restricted': [
+        {'group_name': 'CAP', 'costs': 10},
+        {'unit_type': 'F-14B', 'costs': 20},
+        {'unit_type': 'F-14B'}
+    ]})
+    assert table.costs('F-14B', 'Tomcat', 'CAP North') == 10
+    assert table.costs('F-14B', 'Tomcat', 'SEAD') == 20
+    assert table.costs('F-16C_50', 'Viper', 'SEAD') == 0
+
+
+def test_costs_are_cached_per_slot():
+    config = {'restricted': [{'unit_type': 'F-14B', 'costs': 10}]}
+    table = CostTable(config)
+    assert table.costs('F-14B', 'Tomcat', 'CAP') == 10
+    # changes of the configuration need a new table
+    config['restricted'][0]['costs'] = 20
+    assert table.costs('F-14B', 'Tomcat', 'CAP') == 10
+    assert CostTable(config).costs('F-14B', 'Tomcat', 'CAP') == 20
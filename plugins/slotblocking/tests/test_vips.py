@@ -0,0 +1,204 @@
+"""
+Tests for the VIP role index of the SlotBlocking plugin.
+
+The index is driven with a fake guild and a fake server, which records the role uploads it receives.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.slotblocking.vips import VIPIndex, batches, MAX_BATCH_LENGTH
+
+VIP = 1001
+DONATOR = 1002
+EVERYONE = 1000
+
+
+class FakeRole:
+    def __init__(self, role_id: int, guild: "FakeGuild"):
+        self.id = role_id
+        self.guild = guild
+
+    @property
+    def members(self):
+        return [x for x in self.guild.members.values() if self in x.roles]
+
+
+class FakeMember:
+    def __init__(self, member_id: int, roles: list[FakeRole]):
+        self.id = member_id
+        self.roles = roles
+
+
+class FakeGuild:
+    def __init__(self):
+        self.roles = {x: FakeRole(x, self) for x in [EVERYONE, VIP, DONATOR]}
+        self.members: dict[int, FakeMember] = {}
+
+    def add_member(self, member_id: int, *role_ids: int) -> FakeMember:
+        member = self.members[member_id] = FakeMember(member_id, [self.roles[x] for x in (EVERYONE, ) + role_ids])
+        return member
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+    def get_member(self, member_id: int):
+        return self.members.get(member_id)
+
+
+class FakeDatabase:
+    def __init__(self, links: list[tuple[str, int]]):
+        self.links = links
+
+    def select(self, query: str, params: tuple | None) -> list[tuple]:
+        return self.links
+
+
+class FakeBot:
+    def __init__(self, apool):
+        self.guilds = [FakeGuild()]
+        self.apool = apool
+        self.log = logging.getLogger(__name__)
+
+
+class FakeServer:
+    def __init__(self, name: str = 'DCS.server'):
+        self.name = name
+        self.messages = []
+
+    async def send_to_dcs(self, message: dict):
+        self.messages.append(message)
+
+    @property
+    def uploads(self) -> dict[str, list[int]]:
+        return {x['ucid']: x['roles'] for message in self.messages for x in message['batch']}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ucid(i: int) -> str:
+    return f'{i:032d}'
+
+
+def create_index(fake_pool, members: int = 10, vips: int = 3) -> tuple[VIPIndex, FakeGuild]:
+    bot = FakeBot(fake_pool(FakeDatabase([(ucid(i), i) for i in range(members)])))
+    guild = bot.guilds[0]
+    for i in range(members):
+        if i < vips:
+            guild.add_member(i, VIP)
+        else:
+            guild.add_member(i)
+    return VIPIndex(bot), guild
+
+
+# =============================================================================
+# Batches
+# =============================================================================
+
+def test_batches_fit_into_a_datagram():
+    changes = [{'ucid': ucid(i), 'discord_id': 2 ** 60 + i, 'roles': [2 ** 60 + x for x in range(10)]}
+               for i in range(100)]
+    result = batches(changes)
+    assert len(result) > 1
+    assert [x for batch in result for x in batch] == changes
+    for batch in result:
+        # the way ServerImpl sends it, with all Discord IDs as strings
+        message = json.dumps({'command': 'uploadUserRoles', 'batch': [
+            {'ucid': x['ucid'], 'discord_id': str(x['discord_id']), 'roles': [str(r) for r in x['roles']]}
+            for x in batch
+        ]})
+        assert len(message) <= MAX_BATCH_LENGTH + 256
+
+
+# =============================================================================
+# VIPIndex
+# =============================================================================
+
+def test_first_upload_contains_all_vips(fake_pool):
+    async def scenario():
+        index, _ = create_index(fake_pool)
+        server = FakeServer()
+        assert await index.upload(server, [VIP]) == 3
+        assert server.uploads == {ucid(i): [EVERYONE, VIP] for i in range(3)}
+        # the links are read once
+        await index.upload(FakeServer('other'), [VIP])
+        assert index.bot.apool.statements == 1
+
+    run(scenario())
+
+
+def test_unchanged_vips_are_not_uploaded_again(fake_pool):
+    async def scenario():
+        index, _ = create_index(fake_pool)
+        server = FakeServer()
+        await index.upload(server, [VIP])
+        server.messages.clear()
+        assert await index.upload(server, [VIP]) == 0
+        assert not server.messages
+
+    run(scenario())
+
+
+def test_role_changes_are_uploaded(fake_pool):
+    async def scenario():
+        index, guild = create_index(fake_pool)
+        server = FakeServer()
+        await index.upload(server, [VIP])
+        server.messages.clear()
+        # member 5 becomes a VIP, member 0 loses the VIP role, member 1 is a donator now
+        assert index.update_member(guild.add_member(5, VIP))
+        assert index.update_member(guild.add_member(0))
+        assert index.update_member(guild.add_member(1, VIP, DONATOR))
+        # not a VIP, before or after
+        assert not index.update_member(guild.add_member(6, DONATOR))
+        await index.upload(server, [VIP])
+        assert server.uploads == {
+            ucid(5): [EVERYONE, VIP],
+            ucid(0): [EVERYONE],
+            ucid(1): [EVERYONE, VIP, DONATOR]
+        }
+
+    run(scenario())
+
+
+def test_unlinked_and_removed_members(fake_pool):
+    async def scenario():
+        index, guild = create_index(fake_pool)
+        server = FakeServer()
+        await index.upload(server, [VIP])
+        server.messages.clear()
+        index.unlink(ucid(0))
+        assert index.remove_member(guild.members.pop(1))
+        await index.upload(server, [VIP])
+        assert server.uploads == {ucid(0): [], ucid(1): []}
+        # a new link of a VIP
+        guild.add_member(20, VIP)
+        index.update_member(guild.members[20])
+        index.link(ucid(20), 20)
+        server.messages.clear()
+        await index.upload(server, [VIP])
+        assert server.uploads == {ucid(20): [EVERYONE, VIP]}
+
+    run(scenario())
+
+
+def test_reset_uploads_everything(fake_pool):
+    async def scenario():
+        index, _ = create_index(fake_pool)
+        server = FakeServer()
+        await index.upload(server, [VIP])
+        index.reset(server)
+        server.messages.clear()
+        assert await index.upload(server, [VIP]) == 3
+
+    run(scenario())
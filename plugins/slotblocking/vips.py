@@ -0,0 +1,204 @@
+import asyncio
+import discord
+import json
+import logging
+
+from core.const import MAX_DCS_DATAGRAM
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from core import Server
+    from services.bot import DCSServerBot
+
+__all__ = [
+    "VIPIndex",
+    "batches"
+]
+
+# leave room for the command around the batch, to send every batch in a single datagram
+MAX_BATCH_LENGTH = MAX_DCS_DATAGRAM - 256
+
+# ucid => (discord_id, role ids)
+Upload = dict[str, tuple[int, tuple[int, ...]]]
+
+
+def _length(change: dict) -> int:
+    # Discord IDs are sent as strings, which adds two quotes per ID
+    return len(json.dumps(change)) + 2 * (len(change['roles']) + 1) + 2
+
+
+def batches(changes: Iterable[dict], max_length: int = MAX_BATCH_LENGTH) -> list[list[dict]]:
+    """
+    Splits the role uploads into batches that fit into a single datagram.
+    """
+    result = []
+    batch = []
+    length = 0
+    for change in changes:
+        change_length = _length(change)
+        if batch and length + change_length > max_length:
+            result.append(batch)
+            batch = []
+            length = 0
+        batch.append(change)
+        length += change_length
+    if batch:
+        result.append(batch)
+    return result
+
+
+class VIPIndex:
+    """
+    Linked members of the VIP roles.
+
+    The index maps each VIP role to the Discord members that have it, and each member to their linked UCIDs. It is
+    built once and afterward kept up to date by the Discord member events and the link events of the bot. For every
+    server, the index remembers what has been uploaded to DCS already, so that a mission load only needs to upload
+    what has changed since.
+    """
+
+    def __init__(self, bot: "DCSServerBot", log: logging.Logger | None = None):
+        self.bot = bot
+        self.log = log or logging.getLogger(__name__)
+        # role_id => discord ids
+        self.roles: dict[int, set[int]] = {}
+        # discord_id => ucids
+        self.links: dict[int, set[str]] = {}
+        # ucid => discord_id
+        self.ucids: dict[str, int] = {}
+        # server name => uploaded roles
+        self.uploaded: dict[str, Upload] = {}
+        self._loaded = False
+        self.lock = asyncio.Lock()
+
+    @property
+    def guild(self) -> discord.Guild | None:
+        return self.bot.guilds[0] if self.bot.guilds else None
+
+    async def _load_links(self) -> None:
+        if self._loaded:
+            return
+        async with self.bot.apool.connection() as conn:
+            cursor = await conn.execute("""
+                SELECT ucid, discord_id FROM players
+                WHERE discord_id != -1 AND LENGTH(ucid) = 32 AND manual = TRUE
+            """)
+            async for ucid, discord_id in cursor:
+                self.link(ucid, discord_id)
+        self._loaded = True
+
+    def _watch(self, role_ids: Iterable[int]) -> None:
+        for role_id in role_ids:
+            if role_id in self.roles:
+                continue
+            role = self.guild.get_role(role_id) if self.guild else None
+            self.roles[role_id] = {member.id for member in role.members} if role else set()
+
+    def link(self, ucid: str, discord_id: int) -> None:
+        self.unlink(ucid)
+        self.ucids[ucid] = discord_id
+        self.links.setdefault(discord_id, set()).add(ucid)
+
+    def unlink(self, ucid: str) -> None:
+        discord_id = self.ucids.pop(ucid, None)
+        if discord_id is None:
+            return
+        ucids = self.links.get(discord_id, set())
+        ucids.discard(ucid)
+        if not ucids:
+            self.links.pop(discord_id, None)
+
+    def update_member(self, member: discord.Member) -> bool:
+        """
+        Updates the roles of a member. Returns True, if the member is or was a VIP, which means that their roles have
+        to be uploaded again.
+        """
+        changed = False
+        member_roles = {x.id for x in member.roles}
+        for role_id, members in self.roles.items():
+            if role_id in member_roles and member.id not in members:
+                members.add(member.id)
+                changed = True
+            elif role_id not in member_roles and member.id in members:
+                members.discard(member.id)
+                changed = True
+        return changed or any(member.id in members for members in self.roles.values())
+
+    def remove_member(self, member: discord.Member) -> bool:
+        changed = False
+        for members in self.roles.values():
+            if member.id in members:
+                members.discard(member.id)
+                changed = True
+        return changed
+
+    def reset(self, server: "Server") -> None:
+        """
+        Forgets what has been uploaded to this server, the next upload will contain all VIPs.
+        """
+        self.uploaded.pop(server.name, None)
+
+    def _collect(self, role_ids: list[int]) -> Upload:
+        result: Upload = {}
+        members: set[int] = set().union(*(self.roles.get(role_id, set()) for role_id in role_ids))
+        for discord_id in members:
+            ucids = self.links.get(discord_id)
+            if not ucids:
+                continue
+            member = self.guild.get_member(discord_id)
+            if not member:
+                continue
+            roles = tuple(x.id for x in member.roles)
+            for ucid in ucids:
+                result[ucid] = (discord_id, roles)
+        return result
+
+    def _roles_of(self, ucid: str) -> tuple[int | None, tuple[int, ...]]:
+        discord_id = self.ucids.get(ucid)
+        member = self.guild.get_member(discord_id) if discord_id is not None else None
+        if not member:
+            return None, ()
+        return discord_id, tuple(x.id for x in member.roles)
+
+    def changes(self, server: "Server", role_ids: list[int]) -> list[dict]:
+        """
+        The role uploads that are needed to bring the server up to date with the index.
+        """
+        self._watch(role_ids)
+        uploaded = self.uploaded.get(server.name, {})
+        current = self._collect(role_ids)
+        changes = [
+            {'ucid': ucid, 'discord_id': discord_id, 'roles': list(roles)}
+            for ucid, (discord_id, roles) in current.items()
+            if uploaded.get(ucid) != (discord_id, roles)
+        ]
+        # VIPs that lost their role or link get their actual roles (if any)
+        for ucid in uploaded.keys() - current.keys():
+            discord_id, roles = self._roles_of(ucid)
+            changes.append({'ucid': ucid, 'discord_id': discord_id, 'roles': list(roles)})
+        self.uploaded[server.name] = current
+        return changes
+
+    async def upload(self, server: "Server", role_ids: list[int]) -> int:
+        """
+        Uploads the changed VIPs to the server. Returns the number of uploaded users.
+        """
+        if not self.guild:
+            return 0
+        role_ids = [int(x) for x in role_ids]
+        async with self.lock:
+            await self._load_links()
+            changes = self.changes(server, role_ids)
+            try:
+                for batch in batches(changes):
+                    await server.send_to_dcs({
+                        'command': 'uploadUserRoles',
+                        'batch': batch
+                    })
+            except Exception:
+                # we do not know what DCS received, upload everything on the next attempt
+                self.reset(server)
+                raise
+        if changes:
+            self.log.debug(f"SlotBlocking: {len(changes)} VIP roles uploaded to server {server.name}.")
+        return len(changes)
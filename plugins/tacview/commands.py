@@ -5,7 +5,6 @@ from core import Plugin, get_translation, Group, Server, utils, Status
 from datetime import datetime, timezone
 from discord import app_commands
 from extensions.tacview import TACVIEW_DEFAULT_DIR
-from io import BytesIO
 from services.bot import DCSServerBot
 
 _ = get_translation(__name__.split('.')[1])
@@ -69,21 +68,22 @@ class Tacview(Plugin):
                       server.instance.locals.get('extensions', {}).get('Tacview', {}))
         path = ext_config.get('tacviewExportPath', TACVIEW_DEFAULT_DIR)
         config = self.get_config(server)
-        file_data = await self.node.read_file(os.path.join(path, file))
         try:
-            if config.get('upload', {}).get('channel'):
-                channel_id = config['upload']['channel']
-                if channel_id == -1:
-                    channel = await interaction.user.create_dm()
-                    await channel.send(file=discord.File(fp=BytesIO(file_data), filename=os.path.basename(file)))
-                    await interaction.followup.send(_("Tacview recording sent in a DM"), ephemeral=ephemeral)
+            # Tacview files can be large, so they are streamed from their node
+            async with utils.spool(server.node.stream_file(os.path.join(path, file))) as file_data:
+                if config.get('upload', {}).get('channel'):
+                    channel_id = config['upload']['channel']
+                    if channel_id == -1:
+                        channel = await interaction.user.create_dm()
+                        await channel.send(file=discord.File(fp=file_data, filename=os.path.basename(file)))
+                        await interaction.followup.send(_("Tacview recording sent in a DM"), ephemeral=ephemeral)
+                    else:
+                        channel = self.bot.get_channel(channel_id)
+                        await channel.send(file=discord.File(fp=file_data, filename=os.path.basename(file)))
+                        await interaction.followup.send(
+                            _("Tacview recording uploaded to channel {}").format(channel.mention), ephemeral=ephemeral)
                 else:
-                    channel = self.bot.get_channel(channel_id)
-                    await channel.send(file=discord.File(fp=BytesIO(file_data), filename=os.path.basename(file)))
-                    await interaction.followup.send(_("Tacview recording uploaded to channel {}").format(channel.mention),
-                                                    ephemeral=ephemeral)
-            else:
-                await interaction.followup.send(file=discord.File(fp=BytesIO(file_data), filename=os.path.basename(file)))
+                    await interaction.followup.send(file=discord.File(fp=file_data, filename=os.path.basename(file)))
         except discord.HTTPException as ex:
             if ex.code in [413, 40005]:
                 await interaction.followup.send(_("The file exceeds the maximum allowed size on Discord. Aborted."),
@@ -2,7 +2,6 @@ import asyncio
 import aiohttp
 import discord
 import os
-import pandas as pd
 import psycopg
 import random
 import re
@@ -35,6 +34,7 @@ from ..creditsystem.squadron import Squadron
 from ruamel.yaml import YAML
 yaml = YAML()
 
+pd = utils.lazy_import('pandas')
 _ = get_translation(__name__.split('.')[1])
 
 
@@ -2383,7 +2383,7 @@ class Tournament(Plugin[TournamentEventListener]):
         await self.bot.wait_until_ready()
 
     @staticmethod
-    async def import_tournament_data(buffer: BytesIO) -> pd.DataFrame:
+    async def import_tournament_data(buffer: BytesIO) -> 'pd.DataFrame':
         """
         Import tournament data from Excel buffer and convert squadron names back to IDs
 
@@ -2439,7 +2439,7 @@ class Tournament(Plugin[TournamentEventListener]):
 
         return matches_df
 
-    async def import_tournament_data_to_db(self, match_df: pd.DataFrame, tournament_id: int):
+    async def import_tournament_data_to_db(self, match_df: 'pd.DataFrame', tournament_id: int):
         """
         Update tournament matches in the database based on the provided DataFrame.
 
@@ -2,18 +2,20 @@ import logging
 
 import aiohttp
 import math
-import numpy as np
-import pandas as pd
 import random
 
-from core import report
+from core import report, utils
 from io import BytesIO
-from matplotlib import pyplot as plt, patches
 from openpyxl import Workbook
 from openpyxl.styles import Border, Side, Font
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 from trueskill import Rating
 
+np = utils.lazy_import('numpy')
+pd = utils.lazy_import('pandas')
+patches = utils.lazy_import('matplotlib.patches')
+plt = utils.lazy_import('matplotlib.pyplot')
+
 logger = logging.getLogger(__name__)
 
 
@@ -515,7 +517,7 @@ def calculate_point_multipliers(killer_rating: Rating, victim_rating: Rating) ->
     return killer_multiplier, victim_multiplier
 
 
-def create_tournament_sheet(squadrons_df: pd.DataFrame, matches_df: pd.DataFrame, tournament_id: int) -> bytes:
+def create_tournament_sheet(squadrons_df: 'pd.DataFrame', matches_df: 'pd.DataFrame', tournament_id: int) -> bytes:
     wb = Workbook()
     ws = wb.active
     ws.title = f"Tournament {tournament_id}"
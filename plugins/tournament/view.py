@@ -1,5 +1,4 @@
 import discord
-import numpy as np
 import re
 
 from core import get_translation, utils
@@ -13,6 +12,7 @@ from .const import TOURNAMENT_PHASE
 if TYPE_CHECKING:
     from .commands import Tournament
 
+np = utils.lazy_import('numpy')
 _ = get_translation(__name__.split('.')[1])
 
 WARNING_ICON = "https://github.com/Special-K-s-Flightsim-Bots/DCSServerBot/blob/master/images/warning.png?raw=true"
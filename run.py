@@ -1,5 +1,21 @@
 from __future__ import annotations
 
+import sys
+
+# Startup profile, has to be installed before anything else is imported
+startup_profile = None
+if '--profile-startup' in sys.argv:
+    import importlib.util
+    import os
+
+    spec = importlib.util.spec_from_file_location(
+        'core.utils.startup', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core', 'utils', 'startup.py'))
+    startup = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = startup
+    spec.loader.exec_module(startup)
+    startup_profile = startup.ImportProfiler()
+    startup_profile.install()
+
 # Default imports
 import asyncio
 import certifi
@@ -9,7 +25,6 @@ import logging
 import os
 import psutil
 import psycopg
-import sys
 import time
 import traceback
 
@@ -122,6 +137,7 @@ class Main:
         pfh.setFormatter(pff)
         pfh.doRollover()
         perf_logger.addHandler(pfh)
+        utils.listener_latency.configure(config.get('latency', {}))
 
         # Rotate async_errors.log
         async_log = os.path.join('logs', 'async_errors.log')
@@ -185,6 +201,12 @@ class Main:
         db_available = True
         async with ServiceRegistry(node=self.node) as registry:
             self.log.info("DCSServerBot {} started.".format("MASTER" if self.node.master else "AGENT"))
+            if startup_profile:
+                filename = os.path.join('logs', f'startup-{self.node.name}.log')
+                with open(filename, mode='w', encoding='utf-8') as outfile:
+                    outfile.write(startup_profile.report())
+                startup_profile.uninstall()
+                self.log.info(f"Startup profile written to {filename}")
             try:
                 while not self.node.is_shutdown.is_set():
                     if self.node.claimed_master == self.node.master:
@@ -9,17 +9,25 @@ from core import Channel, utils, Status, PluginError, Group, Node, DEFAULT_CHANN
 from core.data.node import FatalException
 from core.listener import EventListener
 from core.services.registry import ServiceRegistry
+from core.utils.metrics import MetricsRegistry
 from datetime import datetime, timezone
 from discord import Thread, PrivilegedIntentsRequired
 from discord.abc import PrivateChannel, GuildChannel
 from discord.ext import commands
 from typing import TYPE_CHECKING, Iterable, cast, Any
 
+from .messages import MessageQueue
+
 if TYPE_CHECKING:
     from core import Server, NodeImpl
 
 __all__ = ["DCSServerBot", "IgnoreUnknownInteraction"]
 
+DISCORD_REQUESTS = MetricsRegistry.histogram('dcssb_discord_request_seconds', 'Discord REST API latency',
+                                             ['method', 'route'])
+DISCORD_ERRORS = MetricsRegistry.counter('dcssb_discord_request_errors', 'Failed Discord REST API calls',
+                                         ['method', 'route', 'status'])
+
 
 class IgnoreUnknownInteraction(logging.Filter):
     """Drop the noisy 'Unknown interaction' (10062) errors that happen
@@ -55,6 +63,9 @@ class DCSServerBot(commands.Bot):
         self.tree.on_error = self.on_app_command_error
         self._locks: dict[tuple[str, str], asyncio.Lock] = {}
         self._roles = None
+        self.messages = MessageQueue(self)
+        # the HTTP session is created on login, so the rate limit headers of all messages can be read from here on
+        self.http.http_trace = self.messages.trace_config()
 
     async def start(self, token: str, *, reconnect: bool = True) -> None:
         self.synced: bool = False
@@ -68,6 +79,7 @@ class DCSServerBot(commands.Bot):
             exit(-2)
 
     async def close(self):
+        await self.messages.close()
         try:
             await self.audit(message="Discord Bot stopped.")
         except Exception:
@@ -98,7 +110,22 @@ class DCSServerBot(commands.Bot):
     def servers(self) -> dict[str, "Server"]:
         return self.bus.servers
 
+    def _meter_http_requests(self) -> None:
+        request = self.http.request
+
+        async def metered_request(route: discord.http.Route, **kwargs) -> Any:
+            # the route path is the template (like /channels/{channel_id}/messages), which keeps the labels bounded
+            try:
+                with DISCORD_REQUESTS.time(method=route.method, route=route.path):
+                    return await request(route, **kwargs)
+            except discord.HTTPException as ex:
+                DISCORD_ERRORS.inc(method=route.method, route=route.path, status=ex.status)
+                raise
+
+        self.http.request = metered_request
+
     async def setup_hook(self) -> None:
+        self._meter_http_requests()
         self.log.info('- Loading Plugins ...')
         # we need to keep the order for our default plugins...
         for plugin in self.plugins:
@@ -6,6 +6,7 @@ from core import NodeImpl, ServiceRegistry, EventListener, Server, Plugin, Plugi
 from typing import Any
 
 from services.bot.dummy import DummyGuild, DummyMember, DummyRole
+from services.bot.messages import MessageQueue
 
 
 class DummyBot:
@@ -33,6 +34,7 @@ class DummyBot:
         self.owner_id = -1
         self.latency = 0
         self.member = DummyMember("1", name="DCSServerBot")
+        self.messages = MessageQueue(self)
 
     async def start(self):
         self.log.warning("This installation does not use a Discord bot!")
@@ -40,6 +42,7 @@ class DummyBot:
         asyncio.create_task(self.setup_hook())
 
     async def close(self):
+        await self.messages.close()
         for plugin in self.cogs.values():
             await plugin.cog_unload()
         self.closed = True
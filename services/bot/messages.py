@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import discord
+import re
+import time
+
+from aiohttp import ClientError, TraceConfig
+from collections import deque
+from core.utils.metrics import MetricsRegistry
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from services.bot import DCSServerBot
+
+__all__ = [
+    "MessageQueue",
+    "pack"
+]
+
+# Discord limits per message
+MAX_CONTENT = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_LENGTH = 6000
+
+# keep one request of the channel bucket for everything else that posts into the channel
+RESERVED_REQUESTS = 1
+# wait time after a connection problem
+ERROR_BACKOFF = 10.0
+
+QUEUE_DEPTH = MetricsRegistry.gauge('dcssb_message_queue_depth', 'Messages waiting to be sent to Discord',
+                                    ['channel'])
+SEND_LATENCY = MetricsRegistry.histogram('dcssb_message_send_seconds',
+                                         'Time between queueing a message and sending it to Discord', ['channel'])
+MESSAGES_SENT = MetricsRegistry.counter('dcssb_messages_sent', 'Discord messages sent by the message queue',
+                                        ['channel'])
+MESSAGES_DROPPED = MetricsRegistry.counter('dcssb_messages_dropped', 'Queued messages that were not sent',
+                                           ['channel', 'reason'])
+
+MESSAGES_ROUTE = re.compile(r'/channels/(\d+)/messages$')
+
+
+@dataclass
+class QueuedMessage:
+    content: str | None = None
+    embed: discord.Embed | None = None
+    queued: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class Packet:
+    content: str = ''
+    embeds: list[discord.Embed] = field(default_factory=list)
+    messages: list[QueuedMessage] = field(default_factory=list)
+
+
+def pack(messages: Iterable[QueuedMessage]) -> list[Packet]:
+    """
+    Packs queued messages into as few Discord messages as possible, keeping their order.
+    Texts are joined up to 2000 characters, embeds are attached up to 10 (6000 characters) per message. A text that
+    follows an embed starts a new message, as Discord always displays the text above the embeds. Repeated texts
+    are only sent once.
+    """
+    packets: list[Packet] = []
+    packet = Packet()
+    last_content = None
+
+    def new_packet() -> None:
+        nonlocal packet
+        if packet.content or packet.embeds:
+            packets.append(packet)
+            packet = Packet()
+
+    for message in messages:
+        if message.content and message.content != last_content:
+            last_content = message.content
+            if packet.embeds or len(packet.content) + len(message.content) > MAX_CONTENT:
+                new_packet()
+            content = message.content
+            while len(content) > MAX_CONTENT:
+                packet.content = content[:MAX_CONTENT]
+                content = content[MAX_CONTENT:]
+                new_packet()
+            packet.content += content
+        if message.embed:
+            last_content = None
+            length = sum(len(x) for x in packet.embeds) + len(message.embed)
+            if len(packet.embeds) == MAX_EMBEDS or length > MAX_EMBED_LENGTH:
+                new_packet()
+            packet.embeds.append(message.embed)
+        # a message belongs to the packet that sends its (last) part
+        packet.messages.append(message)
+    new_packet()
+    return packets
+
+
+class ChannelWorker:
+    """
+    Sends the queued messages of one channel. Every channel has its own worker, so a slow or missing channel does
+    not delay any other.
+    """
+
+    def __init__(self, queue: MessageQueue, channel_id: int):
+        self.queue = queue
+        self.channel_id = channel_id
+        self.label = str(channel_id)
+        self.messages: deque[QueuedMessage] = deque()
+        self.pending = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        # rate limit of the channel, as reported by Discord on the last message
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+
+    def put(self, message: QueuedMessage) -> None:
+        if len(self.messages) >= self.queue.maxsize:
+            self.messages.popleft()
+            MESSAGES_DROPPED.inc(channel=self.label, reason='overflow')
+        self.messages.append(message)
+        QUEUE_DEPTH.set(len(self.messages), channel=self.label)
+        self.pending.set()
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def update_ratelimit(self, remaining: str | None, reset_after: str | None) -> None:
+        if remaining is None or reset_after is None:
+            return
+        self.remaining = int(remaining)
+        self.reset_at = time.monotonic() + float(reset_after)
+
+    def backoff(self, seconds: float) -> None:
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, time.monotonic() + seconds)
+
+    def pause(self) -> float:
+        """
+        Seconds to wait before the next message can be sent without running into the rate limit.
+        """
+        if self.remaining is None or self.remaining > RESERVED_REQUESTS:
+            return 0.0
+        return max(self.reset_at - time.monotonic(), 0.0)
+
+    async def run(self) -> None:
+        while True:
+            await self.pending.wait()
+            # collect what arrives in the meantime, but never faster than the channel allows
+            await asyncio.sleep(max(self.queue.interval, self.pause()))
+            self.pending.clear()
+            try:
+                await self.send()
+            except Exception as ex:
+                self.queue.log.exception(ex)
+
+    async def get_channel(self) -> discord.abc.Messageable | None:
+        channel = self.queue.bot.get_channel(self.channel_id)
+        if not channel:
+            try:
+                channel = await self.queue.bot.fetch_channel(self.channel_id)
+            except (discord.DiscordException, ClientError):
+                pass
+        return channel
+
+    async def send(self) -> None:
+        if not self.messages:
+            return
+        channel = await self.get_channel()
+        if not channel:
+            self.queue.log.debug(f"MessageQueue: channel {self.channel_id} not found, "
+                                 f"{len(self.messages)} messages dropped.")
+            MESSAGES_DROPPED.inc(len(self.messages), channel=self.label, reason='channel')
+            self.messages.clear()
+            QUEUE_DEPTH.set(0, channel=self.label)
+            return
+        packets = pack(self.messages)
+        self.messages.clear()
+        while packets:
+            pause = self.pause()
+            if pause:
+                await asyncio.sleep(pause)
+            packet = packets[0]
+            try:
+                await channel.send(content=packet.content or None, embeds=packet.embeds)
+            except discord.RateLimited as ex:
+                self.backoff(ex.retry_after)
+                break
+            except discord.HTTPException as ex:
+                if ex.status == 429:
+                    self.backoff(ERROR_BACKOFF)
+                    break
+                self.queue.log.warning(f"MessageQueue: message to channel {self.channel_id} discarded: {ex}")
+                MESSAGES_DROPPED.inc(len(packet.messages), channel=self.label, reason='error')
+            except (ClientError, asyncio.TimeoutError):
+                self.backoff(ERROR_BACKOFF)
+                break
+            else:
+                now = time.monotonic()
+                for message in packet.messages:
+                    SEND_LATENCY.observe(now - message.queued, channel=self.label)
+                MESSAGES_SENT.inc(channel=self.label)
+            packets.pop(0)
+        if packets:
+            # send them again after the backoff, before anything that was queued later
+            self.messages.extendleft(reversed([x for packet in packets for x in packet.messages]))
+            self.pending.set()
+        QUEUE_DEPTH.set(len(self.messages), channel=self.label)
+
+    async def close(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.send()
+
+
+class MessageQueue:
+    """
+    Outbound queue for high-volume messages, like events and chat logs.
+
+    Messages are collected per channel for "interval" seconds and then sent packed into as few Discord messages as
+    possible. The interval grows, when the rate limit headers of the last message show that the channel is about
+    to be rate limited.
+    """
+
+    def __init__(self, bot: DCSServerBot, *, interval: float = 2.0, maxsize: int = 1000):
+        self.bot = bot
+        self.log = bot.log
+        self.interval = interval
+        self.maxsize = maxsize
+        self.workers: dict[int, ChannelWorker] = {}
+
+    def put(self, channel_id: int, content: str | None = None, *, embed: discord.Embed | None = None) -> None:
+        if channel_id == -1 or (not content and not embed):
+            return
+        worker = self.workers.get(channel_id)
+        if not worker:
+            worker = self.workers[channel_id] = ChannelWorker(self, channel_id)
+        worker.put(QueuedMessage(content=content, embed=embed))
+
+    def trace_config(self) -> TraceConfig:
+        """
+        Reads the rate limit headers of all messages sent to a queued channel, including the ones that were not sent
+        through the queue.
+        """
+        async def on_request_end(_session, _context, params) -> None:
+            if params.method != 'POST':
+                return
+            match = MESSAGES_ROUTE.search(params.url.path)
+            worker = self.workers.get(int(match.group(1))) if match else None
+            if worker:
+                worker.update_ratelimit(params.response.headers.get('X-RateLimit-Remaining'),
+                                        params.response.headers.get('X-RateLimit-Reset-After'))
+
+        trace_config = TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    async def close(self) -> None:
+        await asyncio.gather(*[worker.close() for worker in self.workers.values()], return_exceptions=True)
+        self.workers.clear()
@@ -11,7 +11,6 @@ from core.services.base import Service
 from core.services.registry import ServiceRegistry
 from discord.ext import commands
 from discord.utils import MISSING
-from io import BytesIO
 from matplotlib import font_manager
 from pathlib import Path
 from ssl import SSLCertVerificationError
@@ -215,18 +214,14 @@ class BotService(Service):
             admin_channel = self.bot.get_admin_channel(server)
             audit_channel = self.bot.get_channel(self.bot.locals.get('channels', {}).get('audit', -1))
             channel = admin_channel or audit_channel
-            attachment: discord.File | None = None
             if channel:
                 if server and filename:
-                    file = await server.node.read_file(filename)
-                    zip_buffer = BytesIO()
-                    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-                        zip_file.writestr(filename, file)
-                    file = zip_buffer.getvalue()
-                    filename += '.zip'
-                    attachment = discord.File(fp=BytesIO(file), filename=os.path.basename(filename))
-
-                await channel.send(content=mentions, embed=embed, file=attachment)
+                    # the file is streamed from its node, it can be larger than what we want to hold in memory
+                    async with utils.spool(server.node.stream_file(filename), zip_name=filename) as file:
+                        attachment = discord.File(fp=file, filename=os.path.basename(filename) + '.zip')
+                        await channel.send(content=mentions, embed=embed, file=attachment)
+                else:
+                    await channel.send(content=mentions, embed=embed)
             else:
                 self.log.critical(f"{title}: {message}")
         except Exception:
@@ -263,15 +258,15 @@ class BotService(Service):
             else:
                 return
         _embed = discord.Embed.from_dict(embed) if embed else MISSING
-        if filename:
-            data = await server.node.read_file(filename)
-            file = discord.File(BytesIO(data), filename=os.path.basename(filename))
-        else:
-            file = MISSING
         if mention:
             _mention = "".join([self.bot.get_role(role).mention for role in mention])
             content = _mention + (content or "")
-        await _channel.send(content=content, file=file, embed=_embed)
+        if filename:
+            async with utils.spool(server.node.stream_file(filename)) as data:
+                file = discord.File(data, filename=os.path.basename(filename))
+                await _channel.send(content=content, file=file, embed=_embed)
+        else:
+            await _channel.send(content=content, embed=_embed)
 
     async def audit(self, message, user: discord.Member | str | None = None,
                     server: Server | None = None, node: Node | None = None, **kwargs):
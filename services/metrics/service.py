@@ -0,0 +1,110 @@
+import asyncio
+import psutil
+
+from aiohttp import web
+from core import Service, ServiceRegistry, DEFAULT_TAG, Port, PortType, utils
+from services.servicebus import ServiceBus
+from typing import cast
+from typing_extensions import override
+
+__all__ = [
+    "MetricsService"
+]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@ServiceRegistry.register(depends_on=[ServiceBus])
+class MetricsService(Service):
+    """
+    Serves the MetricsRegistry of this node in the Prometheus text format.
+    """
+
+    def __init__(self, node):
+        super().__init__(node, name="Metrics")
+        self.runner: web.AppRunner | None = None
+        self.pool_size = utils.MetricsRegistry.gauge('dcssb_db_pool_size', 'Connections in the pool', ['pool'])
+        self.pool_available = utils.MetricsRegistry.gauge('dcssb_db_pool_available', 'Idle connections in the pool',
+                                                          ['pool'])
+        self.pool_waiting = utils.MetricsRegistry.gauge('dcssb_db_pool_waiting', 'Requests waiting for a connection',
+                                                        ['pool'])
+        self.queue_size = utils.MetricsRegistry.gauge('dcssb_bus_queue_size', 'Unprocessed messages from DCS',
+                                                      ['server'])
+        self.asyncio_tasks = utils.MetricsRegistry.gauge('dcssb_asyncio_tasks', 'Running asyncio tasks')
+        self.memory = utils.MetricsRegistry.gauge('dcssb_process_resident_memory_bytes', 'Resident memory of the node')
+        self.process = psutil.Process()
+        self.cache_size = utils.MetricsRegistry.gauge('dcssb_cache_size', 'Entries in the cache', ['cache'])
+        self.cache_hits = utils.MetricsRegistry.counter('dcssb_cache_hits', 'Cache hits', ['cache'])
+        self.cache_misses = utils.MetricsRegistry.counter('dcssb_cache_misses', 'Cache misses', ['cache'])
+        self.cache_coalesced = utils.MetricsRegistry.counter('dcssb_cache_coalesced',
+                                                             'Calls that waited for a concurrent miss', ['cache'])
+        self.cache_evictions = utils.MetricsRegistry.counter('dcssb_cache_evictions', 'Evicted cache entries',
+                                                             ['cache'])
+
+    @override
+    def get_config(self, *args, **kwargs) -> dict:
+        # the endpoint can be configured per node
+        return self.locals.get(DEFAULT_TAG, {}) | self.locals.get(self.node.name, {})
+
+    @override
+    def get_ports(self) -> dict[str, Port]:
+        config = self.get_config()
+        if not config:
+            return {}
+        return {
+            "Metrics": Port(config.get('port', 9877), PortType.TCP,
+                            public=config.get('listen', '127.0.0.1') != '127.0.0.1')
+        }
+
+    @override
+    async def start(self):
+        config = self.get_config()
+        if not config:
+            return
+        await super().start()
+        utils.MetricsRegistry.set_const_labels(node=self.node.name)
+        utils.MetricsRegistry.add_collector(self.collect)
+        app = web.Application()
+        app.router.add_get(config.get('path', '/metrics'), self.scrape)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, config.get('listen', '127.0.0.1'), config.get('port', 9877))
+        try:
+            await site.start()
+        except OSError as ex:
+            self.log.error(f"{self.name}: Could not bind to port {config.get('port', 9877)}: {ex}")
+
+    @override
+    async def stop(self):
+        utils.MetricsRegistry.remove_collector(self.collect)
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+        await super().stop()
+
+    def collect(self) -> None:
+        pools = {self.node.pool, self.node.apool, self.node.cpool}
+        for pool in [x for x in pools if x and not x.closed]:
+            stats = pool.get_stats()
+            self.pool_size.set(stats.get('pool_size', 0), pool=pool.name)
+            self.pool_available.set(stats.get('pool_available', 0), pool=pool.name)
+            self.pool_waiting.set(stats.get('requests_waiting', 0), pool=pool.name)
+
+        bus = cast(ServiceBus, ServiceRegistry.get(ServiceBus))
+        if bus and bus.udp_server:
+            self.queue_size.clear()
+            for server_name, queue in list(bus.udp_server.message_queue.items()):
+                self.queue_size.set(queue.qsize(), server=server_name)
+        self.asyncio_tasks.set(len(asyncio.all_tasks()))
+        self.memory.set(self.process.memory_info().rss)
+
+        for cache in utils.CacheRegistry.caches():
+            self.cache_size.set(len(cache), cache=cache.name)
+            self.cache_hits.set(cache.stats.hits, cache=cache.name)
+            self.cache_misses.set(cache.stats.misses, cache=cache.name)
+            self.cache_coalesced.set(cache.stats.coalesced, cache=cache.name)
+            self.cache_evictions.set(cache.stats.evictions, cache=cache.name)
+
+    async def scrape(self, request: web.Request) -> web.Response:
+        body = utils.MetricsRegistry.render()
+        return web.Response(body=body.encode('utf-8'), headers={"Content-Type": CONTENT_TYPE})
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from collections import deque
+from core.utils.metrics import MetricsRegistry
+from enum import Enum
+from typing import TYPE_CHECKING, Container, Iterable
+
+if TYPE_CHECKING:
+    from core import EventListener
+
+__all__ = [
+    "EventQueue",
+    "Priority",
+    "DEFAULT_PRIORITIES",
+    "coalesced_events"
+]
+
+# events that are queued at most per server, more important events are always queued
+DEFAULT_MAXSIZE = 10000
+
+BUS_DROPPED = MetricsRegistry.counter('dcssb_bus_dropped', 'Messages from DCS that were dropped, as the queue was full',
+                                      ['server', 'event'])
+BUS_COALESCED = MetricsRegistry.counter('dcssb_bus_coalesced',
+                                        'Messages from DCS that were replaced by a newer one of the same kind',
+                                        ['server', 'event'])
+
+
+class Priority(Enum):
+    CRITICAL = 'critical'   # never dropped
+    NORMAL = 'normal'       # dropped if the queue is full
+    LOW = 'low'             # dropped if the queue is half full
+    PERIODIC = 'periodic'   # like LOW, and only the latest one is kept
+
+
+DEFAULT_PRIORITIES: dict[str, Priority] = {
+    # registration and state changes of the server
+    'registerDCSServer': Priority.CRITICAL,
+    'registerMissionHook': Priority.CRITICAL,
+    'onMissionLoadBegin': Priority.CRITICAL,
+    'onMissionLoadEnd': Priority.CRITICAL,
+    'onMissionRestart': Priority.CRITICAL,
+    'onSimulationStart': Priority.CRITICAL,
+    'onSimulationStop': Priority.CRITICAL,
+    'onSimulationPause': Priority.CRITICAL,
+    'onSimulationResume': Priority.CRITICAL,
+    # players joining and leaving
+    'onPlayerConnect': Priority.CRITICAL,
+    'onPlayerStart': Priority.CRITICAL,
+    'onPlayerStop': Priority.CRITICAL,
+    'onPlayerChangeSlot': Priority.CRITICAL,
+    'onPlayerChangeCoalition': Priority.CRITICAL,
+    'onBanReject': Priority.CRITICAL,
+    'onBanEvade': Priority.CRITICAL,
+    # chat
+    'onChatMessage': Priority.CRITICAL,
+    'onChatCommand': Priority.CRITICAL
+}
+
+
+def coalesced_events(listeners: Iterable[EventListener]) -> set[str]:
+    """
+    The events where only the latest one needs to be processed, as every listener of them declared it with
+    @event(coalesce=True).
+    """
+    coalesced = set()
+    handled = set()
+    for listener in listeners:
+        coalesced |= listener.__coalesced__
+        handled |= set(listener.__events__) - listener.__coalesced__
+    return coalesced - handled
+
+
+class EventQueue:
+    """
+    The queue of the events of one DCS server, that are waiting to be processed by the event listeners.
+
+    The queue is bounded: if the listeners can not keep up (for instance, if they wait for a slow database), less
+    important events are dropped instead of growing the queue without limit. Which events are dropped first depends
+    on their priority. Events are always processed in the order they were received.
+    """
+
+    def __init__(self, server_name: str, config: dict | None = None, *, coalesced: Container[str] = frozenset(),
+                 log: logging.Logger | None = None):
+        config = config or {}
+        self.server_name = server_name
+        self.maxsize: int = config.get('max_size', DEFAULT_MAXSIZE)
+        self.priorities = DEFAULT_PRIORITIES | {
+            event: Priority(priority) for event, priority in config.get('priorities', {}).items()
+        }
+        # events where a newer one replaces the one that is waiting (see coalesced_events)
+        self.coalesced = coalesced
+        self.log = log or logging.getLogger(__name__)
+        # every event sits in a list of its own, so a newer event can replace it in place
+        self._events: deque[list[dict]] = deque()
+        self._latest: dict[str, list[dict]] = {}
+        self._not_empty = asyncio.Event()
+        self._dropping = False
+
+    def priority(self, data: dict) -> Priority:
+        command = data.get('command')
+        if not command:
+            # internal messages
+            return Priority.CRITICAL
+        priority = self.priorities.get(command)
+        if priority:
+            return priority
+        # replies to requests of the bot
+        elif str(data.get('channel', '')).startswith('sync-'):
+            return Priority.CRITICAL
+        return Priority.NORMAL
+
+    def qsize(self) -> int:
+        return len(self._events)
+
+    def empty(self) -> bool:
+        return not self._events
+
+    def put_nowait(self, data: dict) -> bool:
+        """
+        Queues an event. Returns False, if it was dropped.
+        """
+        priority = self.priority(data)
+        command = data.get('command')
+        coalesce = priority == Priority.PERIODIC or command in self.coalesced
+        if coalesce:
+            entry = self._latest.get(command)
+            if entry:
+                entry[0] = data
+                BUS_COALESCED.inc(server=self.server_name, event=command)
+                return True
+        size = len(self._events)
+        if ((priority == Priority.NORMAL and size >= self.maxsize) or
+                (priority in [Priority.LOW, Priority.PERIODIC] and size >= self.maxsize // 2)):
+            BUS_DROPPED.inc(server=self.server_name, event=command)
+            if not self._dropping:
+                self._dropping = True
+                self.log.warning(f"Server {self.server_name}: {size} events are waiting to be processed, "
+                                 f"dropping the less important ones.")
+            return False
+        entry = [data]
+        self._events.append(entry)
+        if coalesce:
+            self._latest[command] = entry
+        self._not_empty.set()
+        return True
+
+    def get_nowait(self) -> dict:
+        if not self._events:
+            raise asyncio.QueueEmpty()
+        entry = self._events.popleft()
+        data = entry[0]
+        command = data.get('command')
+        if self._latest.get(command) is entry:
+            del self._latest[command]
+        if not self._events:
+            self._not_empty.clear()
+            if self._dropping:
+                self._dropping = False
+                self.log.info(f"Server {self.server_name}: all events processed, no events are dropped anymore.")
+        return data
+
+    async def get(self) -> dict:
+        while not self._events:
+            await self._not_empty.wait()
+        return self.get_nowait()
@@ -9,7 +9,7 @@ import uuid
 
 from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from core import Server, Mission, Node, Status, utils, Instance, FatalException, Port, PortType
+from core import Server, Mission, Node, Status, utils, Instance, FatalException, Port, PortType, COMMAND_LINE_ARGS
 from core.autoexec import Autoexec
 from core.data.dataobject import DataObjectFactory
 from core.data.impl.instanceimpl import InstanceImpl
@@ -19,8 +19,9 @@ from core.process import ProcessManager
 from core.pubsub import PubSub
 from core.services.base import Service
 from core.services.registry import ServiceRegistry
-from core.utils import ThreadSafeDict
+from core.utils import ConcurrentDict
 from core.utils.helper import default_serializer
+from core.utils.metrics import MetricsRegistry
 from core.utils.performance import PerformanceLog
 from datetime import datetime, timedelta, timezone
 from enum import Enum
@@ -29,6 +30,8 @@ from psycopg.rows import dict_row
 from psycopg.types.json import Json
 from typing import cast, Any, TYPE_CHECKING, Callable
 
+from .queue import EventQueue, coalesced_events
+
 __all__ = [
     "ServiceBus"
 ]
@@ -40,6 +43,10 @@ if TYPE_CHECKING:
 # these synchronous commands will be passed through to the event handler in any case
 PASS_THROUGH_COMMANDS = ['registerDCSServer', 'getMissionUpdate']
 
+BUS_MESSAGES = MetricsRegistry.counter('dcssb_bus_messages', 'Messages received from DCS', ['server', 'event'])
+BUS_DISPATCH = MetricsRegistry.histogram('dcssb_bus_dispatch_seconds',
+                                         'Time until all listeners have processed a DCS event', ['event'])
+
 
 @ServiceRegistry.register()
 class ServiceBus(Service):
@@ -50,7 +57,9 @@ class ServiceBus(Service):
         self.version = self.node.bot_version
         self.listeners: dict[str, asyncio.Future] = {}
         self.eventListeners: set[EventListener] = set()
-        self.servers: dict[str, Server] = ThreadSafeDict()
+        # shared by all event queues
+        self.coalesced_events: set[str] = set()
+        self.servers: dict[str, Server] = ConcurrentDict()
         self.init_servers()
         self.udp_server = None
         self.executor = None
@@ -168,6 +177,9 @@ class ServiceBus(Service):
         if self.udp_server:
             self.log.debug("- Processing unprocessed messages ...")
             self.udp_server.transport.close()
+            if self.udp_server.capture:
+                self.udp_server.capture.close()
+                self.log.info(f"- {self.udp_server.capture.count} datagrams captured.")
             self.log.debug("- All messages processed.")
         await self.broadcasts_channel.close()
         self.log.debug('- Listener stopped.')
@@ -202,11 +214,19 @@ class ServiceBus(Service):
     def register_eventListener(self, listener: EventListener):
         self.log.debug(f'  - Registering EventListener {type(listener).__name__}')
         self.eventListeners.add(listener)
+        self._update_coalesced_events()
 
     def unregister_eventListener(self, listener: EventListener):
         self.eventListeners.discard(listener)
+        self._update_coalesced_events()
         self.log.debug(f'  - EventListener {type(listener).__name__} unregistered.')
 
+    def _update_coalesced_events(self):
+        # update the set in place, as the event queues hold a reference to it
+        coalesced = coalesced_events(self.eventListeners)
+        self.coalesced_events.intersection_update(coalesced)
+        self.coalesced_events.update(coalesced)
+
     def init_servers(self):
         for instance in self.node.instances.values():
             try:
@@ -474,9 +494,13 @@ class ServiceBus(Service):
             self.servers.pop(server.name, None)
         if server.name in self.udp_server.message_queue:
             self.udp_server.message_queue[server.name].put_nowait({})
-            self.udp_server.message_queue[new_name] = asyncio.Queue()
+            self.udp_server.message_queue[new_name] = self.create_queue(server, new_name)
             asyncio.create_task(self.udp_server.process_messages(new_name))
 
+    def create_queue(self, server: Server, server_name: str | None = None) -> EventQueue:
+        return EventQueue(server_name or server.name, server.locals.get('event_queue'),
+                          coalesced=self.coalesced_events, log=self.log)
+
     async def ban(self, ucid: str, banned_by: str, reason: str = 'n/a', days: int | None = None):
         if days:
             until = datetime.now(tz=timezone.utc) + timedelta(days=days)
@@ -522,6 +546,25 @@ class ServiceBus(Service):
             }
         }))
 
+    async def unban_local(self, ucids: list[str]):
+        """
+        Removes the bans of these players from the DCS servers of this node.
+        """
+        for server in [x for x in self.servers.values() if not x.is_remote]:
+            if server.status not in [Status.PAUSED, Status.RUNNING, Status.STOPPED]:
+                continue
+            try:
+                await server.send_to_dcs({
+                    "command": "unban",
+                    "ucids": ucids
+                })
+            except Exception:
+                self.log.error(f"Could not unban {len(ucids)} players on server {server.name}.", exc_info=True)
+            for ucid in ucids:
+                player = server.get_player(ucid=ucid)
+                if player:
+                    player.banned = False
+
     async def bans(self, *, expired: bool = False) -> list[dict]:
         if expired:
             where = ""
@@ -586,7 +629,7 @@ class ServiceBus(Service):
                 server.locals['channels'] = channels
             # add eventlistener queue
             if server.name not in self.udp_server.message_queue:
-                self.udp_server.message_queue[server.name] = asyncio.Queue()
+                self.udp_server.message_queue[server.name] = self.create_queue(server)
                 asyncio.create_task(self.udp_server.process_messages(server.name))
             self.log.info(f"  => Remote DCS-Server \"{server.name}\" registered.")
         except StopIteration:
@@ -946,9 +989,13 @@ class ServiceBus(Service):
 
             def __init__(derived,):
                 derived.transport = None
-                derived.message_queue: dict[str, asyncio.Queue] = {}
+                derived.message_queue: dict[str, EventQueue] = {}
                 derived._frag_buf = FragmentBuffer()
                 derived._cleanup_task = asyncio.create_task(derived._cleanup_loop())
+                derived.capture = None
+                if getattr(COMMAND_LINE_ARGS, 'capture', None):
+                    derived.capture = utils.CaptureWriter(COMMAND_LINE_ARGS.capture)
+                    self.log.warning(f"Capturing all datagrams from DCS into {COMMAND_LINE_ARGS.capture} ...")
 
             def connection_made(derived, transport):
                 derived.transport = transport
@@ -969,6 +1016,9 @@ class ServiceBus(Service):
                     self.log.warning(f"Empty request received from {addr} - ignoring.")
                     return
 
+                if derived.capture:
+                    derived.capture.write(time.time(), data)
+
                 if data[0:1] == b'\x01':
                     data = data[1:]
 
@@ -1016,6 +1066,14 @@ class ServiceBus(Service):
                     self.log.warning(f"Invalid JSON {payload}")
                     return
 
+                # events that DCS sent in one batch (see EVENT_BATCHING), in the order they happened
+                if msg_data.get('command') == 'batch':
+                    for event in msg_data.get('events', []):
+                        derived._handle_message(event)
+                else:
+                    derived._handle_message(msg_data)
+
+            def _handle_message(derived, msg_data: dict):
                 server_name = msg_data.get('server_name')
                 if not server_name:
                     self.log.warning("Message without server_name received: %s", msg_data)
@@ -1043,7 +1101,7 @@ class ServiceBus(Service):
 
                 # Create a queue if it doesn't exist and schedule processing
                 if server_name not in derived.message_queue:
-                    derived.message_queue[server_name] = asyncio.Queue()
+                    derived.message_queue[server_name] = self.create_queue(server)
                     asyncio.create_task(derived.process_messages(server_name))
 
                 derived.message_queue[server_name].put_nowait(msg_data)
@@ -1057,8 +1115,10 @@ class ServiceBus(Service):
                         if not server:
                             return
 
+                        start = time.perf_counter()
                         try:
                             command = data['command']
+                            BUS_MESSAGES.inc(server=server_name, event=command)
                             if command == 'registerDCSServer':
                                 if not server.is_remote:
                                     if not await self.register_server(data):
@@ -1113,13 +1173,12 @@ class ServiceBus(Service):
 
                                     except Exception as e:
                                         self.log.error(f"Catastrophic error in wait: {e!r}")
+                                    BUS_DISPATCH.observe(time.perf_counter() - start, event=command)
                             else:
                                 await self.send_to_node(data)
 
                         except Exception as ex:
                             self.log.exception(ex)
-                        finally:
-                            derived.message_queue[server_name].task_done()
 
                 finally:
                     self.log.debug(f"Listener for server {server_name} stopped.")
@@ -19,3 +19,14 @@ CREATE TABLE IF NOT EXISTS files (
     data BYTEA NOT NULL,
     created TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
 );
+ALTER TABLE files ADD COLUMN IF NOT EXISTS chunk_size INTEGER NULL;
+ALTER TABLE files ADD COLUMN IF NOT EXISTS chunks INTEGER NULL;
+ALTER TABLE files ADD COLUMN IF NOT EXISTS size BIGINT NULL;
+ALTER TABLE files ADD COLUMN IF NOT EXISTS error TEXT NULL;
+CREATE TABLE IF NOT EXISTS file_chunks (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (file_id, seq)
+);
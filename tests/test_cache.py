@@ -0,0 +1,303 @@
+"""
+Tests for the bounded caches (core/utils/cache.py).
+"""
+
+import asyncio
+import sys
+import threading
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.utils import cache as cache_module
+from core.utils.cache import Cache, CacheRegistry, cached
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    return clock
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+def test_lru_eviction():
+    cache = Cache('test_lru_eviction', maxsize=3)
+    for i in range(3):
+        cache.set(i, str(i))
+    # 0 is used, so 1 is the least recently used entry now
+    assert cache.get(0) == '0'
+    cache.set(3, '3')
+    assert len(cache) == 3
+    assert 1 not in cache
+    assert [cache.get(x) for x in (0, 2, 3)] == ['0', '2', '3']
+    assert cache.stats.evictions == 1
+    # replacing an entry does not evict anything
+    cache.set(3, 'three')
+    assert cache.get(3) == 'three'
+    assert cache.stats.evictions == 1
+
+
+def test_unbounded():
+    cache = Cache('test_unbounded', maxsize=None)
+    for i in range(5000):
+        cache.set(i, i)
+    assert len(cache) == 5000
+    assert cache.stats.evictions == 0
+
+
+def test_ttl(clock):
+    cache = Cache('test_ttl', ttl=10)
+    cache.set('key', 'value')
+    clock.now += 9.9
+    assert cache.get('key') == 'value'
+    clock.now += 0.1
+    assert cache.get('key') is None
+    assert len(cache) == 0
+    assert cache.stats.expirations == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_invalidate():
+    cache = Cache('test_invalidate')
+    cache.set(('Server 1', 'a'), 1)
+    cache.set(('Server 1', 'b'), 2)
+    cache.set(('Server 2', 'a'), 3)
+    assert cache.invalidate(('Server 1', 'a'))
+    assert not cache.invalidate(('Server 1', 'a'))
+    assert ('Server 1', 'a') not in cache
+    assert cache.invalidate_if(lambda key: key[0] == 'Server 1') == 1
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats.invalidations == 3
+
+
+def test_set_after_invalidation():
+    cache = Cache('test_set_after_invalidation')
+    version = cache.version
+    # the value was computed before the invalidation, so it might be outdated
+    cache.invalidate('key')
+    cache.set('key', 'old', version=version)
+    assert 'key' not in cache
+    cache.set('key', 'new', version=cache.version)
+    assert cache.get('key') == 'new'
+
+
+# =============================================================================
+# CacheRegistry
+# =============================================================================
+
+def test_registry_stats():
+    cache = Cache('test_registry_stats', maxsize=2)
+    assert CacheRegistry.get('test_registry_stats') is cache
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)
+    cache.get('c')
+    cache.get('c')
+    cache.get('a')
+    stats = CacheRegistry.stats()['test_registry_stats']
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['evictions'] == 1
+    assert stats['size'] == 2
+    assert stats['maxsize'] == 2
+    assert stats['hit_ratio'] == pytest.approx(2 / 3)
+
+    # a reloaded module replaces its cache
+    replacement = Cache('test_registry_stats')
+    assert CacheRegistry.get('test_registry_stats') is replacement
+    assert CacheRegistry.stats()['test_registry_stats']['hits'] == 0
+
+
+# =============================================================================
+# @cached
+# =============================================================================
+
+def test_cached_sync():
+    calls = []
+
+    @cached(maxsize=2, name='test_cached_sync')
+    def square(x: int) -> int:
+        calls.append(x)
+        return x * x
+
+    assert [square(2), square(2), square(3)] == [4, 4, 9]
+    assert calls == [2, 3]
+    assert square.cache.stats.hits == 1
+    assert square.cache.stats.misses == 2
+
+    assert square.invalidate(2)
+    assert square(2) == 4
+    assert calls == [2, 3, 2]
+    square.cache_clear()
+    assert len(square.cache) == 0
+
+
+def test_cached_sync_exceptions_are_not_cached():
+    calls = []
+
+    @cached(name='test_cached_sync_exceptions_are_not_cached')
+    def fail(x: int) -> int:
+        calls.append(x)
+        raise ValueError(x)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            fail(1)
+    assert calls == [1, 1]
+    assert len(fail.cache) == 0
+
+
+def test_cached_sync_single_flight():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cached(name='test_cached_sync_single_flight')
+    def slow(x: int) -> int:
+        calls.append(x)
+        started.set()
+        release.wait(5)
+        return x
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(1))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [1] * 4
+    assert calls == [1]
+    stats = slow.cache.stats
+    # the function ran once, the waiting threads are no misses
+    assert stats.misses == 1
+    assert stats.hits + stats.coalesced == 3
+
+
+def test_cached_async_single_flight():
+    calls = []
+
+    @cached(name='test_cached_async_single_flight')
+    async def fetch(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x * 10
+
+    async def scenario():
+        assert await asyncio.gather(*(fetch(1) for _ in range(5)), fetch(2)) == [10] * 5 + [20]
+        assert await fetch(1) == 10
+
+    run(scenario())
+    assert calls == [1, 2]
+    stats = fetch.cache.stats
+    assert stats.misses == 2
+    assert stats.coalesced == 4
+    assert stats.hits == 1
+    assert stats.hit_ratio == pytest.approx(5 / 7)
+
+
+def test_cached_async_exceptions():
+    calls = []
+
+    @cached(name='test_cached_async_exceptions')
+    async def fail(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        raise ValueError(x)
+
+    async def scenario():
+        results = await asyncio.gather(*(fail(1) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(x, ValueError) for x in results)
+        # the next call tries again
+        with pytest.raises(ValueError):
+            await fail(1)
+
+    run(scenario())
+    assert calls == [1, 1]
+    assert len(fail.cache) == 0
+
+
+def test_cached_async_cancelled_caller():
+    @cached(name='test_cached_async_cancelled_caller')
+    async def fetch(x: int) -> int:
+        await asyncio.sleep(0.05)
+        return x
+
+    async def scenario():
+        first = asyncio.create_task(fetch(1))
+        second = asyncio.create_task(fetch(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        # the other caller still gets the result
+        assert await second == 1
+        assert first.cancelled()
+
+    run(scenario())
+    # the cache key is the tuple of the arguments
+    assert fetch.cache.get((1, )) == 1
+
+
+def test_cached_async_invalidate_while_pending():
+    calls = []
+
+    @cached(name='test_cached_async_invalidate_while_pending')
+    async def fetch(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        task = asyncio.create_task(fetch(1))
+        await asyncio.sleep(0)
+        fetch.invalidate(1)
+        # the result of the running call is not cached anymore
+        assert await task == 1
+        assert (1, ) not in fetch.cache
+        assert await fetch(1) == 2
+        assert await fetch(1) == 2
+
+    run(scenario())
+
+
+def test_cached_key():
+    class Server:
+        def __init__(self, name: str):
+            self.name = name
+
+    @cached(name='test_cached_key', ignore=('interaction', ))
+    def players(server: Server, interaction: object, sides: list[int]) -> str:
+        return f"{server.name}: {sides}"
+
+    assert players(Server('A'), object(), [1, 2]) == 'A: [1, 2]'
+    # objects with a name are cached by their name, ignored parameters are not part of the key
+    assert players(Server('A'), object(), [1, 2]) == 'A: [1, 2]'
+    assert players.cache.stats.hits == 1
+    assert players(Server('B'), object(), [1, 2]) == 'B: [1, 2]'
+    assert players.cache.stats.misses == 2
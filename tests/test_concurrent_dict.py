@@ -0,0 +1,166 @@
+"""
+Thread-stress tests for ConcurrentDict, which holds the pending kills, disconnects and timers of the Punishment plugin.
+
+Writer threads add, overwrite and remove entries while reader threads look them up and iterate over the dictionary.
+No reader may ever see a torn state, and the dictionary has to end up exactly like a plain dict that got the same
+operations.
+"""
+
+import random
+import sys
+import threading
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.utils.helper import ConcurrentDict
+
+WRITERS = 4
+READERS = 4
+OPERATIONS = 20000
+
+
+def _run(threads: list[threading.Thread]):
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+        assert not thread.is_alive()
+
+
+# =============================================================================
+# Dict behaviour
+# =============================================================================
+
+def test_behaves_like_dict():
+    d = ConcurrentDict(a=1)
+    d['b'] = 2
+    d.update({'c': 3})
+    d |= {'d': 4}
+    assert d.setdefault('e', 5) == 5
+    assert d.setdefault('e', 6) == 5
+    assert d.pop('a') == 1
+    assert d.pop('a', None) is None
+    with pytest.raises(KeyError):
+        d.pop('a')
+    del d['b']
+    assert isinstance(d, dict)
+    assert d == {'c': 3, 'd': 4, 'e': 5}
+    assert list(d) == ['c', 'd', 'e']
+    assert list(d.keys()) == ['c', 'd', 'e']
+    assert list(d.values()) == [3, 4, 5]
+    assert list(d.items()) == [('c', 3), ('d', 4), ('e', 5)]
+    assert d.copy() == {'c': 3, 'd': 4, 'e': 5} and type(d.copy()) is dict
+    assert d.get('c') == 3 and 'c' in d and len(d) == 3
+    assert d.popitem() == ('e', 5)
+    d.clear()
+    assert not d and list(d.items()) == []
+
+
+def test_snapshot_is_stable():
+    d = ConcurrentDict({i: i for i in range(10)})
+    items = d.items()
+    # unchanged dictionaries are not copied again
+    assert d._get_snapshot() is d._get_snapshot()
+    # iterating while writing does not raise and sees the state before the write
+    seen = []
+    for key in d:
+        d[key + 100] = key
+        seen.append(key)
+    assert seen == list(range(10))
+    assert len(d) == 20
+    assert len(items) == 10
+
+
+# =============================================================================
+# Thread stress
+# =============================================================================
+
+def test_concurrent_writers_and_readers():
+    d = ConcurrentDict()
+    errors: list[Exception] = []
+    done = threading.Event()
+
+    def writer(n: int):
+        rnd = random.Random(n)
+        try:
+            for i in range(OPERATIONS):
+                key = (n, rnd.randrange(100))
+                op = rnd.random()
+                if op < 0.5:
+                    # value is always consistent with the key, so readers can check it
+                    d[key] = (key, i)
+                elif op < 0.7:
+                    d.pop(key, None)
+                elif op < 0.8:
+                    d.setdefault(key, (key, -1))
+                elif op < 0.9:
+                    d.update({key: (key, i)})
+                else:
+                    try:
+                        del d[key]
+                    except KeyError:
+                        pass
+        except Exception as ex:
+            errors.append(ex)
+
+    def reader():
+        try:
+            while not done.is_set():
+                for key, value in d.items():
+                    assert value[0] == key
+                for key in d:
+                    assert isinstance(key, tuple)
+                for value in d.values():
+                    assert isinstance(value, tuple)
+                assert len(list(d.keys())) <= WRITERS * 100
+                value = d.get((0, 0))
+                assert value is None or value[0] == (0, 0)
+        except Exception as ex:
+            errors.append(ex)
+
+    readers = [threading.Thread(target=reader) for _ in range(READERS)]
+    for thread in readers:
+        thread.start()
+    _run([threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)])
+    done.set()
+    for thread in readers:
+        thread.join(timeout=60)
+    assert not errors
+
+    # replay the same operations on a plain dict, every writer has its own keys
+    expected = {}
+    for n in range(WRITERS):
+        rnd = random.Random(n)
+        for i in range(OPERATIONS):
+            key = (n, rnd.randrange(100))
+            op = rnd.random()
+            if op < 0.5 or 0.8 <= op < 0.9:
+                expected[key] = (key, i)
+            elif op < 0.7 or op >= 0.9:
+                expected.pop(key, None)
+            else:
+                expected.setdefault(key, (key, -1))
+    assert d == expected
+    assert dict(d.items()) == expected
+
+
+def test_concurrent_counters():
+    d = ConcurrentDict()
+    lock = threading.Lock()
+
+    def increment():
+        for _ in range(OPERATIONS):
+            # read-modify-write still needs external locking, but must not corrupt the dictionary
+            with lock:
+                d['counter'] = d.get('counter', 0) + 1
+            d.setdefault(threading.get_ident(), 0)
+
+    _run([threading.Thread(target=increment) for _ in range(WRITERS)])
+    assert d['counter'] == WRITERS * OPERATIONS
+    assert len(d) == WRITERS + 1
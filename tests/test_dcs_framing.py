@@ -0,0 +1,154 @@
+"""
+Tests for the messages the bot sends to DCS (core/data/impl/serverimpl.py).
+
+Large messages are split into fragments, that DCSServerBotMain.lua puts together again. The Lua side is run under the
+Lua 5.1 runtime of lupa, with a simulated socket that returns the fragments.
+"""
+
+import json
+import random
+import sys
+
+from enum import Enum
+from lupa.lua51 import LuaRuntime
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.const import MAX_SAFE_INTEGER, MAX_DCS_DATAGRAM
+from core.data.impl.serverimpl import serialize, frame
+
+DCS_API = """
+datagrams = {}
+received = {}
+log = { DEBUG = 0, INFO = 1, ERROR = 2, write = function(...) end }
+net = {
+    json2lua = function(msg) return { command = 'test', msg = msg } end
+}
+Sim = {
+    isServer = function() return true end,
+    setUserCallbacks = function(callbacks) hooks = callbacks end
+}
+package.preload['lfs'] = function()
+    return { writedir = function() return '' end, dir = function() return function() return nil end end }
+end
+package.preload['DCSServerBotConfig'] = function() return { DCS_HOST = '127.0.0.1', DCS_PORT = 6666 } end
+package.preload['DCSServerBotUtils'] = function() return {} end
+package.preload['socket'] = function()
+    return {
+        dns = { toip = function(host) return host end },
+        udp = function()
+            return {
+                setsockname = function() end,
+                settimeout = function() end,
+                setoption = function() end,
+                receive = function()
+                    if #datagrams == 0 then
+                        return nil, 'timeout'
+                    end
+                    return table.remove(datagrams, 1)
+                end
+            }
+        end
+    }
+end
+"""
+
+
+class Color(Enum):
+    RED = 'red'
+
+
+def dcs() -> LuaRuntime:
+    # keep Lua strings as bytes, as fragments might split UTF-8 characters
+    lua = LuaRuntime(encoding=None)
+    lua.execute(DCS_API)
+    path = PROJECT_ROOT / 'Scripts' / 'net' / 'DCSServerBot' / 'DCSServerBotMain.lua'
+    lua.execute(path.read_bytes())
+    lua.execute(b"dcsbot.test = function(msg) table.insert(received, msg.msg) end")
+    return lua
+
+
+def receive(lua: LuaRuntime, datagrams: list[bytes]) -> list[bytes]:
+    g = lua.globals()
+    for datagram in datagrams:
+        g.table.insert(g.datagrams, datagram)
+    g.hooks.onSimulationFrame()
+    result = list(g.received.values())
+    g.received = lua.table()
+    return result
+
+
+def test_serialize_converts_large_numbers_and_enums():
+    message = {
+        "command": "uploadUserRoles",
+        "big": MAX_SAFE_INTEGER + 1,
+        "flag": True,
+        "color": Color.RED,
+        "roles": [{"discord": 112233445566778899, "roles": [998877665544332211, 1]}]
+    }
+    assert serialize(message) == {
+        "command": "uploadUserRoles",
+        "big": str(MAX_SAFE_INTEGER + 1),
+        "flag": True,
+        "color": "red",
+        "roles": [{"discord": "112233445566778899", "roles": ["998877665544332211", 1]}]
+    }
+    # the message itself is not changed
+    assert message["big"] == MAX_SAFE_INTEGER + 1
+    assert message["roles"][0]["roles"][0] == 998877665544332211
+
+
+def test_serialize_does_not_copy_what_needs_no_conversion():
+    params = {"restricted": [{"unit_type": "F-14B", "points": 10}], "messages": {"welcome": "Hi"}}
+    message = {"command": "loadParams", "params": params, "id": 112233445566778899}
+    result = serialize(message)
+    assert result is not message
+    assert result["params"] is params
+    assert serialize(params) is params
+
+
+def test_small_messages_are_not_fragmented():
+    data = json.dumps({"command": "sendChatMessage", "message": "Hello"}).encode('utf-8')
+    assert frame(data, 1) == [data]
+    data = b'x' * MAX_DCS_DATAGRAM
+    assert frame(data, 1) == [data]
+
+
+def test_fragments_fit_into_a_datagram():
+    data = b'x' * (5 * MAX_DCS_DATAGRAM + 17)
+    fragments = frame(data, 0xFFFFFFFFFFFF)
+    assert len(fragments) == 6
+    assert all(len(fragment) <= MAX_DCS_DATAGRAM for fragment in fragments)
+
+
+def test_dcs_reassembles_fragments():
+    lua = dcs()
+    message = json.dumps({
+        "command": "loadParams",
+        "params": [{"name": f"Ünit {i}", "points": i} for i in range(2000)]
+    }).encode('utf-8')
+    fragments = frame(message, 42)
+    assert len(fragments) > 1
+    assert receive(lua, fragments) == [message]
+    # out of order, duplicated and mixed with other messages
+    rnd = random.Random(1)
+    shuffled = frame(message, 43) + frame(message, 44)[:1] + [fragments[0]]
+    rnd.shuffle(shuffled)
+    small = json.dumps({"command": "sendChatMessage"}).encode('utf-8')
+    assert receive(lua, shuffled + [small]) == [message, small]
+    # the rest of message 44
+    assert receive(lua, frame(message, 44)[1:]) == [message]
+
+
+def test_dcs_drops_incomplete_messages():
+    lua = dcs()
+    message = b'x' * (3 * MAX_DCS_DATAGRAM)
+    assert receive(lua, frame(message, 1)[:-1]) == []
+    # MAX_WAIT later
+    lua.globals().os.time = lua.eval(b"function() return 2 ^ 31 end")
+    assert receive(lua, frame(message, 2)) == [message]
+    # the fragments of message 1 are gone, so the last one does not complete it
+    assert receive(lua, frame(message, 1)[-1:]) == []
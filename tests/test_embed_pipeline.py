@@ -0,0 +1,156 @@
+"""
+Tests for the rendering of the persistent embeds (core/report/pipeline.py) and the cached report definitions
+(core/report/base.py).
+
+The EmbedPipeline is driven with fake servers and a fake render function, which records how many renders run in
+parallel. The report definitions are read from the real report files of the Mission plugin.
+"""
+
+import asyncio
+import os
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.report import base, EmbedPipeline
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeServer:
+    def __init__(self, name: str):
+        self.name = name
+        self.players = 0
+
+
+class Renderer:
+    def __init__(self, delay: float = 0.01, fail: set[str] | None = None):
+        self.delay = delay
+        self.fail = fail or set()
+        self.rendered: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, server: FakeServer):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if server.name in self.fail:
+                raise ValueError(server.name)
+            self.rendered.append(server.name)
+        finally:
+            self.in_flight -= 1
+
+
+# =============================================================================
+# EmbedPipeline
+# =============================================================================
+
+def test_renders_marked_servers_with_bounded_concurrency():
+    async def scenario():
+        renderer = Renderer()
+        pipeline = EmbedPipeline('test', renderer, max_concurrency=3)
+        servers = [FakeServer(f'server{i}') for i in range(10)]
+        for server in servers:
+            pipeline.mark(server)
+            # marking twice renders once
+            pipeline.mark(server)
+        await pipeline.run()
+        assert sorted(renderer.rendered) == sorted(x.name for x in servers)
+        assert renderer.max_in_flight == 3
+
+        # nothing marked, nothing rendered
+        await pipeline.run()
+        assert len(renderer.rendered) == 10
+
+    run(scenario())
+
+
+def test_unchanged_inputs_are_skipped():
+    async def scenario():
+        renderer = Renderer(delay=0)
+        pipeline = EmbedPipeline('test', renderer, fingerprint=lambda x: x.players)
+        server = FakeServer('server')
+        pipeline.mark(server)
+        await pipeline.run()
+        pipeline.mark(server)
+        await pipeline.run()
+        assert renderer.rendered == ['server']
+
+        server.players = 1
+        pipeline.mark(server)
+        await pipeline.run()
+        assert renderer.rendered == ['server', 'server']
+
+        # too old
+        pipeline.max_age = 0
+        pipeline.mark(server)
+        await pipeline.run()
+        assert renderer.rendered == ['server', 'server', 'server']
+
+    run(scenario())
+
+
+def test_failed_renders_are_repeated():
+    async def scenario():
+        renderer = Renderer(delay=0, fail={'server'})
+        pipeline = EmbedPipeline('test', renderer, fingerprint=lambda x: x.players)
+        server = FakeServer('server')
+        pipeline.mark(server)
+        await pipeline.run()
+        renderer.fail.clear()
+        pipeline.mark(server)
+        await pipeline.run()
+        assert renderer.rendered == ['server']
+
+    run(scenario())
+
+
+def test_marks_while_rendering_are_kept():
+    async def scenario():
+        pipeline = None
+        server = FakeServer('server')
+        rendered = []
+
+        async def render(s: FakeServer):
+            rendered.append(s.name)
+            if len(rendered) == 1:
+                pipeline.mark(s)
+
+        pipeline = EmbedPipeline('test', render)
+        pipeline.mark(server)
+        await pipeline.run()
+        await pipeline.run()
+        assert rendered == ['server', 'server']
+
+    run(scenario())
+
+
+# =============================================================================
+# Report definitions
+# =============================================================================
+
+def test_report_definitions_are_cached_and_copied():
+    filename = str(PROJECT_ROOT / 'plugins' / 'mission' / 'reports' / 'serverStatus.json')
+    first = base._read_report_def(filename)
+    first['elements'][1]['params']['show_password'] = False
+    second = base._read_report_def(filename)
+    assert second['elements'][1]['params']['show_password'] is True
+    assert base.REPORT_DEFINITIONS.get(filename) is not None
+
+
+def test_changed_report_definitions_are_read_again(tmp_path):
+    filename = tmp_path / 'test.json'
+    filename.write_text('{"title": "one"}', encoding='utf-8')
+    assert base._read_report_def(str(filename))['title'] == 'one'
+    filename.write_text('{"title": "two", "color": "red"}', encoding='utf-8')
+    stat = filename.stat()
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert base._read_report_def(str(filename))['title'] == 'two'
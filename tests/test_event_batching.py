@@ -0,0 +1,214 @@
+"""
+Tests for the batching of the events DCS sends to the bot (EVENT_BATCHING in DCSServerBot.lua for the mission and
+DCSServerBotUtils.lua for the hooks).
+
+The scripts are run under the Lua 5.1 runtime of lupa, with a simulated DCS API that records the datagrams sent to the
+bot and a clock that is moved by the tests.
+"""
+
+import json
+import sys
+
+from lupa.lua51 import LuaRuntime, lua_type
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DCS_API = """
+sent = {}
+clock = 0
+timers = {}
+log = { DEBUG = 0, INFO = 1, ERROR = 2, write = function(...) end }
+env = { info = function(...) end }
+lfs = { writedir = function() return '' end }
+dofile = function() end
+loadfile = function() return function() cfg = { name = 'Test Server' } end end
+socket = {
+    gettime = function() return clock end,
+    try = function(...) return ... end,
+    udp = function()
+        return {
+            settimeout = function() end,
+            setsockname = function() end,
+            sendto = function(self, msg) table.insert(sent, msg) return true end
+        }
+    end
+}
+timer = {
+    getTime = function() return clock end,
+    scheduleFunction = function(func, args, time) table.insert(timers, { func = func, time = time }) end
+}
+function run_timers()
+    local due = timers
+    timers = {}
+    for _, t in ipairs(due) do
+        if t.time <= clock then
+            t.func()
+        else
+            table.insert(timers, t)
+        end
+    end
+end
+Sim = {}
+package.preload['socket'] = function() return socket end
+package.preload['lfs'] = function() return lfs end
+package.preload['TableUtils'] = function() return {} end
+package.preload['tools'] = function() return {} end
+package.preload['me_utilities'] = function() return {} end
+"""
+
+
+def to_python(value):
+    if lua_type(value) == 'table':
+        return {str(k): to_python(v) for k, v in value.items()}
+    return value
+
+
+def dcs(event_batching: int | None) -> LuaRuntime:
+    lua = LuaRuntime()
+    lua.execute(DCS_API)
+    lua.globals().net = lua.table(lua2json=lambda tbl: json.dumps(to_python(tbl)))
+    lua.execute(f"""
+        package.preload['DCSServerBotConfig'] = function()
+            return {{ BOT_HOST = '127.0.0.1', BOT_PORT = 10042, DCS_PORT = 6666, EVENT_BATCHING = {event_batching} }}
+        end
+    """ if event_batching is not None else """
+        package.preload['DCSServerBotConfig'] = function()
+            return { BOT_HOST = '127.0.0.1', BOT_PORT = 10042, DCS_PORT = 6666 }
+        end
+    """)
+    return lua
+
+
+def mission(event_batching: int | None) -> LuaRuntime:
+    lua = dcs(event_batching)
+    lua.execute((PROJECT_ROOT / 'Scripts' / 'net' / 'DCSServerBot' / 'DCSServerBot.lua').read_text(encoding='utf-8'))
+    # registerMissionHook
+    g = lua.globals()
+    g.dcsbot.flushBotTables()
+    assert [x['command'] for x in received(lua)] == ['registerMissionHook']
+    g.timers = lua.table()
+    return lua
+
+
+def hook(event_batching: int | None) -> LuaRuntime:
+    lua = dcs(event_batching)
+    path = PROJECT_ROOT / 'Scripts' / 'net' / 'DCSServerBot' / 'DCSServerBotUtils.lua'
+    lua.eval("function(code) package.preload['DCSServerBotUtils'] = loadstring(code) end")(
+        path.read_text(encoding='utf-8'))
+    lua.execute("utils = require('DCSServerBotUtils'); utils.server_name = 'Test Server'")
+    return lua
+
+
+def received(lua: LuaRuntime) -> list[dict]:
+    """
+    The messages the bot got since the last call, with the batches unpacked like the ServiceBus does.
+    """
+    g = lua.globals()
+    messages = []
+    for datagram in g.sent.values():
+        data = json.loads(datagram)
+        if data['command'] == 'batch':
+            assert data['server_name'] == 'Test Server'
+            messages.extend(data['events'])
+        else:
+            messages.append(data)
+    g.sent = lua.table()
+    return messages
+
+
+def datagrams(lua: LuaRuntime) -> int:
+    return len(lua.globals().sent)
+
+
+def event(lua: LuaRuntime, i: int, channel: str = '-1'):
+    lua.globals().dcsbot.sendBotTable(lua.table(command='onMissionEvent', eventName='S_EVENT_SHOT', id=i), channel)
+
+
+def test_without_batching_every_event_is_sent_at_once():
+    lua = mission(None)
+    for i in range(3):
+        event(lua, i)
+    assert datagrams(lua) == 3
+    assert [x['id'] for x in received(lua)] == [0, 1, 2]
+
+
+def test_events_are_sent_in_one_batch_after_the_window():
+    lua = mission(50)
+    g = lua.globals()
+    for i in range(100):
+        event(lua, i)
+    assert datagrams(lua) == 0
+    g.clock = 0.049
+    g.run_timers()
+    assert datagrams(lua) == 0
+    g.clock = 0.05
+    g.run_timers()
+    assert datagrams(lua) == 1
+    events = received(lua)
+    assert [x['id'] for x in events] == list(range(100))
+    assert all(x['server_name'] == 'Test Server' and x['channel'] == '-1' for x in events)
+
+
+def test_replies_are_sent_at_once_after_the_events_before_them():
+    lua = mission(50)
+    event(lua, 1)
+    event(lua, 2)
+    event(lua, 3, 'sync-1234')
+    assert datagrams(lua) == 2
+    assert [x['id'] for x in received(lua)] == [1, 2, 3]
+
+
+def test_large_batches_are_split():
+    lua = mission(1000)
+    g = lua.globals()
+    g.dcsbot.sendBotTable(lua.table(command='onMissionEvent', text='x' * 40000))
+    g.dcsbot.sendBotTable(lua.table(command='onMissionEvent', text='y' * 40000))
+    # the first batch is full
+    assert datagrams(lua) == 1
+    g.clock = 1
+    g.run_timers()
+    assert [x['text'][0] for x in received(lua)] == ['x', 'y']
+
+
+def test_events_are_sent_when_the_timer_is_late():
+    # the timer does not run while the mission is paused
+    lua = mission(50)
+    g = lua.globals()
+    event(lua, 1)
+    g.clock = 0.1
+    event(lua, 2)
+    assert [x['id'] for x in received(lua)] == [1]
+
+
+def test_mission_batches_per_frame():
+    lua = mission(0)
+    g = lua.globals()
+    for i in range(10):
+        event(lua, i)
+    assert datagrams(lua) == 0
+    g.clock = 0.001
+    g.run_timers()
+    assert [x['id'] for x in received(lua)] == list(range(10))
+
+
+def test_hook_batches_per_frame():
+    lua = hook(0)
+    g = lua.globals()
+    for i in range(10):
+        g.utils.sendBotTable(lua.table(command='onPlayerChangeSlot', id=i))
+    assert datagrams(lua) == 0
+    g.utils.checkBotTables()
+    assert datagrams(lua) == 1
+    assert [x['id'] for x in received(lua)] == list(range(10))
+    g.utils.checkBotTables()
+    assert datagrams(lua) == 0
+
+
+def test_hook_without_batching():
+    lua = hook(None)
+    g = lua.globals()
+    g.utils.sendBotTable(lua.table(command='onPlayerChangeSlot', id=1))
+    assert [x['id'] for x in received(lua)] == [1]
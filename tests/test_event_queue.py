@@ -0,0 +1,181 @@
+"""
+Tests for the event queues of the ServiceBus (services/servicebus/queue.py), which hold the events of a DCS server
+until the event listeners have processed them.
+"""
+
+import asyncio
+import sys
+import tracemalloc
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core import EventListener, event
+from services.servicebus.queue import EventQueue, Priority, BUS_DROPPED, BUS_COALESCED, coalesced_events
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def count(metric, **labels) -> float:
+    return sum(value for _, _labels, value in metric.samples() if _labels == labels)
+
+
+def drain(queue: EventQueue) -> list[dict]:
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_priorities():
+    queue = EventQueue('Test', {'priorities': {'onMissionEvent': 'low', 'onChatMessage': 'normal',
+                                               'serverLoad': 'periodic'}})
+    assert queue.priority({'command': 'registerDCSServer'}) == Priority.CRITICAL
+    assert queue.priority({'command': 'onPlayerStart'}) == Priority.CRITICAL
+    assert queue.priority({'command': 'onGameEvent'}) == Priority.NORMAL
+    assert queue.priority({'command': 'serverLoad'}) == Priority.PERIODIC
+    assert queue.priority({'command': 'getMissionSituation', 'channel': 'sync-1234'}) == Priority.CRITICAL
+    assert queue.priority({}) == Priority.CRITICAL
+    # configured
+    assert queue.priority({'command': 'onMissionEvent'}) == Priority.LOW
+    assert queue.priority({'command': 'onChatMessage'}) == Priority.NORMAL
+
+
+def test_events_keep_their_order():
+    async def _test():
+        queue = EventQueue('Test')
+        for i in range(100):
+            queue.put_nowait({'command': 'onGameEvent', 'id': i})
+        return [(await queue.get())['id'] for _ in range(100)]
+
+    assert run(_test()) == list(range(100))
+
+
+def test_full_queue_drops_less_important_events():
+    queue = EventQueue('Test', {'max_size': 10, 'priorities': {'onMissionEvent': 'low'}})
+    dropped = count(BUS_DROPPED, server='Test', event='onGameEvent')
+    for i in range(5):
+        assert queue.put_nowait({'command': 'onMissionEvent', 'id': i})
+    # half full
+    assert not queue.put_nowait({'command': 'onMissionEvent', 'id': 5})
+    for i in range(5):
+        assert queue.put_nowait({'command': 'onGameEvent', 'id': i})
+    # full
+    assert not queue.put_nowait({'command': 'onGameEvent', 'id': 5})
+    assert count(BUS_DROPPED, server='Test', event='onGameEvent') == dropped + 1
+    # critical events are always queued
+    assert queue.put_nowait({'command': 'onPlayerStop', 'id': 1})
+    assert queue.put_nowait({'command': 'getMissionSituation', 'channel': 'sync-1'})
+    assert queue.qsize() == 12
+    events = drain(queue)
+    assert [x['command'] for x in events[-2:]] == ['onPlayerStop', 'getMissionSituation']
+    # empty again
+    assert queue.put_nowait({'command': 'onGameEvent', 'id': 6})
+
+
+def test_periodic_events_are_coalesced():
+    queue = EventQueue('Test', {'priorities': {'serverLoad': 'periodic'}})
+    coalesced = count(BUS_COALESCED, server='Test', event='serverLoad')
+    queue.put_nowait({'command': 'serverLoad', 'cpu': 1})
+    queue.put_nowait({'command': 'onGameEvent', 'id': 1})
+    queue.put_nowait({'command': 'serverLoad', 'cpu': 2})
+    queue.put_nowait({'command': 'perfmon', 'fps': 60})
+    queue.put_nowait({'command': 'serverLoad', 'cpu': 3})
+    assert count(BUS_COALESCED, server='Test', event='serverLoad') == coalesced + 2
+    # the latest value, at the place of the first one
+    assert drain(queue) == [
+        {'command': 'serverLoad', 'cpu': 3},
+        {'command': 'onGameEvent', 'id': 1},
+        {'command': 'perfmon', 'fps': 60}
+    ]
+    # once processed, the next one is queued again
+    queue.put_nowait({'command': 'serverLoad', 'cpu': 4})
+    assert drain(queue) == [{'command': 'serverLoad', 'cpu': 4}]
+
+
+class MissionListener(EventListener):
+    @event(name="getMissionUpdate", coalesce=True)
+    async def getMissionUpdate(self, server, data: dict) -> None:
+        ...
+
+    @event(name="onGameEvent")
+    async def onGameEvent(self, server, data: dict) -> None:
+        ...
+
+
+class SchedulerListener(EventListener):
+    @event(name="getMissionUpdate", coalesce=True)
+    async def getMissionUpdate(self, server, data: dict) -> None:
+        ...
+
+
+class StatsListener(EventListener):
+    @event(name="getMissionUpdate")
+    async def getMissionUpdate(self, server, data: dict) -> None:
+        ...
+
+
+def test_coalesced_events_are_declared_by_all_listeners():
+    assert MissionListener.__coalesced__ == {'getMissionUpdate'}
+    assert coalesced_events([MissionListener, SchedulerListener]) == {'getMissionUpdate'}
+    # one listener needs every event
+    assert coalesced_events([MissionListener, SchedulerListener, StatsListener]) == set()
+    assert coalesced_events([]) == set()
+
+
+def test_declared_events_are_coalesced():
+    queue = EventQueue('Test', coalesced={'getMissionUpdate'})
+    coalesced = count(BUS_COALESCED, server='Test', event='getMissionUpdate')
+    for i in range(10):
+        queue.put_nowait({'command': 'getMissionUpdate', 'mission_time': i})
+        queue.put_nowait({'command': 'onGameEvent', 'id': i})
+    assert count(BUS_COALESCED, server='Test', event='getMissionUpdate') == coalesced + 9
+    events = drain(queue)
+    # 11 instead of 20 events to dispatch, the others keep their order
+    assert len(events) == 11
+    assert events[0] == {'command': 'getMissionUpdate', 'mission_time': 9}
+    assert [x['id'] for x in events[1:]] == list(range(10))
+    # not coalesced, unless declared
+    queue = EventQueue('Test')
+    queue.put_nowait({'command': 'getMissionUpdate', 'mission_time': 1})
+    queue.put_nowait({'command': 'getMissionUpdate', 'mission_time': 2})
+    assert queue.qsize() == 2
+
+
+def test_bounded_memory_with_a_stalled_consumer():
+    async def _test():
+        queue = EventQueue('Stress', {'max_size': 1000, 'priorities': {'serverLoad': 'periodic'}})
+        stalled = asyncio.Event()
+
+        async def consumer():
+            # a listener that waits for a database that never answers
+            await queue.get()
+            await stalled.wait()
+
+        task = asyncio.create_task(consumer())
+        await asyncio.sleep(0)
+
+        def produce(number: int):
+            for i in range(number):
+                queue.put_nowait({'command': 'onMissionEvent', 'eventName': 'S_EVENT_SHOT', 'id': i,
+                                  'initiator': {'name': f'Unit {i}', 'type': 'F-16C_50'}})
+                queue.put_nowait({'command': 'serverLoad', 'cpu': i})
+
+        tracemalloc.start()
+        produce(5000)
+        baseline = tracemalloc.get_traced_memory()[0]
+        produce(20000)
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        task.cancel()
+        return queue, growth
+
+    queue, growth = run(_test())
+    assert queue.qsize() <= 1000
+    # an unbounded queue would hold 20000 more events with more than 10 MB
+    assert growth < 1024 * 1024
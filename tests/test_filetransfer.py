@@ -0,0 +1,262 @@
+"""
+Tests for the chunked file transfer between nodes (core/utils/filetransfer.py).
+
+The sender and the receiver run against the fake psycopg pool (see conftest.py), with a database that keeps the files
+and file_chunks tables in memory, including the foreign key and the ON DELETE CASCADE between them.
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from psycopg import errors
+from core.utils.filetransfer import FileTransfer, ChecksumError, read_chunks
+
+CHUNK_SIZE = 1000
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.files: dict[int, dict] = {}
+        # (file_id, seq) => (data, checksum)
+        self.file_chunks: dict[tuple[int, int], tuple[bytes, str]] = {}
+        self.next_id = 1
+        self.max_chunks = 0
+        # chunks that get corrupted when they are stored
+        self.corrupt: set[int] = set()
+
+    def chunks(self, file_id: int) -> list[int]:
+        return sorted(seq for _file_id, seq in self.file_chunks if _file_id == file_id)
+
+    def select(self, query: str, params: tuple | dict) -> list[tuple] | None:
+        query = ' '.join(query.split())
+        if query.startswith('INSERT INTO files'):
+            file_id = self.next_id
+            self.next_id += 1
+            self.files[file_id] = {'name': params[1], 'chunks': None, 'size': None, 'error': None}
+            return [(file_id, )]
+        elif query.startswith('SELECT (SELECT MIN(seq)'):
+            if params[0] not in self.files:
+                return []
+            seqs = self.chunks(params[0])
+            return [(seqs[0] if seqs else None, )]
+        elif query.startswith('INSERT INTO file_chunks'):
+            file_id, seq, data, checksum = params
+            if file_id not in self.files:
+                raise errors.ForeignKeyViolation(f"file {file_id} does not exist")
+            data = bytes(data.obj)
+            if seq in self.corrupt:
+                data = bytes([data[0] ^ 0xff]) + data[1:]
+            self.file_chunks.setdefault((file_id, seq), (data, checksum))
+            self.max_chunks = max(self.max_chunks, len(self.chunks(file_id)))
+            return None
+        elif query.startswith('UPDATE files SET chunks'):
+            chunks, size, file_id = params
+            if file_id in self.files:
+                self.files[file_id] |= {'chunks': chunks, 'size': size}
+            return None
+        elif query.startswith('UPDATE files SET error'):
+            error, file_id = params
+            if file_id in self.files:
+                self.files[file_id]['error'] = error
+            return None
+        elif query.startswith('WITH acked AS'):
+            file_id, seq = params['file_id'], params['seq']
+            for key in [(file_id, x) for x in self.chunks(file_id) if x < seq]:
+                del self.file_chunks[key]
+            row = self.file_chunks.get((file_id, seq))
+            return [row] if row else []
+        elif query.startswith('SELECT name, chunks, size, error FROM files'):
+            file = self.files.get(params[0])
+            return [(file['name'], file['chunks'], file['size'], file['error'])] if file else []
+        elif query.startswith('DELETE FROM files'):
+            self.files.pop(params[0], None)
+            # ON DELETE CASCADE
+            for key in [(params[0], x) for x in self.chunks(params[0])]:
+                del self.file_chunks[key]
+            return None
+        raise AssertionError(f"Unexpected statement: {query}")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def source(data: bytes, chunk_size: int = CHUNK_SIZE):
+    offset = 0
+
+    async def read(size: int) -> bytes:
+        nonlocal offset
+        # return less than requested, like a network stream would
+        size = min(size, 300)
+        chunk = data[offset:offset + size]
+        offset += len(chunk)
+        return chunk
+
+    async for chunk in read_chunks(read, chunk_size):
+        yield chunk
+
+
+async def receive(transfer: FileTransfer, file_id: int) -> bytes:
+    return b''.join([chunk async for chunk in transfer.receive(file_id)])
+
+
+def create_transfer(fake_pool, db: FakeDatabase, **kwargs) -> FileTransfer:
+    return FileTransfer(fake_pool(db), 0, chunk_size=CHUNK_SIZE, **({'timeout': 5} | kwargs))
+
+
+def test_read_chunks():
+    async def scenario():
+        data = os.urandom(10 * CHUNK_SIZE + 500)
+        chunks = [chunk async for chunk in source(data)]
+        assert [len(x) for x in chunks] == [CHUNK_SIZE] * 10 + [500]
+        assert b''.join(chunks) == data
+        # a multiple of the chunk size does not end with an empty chunk
+        assert [len(x) async for x in source(data[:2 * CHUNK_SIZE])] == [CHUNK_SIZE, CHUNK_SIZE]
+        assert [x async for x in source(b'')] == []
+
+    run(scenario())
+
+
+def test_transfer(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db)
+        data = os.urandom(10 * CHUNK_SIZE + 500)
+        file_id = await transfer.offer('test.bin', source(data))
+        assert hashlib.sha256(await receive(transfer, file_id)).digest() == hashlib.sha256(data).digest()
+        # everything is removed afterward
+        assert db.files == {}
+        assert db.file_chunks == {}
+
+    run(scenario())
+
+
+def test_empty_file(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db)
+        file_id = await transfer.offer('empty.bin', source(b''))
+        assert await receive(transfer, file_id) == b''
+        assert db.files == {}
+
+    run(scenario())
+
+
+def test_checksum_mismatch(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        db.corrupt.add(3)
+        transfer = create_transfer(fake_pool, db)
+        file_id = await transfer.offer('test.bin', source(os.urandom(10 * CHUNK_SIZE)))
+        received = []
+        with pytest.raises(ChecksumError):
+            async for chunk in transfer.receive(file_id):
+                received.append(chunk)
+        # the chunks before the corrupted one were delivered
+        assert len(received) == 3
+        await asyncio.sleep(0.05)
+        assert db.files == {}
+        assert db.file_chunks == {}
+
+    run(scenario())
+
+
+def test_window(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db, window=3)
+        data = os.urandom(20 * CHUNK_SIZE)
+        file_id = await transfer.offer('test.bin', source(data))
+        # nobody receives, so the sender stops as soon as the window is full
+        await asyncio.sleep(0.2)
+        assert db.chunks(file_id) == [0, 1, 2]
+        # a slow receiver
+        received = bytearray()
+        async for chunk in transfer.receive(file_id):
+            received += chunk
+            await asyncio.sleep(0.001)
+        assert received == data
+        assert db.max_chunks == 3
+
+    run(scenario())
+
+
+def test_receiver_timeout(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db, window=2, timeout=0.1)
+        file_id = await transfer.offer('test.bin', source(os.urandom(10 * CHUNK_SIZE)))
+        await asyncio.gather(*transfer._tasks)
+        # the sender gave up and tells the receiver
+        assert 'TimeoutError' in db.files[file_id]['error']
+        with pytest.raises(IOError, match='failed'):
+            await receive(transfer, file_id)
+        assert db.files == {}
+        assert db.file_chunks == {}
+
+    run(scenario())
+
+
+def test_cancel(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db, window=2)
+        closed = asyncio.Event()
+
+        async def chunks():
+            try:
+                async for chunk in source(os.urandom(20 * CHUNK_SIZE)):
+                    yield chunk
+            finally:
+                closed.set()
+
+        file_id = await transfer.offer('test.bin', chunks())
+        receiver = transfer.receive(file_id)
+        assert len(await anext(receiver)) == CHUNK_SIZE
+        # the receiver stops after the first chunk
+        await receiver.aclose()
+        assert db.files == {}
+        assert db.file_chunks == {}
+        # the sender notices and stops, too
+        await asyncio.wait_for(asyncio.gather(*transfer._tasks), timeout=5)
+        assert closed.is_set()
+        assert db.file_chunks == {}
+
+    run(scenario())
+
+
+def test_source_errors(fake_pool):
+    async def scenario():
+        db = FakeDatabase()
+        transfer = create_transfer(fake_pool, db)
+
+        async def missing():
+            raise FileNotFoundError('test.bin')
+            yield b''
+
+        # errors on opening the source are raised before anything is stored
+        with pytest.raises(FileNotFoundError):
+            await transfer.offer('test.bin', missing())
+        assert db.files == {}
+
+        async def broken():
+            yield b'x' * CHUNK_SIZE
+            raise OSError('disk error')
+
+        file_id = await transfer.offer('test.bin', broken())
+        with pytest.raises(IOError, match='disk error'):
+            await receive(transfer, file_id)
+        assert db.files == {}
+        assert db.file_chunks == {}
+
+    run(scenario())
@@ -0,0 +1,147 @@
+"""
+Tests for the outbound message queue of the bot (services/bot/messages.py), that sends the events of the Mission
+plugin.
+
+The queue is driven with a fake bot and fake channels, which record the messages they receive.
+"""
+
+import asyncio
+import discord
+import logging
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.bot.messages import MessageQueue, QueuedMessage, pack, MAX_CONTENT
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, delay: float = 0):
+        self.id = channel_id
+        self.delay = delay
+        self.sent: list[tuple[str | None, list[discord.Embed]]] = []
+
+    async def send(self, content: str | None = None, *, embeds: list[discord.Embed] = None):
+        await asyncio.sleep(self.delay)
+        self.sent.append((content, embeds or []))
+
+
+class FakeBot:
+    def __init__(self, *channels: FakeChannel):
+        self.log = logging.getLogger(__name__)
+        self.channels = {x.id: x for x in channels}
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        raise discord.DiscordException(f'Unknown channel {channel_id}')
+
+
+# =============================================================================
+# Packing
+# =============================================================================
+
+def test_texts_are_joined_up_to_the_limit():
+    messages = [QueuedMessage(content='x' * 600 + str(i)) for i in range(7)]
+    packets = pack(messages)
+    assert [len(x.content) for x in packets] == [1803, 1803, 601]
+    assert sum(len(x.messages) for x in packets) == 7
+
+
+def test_repeated_texts_are_sent_once():
+    packets = pack([QueuedMessage(content='a'), QueuedMessage(content='a'), QueuedMessage(content='b')])
+    assert len(packets) == 1
+    assert packets[0].content == 'ab'
+
+
+def test_long_texts_are_split():
+    packets = pack([QueuedMessage(content='x' * (MAX_CONTENT * 2 + 10))])
+    assert [len(x.content) for x in packets] == [MAX_CONTENT, MAX_CONTENT, 10]
+
+
+def test_embeds_are_packed_in_order():
+    embeds = [discord.Embed(title=f'embed{i}') for i in range(12)]
+    messages = [QueuedMessage(content='before')] + [QueuedMessage(embed=x) for x in embeds] + \
+               [QueuedMessage(content='after')]
+    packets = pack(messages)
+    # the text above the first embeds, max. 10 embeds per message, a text after an embed starts a new message
+    assert [(x.content, len(x.embeds)) for x in packets] == [('before', 10), ('', 2), ('after', 0)]
+    assert [e for x in packets for e in x.embeds] == embeds
+
+
+# =============================================================================
+# MessageQueue
+# =============================================================================
+
+def test_messages_are_packed_per_channel():
+    async def scenario():
+        events = FakeChannel(1)
+        chat = FakeChannel(2)
+        queue = MessageQueue(FakeBot(events, chat), interval=0.01)
+        for i in range(5):
+            queue.put(1, f'event{i}')
+            queue.put(2, f'chat{i}')
+        await asyncio.sleep(0.05)
+        assert events.sent == [('event0event1event2event3event4', [])]
+        assert chat.sent == [('chat0chat1chat2chat3chat4', [])]
+        await queue.close()
+
+    run(scenario())
+
+
+def test_slow_or_missing_channels_do_not_block_others():
+    async def scenario():
+        slow = FakeChannel(1, delay=1)
+        fast = FakeChannel(2)
+        queue = MessageQueue(FakeBot(slow, fast), interval=0.01)
+        queue.put(3, 'missing')
+        queue.put(1, 'slow')
+        queue.put(2, 'fast')
+        await asyncio.sleep(0.1)
+        assert fast.sent == [('fast', [])]
+        assert not slow.sent
+        await queue.close()
+
+    run(scenario())
+
+
+def test_rate_limits_are_respected():
+    async def scenario():
+        channel = FakeChannel(1)
+        queue = MessageQueue(FakeBot(channel), interval=0.01)
+        queue.put(1, 'first')
+        await asyncio.sleep(0.05)
+        assert len(channel.sent) == 1
+        # Discord reported that the channel bucket is exhausted for the next 0.2s
+        queue.workers[1].update_ratelimit('0', '0.2')
+        queue.put(1, 'second')
+        await asyncio.sleep(0.1)
+        assert len(channel.sent) == 1
+        await asyncio.sleep(0.2)
+        assert channel.sent[1] == ('second', [])
+        await queue.close()
+
+    run(scenario())
+
+
+def test_close_sends_everything():
+    async def scenario():
+        channel = FakeChannel(1)
+        queue = MessageQueue(FakeBot(channel), interval=10)
+        queue.put(1, 'event')
+        queue.put(1, embed=discord.Embed(title='embed'))
+        await queue.close()
+        assert len(channel.sent) == 1
+        assert channel.sent[0][0] == 'event'
+        assert channel.sent[0][1][0].title == 'embed'
+
+    run(scenario())
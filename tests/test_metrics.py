@@ -0,0 +1,216 @@
+"""
+Tests for the metrics registry (core/utils/metrics.py) and its Prometheus endpoint (services/metrics).
+"""
+
+import asyncio
+import math
+import sys
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from core.utils.cache import Cache
+from core.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from services.metrics.service import MetricsService, CONTENT_TYPE
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def values(metric) -> dict:
+    return {(name, tuple(sorted(labels.items()))): value for name, labels, value in metric.samples()}
+
+
+def family(text: str, name: str) -> list[str]:
+    """
+    The lines of one metric family in the rendered output.
+    """
+    lines = text.splitlines()
+    start = lines.index(next(x for x in lines if x.startswith(f"# HELP {name} ")))
+    end = next((i for i in range(start + 2, len(lines)) if lines[i].startswith('# HELP')), len(lines))
+    return lines[start:end]
+
+
+@pytest.fixture
+def const_labels():
+    yield
+    MetricsRegistry.set_const_labels()
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+def test_counter():
+    counter = Counter('test_events', 'Events', ['server'])
+    counter.inc(server='A')
+    counter.inc(2, server='A')
+    counter.inc(server='B')
+    assert values(counter) == {
+        ('test_events_total', (('server', 'A'), )): 3,
+        ('test_events_total', (('server', 'B'), )): 1
+    }
+    # totals that are counted somewhere else
+    counter.set(10, server='B')
+    assert values(counter)[('test_events_total', (('server', 'B'), ))] == 10
+    counter.remove(server='A')
+    assert list(values(counter)) == [('test_events_total', (('server', 'B'), ))]
+
+
+def test_missing_label():
+    counter = Counter('test_missing_label', 'Events', ['server', 'event'])
+    with pytest.raises(ValueError, match='event'):
+        counter.inc(server='A')
+    # additional labels are ignored
+    counter.inc(server='A', event='onPlayerStart', other='x')
+    assert values(counter) == {('test_missing_label_total', (('event', 'onPlayerStart'), ('server', 'A'))): 1}
+
+
+def test_gauge():
+    gauge = Gauge('test_queue_size', 'Queue size', ['server'])
+    gauge.set(5, server='A')
+    gauge.inc(server='A')
+    gauge.dec(3, server='A')
+    gauge.dec(server='B')
+    assert values(gauge) == {
+        ('test_queue_size', (('server', 'A'), )): 3,
+        ('test_queue_size', (('server', 'B'), )): -1
+    }
+    gauge.clear()
+    assert values(gauge) == {}
+
+
+def test_histogram():
+    histogram = Histogram('test_latency_seconds', 'Latency', ['event'], buckets=[1.0, 0.1, 0.5])
+    assert histogram.buckets == (0.1, 0.5, 1.0)
+    for value in (0.05, 0.1, 0.3, 0.7, 2.0):
+        histogram.observe(value, event='A')
+    histogram.observe(0.2, event='B')
+
+    samples = [(name, labels, value) for name, labels, value in histogram.samples() if labels['event'] == 'A']
+    # the buckets are cumulative and include their upper bound
+    assert [(x[1]['le'], x[2]) for x in samples if x[0] == 'test_latency_seconds_bucket'] == [
+        ('0.1', 2), ('0.5', 3), ('1.0', 4), ('+Inf', 5)
+    ]
+    assert ('test_latency_seconds_sum', {'event': 'A'}, pytest.approx(3.15)) in samples
+    assert ('test_latency_seconds_count', {'event': 'A'}, 5) in samples
+    assert values(histogram)[('test_latency_seconds_count', (('event', 'B'), ))] == 1
+
+
+def test_histogram_time():
+    histogram = Histogram('test_time_seconds', 'Time', buckets=[10.0])
+    with pytest.raises(RuntimeError):
+        with histogram.time():
+            raise RuntimeError()
+    # failures are measured, too
+    samples = values(histogram)
+    assert samples[('test_time_seconds_count', ())] == 1
+    assert 0 <= samples[('test_time_seconds_sum', ())] < 10
+
+
+def test_registry():
+    counter = MetricsRegistry.counter('test_registry', 'Events')
+    # modules that define the same metric share it
+    assert MetricsRegistry.counter('test_registry', 'Events') is counter
+    assert MetricsRegistry.get('test_registry') is counter
+    with pytest.raises(ValueError, match='counter'):
+        MetricsRegistry.gauge('test_registry', 'Events')
+
+
+# =============================================================================
+# Prometheus text format
+# =============================================================================
+
+def test_render(const_labels):
+    MetricsRegistry.counter('test_render_messages', 'Messages\nfrom "DCS" \\ per server', ['server']).inc(
+        server='My "Server"\n\\ 1')
+    MetricsRegistry.histogram('test_render_seconds', 'Dispatch time', buckets=[0.5]).observe(0.25)
+    MetricsRegistry.gauge('test_render_size', 'Queue size').set(math.inf)
+    MetricsRegistry.set_const_labels(node='NodeA')
+
+    text = MetricsRegistry.render()
+    assert text.endswith('\n')
+    assert family(text, 'test_render_messages_total') == [
+        '# HELP test_render_messages_total Messages\\nfrom "DCS" \\\\ per server',
+        '# TYPE test_render_messages_total counter',
+        'test_render_messages_total{node="NodeA",server="My \\"Server\\"\\n\\\\ 1"} 1'
+    ]
+    assert family(text, 'test_render_seconds') == [
+        '# HELP test_render_seconds Dispatch time',
+        '# TYPE test_render_seconds histogram',
+        'test_render_seconds_bucket{node="NodeA",le="0.5"} 1',
+        'test_render_seconds_bucket{node="NodeA",le="+Inf"} 1',
+        'test_render_seconds_sum{node="NodeA"} 0.25',
+        'test_render_seconds_count{node="NodeA"} 1'
+    ]
+    assert family(text, 'test_render_size') == [
+        '# HELP test_render_size Queue size',
+        '# TYPE test_render_size gauge',
+        'test_render_size{node="NodeA"} +Inf'
+    ]
+
+
+def test_broken_collector():
+    gauge = MetricsRegistry.gauge('test_broken_collector', 'Collected value')
+
+    def broken():
+        raise RuntimeError('broken')
+
+    def collector():
+        gauge.set(42)
+
+    MetricsRegistry.add_collector(broken)
+    MetricsRegistry.add_collector(collector)
+    try:
+        assert 'test_broken_collector 42\n' in MetricsRegistry.render()
+    finally:
+        MetricsRegistry.remove_collector(broken)
+        MetricsRegistry.remove_collector(collector)
+
+
+# =============================================================================
+# Metrics service
+# =============================================================================
+
+def test_endpoint(tmp_path, const_labels):
+    node = SimpleNamespace(name='NodeA', pool=None, apool=None, cpool=None, config={}, config_dir=str(tmp_path))
+    service = MetricsService(node)
+    cache = Cache('test_endpoint')
+    cache.set('key', 'value')
+    cache.get('key')
+    cache.get('other')
+
+    async def scenario():
+        MetricsRegistry.set_const_labels(node=node.name)
+        MetricsRegistry.add_collector(service.collect)
+        app = web.Application()
+        app.router.add_get('/metrics', service.scrape)
+        try:
+            async with TestClient(TestServer(app)) as client:
+                response = await client.get('/metrics')
+                assert response.status == 200
+                assert response.headers['Content-Type'] == CONTENT_TYPE
+                return await response.text()
+        finally:
+            MetricsRegistry.remove_collector(service.collect)
+
+    text = run(scenario())
+    assert family(text, 'dcssb_cache_hits_total')[:2] == [
+        '# HELP dcssb_cache_hits_total Cache hits',
+        '# TYPE dcssb_cache_hits_total counter'
+    ]
+    assert 'dcssb_cache_hits_total{node="NodeA",cache="test_endpoint"} 1' in text
+    assert 'dcssb_cache_misses_total{node="NodeA",cache="test_endpoint"} 1' in text
+    assert 'dcssb_cache_size{node="NodeA",cache="test_endpoint"} 1' in text
+    assert '# TYPE dcssb_asyncio_tasks gauge' in text
+    # every sample has the node label
+    assert all('node="NodeA"' in x for x in text.splitlines() if x and not x.startswith('#'))
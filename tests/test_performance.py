@@ -0,0 +1,72 @@
+"""
+Tests for the latency tracking of the event handlers (core/utils/performance.py).
+"""
+
+import asyncio
+import sys
+
+from pathlib import Path
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.utils.performance import LatencyTracker, PerformanceLog
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_budget_exceeded():
+    tracker = LatencyTracker(0.1, budgets={'Mission': 1.0, 'Mission:onPlayerStart': 0.01}, trace='none')
+    assert not tracker.record('Mission', 'onMissionLoadEnd', 0.5)
+    assert tracker.record('Mission', 'onPlayerStart', 0.5)
+    assert tracker.record('Admin', 'onPlayerStart', 0.5)
+    stats = tracker.summary('Mission', 'onPlayerStart')
+    assert stats.count == 1
+    assert stats.exceeded == 1
+    assert stats.budget == 0.01
+
+
+def test_single_profiler():
+    with PerformanceLog('outer', use_profiling=True) as outer:
+        with PerformanceLog('inner', use_profiling=True) as inner:
+            pass
+    assert outer.profiler
+    assert inner.profiler is None
+    # the lock is released again
+    with PerformanceLog('next', use_profiling=True) as log:
+        assert log.profiler
+
+
+def test_concurrent_profiles():
+    tracker = LatencyTracker(0.01, trace='profile')
+    keys = [('Mission', 'onPlayerStart'), ('Admin', 'onPlayerStart')]
+
+    async def handler(key: tuple[str, str]) -> str:
+        async with tracker.measure(*key):
+            await asyncio.sleep(0.05)
+        return key[0]
+
+    async def main():
+        for key in keys:
+            tracker._profile_next.add(key)
+        return await asyncio.gather(*(handler(key) for key in keys))
+
+    # both handlers run, even though only one of them can be profiled
+    assert run(main()) == ['Mission', 'Admin']
+    # both exceeded their budget, so both are profiled on their next call
+    assert tracker._profile_next == set(keys)
+
+    async def skipped():
+        tracker._profile_next.clear()
+        tracker._profile_next.add(keys[1])
+        with PerformanceLog('other', use_profiling=True):
+            async with tracker.measure(*keys[1]):
+                pass
+
+    tracker.budget = 1.0
+    run(skipped())
+    # the profile was skipped, so it is tried again on the next call
+    assert tracker._profile_next == {keys[1]}
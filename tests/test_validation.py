@@ -0,0 +1,172 @@
+"""
+Tests for the cached configuration validation.
+
+Every example configuration of the repository is validated without the cache (plain pykwalify), with the cache (miss
+and hit) and in parallel, and all of them have to come to the same result.
+"""
+
+import shutil
+import sys
+
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.commandline import COMMAND_LINE_ARGS
+from core.utils import validators
+
+from pykwalify.core import Core
+from pykwalify.errors import PyKwalifyException, SchemaError
+
+SAMPLES = PROJECT_ROOT / 'samples'
+PRESETS_SCHEMAS = ['schemas/presets_schema.yaml', 'extensions/realweather/schemas/realweather_schema.yaml']
+
+
+def _schemas(*paths: str) -> list[str]:
+    return sorted(str(x.relative_to(PROJECT_ROOT)) for path in paths for x in (PROJECT_ROOT / path).glob('*.yaml'))
+
+
+def _examples() -> list[tuple[str, list[str]]]:
+    examples = [
+        ('samples/main.yaml', ['schemas/main_schema.yaml']),
+        ('samples/nodes.yaml', ['schemas/nodes_schema.yaml'] + sorted(
+            str(x.relative_to(PROJECT_ROOT)) for x in (PROJECT_ROOT / 'extensions').rglob('*_schema.yaml'))),
+        ('samples/servers.yaml', ['schemas/servers_schema.yaml']),
+        ('samples/menus.yaml', ['schemas/menus_schema.yaml']),
+        ('samples/presets.yaml', PRESETS_SCHEMAS),
+        ('samples/presets_tournament.yaml', PRESETS_SCHEMAS),
+    ]
+    for file in sorted((SAMPLES / 'plugins').glob('*.yaml')):
+        schemas = _schemas(f'plugins/{file.stem}/schemas')
+        if schemas:
+            examples.append((f'samples/plugins/{file.name}', schemas + ['schemas/commands_schema.yaml']))
+    for file in sorted((SAMPLES / 'services').glob('*.yaml')):
+        schemas = _schemas(f'services/{file.stem}/schemas')
+        if schemas:
+            examples.append((f'samples/services/{file.name}', schemas))
+    return examples
+
+
+EXAMPLES = _examples()
+
+
+def _outcome(func, *args) -> str | None:
+    try:
+        func(*args)
+        return None
+    except PyKwalifyException as ex:
+        return f"{type(ex).__name__}: {ex.msg}"
+
+
+def _uncached(source_file: str, schema_files: list[str]):
+    Core(source_file=source_file, schema_files=schema_files, file_encoding='utf-8',
+         extensions=['core/utils/validators.py']).validate(raise_exception=True)
+
+
+def _cached(source_file: str, schema_files: list[str]):
+    validators.validate(source_file, schema_files, raise_exception=True)
+
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch):
+    monkeypatch.chdir(PROJECT_ROOT)
+    monkeypatch.setattr(COMMAND_LINE_ARGS, 'config', str(SAMPLES), raising=False)
+    monkeypatch.setattr(COMMAND_LINE_ARGS, 'node', 'Legion', raising=False)
+    validators._validation_cache().clear()
+    yield
+    validators._validation_cache().clear()
+
+
+# =============================================================================
+# Example configurations
+# =============================================================================
+
+def test_examples_found():
+    assert len(EXAMPLES) > 20
+
+
+@pytest.mark.parametrize('source_file,schema_files', EXAMPLES, ids=[x[0] for x in EXAMPLES])
+def test_cached_validation_is_identical(source_file, schema_files):
+    expected = _outcome(_uncached, source_file, schema_files)
+    cache = validators._validation_cache()
+
+    assert _outcome(_cached, source_file, schema_files) == expected
+    hits = cache.stats.hits
+    assert _outcome(_cached, source_file, schema_files) == expected
+    if expected is None:
+        assert cache.stats.hits == hits + 1
+    else:
+        # failed validations are never cached
+        assert cache.stats.hits == hits
+
+
+def test_parallel_validation_is_identical():
+    presets = [x for x, schemas in EXAMPLES if schemas == PRESETS_SCHEMAS]
+    expected = [_outcome(_uncached, x, PRESETS_SCHEMAS) for x in presets]
+    validators.validate_all(presets, PRESETS_SCHEMAS, raise_exception=not any(expected))
+    assert len(validators._validation_cache()) == expected.count(None)
+
+
+# =============================================================================
+# Invalidation
+# =============================================================================
+
+def test_changed_file_is_validated_again(tmp_path):
+    source_file = tmp_path / 'presets.yaml'
+    shutil.copy(SAMPLES / 'presets.yaml', source_file)
+    _cached(str(source_file), PRESETS_SCHEMAS)
+
+    source_file.write_text(source_file.read_text(encoding='utf-8') + '\nbroken: 4711\n', encoding='utf-8')
+    expected = _outcome(_uncached, str(source_file), PRESETS_SCHEMAS)
+    assert expected is not None
+    assert _outcome(_cached, str(source_file), PRESETS_SCHEMAS) == expected
+
+
+def test_changed_schema_is_validated_again(tmp_path):
+    source_file = tmp_path / 'test.yaml'
+    source_file.write_text('value: 1\n', encoding='utf-8')
+    schema_file = tmp_path / 'test_schema.yaml'
+    schema_file.write_text('type: map\nmapping:\n  value: {type: int}\n', encoding='utf-8')
+    _cached(str(source_file), [str(schema_file)])
+
+    schema_file.write_text('type: map\nmapping:\n  value: {type: str}\n', encoding='utf-8')
+    with pytest.raises(SchemaError):
+        _cached(str(source_file), [str(schema_file)])
+
+
+def test_removed_directory_is_checked_again(tmp_path):
+    directory = tmp_path / 'installation'
+    directory.mkdir()
+    source_file = tmp_path / 'test.yaml'
+    source_file.write_text(f'DEFAULT:\n  installation: "{directory.as_posix()}"\n', encoding='utf-8')
+    schema_file = tmp_path / 'test_schema.yaml'
+    schema_file.write_text(
+        'type: map\nmapping:\n  DEFAULT:\n    type: map\n    mapping:\n'
+        '      installation: {type: str, func: dir_exists}\n', encoding='utf-8')
+    hits = validators._validation_cache().stats.hits
+    _cached(str(source_file), [str(schema_file)])
+    _cached(str(source_file), [str(schema_file)])
+    assert validators._validation_cache().stats.hits == hits + 1
+
+    directory.rmdir()
+    with pytest.raises(SchemaError):
+        _cached(str(source_file), [str(schema_file)])
+
+
+def test_warnings_are_logged_again(tmp_path, caplog):
+    source_file = tmp_path / 'test.yaml'
+    source_file.write_text('DEFAULT:\n  old: 1\n', encoding='utf-8')
+    schema_file = tmp_path / 'test_schema.yaml'
+    schema_file.write_text(
+        'type: map\nmapping:\n  DEFAULT:\n    type: map\n    mapping:\n'
+        '      old: {type: int, func: obsolete}\n', encoding='utf-8')
+    hits = validators._validation_cache().stats.hits
+    for _ in range(2):
+        caplog.clear()
+        _cached(str(source_file), [str(schema_file)])
+        assert 'is obsolete' in caplog.text
+    assert validators._validation_cache().stats.hits == hits + 1